@@ -6,7 +6,6 @@ import json
 from typing import Tuple, List
 from algorithms.hga import HybridGeneticAlgorithm
 from utils.data_loader import load_destinations_from_csv
-from models.route import Route
 
 class TourismRouteRecommendationSystem:
     """
@@ -87,8 +86,7 @@ class TourismRouteRecommendationSystem:
         # Format hasil
         recommendations = []
         for i, chromosome in enumerate(best_chromosomes):
-            route = Route(user_location, chromosome.genes)
-            route_info = route.get_route_summary()
+            route_info = chromosome.get_route_summary()
             route_info['rank'] = i + 1
             recommendations.append(route_info)
         
@@ -4,8 +4,9 @@ Class untuk representasi kromosom dalam Genetic Algorithm
 from typing import List, Tuple
 import random
 from models.destination import Destination
+from algorithms.evaluation import RouteEvaluation, evaluate_route
 from models.route import Route
-from utils.penalty import calculate_total_penalty, apply_penalty_to_fitness, get_constraint_violation_info
+from utils.penalty import get_constraint_violation_info
 
 class Chromosome:
     """
@@ -33,6 +34,7 @@ class Chromosome:
         self.penalty_value = None
         self._total_distance = None
         self._total_time = None
+        self._evaluation: RouteEvaluation = None
     
     def calculate_fitness(self) -> float:
         """
@@ -43,33 +45,28 @@ class Chromosome:
         - Jarak maksimal: 20 km
         - Waktu tempuh maksimal: 5 jam (300 menit)
         
+        Jarak, waktu, penalty, dan feasibility dihitung sekaligus oleh kernel evaluasi
+        dan disimpan di kromosom untuk dipakai ulang (summary, response).
+        
         Returns:
             Nilai fitness (dengan penalty jika ada pelanggaran constraint)
         """
-        route = Route(
-            self.start_point, 
-            self.genes, 
-          )
-        
-        # Hitung total distance dan time
-        self._total_distance = route.calculate_total_distance()
-        self._total_time = route.calculate_total_travel_time()
-        
-        # Hitung base fitness (tanpa penalty)
-        if self._total_distance == 0:
-            base_fitness = float('inf')
-        else:
-            # Fitness berbanding terbalik dengan jarak (jarak pendek = fitness tinggi)
-            base_fitness = 1.0 / self._total_distance
-        
-        # Hitung penalty dari constraint violations
-        self.penalty_value = calculate_total_penalty(self._total_distance, self._total_time)
-        
-        # Terapkan penalty pada fitness
-        self.fitness_value = apply_penalty_to_fitness(base_fitness, self.penalty_value)
-        
+        self.set_evaluation(evaluate_route(self.genes, self.start_point))
         return self.fitness_value
     
+    def set_evaluation(self, evaluation: RouteEvaluation):
+        """
+        Menyimpan hasil evaluasi rute (dipakai juga oleh kernel evaluasi populasi)
+        
+        Args:
+            evaluation: Hasil evaluasi untuk genes kromosom ini
+        """
+        self._evaluation = evaluation
+        self._total_distance = evaluation.total_distance
+        self._total_time = evaluation.total_time
+        self.penalty_value = evaluation.penalty
+        self.fitness_value = evaluation.fitness
+    
     def get_fitness(self) -> float:
         """
         Mendapatkan nilai fitness (hitung jika belum ada)
@@ -87,14 +84,9 @@ class Chromosome:
         Returns:
             Total jarak dalam km
         """
-        if self._total_distance is not None:
-            return self._total_distance
-            
-        route = Route(
-            self.start_point, 
-            self.genes, 
-            )
-        return route.calculate_total_distance()
+        if self._total_distance is None:
+            self.calculate_fitness()
+        return self._total_distance
     
     def get_total_travel_time(self) -> float:
         """
@@ -103,14 +95,9 @@ class Chromosome:
         Returns:
             Total waktu tempuh dalam menit
         """
-        if self._total_time is not None:
-            return self._total_time
-            
-        route = Route(
-            self.start_point, 
-            self.genes, 
-            )
-        return route.calculate_total_travel_time()
+        if self._total_time is None:
+            self.calculate_fitness()
+        return self._total_time
     
     def get_penalty(self) -> float:
         """
@@ -143,8 +130,9 @@ class Chromosome:
         Returns:
             True jika tidak ada constraint yang dilanggar
         """
-        constraint_info = self.get_constraint_info()
-        return constraint_info['is_feasible']
+        if self._evaluation is None:
+            self.calculate_fitness()
+        return self._evaluation.is_feasible
     
     def is_valid(self) -> bool:
         """
@@ -160,6 +148,16 @@ class Chromosome:
           )
         return route.is_valid_route_order()
     
+    def get_route_summary(self) -> dict:
+        """
+        Mendapatkan ringkasan rute memakai jarak dan waktu yang sudah dihitung
+        
+        Returns:
+            Dictionary hasil Route.get_route_summary()
+        """
+        route = Route(self.start_point, self.genes)
+        return route.get_route_summary(self.get_total_distance(), self.get_total_travel_time())
+    
     def copy(self) -> 'Chromosome':
         """
         Membuat salinan kromosom
@@ -176,6 +174,7 @@ class Chromosome:
         new_chromosome.penalty_value = self.penalty_value
         new_chromosome._total_distance = self._total_distance
         new_chromosome._total_time = self._total_time
+        new_chromosome._evaluation = self._evaluation
         return new_chromosome
     
     def __repr__(self) -> str:
@@ -0,0 +1,354 @@
+"""
+Kernel evaluasi rute
+
+Jarak dan waktu tempuh antar destinasi disusun sekali menjadi matrix dense yang
+diindeks dengan index baris DestinationTable, dan leg dari titik awal disimpan
+sebagai vektor per titik awal. Evaluasi satu rute (jarak, waktu, penalty, fitness,
+feasibility) cukup satu kali loop atas index gen tanpa membuat objek Route atau
+tuple koordinat.
+
+Nilai yang dihasilkan sama dengan Route.calculate_total_distance() dan
+Route.calculate_total_travel_time() (urutan penjumlahan sama).
+"""
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+import utils.distance as distance_module
+from models.destination import Destination
+from models.destination_table import DestinationTable
+from utils.distance import calculate_distance, haversine_many, distance_matrix_for
+from utils.penalty import calculate_total_penalty, apply_penalty_to_fitness, is_within_constraints
+from utils.matrix_store import get_distance_cache, get_travel_time_cache
+from utils.data_plane import SharedPairMatrix
+
+# Jumlah titik awal yang vektor leg-nya disimpan per tabel
+START_LEG_CACHE_SIZE = 256
+
+# Jumlah pasangan (tabel, profil OSRM) yang matrix dense-nya disimpan
+DENSE_MATRIX_CACHE_SIZE = 4
+
+# Jumlah sel matrix dense / vektor titik awal yang diisi per sumber saat dibangun
+# (di-flush ke utils.metrics saat scrape; bukan lookup per evaluasi)
+_fill_stats = {
+    'matrix': 0,
+    'haversine': 0
+}
+
+
+def drain_fill_stats() -> Dict[str, int]:
+    """
+    Mengambil jumlah sel yang diisi per sumber sejak pemanggilan terakhir lalu me-reset-nya
+
+    Returns:
+        Dictionary {source: jumlah sel}
+    """
+    drained = {}
+    for source in _fill_stats:
+        drained[source] = _fill_stats[source]
+        _fill_stats[source] = 0
+    return drained
+
+
+class RouteEvaluation:
+    """
+    Hasil evaluasi satu rute
+
+    Attributes:
+        total_distance: Total jarak (km)
+        total_time: Total waktu tempuh (menit)
+        penalty: Total penalty constraint
+        fitness: Fitness setelah penalty
+        is_feasible: True jika memenuhi constraint jarak dan waktu
+    """
+
+    __slots__ = ('total_distance', 'total_time', 'penalty', 'fitness', 'is_feasible')
+
+    def __init__(self, total_distance: float, total_time: float):
+        self.total_distance = total_distance
+        self.total_time = total_time
+
+        base_fitness = float('inf') if total_distance == 0 else 1.0 / total_distance
+        self.penalty = calculate_total_penalty(total_distance, total_time)
+        self.fitness = apply_penalty_to_fitness(base_fitness, self.penalty)
+        self.is_feasible = is_within_constraints(total_distance, total_time)
+
+    def __repr__(self) -> str:
+        return (f"RouteEvaluation(distance={self.total_distance:.2f}km, time={self.total_time:.1f}min, "
+                f"fitness={self.fitness:.6f}, feasible={self.is_feasible})")
+
+
+def _coordinate_key(latitude: float, longitude: float) -> str:
+    # Format koordinat yang sama dengan key DistanceMatrixCache / TravelTimeMatrixCache
+    return f"{latitude:.6f},{longitude:.6f}"
+
+
+def _fill_from_pair_keys(target: np.ndarray, pair_items, positions: Dict[str, List[int]], value_of) -> int:
+    """Isi matrix dari dict {"lat,lon|lat,lon": value}; return jumlah pasangan yang terisi"""
+    filled = 0
+    for key, value in pair_items:
+        first, _, second = key.partition('|')
+        rows = positions.get(first)
+        cols = positions.get(second)
+        if rows is None or cols is None:
+            continue
+        value = value_of(value)
+        if value is None:
+            continue
+        for i in rows:
+            for j in cols:
+                target[i, j] = value
+                target[j, i] = value
+                filled += 1
+    return filled
+
+
+def _fill_from_matrix(target: np.ndarray, matrix, keys: List[str], positions: Dict[str, List[int]], value_of) -> int:
+    """Isi matrix dense dari dict matrix, atau langsung dari array jika matrix dari data plane"""
+    if isinstance(matrix, SharedPairMatrix):
+        return matrix.fill_dense(target, keys)
+    return _fill_from_pair_keys(target, matrix.items(), positions, value_of)
+
+
+class DenseMatrices:
+    """
+    Matrix jarak dan waktu tempuh dense untuk satu DestinationTable
+
+    Jika distance matrix (OSRM) tersedia atau OSRM real-time nonaktif, matrix jarak diisi
+    penuh saat dibangun: pasangan yang ada di matrix memakai nilai tersebut, sisanya
+    Haversine (sama dengan calculate_distance). Jika tidak, sel diisi lazily dengan
+    calculate_distance saat pertama kali dibutuhkan (NaN = belum dihitung).
+
+    Waktu tempuh yang tidak ada di travel time matrix bernilai 0 (sama dengan
+    Route.calculate_total_travel_time yang melewati leg tanpa data).
+    """
+
+    def __init__(self, table: DestinationTable, profile: str = None):
+        self.table = table
+        self.profile = profile or distance_module.current_profile()
+        size = len(table)
+        self._keys = [_coordinate_key(lat, lon) for lat, lon in zip(table.latitude.tolist(), table.longitude.tolist())]
+        positions: Dict[str, List[int]] = {}
+        for index, key in enumerate(self._keys):
+            positions.setdefault(key, []).append(index)
+
+        # Matrix jarak
+        self.distance = np.full((size, size), np.nan)
+        matrix = get_distance_cache(self.profile) if distance_module.USE_DISTANCE_MATRIX else None
+        self._distance_matrix = matrix
+        # Tanpa matrix dan tanpa OSRM, calculate_distance selalu Haversine sehingga bisa diisi penuh
+        self.complete = matrix is not None or not distance_module.USE_OSRM
+        if self.complete:
+            hits = _fill_from_matrix(self.distance, matrix.matrix, self._keys, positions, lambda value: value) if matrix else 0
+            missing = np.isnan(self.distance)
+            misses = int(np.triu(missing, 1).sum())
+            if misses:
+                fallback = distance_matrix_for(np.column_stack((table.latitude, table.longitude)))
+                self.distance[missing] = fallback[missing]
+            _fill_stats['matrix'] += hits
+            _fill_stats['haversine'] += misses
+        np.fill_diagonal(self.distance, 0.0)
+
+        # Matrix waktu tempuh
+        self._travel_time_cache = get_travel_time_cache(self.profile)
+        self.travel_time = np.zeros((size, size))
+        _fill_from_matrix(
+            self.travel_time, self._travel_time_cache.matrix, self._keys, positions,
+            lambda value: value.get('duration') if value else None
+        )
+
+        # Salinan list untuk akses skalar cepat di kernel Python
+        self._distance_rows = self.distance.tolist()
+        self._time_rows = self.travel_time.tolist()
+        self._start_legs: "OrderedDict[Tuple[float, float], Tuple[List[float], List[float]]]" = OrderedDict()
+
+    def leg_distance(self, i: int, j: int) -> float:
+        """Jarak destinasi i -> j (mengisi sel jika belum dihitung)"""
+        value = self._distance_rows[i][j]
+        if value != value:
+            table = self.table
+            value = calculate_distance(
+                table.latitude.item(i), table.longitude.item(i),
+                table.latitude.item(j), table.longitude.item(j)
+            )
+            self._distance_rows[i][j] = value
+            self.distance[i, j] = value
+        return value
+
+    def _start_distances(self, start_point: Tuple[float, float]) -> List[float]:
+        """Jarak titik awal ke semua destinasi: Haversine vektor, ditimpa nilai distance matrix jika ada"""
+        table = self.table
+        distances = haversine_many(start_point[0], start_point[1], table.latitude, table.longitude).tolist()
+        matrix = self._distance_matrix
+        hits = 0
+        if matrix is not None:
+            start = (start_point[0], start_point[1])
+            start_key = _coordinate_key(*start)
+            coordinates = zip(table.latitude.tolist(), table.longitude.tolist())
+            for index, (key, coordinate) in enumerate(zip(self._keys, coordinates)):
+                if coordinate == start:
+                    # Koordinat sama persis dengan destinasi: calculate_distance mengembalikan 0
+                    continue
+                # Urutan key mengikuti DistanceMatrixCache._make_key (sorted tuple koordinat)
+                pair_key = f"{start_key}|{key}" if start < coordinate else f"{key}|{start_key}"
+                value = matrix.matrix.get(pair_key)
+                if value is not None:
+                    distances[index] = value
+                    hits += 1
+        _fill_stats['matrix'] += hits
+        _fill_stats['haversine'] += len(distances) - hits
+        return distances
+
+    def start_legs(self, start_point: Tuple[float, float]) -> Tuple[List[float], List[float]]:
+        """
+        Vektor jarak dan waktu dari titik awal ke setiap destinasi
+
+        Returns:
+            Tuple (list jarak km, list waktu menit) dengan panjang = jumlah destinasi
+        """
+        start_point = (start_point[0], start_point[1])
+        legs = self._start_legs.get(start_point)
+        if legs is not None:
+            self._start_legs.move_to_end(start_point)
+            return legs
+
+        latitudes = self.table.latitude.tolist()
+        longitudes = self.table.longitude.tolist()
+        if self.complete:
+            distances = self._start_distances(start_point)
+        else:
+            distances = [
+                calculate_distance(start_point[0], start_point[1], lat, lon)
+                for lat, lon in zip(latitudes, longitudes)
+            ]
+        times = []
+        travel_time_cache = self._travel_time_cache
+        for lat, lon in zip(latitudes, longitudes):
+            travel_time = travel_time_cache.get_duration(start_point, (lat, lon))
+            times.append(travel_time if travel_time is not None else 0.0)
+
+        legs = (distances, times)
+        self._start_legs[start_point] = legs
+        while len(self._start_legs) > START_LEG_CACHE_SIZE:
+            self._start_legs.popitem(last=False)
+        return legs
+
+    def route_totals(self, gene_indices: Sequence[int], start_point: Tuple[float, float]) -> Tuple[float, float]:
+        """
+        Total jarak dan waktu tempuh satu rute dalam satu loop
+
+        Args:
+            gene_indices: Index baris destinasi sesuai urutan kunjungan
+            start_point: Koordinat titik awal
+
+        Returns:
+            Tuple (total jarak km, total waktu menit)
+        """
+        if not gene_indices:
+            return 0.0, 0.0
+
+        start_distances, start_times = self.start_legs(start_point)
+        distance_rows = self._distance_rows
+        time_rows = self._time_rows
+
+        previous = gene_indices[0]
+        total_distance = 0.0 + start_distances[previous]
+        total_time = 0.0 + start_times[previous]
+        for current in gene_indices[1:]:
+            leg = distance_rows[previous][current]
+            if leg != leg:
+                leg = self.leg_distance(previous, current)
+            total_distance += leg
+            total_time += time_rows[previous][current]
+            previous = current
+        return total_distance, total_time
+
+    def route_distance(self, gene_indices: Sequence[int], start_point: Tuple[float, float]) -> float:
+        """Total jarak satu rute (dipakai 2-Opt)"""
+        return self.route_totals(gene_indices, start_point)[0]
+
+
+# Cache matrix dense per tabel dan profil: (id(table), profile) -> (settings, DenseMatrices)
+_dense_matrices: "OrderedDict[Tuple[int, str], Tuple[Tuple, DenseMatrices]]" = OrderedDict()
+
+
+def _matrix_settings(profile: str) -> Tuple:
+    """Pengaturan yang mempengaruhi isi matrix; perubahan memicu build ulang"""
+    matrix = get_distance_cache(profile) if distance_module.USE_DISTANCE_MATRIX else None
+    matrix_state = (id(matrix.matrix), len(matrix.matrix)) if matrix else None
+    travel_time_cache = get_travel_time_cache(profile)
+    return (
+        distance_module.USE_DISTANCE_MATRIX,
+        distance_module.USE_OSRM,
+        matrix_state,
+        id(travel_time_cache.matrix),
+        len(travel_time_cache.matrix)
+    )
+
+
+def get_dense_matrices(table: DestinationTable) -> DenseMatrices:
+    """
+    Mendapatkan matrix dense untuk tabel dan profil OSRM aktif
+    (dibangun ulang jika pengaturan jarak berubah)
+
+    Args:
+        table: DestinationTable
+
+    Returns:
+        DenseMatrices
+    """
+    profile = distance_module.current_profile()
+    cache_key = (id(table), profile)
+    entry = _dense_matrices.get(cache_key)
+    if entry is not None and entry[1].table is table:
+        settings, matrices = entry
+        if settings == _matrix_settings(profile):
+            _dense_matrices.move_to_end(cache_key)
+            return matrices
+
+    matrices = DenseMatrices(table, profile)
+    # Settings diambil setelah build karena build dapat memuat matrix dari file
+    _dense_matrices[cache_key] = (_matrix_settings(profile), matrices)
+    while len(_dense_matrices) > DENSE_MATRIX_CACHE_SIZE:
+        _dense_matrices.popitem(last=False)
+    return matrices
+
+
+def evaluate_route(genes: Sequence[Destination], start_point: Tuple[float, float]) -> RouteEvaluation:
+    """
+    Evaluasi lengkap satu rute: jarak, waktu, penalty, fitness, dan feasibility
+
+    Args:
+        genes: List destinasi sesuai urutan kunjungan
+        start_point: Koordinat titik awal
+
+    Returns:
+        RouteEvaluation
+    """
+    if not genes:
+        return RouteEvaluation(0.0, 0.0)
+    matrices = get_dense_matrices(genes[0].table)
+    return RouteEvaluation(*matrices.route_totals([gene.index for gene in genes], start_point))
+
+
+def route_distance(genes: Sequence[Destination], start_point: Tuple[float, float]) -> float:
+    """
+    Total jarak satu rute
+
+    Args:
+        genes: List destinasi sesuai urutan kunjungan
+        start_point: Koordinat titik awal
+
+    Returns:
+        Total jarak dalam km
+    """
+    if not genes:
+        return 0.0
+    matrices = get_dense_matrices(genes[0].table)
+    return matrices.route_distance([gene.index for gene in genes], start_point)
+
+
+def clear_dense_matrices():
+    """Membuang semua matrix dense (dipanggil saat data/matrix di-reload)"""
+    _dense_matrices.clear()
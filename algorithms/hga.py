@@ -2,13 +2,30 @@
 Hybrid Genetic Algorithm (HGA) untuk optimasi rute wisata
 Menggabungkan Genetic Algorithm dengan 2-Opt local search
 """
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import random
+import weakref
 from algorithms.chromosome import Chromosome
+from algorithms.kernels import IndexKernels, resolve_backend
+from algorithms.local_search import LOCAL_SEARCH_METHODS, CategoryLocalSearch
 from algorithms.population import Population
 from algorithms.operators import GAOperators
 from algorithms.two_opt import TwoOptOptimizer
 from models.destination import Destination
+from utils.data_loader import group_destinations_by_category
+from utils.metrics import ROUTE_STAGE_DURATION
+
+# Histogram per tahap HGA (lihat utils.metrics)
+_POPULATION_INIT_STAGE = ROUTE_STAGE_DURATION.labels(stage="population_init")
+_FITNESS_EVALUATION_STAGE = ROUTE_STAGE_DURATION.labels(stage="fitness_evaluation")
+_TWO_OPT_STAGE = ROUTE_STAGE_DURATION.labels(stage="two_opt")
+
+# Instance HGA yang masih hidup (weak reference, untuk laporan memory history)
+_live_instances = weakref.WeakSet()
+
+def live_instances() -> List["HybridGeneticAlgorithm"]:
+    """Instance HGA yang masih direferensikan (dipakai utils.memory_report)"""
+    return list(_live_instances)
 
 class HybridGeneticAlgorithm:
     
@@ -20,7 +37,13 @@ class HybridGeneticAlgorithm:
                  elitism_count: int = 2,
                  tournament_size: int = 3,
                  use_2opt: bool = True,
-                 two_opt_iterations: int = 500):
+                 two_opt_iterations: int = 500,
+                 backend: str = None,
+                 seed: Optional[int] = None,
+                 rng: Optional[random.Random] = None,
+                 local_search: str = 'swap',
+                 local_search_policy: str = 'first',
+                 dont_look_bits: bool = False):
         
         self.population_size = population_size
         self.generations = generations
@@ -29,37 +52,67 @@ class HybridGeneticAlgorithm:
         self.elitism_count = elitism_count
         self.tournament_size = tournament_size
         self.use_2opt = use_2opt
+        self.two_opt_iterations = two_opt_iterations
+        # Local search offspring: 'swap' (TwoOptOptimizer) atau 'category' (CategoryLocalSearch)
+        if local_search not in LOCAL_SEARCH_METHODS:
+            raise ValueError(f"Invalid local search. Must be one of: {list(LOCAL_SEARCH_METHODS)}")
+        self.local_search = local_search
+        self.local_search_policy = local_search_policy
+        # Don't-look bits untuk swap 2-Opt (policy 'first' tanpa bits = scan ulang seperti dulu)
+        self.dont_look_bits = dont_look_bits
+        # Backend kernel: 'python', 'numba', atau 'auto' (default dari HGA_BACKEND)
+        self.backend = resolve_backend(backend)
+        # Stream random milik instance ini: rng dari pemanggil, random.Random(seed),
+        # atau modul random global jika keduanya kosong (perilaku lama, ikut random.seed())
+        self.seed = seed
+        self.rng = rng or (random.Random(seed) if seed is not None else random)
         
         # Inisialisasi operator dan optimizer
         self.operators = GAOperators()
-        self.two_opt = TwoOptOptimizer(max_iterations=two_opt_iterations)
+        self.two_opt = TwoOptOptimizer(
+            max_iterations=two_opt_iterations,
+            policy=local_search_policy,
+            dont_look_bits=dont_look_bits
+        )
+        # Langkah local search category yang dinilai/diterapkan (total semua rute satu run)
+        self.category_search_moves = {'evaluated': 0, 'applied': 0}
         
         # Tracking evolusi
         self.best_fitness_history = []
         self.average_fitness_history = []
         self.best_solution = None
+        _live_instances.add(self)
     
     def run(self, 
             destinations: List[Destination],
             start_point: Tuple[float, float],
-            num_solutions: int = 3) -> List[Chromosome]:
+            num_solutions: int = 3,
+            grouped_destinations: Dict = None) -> List[Chromosome]:
         """
         Menjalankan HGA untuk menemukan solusi rute optimal
         
         Args:
             destinations: List semua destinasi yang tersedia
             start_point: Koordinat titik awal
-            end_point: Koordinat titik akhir
             num_solutions: Jumlah solusi terbaik yang dikembalikan
+            grouped_destinations: Destinasi yang sudah dikelompokkan per kategori
+                                  (opsional, dipakai ulang antar request)
             
         Returns:
             List kromosom (solusi) terbaik
         """
+        # Pengelompokan kategori cukup dihitung sekali per run (bukan per generasi)
+        if grouped_destinations is None:
+            grouped_destinations = group_destinations_by_category(destinations)
+        
         print("=== Memulai Hybrid Genetic Algorithm ===")
         print(f"Populasi: {self.population_size}, Generasi: {self.generations}")
         print(f"Crossover Rate: {self.crossover_rate}, Mutation Rate: {self.mutation_rate}")
-        print(f"Elitism: {self.elitism_count}, 2-Opt: {self.use_2opt}\n")
+        print(f"Elitism: {self.elitism_count}, 2-Opt: {self.use_2opt} ({self.local_search}), "
+              f"Backend: {self.backend}, Seed: {self.seed}\n")
 
+        self.two_opt.reset_stats()
+        self.category_search_moves = {'evaluated': 0, 'applied': 0}
         bestRoutes = []
         for numRoute in range(num_solutions):
             print(f" Mencari Rute Terbaik ke-{numRoute + 1} ")
@@ -67,13 +120,18 @@ class HybridGeneticAlgorithm:
             self.best_solution = None
             self.best_fitness_history = []
             self.average_fitness_history = []
+            kernels = self._create_kernels(destinations, start_point)
+            local_search = self._create_local_search(destinations, start_point)
             # 1. Inisialisasi populasi awal
             print("Tahap 1: Inisialisasi populasi...")
             population = Population(population_size=self.population_size)
-            population.initialize_random_population(
-                destinations,
-                start_point,
-            )
+            with _POPULATION_INIT_STAGE.time():
+                population.initialize_random_population(
+                    destinations,
+                    start_point,
+                    grouped_destinations,
+                    rng=self.rng,
+                )
             
             # # Validasi populasi awal - pastikan tidak ada duplikat
             # for i, chrom in enumerate(population.chromosomes):
@@ -81,7 +139,8 @@ class HybridGeneticAlgorithm:
             #         place_ids = [gene.place_id for gene in chrom.genes]
             #         print(f"WARNING: Kromosom {i} dalam populasi awal memiliki duplikat place_ids: {place_ids}")
             
-            population.evaluate_fitness()
+            with _FITNESS_EVALUATION_STAGE.time():
+                self._evaluate(population, kernels)
             
             best_initial = population.get_best_chromosome()
             print(f"Populasi awal - Best distance: {best_initial.get_total_distance():.2f} km, "
@@ -91,7 +150,8 @@ class HybridGeneticAlgorithm:
             print("Tahap 2: Evolusi melalui generasi...")
             for generation in range(self.generations):
                 # 3. Evaluasi fitness
-                population.evaluate_fitness()
+                with _FITNESS_EVALUATION_STAGE.time():
+                    self._evaluate(population, kernels)
                 population.sort_by_fitness()
                 
                 # Track best solution
@@ -115,7 +175,7 @@ class HybridGeneticAlgorithm:
                 
                 # 8. Generasi populasi baru
                 # new_population = self._create_new_generation(population)
-                new_population = self._create_new_generation_modified(population, destinations, start_point)
+                new_population = self._create_new_generation_modified(population, destinations, start_point, grouped_destinations, kernels, local_search)
                 population = new_population
 
             print(f"\n=== HGA ke-{numRoute + 1} Selesai ===")
@@ -123,8 +183,14 @@ class HybridGeneticAlgorithm:
             print(f"Solusi terbaik: {self.best_solution.get_total_distance():.2f} km, "
                   f"Waktu: {self.best_solution.get_total_travel_time():.1f} min [{feasible_status}]\n")
             
+            if local_search is not None:
+                self.category_search_moves['evaluated'] += local_search.stats['evaluated']
+                self.category_search_moves['applied'] += sum(
+                    local_search.stats[kind] for kind in ('replace', 'swap', 'relocate')
+                )
+            
             # Simpan final population untuk visualisasi
-            population.evaluate_fitness()
+            self._evaluate(population, kernels)
             population.sort_by_fitness()
             self.final_population = population
             
@@ -218,12 +284,54 @@ class HybridGeneticAlgorithm:
         
     #     return Population(chromosomes=new_chromosomes, population_size=self.population_size)
 
-    def _create_new_generation_modified(self, population: Population, destinations: List[Destination], start_point: Tuple[float, float]) -> Population:
+    def _create_kernels(self, destinations: List[Destination], start_point: Tuple[float, float]) -> Optional[IndexKernels]:
+        """
+        Menyiapkan kernel index array jika backend 'numba' aktif
+        
+        Returns:
+            IndexKernels, atau None untuk jalur Python (backend 'python' atau matrix jarak
+            belum lengkap karena OSRM real-time aktif tanpa distance matrix)
+        """
+        if self.backend != 'numba' or not destinations:
+            return None
+        kernels = IndexKernels(destinations[0].table, start_point)
+        if not kernels.complete:
+            print("⚠ Distance matrix tidak lengkap, kernel HGA memakai jalur Python")
+            return None
+        return kernels
+    
+    def _create_local_search(self, destinations: List[Destination], start_point: Tuple[float, float]) -> Optional[CategoryLocalSearch]:
+        """
+        Menyiapkan CategoryLocalSearch jika local_search 'category' aktif
+        
+        Returns:
+            CategoryLocalSearch, atau None untuk local search swap
+        """
+        if not self.use_2opt or self.local_search != 'category' or not destinations:
+            return None
+        return CategoryLocalSearch(
+            destinations, start_point,
+            max_iterations=self.two_opt_iterations,
+            policy=self.local_search_policy
+        )
+    
+    def _evaluate(self, population: Population, kernels: Optional[IndexKernels]):
+        if kernels is not None:
+            kernels.evaluate(population.chromosomes)
+        else:
+            population.evaluate_fitness()
+
+    def _create_new_generation_modified(self, population: Population, destinations: List[Destination], start_point: Tuple[float, float], grouped_destinations: Dict = None, kernels: Optional[IndexKernels] = None, local_search: Optional[CategoryLocalSearch] = None) -> Population:
         """
         Membuat generasi baru dengan satu offspring hasil evolusi, sisanya random population.
         
         Args:
             population: Populasi saat ini
+            destinations: List semua destinasi yang tersedia
+            start_point: Koordinat titik awal
+            grouped_destinations: Destinasi yang sudah dikelompokkan per kategori
+            kernels: Kernel index array (backend 'numba'), None untuk jalur Python
+            local_search: CategoryLocalSearch (local_search 'category'), None untuk swap
             
         Returns:
             Populasi generasi baru
@@ -235,27 +343,41 @@ class HybridGeneticAlgorithm:
         new_chromosomes.extend([c.copy() for c in elite_chromosomes])
 
         # Hanya satu offspring hasil evolusi
-        parent1 = self.operators.tournament_selection(
-            population.chromosomes, self.tournament_size
-        )
-        parent2 = self.operators.tournament_selection(
-            population.chromosomes, self.tournament_size
-        )
-        parent3 = self.operators.tournament_selection(
-            population.chromosomes, self.tournament_size
-        )
-        parent4 = self.operators.tournament_selection(
-            population.chromosomes, self.tournament_size
-        )
+        if kernels is not None:
+            parent1, parent2, parent3, parent4 = kernels.tournament_selection(
+                population.chromosomes, self.tournament_size, count=4, rng=self.rng
+            )
+        else:
+            parent1 = self.operators.tournament_selection(
+                population.chromosomes, self.tournament_size, rng=self.rng
+            )
+            parent2 = self.operators.tournament_selection(
+                population.chromosomes, self.tournament_size, rng=self.rng
+            )
+            parent3 = self.operators.tournament_selection(
+                population.chromosomes, self.tournament_size, rng=self.rng
+            )
+            parent4 = self.operators.tournament_selection(
+                population.chromosomes, self.tournament_size, rng=self.rng
+            )
 
-        if random.random() < self.crossover_rate:
-            offspring, _ = self.operators.order_crossover_modified(parent1, parent2, parent3, parent4)
+        if self.rng.random() < self.crossover_rate:
+            offspring, _ = self.operators.order_crossover_modified(parent1, parent2, parent3, parent4, rng=self.rng)
         else:
             offspring = parent1.copy()
 
-        offspring = self.operators.swap_mutation(offspring, self.mutation_rate)
+        if kernels is not None:
+            offspring = kernels.swap_mutation(offspring, self.mutation_rate, rng=self.rng)
+        else:
+            offspring = self.operators.swap_mutation(offspring, self.mutation_rate, rng=self.rng)
         if self.use_2opt:
-            offspring = self.two_opt.optimize_with_constraints(offspring)
+            with _TWO_OPT_STAGE.time():
+                if local_search is not None:
+                    offspring = local_search.optimize(offspring)
+                elif kernels is not None and self.two_opt.legacy_mode:
+                    offspring = kernels.swap_local_search(offspring, self.two_opt_iterations)
+                else:
+                    offspring = self.two_opt.optimize_with_constraints(offspring)
 
         new_chromosomes.append(offspring)
 
@@ -267,8 +389,10 @@ class HybridGeneticAlgorithm:
             start_point = start_point
 
             temp_population = Population(population_size=remaining)
-            temp_population.initialize_random_population(destinations, start_point)
-            temp_population.evaluate_fitness()
+            with _POPULATION_INIT_STAGE.time():
+                temp_population.initialize_random_population(destinations, start_point, grouped_destinations, rng=self.rng)
+            with _FITNESS_EVALUATION_STAGE.time():
+                self._evaluate(temp_population, kernels)
             new_chromosomes.extend(temp_population.chromosomes)
 
         # Batasi ukuran populasi
@@ -364,5 +488,27 @@ class HybridGeneticAlgorithm:
             'average_fitness_history': self.average_fitness_history,
             'best_distance_history': best_distance_history,
             'best_distance': self.best_solution.get_total_distance() if self.best_solution else None,
-            'best_solution': self.best_solution
+            'best_solution': self.best_solution,
+            'local_search_moves': self.get_local_search_moves(),
+            'final_population_valid_routes': self._final_valid_routes()
         }
+
+    def _final_valid_routes(self) -> Optional[int]:
+        """Jumlah kromosom dengan urutan kategori valid di populasi akhir (None sebelum run)"""
+        population = getattr(self, 'final_population', None)
+        if population is None:
+            return None
+        return int(population.valid_route_mask().sum())
+    
+    def get_local_search_moves(self) -> Dict[str, int]:
+        """
+        Jumlah langkah local search yang dinilai dan diterapkan pada run terakhir
+        
+        Kernel swap numba (backend 'numba' tanpa opsi 2-Opt baru) tidak menghitung langkah.
+        
+        Returns:
+            Dictionary {'evaluated': int, 'applied': int}
+        """
+        if self.local_search == 'category':
+            return dict(self.category_search_moves)
+        return dict(self.two_opt.stats)
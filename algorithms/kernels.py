@@ -0,0 +1,240 @@
+"""
+Kernel HGA berbasis index array dengan backend JIT opsional (Numba)
+
+Backend dipilih saat runtime:
+- 'python' (default): jalur Python biasa (Chromosome, GAOperators, TwoOptOptimizer)
+- 'numba': evaluasi populasi, local search swap, swap mutation, dan tournament
+  selection dijalankan sebagai kernel atas index baris DestinationTable yang
+  dikompilasi dengan Numba
+- 'auto': 'numba' jika terpasang, selain itu 'python'
+
+Jika Numba tidak terpasang, 'numba' otomatis kembali ke 'python'. Bilangan acak tetap
+diambil dari modul random dengan urutan yang sama seperti jalur Python, dan
+penjumlahan jarak memakai urutan yang sama, sehingga kedua backend menghasilkan
+rute yang identik untuk seed yang sama.
+"""
+import os
+import random
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from algorithms.chromosome import Chromosome
+from algorithms.evaluation import RouteEvaluation, get_dense_matrices
+from algorithms.operators import SWAP_GROUPS
+from models.category import SLOT_GROUPS
+from models.destination_table import DestinationTable
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+BACKENDS = ('python', 'numba', 'auto')
+
+# Backend default, bisa diubah lewat environment variable HGA_BACKEND
+DEFAULT_BACKEND = os.environ.get('HGA_BACKEND', 'python')
+
+
+def _jit(function):
+    """Kompilasi dengan numba.njit jika tersedia, selain itu fungsi Python apa adanya"""
+    if NUMBA_AVAILABLE:
+        return numba.njit(cache=True)(function)
+    return function
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """
+    Menentukan backend yang benar-benar dipakai
+
+    Args:
+        backend: 'python', 'numba', 'auto', atau None (pakai DEFAULT_BACKEND)
+
+    Returns:
+        'python' atau 'numba'
+    """
+    backend = (backend or DEFAULT_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend HGA tidak dikenal: {backend} (pilihan: {', '.join(BACKENDS)})")
+    if backend == 'python':
+        return 'python'
+    if not NUMBA_AVAILABLE:
+        if backend == 'numba':
+            print("⚠ Numba tidak terpasang, backend HGA kembali ke 'python'")
+        return 'python'
+    return 'numba'
+
+
+# =============================================================================
+# KERNELS (kode Python yang kompatibel dengan Numba nopython mode)
+# =============================================================================
+
+@_jit
+def _route_distance(route, start_distances, distance):
+    previous = route[0]
+    total_distance = 0.0 + start_distances[previous]
+    for k in range(1, route.shape[0]):
+        current = route[k]
+        total_distance += distance[previous, current]
+        previous = current
+    return total_distance
+
+
+@_jit
+def population_totals(routes, start_distances, start_times, distance, travel_time):
+    """Total jarak dan waktu untuk setiap baris routes (populasi x panjang rute)"""
+    count = routes.shape[0]
+    length = routes.shape[1]
+    distances = np.zeros(count)
+    times = np.zeros(count)
+    for r in range(count):
+        previous = routes[r, 0]
+        total_distance = 0.0 + start_distances[previous]
+        total_time = 0.0 + start_times[previous]
+        for k in range(1, length):
+            current = routes[r, k]
+            total_distance += distance[previous, current]
+            total_time += travel_time[previous, current]
+            previous = current
+        distances[r] = total_distance
+        times[r] = total_time
+    return distances, times
+
+
+@_jit
+def swap_local_search(route, start_distances, distance, swap_pairs, max_iterations):
+    """
+    Local search first-improvement dengan menukar gen dalam grup slot yang sama
+
+    Urutan pasangan swap sama dengan TwoOptOptimizer.optimize_with_constraints.
+    """
+    current = route.copy()
+    current_distance = _route_distance(current, start_distances, distance)
+    improved = True
+    iteration = 0
+    while improved and iteration < max_iterations:
+        improved = False
+        iteration += 1
+        for p in range(swap_pairs.shape[0]):
+            i = swap_pairs[p, 0]
+            j = swap_pairs[p, 1]
+            gene = current[i]
+            current[i] = current[j]
+            current[j] = gene
+            new_distance = _route_distance(current, start_distances, distance)
+            if new_distance < current_distance:
+                current_distance = new_distance
+                improved = True
+                break
+            # Kembalikan swap
+            gene = current[i]
+            current[i] = current[j]
+            current[j] = gene
+    return current, current_distance
+
+
+@_jit
+def swap_genes(route, position1, position2):
+    """Salinan route dengan dua posisi ditukar"""
+    mutated = route.copy()
+    gene = mutated[position1]
+    mutated[position1] = mutated[position2]
+    mutated[position2] = gene
+    return mutated
+
+
+@_jit
+def tournament_winners(fitness, samples):
+    """Index pemenang untuk setiap baris samples (tournament x ukuran tournament)"""
+    winners = np.empty(samples.shape[0], np.int64)
+    for t in range(samples.shape[0]):
+        best = samples[t, 0]
+        for c in range(1, samples.shape[1]):
+            candidate = samples[t, c]
+            if fitness[candidate] > fitness[best]:
+                best = candidate
+        winners[t] = best
+    return winners
+
+
+def _swap_pairs() -> np.ndarray:
+    pairs = []
+    for positions in SLOT_GROUPS.values():
+        for i in range(len(positions)):
+            for j in range(i + 1, len(positions)):
+                pairs.append((positions[i], positions[j]))
+    return np.array(pairs, dtype=np.int64)
+
+
+# Pasangan posisi swap dalam grup slot, urutan sama dengan optimize_with_constraints
+SWAP_PAIRS = _swap_pairs()
+
+
+class IndexKernels:
+    """
+    Operasi HGA atas index array untuk satu tabel destinasi dan satu titik awal
+
+    Dipakai HybridGeneticAlgorithm jika backend 'numba' aktif. Semua method menerima
+    dan mengembalikan Chromosome sehingga sisa algoritma (crossover, elitism) tidak
+    perlu tahu backend mana yang dipakai.
+    """
+
+    def __init__(self, table: DestinationTable, start_point: Tuple[float, float]):
+        self.table = table
+        self.start_point = start_point
+        matrices = get_dense_matrices(table)
+        self.complete = matrices.complete
+        start_distances, start_times = matrices.start_legs(start_point)
+        self.start_distances = np.asarray(start_distances, dtype=np.float64)
+        self.start_times = np.asarray(start_times, dtype=np.float64)
+        self.distance = matrices.distance
+        self.travel_time = matrices.travel_time
+
+    def _indices(self, chromosome: Chromosome) -> np.ndarray:
+        return np.fromiter((gene.index for gene in chromosome.genes), dtype=np.int64, count=len(chromosome.genes))
+
+    def _chromosome(self, route: np.ndarray) -> Chromosome:
+        destinations = self.table.destinations
+        return Chromosome([destinations[index] for index in route.tolist()], self.start_point)
+
+    def evaluate(self, chromosomes: List[Chromosome]):
+        """Evaluasi semua kromosom yang belum punya fitness dalam satu panggilan kernel"""
+        pending = [chromosome for chromosome in chromosomes if chromosome.fitness_value is None]
+        if not pending:
+            return
+        routes = np.array([[gene.index for gene in chromosome.genes] for chromosome in pending], dtype=np.int64)
+        distances, times = population_totals(
+            routes, self.start_distances, self.start_times, self.distance, self.travel_time
+        )
+        for chromosome, total_distance, total_time in zip(pending, distances.tolist(), times.tolist()):
+            chromosome.set_evaluation(RouteEvaluation(total_distance, total_time))
+
+    def tournament_selection(self, chromosomes: List[Chromosome], tournament_size: int, count: int = 1,
+                             rng=random) -> List[Chromosome]:
+        """
+        Tournament selection untuk beberapa pemenang sekaligus
+
+        Sampling memakai rng.sample seperti GAOperators.tournament_selection.
+        """
+        self.evaluate(chromosomes)
+        size = min(tournament_size, len(chromosomes))
+        samples = np.array([rng.sample(range(len(chromosomes)), size) for _ in range(count)], dtype=np.int64)
+        fitness = np.array([chromosome.fitness_value for chromosome in chromosomes], dtype=np.float64)
+        return [chromosomes[winner] for winner in tournament_winners(fitness, samples).tolist()]
+
+    def swap_mutation(self, chromosome: Chromosome, mutation_rate: float, rng=random) -> Chromosome:
+        """Swap mutation dalam grup slot (sama dengan GAOperators.swap_mutation)"""
+        if rng.random() > mutation_rate:
+            return chromosome
+        swap_group = rng.choice(SWAP_GROUPS)
+        position1, position2 = rng.sample(swap_group, 2)
+        return self._chromosome(swap_genes(self._indices(chromosome), position1, position2))
+
+    def swap_local_search(self, chromosome: Chromosome, max_iterations: int) -> Chromosome:
+        """Local search swap (sama dengan TwoOptOptimizer.optimize_with_constraints)"""
+        route, _ = swap_local_search(
+            self._indices(chromosome), self.start_distances, self.distance, SWAP_PAIRS, max_iterations
+        )
+        return self._chromosome(route)
@@ -0,0 +1,281 @@
+"""
+Local search berbasis kategori: replace, swap, dan relocate
+
+TwoOptOptimizer.optimize_with_constraints hanya menukar posisi gen yang sudah ada
+di rute. Local search ini juga bisa mengganti gen dengan destinasi lain yang
+kategorinya cocok dengan slot tersebut, sehingga destinasi yang lebih dekat bisa
+masuk ke rute. Neighborhood:
+
+- replace: ganti gen di satu slot dengan kandidat dari daftar tetangga terdekat
+  (kNN) gen sebelum/sesudahnya yang cocok dengan slot dan belum ada di rute
+- swap: tukar dua gen dalam grup slot kategori yang sama (seperti optimize_with_constraints)
+- relocate: pindahkan satu gen ke slot lain dalam grup kategorinya, gen di antaranya
+  bergeser satu slot (Or-opt atas urutan slot satu kategori; pola K1, C1, W1, K2,
+  W2, C2, K3, O tidak berubah). Untuk grup dua slot sama dengan swap, sehingga
+  hanya dicoba untuk grup tiga slot atau lebih.
+
+Setiap langkah dinilai dengan delta jarak (hanya leg yang berubah), bukan jarak
+rute penuh. Kebijakan 'first' langsung menerapkan langkah pertama yang memperbaiki
+rute, 'best' memindai semua langkah lalu menerapkan yang terbaik.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from algorithms.chromosome import Chromosome
+from algorithms.evaluation import get_dense_matrices
+from models.category import ROUTE_PATTERN, SLOT_CANDIDATE_BITS, SLOT_GROUPS
+from models.destination import Destination
+from utils.distance import distance_matrix_for
+
+# Metode local search HGA: 'swap' (TwoOptOptimizer) dan 'category' (modul ini)
+LOCAL_SEARCH_METHODS = ('swap', 'category')
+
+# Kebijakan penerapan langkah
+POLICIES = ('first', 'best')
+
+# Jumlah tetangga terdekat per destinasi yang dicoba untuk replace
+DEFAULT_NEIGHBORS = 8
+
+# Perbaikan jarak minimal (km) agar langkah diterapkan (menghindari loop akibat pembulatan)
+IMPROVEMENT_EPSILON = 1e-9
+
+# Grup slot yang relocate-nya berbeda dari swap
+RELOCATE_GROUPS = [positions for positions in SLOT_GROUPS.values() if len(positions) >= 3]
+
+
+def _relocate_moves() -> List[Tuple[List[int], int, int]]:
+    """(posisi grup, index asal, index tujuan) untuk setiap relocate yang bukan swap"""
+    moves = []
+    for positions in RELOCATE_GROUPS:
+        for source in range(len(positions)):
+            for target in range(len(positions)):
+                if abs(source - target) >= 2:
+                    moves.append((positions, source, target))
+    return moves
+
+
+RELOCATE_MOVES = _relocate_moves()
+
+SWAP_MOVES = [
+    (positions[i], positions[j])
+    for positions in SLOT_GROUPS.values()
+    for i in range(len(positions))
+    for j in range(i + 1, len(positions))
+]
+
+
+class CategoryLocalSearch:
+    """
+    Local search replace/swap/relocate untuk satu set destinasi dan satu titik awal
+
+    Daftar kNN per kategori slot dihitung sekali saat dibuat (dipakai ulang untuk
+    semua offspring dalam satu run HGA).
+
+    Attributes:
+        policy: 'first' atau 'best'
+        max_iterations: Maksimal langkah yang diterapkan per optimize()
+        stats: Jumlah langkah yang diterapkan per jenis dan jumlah langkah yang dinilai
+    """
+
+    def __init__(self,
+                 destinations: List[Destination],
+                 start_point: Tuple[float, float],
+                 max_iterations: int = 500,
+                 policy: str = 'first',
+                 neighbors: int = DEFAULT_NEIGHBORS):
+        """
+        Args:
+            destinations: Destinasi yang boleh masuk rute (kandidat replace)
+            start_point: Koordinat titik awal
+            max_iterations: Maksimal langkah yang diterapkan per kromosom
+            policy: 'first' (first improvement) atau 'best' (best improvement)
+            neighbors: Jumlah tetangga terdekat per destinasi untuk replace
+
+        Raises:
+            ValueError: Jika policy tidak dikenal
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid local search policy. Must be one of: {list(POLICIES)}")
+        self.policy = policy
+        self.max_iterations = max_iterations
+        self.start_point = start_point
+        self.table = destinations[0].table
+        self._matrices = get_dense_matrices(self.table)
+        self._distance_rows = self._matrices._distance_rows
+        self._start_distances = self._matrices.start_legs(start_point)[0]
+        self._build_neighbors(self.table.indices_of(destinations), neighbors)
+        self.stats = {'replace': 0, 'swap': 0, 'relocate': 0, 'evaluated': 0}
+
+    def _build_neighbors(self, pool: np.ndarray, k: int):
+        """kNN kandidat per mask slot: dari setiap destinasi dan dari titik awal"""
+        table = self.table
+        ranking = self._matrices.distance
+        if np.isnan(ranking).any():
+            # Sel yang belum dihitung (OSRM real-time) diurutkan dengan Haversine
+            fallback = distance_matrix_for(np.column_stack((table.latitude, table.longitude)))
+            ranking = np.where(np.isnan(ranking), fallback, ranking)
+        start_distances = np.asarray(self._start_distances, dtype=np.float64)
+        pool = np.unique(pool)
+
+        # Satu daftar per mask kandidat slot yang berbeda (slot dengan pola sama berbagi daftar)
+        self._slot_neighbors: Dict[int, List[List[int]]] = {}
+        self._start_neighbors: Dict[int, List[int]] = {}
+        for bits in set(SLOT_CANDIDATE_BITS):
+            candidates = pool[(table.category_mask[pool] & bits) != 0]
+            count = min(k + 1, len(candidates))
+            if count == 0:
+                self._slot_neighbors[bits] = [[] for _ in range(len(table))]
+                self._start_neighbors[bits] = []
+                continue
+            sub = ranking[:, candidates]
+            nearest = np.argsort(sub, axis=1, kind='stable')[:, :count]
+            rows = candidates[nearest].tolist()
+            # Destinasi itu sendiri bukan tetangganya
+            self._slot_neighbors[bits] = [[c for c in row if c != i][:k] for i, row in enumerate(rows)]
+            self._start_neighbors[bits] = candidates[np.argsort(start_distances[candidates], kind='stable')[:k]].tolist()
+
+    def _leg(self, i: int, j: int) -> float:
+        value = self._distance_rows[i][j]
+        if value != value:
+            value = self._matrices.leg_distance(i, j)
+        return value
+
+    def _edge(self, route: Sequence[int], position: int) -> float:
+        """Jarak leg yang masuk ke posisi (dari titik awal untuk posisi 0)"""
+        if position == 0:
+            return self._start_distances[route[0]]
+        return self._leg(route[position - 1], route[position])
+
+    def _edges(self, route: Sequence[int], positions) -> float:
+        return sum(self._edge(route, position) for position in positions)
+
+    def _replace_candidates(self, route: List[int], position: int) -> List[int]:
+        bits = SLOT_CANDIDATE_BITS[position]
+        if position == 0:
+            candidates = list(self._start_neighbors[bits])
+        else:
+            candidates = list(self._slot_neighbors[bits][route[position - 1]])
+        if position + 1 < len(route):
+            candidates.extend(self._slot_neighbors[bits][route[position + 1]])
+        return candidates
+
+    def _replace_moves(self, route: List[int]):
+        """(delta, 'replace', (posisi, kandidat)) untuk setiap replace yang memperbaiki rute"""
+        size = len(route)
+        in_route = set(route)
+        for position in range(size):
+            gene = route[position]
+            has_next = position + 1 < size
+            before = self._edge(route, position) + (self._leg(gene, route[position + 1]) if has_next else 0.0)
+            seen = set()
+            for candidate in self._replace_candidates(route, position):
+                if candidate in in_route or candidate in seen:
+                    continue
+                seen.add(candidate)
+                self.stats['evaluated'] += 1
+                incoming = self._start_distances[candidate] if position == 0 else self._leg(route[position - 1], candidate)
+                after = incoming + (self._leg(candidate, route[position + 1]) if has_next else 0.0)
+                delta = after - before
+                if delta < -IMPROVEMENT_EPSILON:
+                    yield delta, 'replace', (position, candidate)
+
+    def _swap_moves(self, route: List[int]):
+        size = len(route)
+        for first, second in SWAP_MOVES:
+            affected = {p for p in (first, first + 1, second, second + 1) if p < size}
+            before = self._edges(route, affected)
+            route[first], route[second] = route[second], route[first]
+            after = self._edges(route, affected)
+            route[first], route[second] = route[second], route[first]
+            self.stats['evaluated'] += 1
+            delta = after - before
+            if delta < -IMPROVEMENT_EPSILON:
+                yield delta, 'swap', (first, second)
+
+    def _relocate_moves(self, route: List[int]):
+        size = len(route)
+        for positions, source, target in RELOCATE_MOVES:
+            affected = {p for position in positions for p in (position, position + 1) if p < size}
+            before = self._edges(route, affected)
+            original = [route[p] for p in positions]
+            self._apply_relocate(route, positions, source, target)
+            after = self._edges(route, affected)
+            for p, gene in zip(positions, original):
+                route[p] = gene
+            self.stats['evaluated'] += 1
+            delta = after - before
+            if delta < -IMPROVEMENT_EPSILON:
+                yield delta, 'relocate', (positions, source, target)
+
+    @staticmethod
+    def _apply_relocate(route: List[int], positions: List[int], source: int, target: int):
+        genes = [route[p] for p in positions]
+        genes.insert(target, genes.pop(source))
+        for p, gene in zip(positions, genes):
+            route[p] = gene
+
+    def _apply(self, route: List[int], kind: str, move):
+        if kind == 'replace':
+            position, candidate = move
+            route[position] = candidate
+        elif kind == 'swap':
+            first, second = move
+            route[first], route[second] = route[second], route[first]
+        else:
+            self._apply_relocate(route, *move)
+        self.stats[kind] += 1
+
+    def _next_move(self, route: List[int]) -> Optional[Tuple]:
+        neighborhoods = (self._replace_moves(route), self._swap_moves(route), self._relocate_moves(route))
+        if self.policy == 'first':
+            for moves in neighborhoods:
+                for move in moves:
+                    return move
+            return None
+        best = None
+        for moves in neighborhoods:
+            for move in moves:
+                if best is None or move[0] < best[0]:
+                    best = move
+        return best
+
+    def optimize_route(self, route: List[int]) -> Tuple[List[int], float]:
+        """
+        Local search atas index gen
+
+        Args:
+            route: Index baris destinasi sesuai urutan kunjungan
+
+        Returns:
+            Tuple (route hasil, total perubahan jarak km; negatif = lebih pendek)
+        """
+        route = list(route)
+        total_delta = 0.0
+        for _ in range(self.max_iterations):
+            move = self._next_move(route)
+            if move is None:
+                break
+            delta, kind, detail = move
+            self._apply(route, kind, detail)
+            total_delta += delta
+        return route, total_delta
+
+    def optimize(self, chromosome: Chromosome) -> Chromosome:
+        """
+        Mengoptimasi kromosom (pola kategori tetap terpenuhi)
+
+        Args:
+            chromosome: Kromosom yang akan dioptimasi
+
+        Returns:
+            Kromosom baru jika ada perbaikan, selain itu kromosom yang sama
+        """
+        route = [gene.index for gene in chromosome.genes]
+        if len(route) != len(ROUTE_PATTERN):
+            return chromosome
+        optimized, total_delta = self.optimize_route(route)
+        if total_delta >= 0:
+            return chromosome
+        destinations = self.table.destinations
+        return Chromosome([destinations[index] for index in optimized], chromosome.start_point)
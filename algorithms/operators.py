@@ -3,16 +3,42 @@ Operator-operator Genetic Algorithm: Selection, Crossover, Mutation
 """
 import random
 from typing import List, Tuple
+import numpy as np
 from algorithms.chromosome import Chromosome
+from models.category import SLOT_GROUPS, slot_compatible
+
+# Grup posisi yang boleh ditukar satu sama lain (kategori pola yang sama)
+SWAP_GROUPS = [positions for positions in SLOT_GROUPS.values() if len(positions) >= 2]
+
+def _drop_incompatible(genes: List, compatible: np.ndarray):
+    """Mengganti gen yang tidak cocok dengan slotnya menjadi None (in-place)"""
+    for i in np.flatnonzero(~compatible):
+        genes[i] = None
+
 
 class GAOperators:
     """
     Class yang berisi operator-operator Genetic Algorithm
+    
+    Semua operator random menerima parameter rng (random.Random) agar setiap run HGA
+    memakai stream random sendiri; tanpa rng dipakai modul random global.
     """
     
+    @staticmethod
+    def _slot_compatibility(*parents: Chromosome) -> np.ndarray:
+        """
+        Kecocokan kategori setiap gen dengan slotnya untuk beberapa kromosom sekaligus
+        
+        Returns:
+            Array bool (jumlah kromosom, panjang rute)
+        """
+        table = parents[0].genes[0].table
+        gene_indices = np.array([[gene.index for gene in parent.genes] for parent in parents], dtype=np.int64)
+        return slot_compatible(table.category_mask[gene_indices])
+    
     @staticmethod
     def tournament_selection(population: List[Chromosome], 
-                            tournament_size: int = 8) -> Chromosome:
+                            tournament_size: int = 8, rng=random) -> Chromosome:
         """
         Seleksi menggunakan metode tournament
         
@@ -21,15 +47,16 @@ class GAOperators:
         Args:
             population: List kromosom dalam populasi
             tournament_size: Jumlah kromosom yang ikut tournament
+            rng: Sumber random (default: modul random global)
             
         Returns:
             Kromosom pemenang tournament
         """
-        tournament = random.sample(population, min(tournament_size, len(population))) # min() memastikan bahwa ukuran tournament tidak melebihi populasi
+        tournament = rng.sample(population, min(tournament_size, len(population))) # min() memastikan bahwa ukuran tournament tidak melebihi populasi
         return max(tournament, key=lambda x: x.get_fitness())
     
     @staticmethod
-    def roulette_wheel_selection(population: List[Chromosome]) -> Chromosome:
+    def roulette_wheel_selection(population: List[Chromosome], rng=random) -> Chromosome:
         """
         Seleksi menggunakan metode roulette wheel
         
@@ -37,6 +64,7 @@ class GAOperators:
         
         Args:
             population: List kromosom dalam populasi
+            rng: Sumber random (default: modul random global)
             
         Returns:
             Kromosom yang terpilih
@@ -44,10 +72,10 @@ class GAOperators:
         total_fitness = sum(c.get_fitness() for c in population)
         
         if total_fitness == 0:
-            return random.choice(population)
+            return rng.choice(population)
         
         # Generate random number
-        pick = random.uniform(0, total_fitness)
+        pick = rng.uniform(0, total_fitness)
         current = 0
         
         for chromosome in population:
@@ -58,7 +86,7 @@ class GAOperators:
         return population[-1]
     
     @staticmethod
-    def order_crossover(parent1: Chromosome, parent2: Chromosome) -> Tuple[Chromosome, Chromosome]:
+    def order_crossover(parent1: Chromosome, parent2: Chromosome, rng=random) -> Tuple[Chromosome, Chromosome]:
         """
         Order Crossover (OX) - Cocok untuk masalah rute/permutasi
         
@@ -68,6 +96,7 @@ class GAOperators:
         Args:
             parent1: Kromosom parent pertama
             parent2: Kromosom parent kedua
+            rng: Sumber random (default: modul random global)
             
         Returns:
             Tuple dua kromosom offspring
@@ -75,8 +104,8 @@ class GAOperators:
         size = len(parent1.genes)
         
         # Pilih dua titik crossover random
-        point1 = random.randint(0, size - 1)
-        point2 = random.randint(0, size - 1)
+        point1 = rng.randint(0, size - 1)
+        point2 = rng.randint(0, size - 1)
         
         # Pastikan point1 < point2
         if point1 > point2:
@@ -138,7 +167,7 @@ class GAOperators:
         return offspring1, offspring2
     
     @staticmethod
-    def order_crossover_modified(parent1: Chromosome, parent2: Chromosome, parent3: Chromosome, parent4: Chromosome) -> Tuple[Chromosome, Chromosome]:
+    def order_crossover_modified(parent1: Chromosome, parent2: Chromosome, parent3: Chromosome, parent4: Chromosome, rng=random) -> Tuple[Chromosome, Chromosome]:
         """
         Order Crossover (OX) - Cocok untuk masalah rute/permutasi
         
@@ -148,6 +177,7 @@ class GAOperators:
         Args:
             parent1: Kromosom parent pertama
             parent2: Kromosom parent kedua
+            rng: Sumber random (default: modul random global)
             
         Returns:
             Tuple dua kromosom offspring
@@ -155,8 +185,8 @@ class GAOperators:
         size = len(parent1.genes)
         
         # Pilih dua titik crossover random
-        point1 = random.randint(0, size - 1)
-        point2 = random.randint(0, size - 1)
+        point1 = rng.randint(0, size - 1)
+        point2 = rng.randint(0, size - 1)
         
         # Pastikan point1 < point2
         if point1 > point2:
@@ -185,6 +215,13 @@ class GAOperators:
             for gene in parent4.genes
         ]
         
+        # Gen donor hanya dipakai jika kategorinya cocok dengan slot tujuan
+        # (dicek sekaligus untuk semua parent dengan satu operasi bitmask)
+        compatible = GAOperators._slot_compatibility(parent1, parent2, parent3, parent4)
+        _drop_incompatible(parent2_filtered, compatible[1])
+        _drop_incompatible(parent3_filtered, compatible[2])
+        _drop_incompatible(parent4_filtered, compatible[3])
+        
         # idx = 0
         for i in range(size):
             if offspring1_genes[i] is None and parent2_filtered[i] is not None:
@@ -217,6 +254,9 @@ class GAOperators:
             gene if id(gene) not in selected_ids2 else None
             for gene in parent4.genes
         ]
+        _drop_incompatible(parent1_filtered, compatible[0])
+        _drop_incompatible(parent3_filtered, compatible[2])
+        _drop_incompatible(parent4_filtered, compatible[3])
  
         for i in range(size):
             if offspring2_genes[i] is None and parent1_filtered[i] is not None:
@@ -241,7 +281,7 @@ class GAOperators:
         return offspring1, offspring2
     
     @staticmethod
-    def position_based_crossover(parent1: Chromosome, parent2: Chromosome) -> Tuple[Chromosome, Chromosome]:
+    def position_based_crossover(parent1: Chromosome, parent2: Chromosome, rng=random) -> Tuple[Chromosome, Chromosome]:
         """
         Position Based Crossover - Alternatif untuk OX
         
@@ -250,6 +290,7 @@ class GAOperators:
         Args:
             parent1: Kromosom parent pertama
             parent2: Kromosom parent kedua
+            rng: Sumber random (default: modul random global)
             
         Returns:
             Tuple dua kromosom offspring
@@ -259,7 +300,7 @@ class GAOperators:
         # Pilih beberapa posisi random (sekitar 40% dari total)
         # Untuk 8 gen, 40% adalah sekitar 3 posisi
         num_positions = max(1, int(0.4 * size))
-        selected_positions = random.sample(range(size), num_positions)
+        selected_positions = rng.sample(range(size), num_positions)
         
         # Buat offspring 1
         offspring1_genes = [None] * size
@@ -315,33 +356,28 @@ class GAOperators:
         return offspring1, offspring2
     
     @staticmethod
-    def swap_mutation(chromosome: Chromosome, mutation_rate: float = 0.01) -> Chromosome:
+    def swap_mutation(chromosome: Chromosome, mutation_rate: float = 0.01, rng=random) -> Chromosome:
         """
         Swap Mutation - Menukar posisi dua gen
         
         Args:
             chromosome: Kromosom yang akan dimutasi
             mutation_rate: Probabilitas mutasi terjadi
+            rng: Sumber random (default: modul random global)
             
         Returns:
             Kromosom hasil mutasi (bisa sama jika tidak terjadi mutasi)
         """
-        if random.random() > mutation_rate:
+        if rng.random() > mutation_rate:
             return chromosome
         
         # Copy genes
         mutated_genes = chromosome.genes.copy()
         size = len(mutated_genes)
         
-        # Pilih dua posisi yang boleh ditukar sesuai kategori
-        allowed_swaps = [
-            [0, 3, 6],  # swap antara index 0, 3, 6
-            [1, 5],     # swap antara index 1 dan 5
-            [2, 4]      # swap antara index 2 dan 4
-        ]
-        # Pilih satu grup swap secara acak
-        swap_group = random.choice(allowed_swaps)
-        pos1, pos2 = random.sample(swap_group, 2)
+        # Pilih satu grup swap secara acak ([0, 3, 6], [1, 5], atau [2, 4])
+        swap_group = rng.choice(SWAP_GROUPS)
+        pos1, pos2 = rng.sample(swap_group, 2)
         
         mutated_genes[pos1], mutated_genes[pos2] = mutated_genes[pos2], mutated_genes[pos1]
         
@@ -351,26 +387,27 @@ class GAOperators:
           )
     
     @staticmethod
-    def inversion_mutation(chromosome: Chromosome, mutation_rate: float = 0.01) -> Chromosome:
+    def inversion_mutation(chromosome: Chromosome, mutation_rate: float = 0.01, rng=random) -> Chromosome:
         """
         Inversion Mutation - Membalik urutan subset gen
         
         Args:
             chromosome: Kromosom yang akan dimutasi
             mutation_rate: Probabilitas mutasi terjadi
+            rng: Sumber random (default: modul random global)
             
         Returns:
             Kromosom hasil mutasi
         """
-        if random.random() > mutation_rate:
+        if rng.random() > mutation_rate:
             return chromosome
         
         mutated_genes = chromosome.genes.copy()
         size = len(mutated_genes)
         
         # Pilih dua posisi dan balik urutan di antaranya
-        point1 = random.randint(0, size - 1)
-        point2 = random.randint(0, size - 1)
+        point1 = rng.randint(0, size - 1)
+        point2 = rng.randint(0, size - 1)
         
         if point1 > point2:
             point1, point2 = point2, point1
@@ -384,29 +421,30 @@ class GAOperators:
           )
     
     @staticmethod
-    def scramble_mutation(chromosome: Chromosome, mutation_rate: float = 0.01) -> Chromosome:
+    def scramble_mutation(chromosome: Chromosome, mutation_rate: float = 0.01, rng=random) -> Chromosome:
         """
         Scramble Mutation - Mengacak urutan subset gen
         
         Args:
             chromosome: Kromosom yang akan dimutasi
             mutation_rate: Probabilitas mutasi terjadi
+            rng: Sumber random (default: modul random global)
             
         Returns:
             Kromosom hasil mutasi
         """
-        if random.random() > mutation_rate:
+        if rng.random() > mutation_rate:
             return chromosome
         
         mutated_genes = chromosome.genes.copy()
         size = len(mutated_genes)
         
         # Pilih subset dan acak urutannya
-        point1 = random.randint(0, size - 2)
-        point2 = random.randint(point1 + 1, size - 1)
+        point1 = rng.randint(0, size - 2)
+        point2 = rng.randint(point1 + 1, size - 1)
         
         subset = mutated_genes[point1:point2+1]
-        random.shuffle(subset)
+        rng.shuffle(subset)
         mutated_genes[point1:point2+1] = subset
         
         return Chromosome(
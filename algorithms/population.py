@@ -3,10 +3,23 @@ Class untuk manajemen populasi dalam Genetic Algorithm
 """
 from typing import List, Tuple
 import random
+import weakref
+import numpy as np
 from algorithms.chromosome import Chromosome
+from models.category import ROUTE_LENGTH, route_order_valid, slot_candidates
 from models.destination import Destination
 from utils.data_loader import group_destinations_by_category
 
+# Batas pemilihan ulang kandidat per slot saat membuat populasi random
+MAX_SLOT_REDRAWS = 16
+
+# Populasi yang masih hidup (weak reference, untuk laporan memory)
+_live_populations = weakref.WeakSet()
+
+def live_populations() -> List["Population"]:
+    """Populasi yang masih direferensikan (dipakai utils.memory_report)"""
+    return list(_live_populations)
+
 class Population:
     """
     Class untuk merepresentasikan populasi (kumpulan kromosom)
@@ -26,11 +39,14 @@ class Population:
         """
         self.chromosomes = chromosomes if chromosomes else []
         self.population_size = population_size
+        _live_populations.add(self)
     
     def initialize_random_population(
             self, 
             all_destinations: List[Destination],
             start_point: Tuple[float, float],
+            grouped_destinations: dict = None,
+            rng=None,
         ):
         """
         Inisialisasi populasi awal dengan kromosom random yang valid
@@ -40,10 +56,14 @@ class Population:
         Args:
             all_destinations: List semua destinasi yang tersedia
             start_point: Koordinat titik awal
-            end_point: Koordinat titik akhir
+            grouped_destinations: Hasil group_destinations_by_category yang sudah dihitung
+                                  (opsional, dihitung ulang jika None)
+            rng: random.Random milik run HGA (default: modul random global)
         """
         # Kelompokkan destinasi berdasarkan kategori
-        grouped = group_destinations_by_category(all_destinations)
+        grouped = grouped_destinations
+        if grouped is None:
+            grouped = group_destinations_by_category(all_destinations)
         
         # Validasi apakah ada cukup destinasi untuk setiap kategori
         required_counts = {
@@ -58,70 +78,92 @@ class Population:
                 raise ValueError(f"Tidak cukup destinasi kategori {category}. "
                                f"Dibutuhkan {required_count}, tersedia {len(grouped[category])}")
         
-        # Generate populasi
-        for _ in range(self.population_size):
-            chromosome = self._create_random_valid_chromosome(
-                grouped,
-                start_point,
-            )
-            self.chromosomes.append(chromosome)
+        # Kandidat per slot: filter bitmask kategori sekali untuk seluruh populasi
+        table = all_destinations[0].table
+        indices = table.indices_of(all_destinations)
+        pools = slot_candidates(indices, table.category_mask[indices])
+        
+        # Generator NumPy diturunkan dari rng (atau modul random agar random.seed() tetap berlaku)
+        generator = np.random.default_rng((rng or random).getrandbits(64))
+        routes = self._sample_routes(pools, self.population_size, generator)
+        
+        views = table.destinations
+        for row in routes.tolist():
+            self.chromosomes.append(Chromosome([views[i] for i in row], start_point))
     
-    def _create_random_valid_chromosome(
-            self,
-            grouped_destinations: dict,
-            start_point: Tuple[float, float],
-        ) -> Chromosome:
+    @staticmethod
+    def _sample_routes(slot_pools: List[np.ndarray], size: int, rng: np.random.Generator,
+                       max_redraws: int = MAX_SLOT_REDRAWS) -> np.ndarray:
         """
-        Membuat satu kromosom random yang valid dengan pola K1, C1, W1, K2, W2, C2, K3, O
+        Membuat sejumlah rute random yang valid dengan pola K1, C1, W1, K2, W2, C2, K3, O
+        
+        Setiap slot diisi untuk semua rute sekaligus: pilih kandidat random dari pool
+        slot, lalu pilih ulang hanya untuk rute yang mendapat destinasi yang sudah ada
+        di slot sebelumnya. Hasilnya uniform atas kandidat yang belum dipakai rute tsb.
         
         Args:
-            grouped_destinations: Dictionary destinasi yang sudah dikelompokkan
-            start_point: Titik awal
+            slot_pools: Index kandidat untuk setiap slot (lihat slot_candidates)
+            size: Jumlah rute
+            rng: Generator random NumPy
+            max_redraws: Batas pemilihan ulang sebelum memilih langsung dari sisa kandidat
             
         Returns:
-            Kromosom valid
+            Array (size, 8) berisi index destinasi
         """
-        genes = []
+        routes = np.empty((size, len(slot_pools)), dtype=np.int64)
         
-        # K1 - Makanan berat pertama
-        genes.append(random.choice(grouped_destinations['makanan_berat']))
-        
-        # C1 - Makanan ringan pertama
-        genes.append(random.choice(grouped_destinations['makanan_ringan']))
-        
-        # W1 - Non kuliner pertama
-        genes.append(random.choice(grouped_destinations['non_kuliner'] + grouped_destinations['all']))
-        
-        # K2 - Makanan berat kedua (tidak sama dengan K1)
-        available_k2 = [d for d in grouped_destinations['makanan_berat'] if d != genes[0]]
-        genes.append(random.choice(available_k2))
-        
-        # W2 - Non kuliner kedua (tidak sama dengan W1)
-        available_w2 = [d for d in grouped_destinations['non_kuliner'] if d != genes[2]]
-        available_w2.extend(d for d in grouped_destinations['all'] if d not in genes)
-        genes.append(random.choice(available_w2))
-        
-        # C2 - Makanan ringan kedua (tidak sama dengan C1)
-        available_c2 = [d for d in grouped_destinations['makanan_ringan'] if d != genes[1]]
-        genes.append(random.choice(available_c2))
+        for slot, pool in enumerate(slot_pools):
+            if len(pool) == 0:
+                raise ValueError(f"Tidak ada destinasi untuk slot {slot + 1} pola rute")
+            
+            chosen = routes[:, :slot]
+            picks = pool[rng.integers(0, len(pool), size)]
+            conflict = (chosen == picks[:, None]).any(axis=1)
+            
+            redraws = 0
+            while conflict.any() and redraws < max_redraws:
+                picks[conflict] = pool[rng.integers(0, len(pool), int(conflict.sum()))]
+                conflict = (chosen == picks[:, None]).any(axis=1)
+                redraws += 1
+            
+            # Pool hampir habis: pilih langsung dari kandidat yang tersisa
+            for row in np.flatnonzero(conflict):
+                remaining = np.setdiff1d(pool, chosen[row])
+                if len(remaining) == 0:
+                    raise ValueError(f"Tidak cukup destinasi unik untuk slot {slot + 1} pola rute")
+                picks[row] = remaining[rng.integers(0, len(remaining))]
+            
+            routes[:, slot] = picks
         
-        # K3 - Makanan berat ketiga (tidak sama dengan K1 dan K2)
-        available_k3 = [d for d in grouped_destinations['makanan_berat'] 
-                       if d not in [genes[0], genes[3]]]
-        genes.append(random.choice(available_k3))
+        return routes
+    
+    def gene_category_masks(self) -> np.ndarray:
+        """
+        Bitmask kategori semua gen dalam populasi
         
-        # O - Oleh-oleh
-        available_o = [d for d in grouped_destinations['all'] if d not in genes]
-        genes.append(random.choice(grouped_destinations['oleh_oleh'] + available_o))
+        Returns:
+            Array (jumlah kromosom, panjang rute)
+        """
+        if not self.chromosomes:
+            return np.zeros((0, ROUTE_LENGTH), dtype=np.uint64)
+        table = self.chromosomes[0].genes[0].table
+        gene_indices = np.array([[gene.index for gene in c.genes] for c in self.chromosomes], dtype=np.int64)
+        return table.category_mask[gene_indices]
+    
+    def valid_route_mask(self) -> np.ndarray:
+        """
+        Validasi pola urutan K1, C1, W1, K2, W2, C2, K3, O untuk seluruh populasi
         
-        return Chromosome(
-                genes, 
-                start_point, 
-            )
+        Returns:
+            Array bool, True untuk kromosom dengan urutan valid
+        """
+        return route_order_valid(self.gene_category_masks())
     
     def evaluate_fitness(self):
+        # Kromosom yang fitness-nya sudah dihitung (elit, hasil copy) tidak dievaluasi ulang
         for chromosome in self.chromosomes:
-            chromosome.calculate_fitness()
+            if chromosome.fitness_value is None:
+                chromosome.calculate_fitness()
     
     def sort_by_fitness(self):
         self.chromosomes.sort(reverse=True, key=lambda x: x.get_fitness())
@@ -1,10 +1,58 @@
 """
 Algoritma 2-Opt untuk local search optimization
+
+Mode default memindai ulang semua pasangan dari awal setelah setiap perbaikan
+(perilaku lama, hasil identik). Dengan dont_look_bits, neighbors, atau policy
+'best', langkah dinilai dengan delta jarak (hanya leg yang berubah):
+
+- dont_look_bits: node/posisi yang sekitarnya tidak berubah sejak terakhir dicek
+  tanpa hasil tidak dicek ulang; bit dibuka lagi saat leg di dekatnya berubah
+- neighbors: 2-opt hanya mencoba sambungan baru ke sejumlah tetangga terdekat
+  setiap node (candidate list)
+- policy 'best': terapkan langkah terbaik, bukan yang pertama ditemukan
+
+max_iterations adalah batas langkah yang diterapkan. Jumlah langkah yang dinilai
+dan diterapkan dicatat di stats.
 """
-from typing import List
+from collections import deque
+from typing import Dict, List, Optional, Sequence
 from algorithms.chromosome import Chromosome
+from algorithms.evaluation import get_dense_matrices, route_distance
+from models.category import SLOT_GROUPS
 from models.destination import Destination
-from utils.distance import calculate_distance
+
+# Kebijakan penerapan langkah
+POLICIES = ('first', 'best')
+
+# Penanda titik awal pada path 2-opt (bukan index destinasi)
+START = -1
+
+# Perbaikan jarak minimal (km) agar langkah diterapkan
+IMPROVEMENT_EPSILON = 1e-9
+
+
+class _LegDistances:
+    """
+    Jarak leg dari matrix dense untuk delta evaluation (START = titik awal)
+    
+    Reversal segmen mengasumsikan jarak simetris, sama seperti distance matrix
+    (satu nilai per pasangan koordinat).
+    """
+    
+    def __init__(self, genes: Sequence[Destination], start_point: tuple):
+        self.matrices = get_dense_matrices(genes[0].table)
+        self.rows = self.matrices._distance_rows
+        self.start = self.matrices.start_legs(start_point)[0]
+    
+    def __call__(self, u: int, v: int) -> float:
+        if u == START:
+            return self.start[v]
+        if v == START:
+            return self.start[u]
+        value = self.rows[u][v]
+        if value != value:
+            value = self.matrices.leg_distance(u, v)
+        return value
 
 class TwoOptOptimizer:
     """
@@ -14,14 +62,40 @@ class TwoOptOptimizer:
     menghilangkan crossing edges (edge yang bersilangan)
     """
     
-    def __init__(self, max_iterations: int = 500):
+    def __init__(self,
+                 max_iterations: int = 500,
+                 policy: str = 'first',
+                 dont_look_bits: bool = False,
+                 neighbors: Optional[int] = None):
         """
         Inisialisasi 2-Opt optimizer
         
         Args:
-            max_iterations: Maksimal iterasi untuk mencari improvement
+            max_iterations: Maksimal iterasi (langkah yang diterapkan) untuk mencari improvement
+            policy: 'first' (first improvement) atau 'best' (best improvement)
+            dont_look_bits: Lewati node/posisi yang sekitarnya tidak berubah
+            neighbors: Batas candidate list 2-opt per node (None = semua node)
+        
+        Raises:
+            ValueError: Jika policy tidak dikenal
         """
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid 2-Opt policy. Must be one of: {list(POLICIES)}")
         self.max_iterations = max_iterations
+        self.policy = policy
+        self.dont_look_bits = dont_look_bits
+        self.neighbors = neighbors
+        # Jumlah langkah yang dinilai dan diterapkan (kumulatif, lihat reset_stats)
+        self.stats: Dict[str, int] = {'evaluated': 0, 'applied': 0}
+    
+    def reset_stats(self):
+        """Mengosongkan hitungan langkah"""
+        self.stats = {'evaluated': 0, 'applied': 0}
+    
+    @property
+    def legacy_mode(self) -> bool:
+        """True jika tidak ada opsi baru: scan ulang dari awal seperti perilaku lama"""
+        return self.policy == 'first' and not self.dont_look_bits and self.neighbors is None
     
     def optimize(self, chromosome: Chromosome) -> Chromosome:
         """
@@ -33,6 +107,9 @@ class TwoOptOptimizer:
         Returns:
             Kromosom yang telah dioptimasi
         """
+        if not self.legacy_mode:
+            return self._optimize_reversal(chromosome)
+        
         # Copy kromosom untuk tidak memodifikasi yang asli
         current_genes = chromosome.genes.copy()
         current_distance = self._calculate_route_distance(
@@ -58,12 +135,14 @@ class TwoOptOptimizer:
                         chromosome.start_point,
                         # chromosome.end_point
                     )
+                    self.stats['evaluated'] += 1
                     
                     # Jika lebih baik, gunakan rute baru
                     if new_distance < current_distance:
                         current_genes = new_genes
                         current_distance = new_distance
                         improved = True
+                        self.stats['applied'] += 1
                         break
                 
                 if improved:
@@ -110,31 +189,8 @@ class TwoOptOptimizer:
         Returns:
             Total jarak dalam km
         """
-        if not genes:
-            return 0.0
-        
-        total_distance = 0.0
-        
-        # Jarak dari start ke destinasi pertama
-        total_distance += calculate_distance(
-            start_point[0], start_point[1],
-            genes[0].latitude, genes[0].longitude
-        )
-        
-        # Jarak antar destinasi
-        for i in range(len(genes) - 1):
-            total_distance += calculate_distance(
-                genes[i].latitude, genes[i].longitude,
-                genes[i + 1].latitude, genes[i + 1].longitude
-            )
-        
-        # # Jarak dari destinasi terakhir ke end
-        # total_distance += calculate_distance(
-        #     genes[-1].latitude, genes[-1].longitude,
-        #     end_point[0], end_point[1]
-        # )
-        
-        return total_distance
+        # Jarak start -> destinasi pertama + antar destinasi dari matrix dense
+        return route_distance(genes, start_point)
     
     def optimize_with_constraints(self, chromosome: Chromosome) -> Chromosome:
         """
@@ -149,16 +205,14 @@ class TwoOptOptimizer:
         Returns:
             Kromosom yang telah dioptimasi dengan constraint terpenuhi
         """
+        if not self.legacy_mode:
+            return self._optimize_swaps(chromosome)
+        
         # Untuk constraint-based optimization, kita hanya bisa menukar
         # destinasi dalam posisi yang memiliki kategori yang sama
         
-        # Mapping kategori ke posisi dalam rute
-        category_positions = {
-            'makanan_berat': [0, 3, 6],  # K1, K2, K3
-            'makanan_ringan': [1, 5],     # C1, C2
-            'non_kuliner': [2, 4],        # W1, W2
-            'oleh_oleh': [7]              # O
-        }
+        # Mapping kategori ke posisi dalam rute: K1/K2/K3, C1/C2, W1/W2, O
+        category_positions = SLOT_GROUPS
         
         current_genes = chromosome.genes.copy()
         current_distance = self._calculate_route_distance(
@@ -193,11 +247,13 @@ class TwoOptOptimizer:
                             chromosome.start_point,
                             # chromosome.end_point
                         )
+                        self.stats['evaluated'] += 1
                         
                         if new_distance < current_distance:
                             current_genes = new_genes
                             current_distance = new_distance
                             improved = True
+                            self.stats['applied'] += 1
                             break
                     
                     if improved:
@@ -211,3 +267,195 @@ class TwoOptOptimizer:
             chromosome.start_point, 
             # chromosome.end_point
           )
+    
+    def _pick(self, moves) -> Optional[tuple]:
+        """Langkah pertama (policy 'first') atau terbaik (policy 'best') dari generator langkah"""
+        best = None
+        for move in moves:
+            if self.policy == 'first':
+                return move
+            if best is None or move[0] < best[0]:
+                best = move
+        return best
+    
+    def _build_candidates(self, path: List[int], distance: _LegDistances) -> Dict[int, List[int]]:
+        """Candidate list per node: node lain di path, terdekat dulu, dibatasi self.neighbors"""
+        candidates = {}
+        for node in path:
+            others = sorted((other for other in path if other != node), key=lambda other: distance(node, other))
+            candidates[node] = others if self.neighbors is None else others[:self.neighbors]
+        return candidates
+    
+    def _reversal_delta(self, path: List[int], distance: _LegDistances, x: int, y: int) -> float:
+        """Perubahan jarak jika segmen path[x..y] dibalik (1 <= x < y)"""
+        delta = distance(path[x - 1], path[y]) - distance(path[x - 1], path[x])
+        if y + 1 < len(path):
+            delta += distance(path[x], path[y + 1]) - distance(path[y], path[y + 1])
+        return delta
+    
+    def _node_reversals(self, path, position, candidates, distance, node):
+        """
+        (delta, x, y) untuk setiap reversal yang memperbaiki rute dengan menyambung node ke kandidatnya
+        
+        Sambungan baru node -> kandidat bisa lewat leg sesudah node atau leg sebelum node.
+        """
+        k = position[node]
+        last = len(path) - 1
+        for other in candidates[node]:
+            l = position[other]
+            for x, y in ((k + 1, l) if l > k else (l + 1, k),
+                         (l, k - 1) if l < k else (k, l - 1)):
+                if x < 1 or y > last or y - x < 1:
+                    continue
+                self.stats['evaluated'] += 1
+                delta = self._reversal_delta(path, distance, x, y)
+                if delta < -IMPROVEMENT_EPSILON:
+                    yield delta, x, y
+    
+    def _optimize_reversal(self, chromosome: Chromosome) -> Chromosome:
+        """
+        2-Opt dengan delta evaluation, candidate list, don't-look bits, dan policy
+        
+        Path = titik awal + gen; titik awal tidak ikut dibalik.
+        
+        Args:
+            chromosome: Kromosom yang akan dioptimasi
+            
+        Returns:
+            Kromosom baru jika ada perbaikan, selain itu kromosom yang sama
+        """
+        genes = chromosome.genes
+        if len(genes) < 3:
+            return chromosome
+        distance = _LegDistances(genes, chromosome.start_point)
+        path = [START] + [gene.index for gene in genes]
+        if len(set(path)) != len(path):
+            # Posisi node harus unik; rute dengan destinasi ganda tidak dioptimasi
+            return chromosome
+        position = {node: i for i, node in enumerate(path)}
+        candidates = self._build_candidates(path, distance)
+        
+        def node_moves(node):
+            return self._node_reversals(path, position, candidates, distance, node)
+        
+        def apply(x, y):
+            path[x:y + 1] = reversed(path[x:y + 1])
+            for i in range(x, y + 1):
+                position[path[i]] = i
+            self.stats['applied'] += 1
+        
+        applied = 0
+        if self.dont_look_bits:
+            # Antrian = node dengan bit terbuka
+            queue = deque(path)
+            queued = set(path)
+            while queue and applied < self.max_iterations:
+                node = queue.popleft()
+                queued.discard(node)
+                move = self._pick(node_moves(node))
+                if move is None:
+                    continue
+                _, x, y = move
+                apply(x, y)
+                applied += 1
+                # Buka bit node di ujung-ujung leg yang berubah
+                for i in (x - 1, x, y, y + 1):
+                    if i < len(path) and path[i] not in queued:
+                        queue.append(path[i])
+                        queued.add(path[i])
+        else:
+            while applied < self.max_iterations:
+                move = self._pick(move for node in path for move in node_moves(node))
+                if move is None:
+                    break
+                _, x, y = move
+                apply(x, y)
+                applied += 1
+        
+        if applied == 0:
+            return chromosome
+        destinations = genes[0].table.destinations
+        return Chromosome([destinations[node] for node in path[1:]], chromosome.start_point)
+    
+    def _optimize_swaps(self, chromosome: Chromosome) -> Chromosome:
+        """
+        Swap dalam grup kategori dengan delta evaluation, don't-look bits, dan policy
+        
+        Don't-look bit disimpan per posisi. Setelah swap posisi p dan q, bit posisi
+        yang swap-nya menyentuh leg di sekitar p atau q dibuka lagi. Grup kategori
+        paling banyak tiga posisi, sehingga candidate list (neighbors) tidak dipakai.
+        
+        Args:
+            chromosome: Kromosom yang akan dioptimasi
+            
+        Returns:
+            Kromosom baru jika ada perbaikan, selain itu kromosom yang sama
+        """
+        genes = chromosome.genes
+        size = len(genes)
+        if size < 2:
+            return chromosome
+        distance = _LegDistances(genes, chromosome.start_point)
+        route = [gene.index for gene in genes]
+        partners = {
+            position: [other for other in positions if other != position and other < size]
+            for positions in SLOT_GROUPS.values()
+            for position in positions if position < size
+        }
+        
+        def edge(position):
+            # Leg yang masuk ke posisi (dari titik awal untuk posisi 0)
+            return distance(START if position == 0 else route[position - 1], route[position])
+        
+        def swap_delta(p, q):
+            affected = {i for i in (p, p + 1, q, q + 1) if i < size}
+            before = sum(edge(i) for i in affected)
+            route[p], route[q] = route[q], route[p]
+            after = sum(edge(i) for i in affected)
+            route[p], route[q] = route[q], route[p]
+            self.stats['evaluated'] += 1
+            return after - before
+        
+        def position_moves(p, later_only=False):
+            for q in partners.get(p, ()):
+                if later_only and q < p:
+                    continue
+                delta = swap_delta(p, q)
+                if delta < -IMPROVEMENT_EPSILON:
+                    yield delta, p, q
+        
+        def apply(p, q):
+            route[p], route[q] = route[q], route[p]
+            self.stats['applied'] += 1
+        
+        applied = 0
+        if self.dont_look_bits:
+            queue = deque(sorted(partners))
+            queued = set(queue)
+            while queue and applied < self.max_iterations:
+                p = queue.popleft()
+                queued.discard(p)
+                move = self._pick(position_moves(p))
+                if move is None:
+                    continue
+                _, p, q = move
+                apply(p, q)
+                applied += 1
+                for r in partners:
+                    touched = any(abs(t - u) <= 1 for t in [r] + partners[r] for u in (p, q))
+                    if touched and r not in queued:
+                        queue.append(r)
+                        queued.add(r)
+        else:
+            while applied < self.max_iterations:
+                move = self._pick(move for p in sorted(partners) for move in position_moves(p, later_only=True))
+                if move is None:
+                    break
+                _, p, q = move
+                apply(p, q)
+                applied += 1
+        
+        if applied == 0:
+            return chromosome
+        destinations = genes[0].table.destinations
+        return Chromosome([destinations[index] for index in route], chromosome.start_point)
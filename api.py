@@ -2,19 +2,35 @@
 FastAPI application untuk sistem rekomendasi rute wisata Surabaya
 menggunakan Hybrid Genetic Algorithm (HGA)
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
+import asyncio
 import json
-import time
+import os
 from datetime import datetime
 
-from algorithms.hga import HybridGeneticAlgorithm
-from utils.data_loader import load_destinations_from_csv
-from utils.distance import get_osrm_cache_stats, clear_osrm_cache, set_use_osrm, set_osrm_profile, recalculate_route_with_osrm
-from models.route import Route
+from utils.distance import get_osrm_cache_stats, clear_osrm_cache, set_use_osrm, set_osrm_profile, warm_osrm_cache
+from utils.matrix_store import preload_profiles
+from services.route_generation import (
+    RouteGenerationError,
+    generate_route_recommendations,
+    ROUTE_SEARCH_TIMEOUT_SECONDS
+)
+from services.jobs import DEFAULT_JOB_WORKERS, JobManager, JobQueueFullError, collect_outcome_metrics
+from services.data_snapshot import SnapshotManager, DATA_WATCH_INTERVAL_SECONDS
+from services.destination_catalog import (
+    CatalogQueryError,
+    parse_fields,
+    parse_bbox,
+    parse_categories
+)
+from utils.metrics import REGISTRY, HTTP_REQUESTS_IN_FLIGHT, JOB_QUEUE_DEPTH
+from utils.profiling import RequestProfiler
+from utils.memory_report import MEMORY_TRACEMALLOC, memory_report, start_tracing
 
 # Default HGA Configuration (sesuai dengan Main.py)
 DEFAULT_HGA_CONFIG = {
@@ -25,62 +41,111 @@ DEFAULT_HGA_CONFIG = {
     "elitism_count": 10,
     "tournament_size": 8,
     "use_2opt": True,
-    "two_opt_iterations": 500
+    "two_opt_iterations": 500,
+    "local_search": "swap",
+    "local_search_policy": "first",
+    "dont_look_bits": False
 }
 
+DESTINATIONS_FILE = "./data/data_wisata.jsonl"
+
+# Konfigurasi job asinkron (/jobs/generate-routes)
+JOB_WORKERS = DEFAULT_JOB_WORKERS       # Jumlah proses solver (default jumlah core, env ROUTE_API_JOB_WORKERS)
+JOB_QUEUE_MAX_SIZE = 100                # Maksimal job yang menunggu di antrian
+JOB_RESULT_TTL_SECONDS = 3600           # Lama hasil job disimpan setelah selesai
+JOB_ROUTE_SEARCH_TIMEOUT_SECONDS = 900  # Timeout pencarian rute untuk job
+
+# Konfigurasi batch (/generate-routes/batch)
+BATCH_MAX_LOCATIONS = 500  # Maksimal lokasi per request batch
+
+# Cache HTTP katalog destinasi (/api/destinations)
+DESTINATIONS_CACHE_MAX_AGE = 300  # Detik; setelahnya client revalidasi dengan If-None-Match
+
+# Token admin untuk fitur diagnostik (mis. profiling request); kosong = fitur admin nonaktif
+ADMIN_TOKEN = os.environ.get("ROUTE_API_ADMIN_TOKEN", "")
+
 # Global variables untuk cache
-destinations = None
+# Snapshot data aktif (destinasi, kategori, katalog, matrix); ditukar atomik saat reload
+snapshot_manager: Optional[SnapshotManager] = None
+job_manager = None
+data_watch_task = None
 
 # System initialization
 def initialize_system():
     """Load destinations data on startup"""
-    global destinations
-    if destinations is None:
+    global snapshot_manager
+    if snapshot_manager is None:
+        # tracemalloc dimulai sebelum data dimuat agar alokasi matrix ikut tertrace
+        if MEMORY_TRACEMALLOC and start_tracing():
+            print("tracemalloc enabled (MEMORY_TRACEMALLOC=1)")
         print("Loading destinations data...")
-        destinations = load_destinations_from_csv("./data/data_wisata.jsonl")
-        print(f"Successfully loaded {len(destinations)} destinations")
+        warmed = warm_osrm_cache()
+        if warmed:
+            print(f"Warmed OSRM cache with {warmed} entries")
+        # Matrix semua profil yang tersedia dimuat sekali agar ganti profil tidak cold start
+        profiles = preload_profiles()
+        print(f"Loaded distance matrices for profiles: {', '.join(profiles) or '-'}")
+        manager = SnapshotManager(DESTINATIONS_FILE)
+        snapshot = manager.load_initial()
+        snapshot_manager = manager
+        print(f"Successfully loaded {len(snapshot.destinations)} destinations (data version {snapshot.version})")
 
-def generate_google_maps_url(start_point, destinations_list):
-    """
-    Generate Google Maps URL untuk navigasi rute
-    
-    Args:
-        start_point: Tuple (latitude, longitude) titik awal
-        destinations_list: List of Destination objects
-    
-    Returns:
-        String URL Google Maps untuk navigasi
-    
-    Format URL: https://www.google.com/maps/dir/start/dest1/dest2/.../destN
-    """
-    base_url = "https://www.google.com/maps/dir"
-    
-    # Build waypoints list
-    waypoints = []
-    
-    # Add start point
-    waypoints.append(f"'{start_point[0]},{start_point[1]}'")
-    
-    # Add all destinations
-    for dest in destinations_list:
-        waypoints.append(f"{dest.latitude},+{dest.longitude}")
-    
-    # Join waypoints with /
-    waypoints_str = "/".join(waypoints)
-    
-    # Add travel mode parameter (9 = motorcycle/driving)
-    # Reference: https://developers.google.com/maps/documentation/urls/get-started
-    url = f"{base_url}/{waypoints_str}?entry=ttu&travelmode=two-wheeler"
-    
-    return url
+async def watch_data_files():
+    """Reload snapshot di background jika file destinasi/matrix berubah (DATA_WATCH_INTERVAL_SECONDS)"""
+    while True:
+        await asyncio.sleep(DATA_WATCH_INTERVAL_SECONDS)
+        try:
+            if snapshot_manager is not None and snapshot_manager.has_file_changes():
+                result = await asyncio.to_thread(snapshot_manager.reload)
+                print(f"Data files changed, reloaded: {result}")
+        except Exception as e:
+            print(f"⚠ Data reload failed, keeping current snapshot: {e}")
+
+def start_data_watch():
+    """Start file watch jika DATA_WATCH_INTERVAL_SECONDS > 0"""
+    global data_watch_task
+    if DATA_WATCH_INTERVAL_SECONDS > 0 and data_watch_task is None:
+        data_watch_task = asyncio.create_task(watch_data_files())
+        print(f"Watching data files every {DATA_WATCH_INTERVAL_SECONDS}s")
+
+def stop_data_watch():
+    """Stop file watch"""
+    global data_watch_task
+    if data_watch_task is not None:
+        data_watch_task.cancel()
+        data_watch_task = None
+
+def start_job_workers():
+    """Start job queue dan pool proses solver"""
+    global job_manager
+    if job_manager is None:
+        job_manager = JobManager(
+            data_file=DESTINATIONS_FILE,
+            max_workers=JOB_WORKERS,
+            max_queue_size=JOB_QUEUE_MAX_SIZE,
+            result_ttl_seconds=JOB_RESULT_TTL_SECONDS
+        )
+        job_manager.start()
+        print(f"Started {JOB_WORKERS} job workers")
+
+def stop_job_workers():
+    """Stop job queue dan pool proses solver"""
+    global job_manager
+    if job_manager is not None:
+        job_manager.shutdown()
+        job_manager = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     initialize_system()
+    start_job_workers()
+    start_data_watch()
     print("API Server started successfully!")
     yield
     # Shutdown (jika diperlukan cleanup)
+    stop_data_watch()
+    stop_job_workers()
     print("API Server shutting down...")
 
 # Initialize FastAPI app with lifespan
@@ -100,6 +165,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def track_requests_in_flight(request, call_next):
+    """Gauge jumlah request yang sedang diproses (untuk /metrics)"""
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    try:
+        return await call_next(request)
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+
+def require_admin(admin_token: Optional[str]):
+    """
+    Validasi token admin dari header X-Admin-Token
+    
+    Raises:
+        HTTPException 403: Jika fitur admin nonaktif atau token tidak cocok
+    """
+    if not ADMIN_TOKEN or admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+JOB_QUEUE_DEPTH.set_function(lambda: job_manager.queue_depth() if job_manager is not None else 0)
+
 # Pydantic Models untuk Request/Response
 class LocationRequest(BaseModel):
     latitude: float = Field(..., description="Latitude lokasi user", ge=-90, le=90)
@@ -163,12 +249,36 @@ class HGAConfig(BaseModel):
         ge=10, 
         le=2000
     )
+    local_search: Optional[str] = Field(
+        DEFAULT_HGA_CONFIG["local_search"],
+        description="Local search offspring: swap (tukar posisi dalam kategori) atau category (juga replace dan relocate)",
+        pattern="^(swap|category)$"
+    )
+    local_search_policy: Optional[str] = Field(
+        DEFAULT_HGA_CONFIG["local_search_policy"],
+        description="Kebijakan local search (category dan swap 2-Opt): first atau best improvement",
+        pattern="^(first|best)$"
+    )
+    dont_look_bits: Optional[bool] = Field(
+        DEFAULT_HGA_CONFIG["dont_look_bits"],
+        description="Don't-look bits untuk local search swap: lewati posisi yang sekitarnya tidak berubah"
+    )
+    seed: Optional[int] = Field(
+        None,
+        description="Seed random HGA (hasil sama untuk seed dan data yang sama); kosong = random",
+        ge=0
+    )
 
 class RouteRecommendationRequest(BaseModel):
     latitude: float = Field(..., description="Latitude lokasi user", ge=-90, le=90)
     longitude: float = Field(..., description="Longitude lokasi user", ge=-180, le=180)
     num_routes: Optional[int] = Field(3, description="Jumlah rute yang diinginkan", ge=1, le=5)
     hga_config: Optional[HGAConfig] = Field(None, description="Konfigurasi HGA (opsional)")
+    osrm_profile: Optional[str] = Field(
+        None, 
+        description="Profil OSRM untuk request ini: driving, bike, atau foot (default: profil global)", 
+        pattern="^(driving|bike|foot)$"
+    )
     
     model_config = {
         "json_schema_extra": {
@@ -190,6 +300,37 @@ class RouteRecommendationRequest(BaseModel):
         }
     }
 
+class BatchLocation(BaseModel):
+    latitude: float = Field(..., description="Latitude titik awal", ge=-90, le=90)
+    longitude: float = Field(..., description="Longitude titik awal", ge=-180, le=180)
+
+class BatchRouteRecommendationRequest(BaseModel):
+    locations: List[BatchLocation] = Field(
+        ..., 
+        description="Daftar titik awal (mis. semua hotel di satu kecamatan)", 
+        min_length=1, 
+        max_length=BATCH_MAX_LOCATIONS
+    )
+    num_routes: Optional[int] = Field(3, description="Jumlah rute per lokasi", ge=1, le=5)
+    hga_config: Optional[HGAConfig] = Field(None, description="Konfigurasi HGA untuk semua lokasi (opsional)")
+    osrm_profile: Optional[str] = Field(
+        None, 
+        description="Profil OSRM untuk request ini: driving, bike, atau foot (default: profil global)", 
+        pattern="^(driving|bike|foot)$"
+    )
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "locations": [
+                    {"latitude": -7.2575, "longitude": 112.7521},
+                    {"latitude": -7.2654, "longitude": 112.7423}
+                ],
+                "num_routes": 3
+            }
+        }
+    }
+
 class DestinationInfo(BaseModel):
     order: int
     place_id: Optional[int] = None
@@ -224,8 +365,15 @@ async def root():
             "health": "/health",
             "docs": "/docs",
             "recommend": "/generate-routes (POST)",
+            "recommend_batch": "/generate-routes/batch (POST)",
+            "submit_job": "/jobs/generate-routes (POST)",
+            "job_status": "/jobs/{job_id} (GET)",
             "destinations": "/api/destinations (GET)",
             "default_config": "/api/config/default (GET)",
+            "metrics": "/metrics (GET)",
+            "admin_reload": "/api/admin/reload (POST, admin)",
+            "admin_memory": "/api/admin/memory (GET, admin)",
+            "admin_osrm_cache": "/api/admin/osrm-cache (GET, admin)",
             "osrm_status": "/api/osrm/status (GET)"
         }
     }
@@ -234,22 +382,38 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     osrm_stats = get_osrm_cache_stats()
+    snapshot = snapshot_manager.current if snapshot_manager is not None else None
     return {
         "status": "healthy",
-        "destinations_loaded": destinations is not None,
-        "total_destinations": len(destinations) if destinations else 0,
+        "destinations_loaded": snapshot is not None,
+        "total_destinations": len(snapshot.destinations) if snapshot else 0,
+        "data_version": snapshot.version if snapshot else None,
         "osrm_enabled": osrm_stats['osrm_enabled'],
-        "osrm_cache_size": osrm_stats['cache_size'],
+        "osrm_cache_size": osrm_stats['osrm_runtime_cache_size'],
+        "key_cache_size": {name: cache['size'] for name, cache in osrm_stats['key_caches'].items()},
+        "jobs": job_manager.get_stats() if job_manager is not None else None,
         "timestamp": datetime.now().isoformat()
     }
 
-# Konstanta untuk validasi rute
-MAX_ROUTE_DISTANCE_KM = 25.0  # Maksimal jarak rute yang valid
-MAX_HGA_RETRY_ATTEMPTS = 10   # Maksimal percobaan ulang HGA
-ROUTE_SEARCH_TIMEOUT_SECONDS = 60  # Timeout untuk pencarian rute (detik)
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Health"])
+async def metrics():
+    """
+    Metrics dalam Prometheus text exposition format
+    
+    - Histogram durasi request dan per tahap (hga_attempt, population_init,
+      fitness_evaluation, two_opt, osrm_validation, response_building)
+    - Counter attempt HGA, rute ditolak, timeout, dan sumber lookup jarak
+    - Gauge request in-flight dan kedalaman antrian job
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 @app.post("/generate-routes", response_model=RouteRecommendationResponse, tags=["Recommendations"])
-async def get_route_recommendations(request: RouteRecommendationRequest):
+async def get_route_recommendations(
+    request: RouteRecommendationRequest,
+    profile: bool = Query(False, description="Profiling request (admin only)"),
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None)
+):
     """
     Mendapatkan rekomendasi rute wisata optimal berdasarkan lokasi user
     
@@ -257,243 +421,47 @@ async def get_route_recommendations(request: RouteRecommendationRequest):
     - **longitude**: Longitude lokasi user (-180 sampai 180)
     - **num_routes**: Jumlah rute yang diinginkan (1-5, default: 3)
     - **hga_config**: Konfigurasi HGA (opsional)
+    - **osrm_profile**: Profil OSRM untuk request ini (opsional, default: profil global)
+    - **profile**: `?profile=1` atau header `X-Profile: 1` (butuh header `X-Admin-Token`)
+      menjalankan request di bawah cProfile dan menambahkan `data.profile` berisi
+      breakdown per fungsi (calculate_fitness, 2-Opt, inisialisasi populasi, OSRM)
     
     Mekanisme validasi:
     - Setelah rute dihasilkan, dilakukan pengecekan ulang dengan OSRM
     - Jika jarak > 25 km, rute ditolak dan HGA dijalankan ulang
     - Proses berlanjut hingga mendapatkan sejumlah rute yang diminta
     """
+    profiling = profile or (x_profile or "").lower() in ("1", "true", "yes")
+    if profiling:
+        require_admin(x_admin_token)
+    
     try:
         # Validasi destinations sudah dimuat
-        if destinations is None:
+        if snapshot_manager is None or snapshot_manager.current is None:
             raise HTTPException(
                 status_code=500, 
                 detail="Destinations data not loaded. Please restart the server."
             )
         
-        # Extract data dari request
-        user_location = (request.latitude, request.longitude)
-        num_routes = request.num_routes
-        
         # Inisialisasi HGA dengan konfigurasi dari request atau default
         hga_config = request.hga_config or HGAConfig()
         
-        print(f"\nProcessing request for location: {user_location}")
-        print(f"HGA Config - Pop: {hga_config.population_size}, Gen: {hga_config.generations}, "
-              f"2-Opt: {hga_config.use_2opt} ({hga_config.two_opt_iterations} iter)")
-        print(f"Target: {num_routes} routes with max distance {MAX_ROUTE_DISTANCE_KM} km")
-        
-        # List untuk menyimpan rute yang valid
-        valid_routes = []
-        # Set untuk menyimpan route signature (untuk menghindari duplikat)
-        seen_route_signatures = set()
-        # Counter untuk retry attempts
-        total_attempts = 0
-        # Statistik untuk response
-        all_stats = []
-        rejected_routes_count = 0
-        # Track waktu mulai untuk timeout
-        start_time = time.time()
-        timeout_reached = False
-        
-        # Loop hingga mendapatkan jumlah rute yang diminta atau mencapai batas retry atau timeout
-        while len(valid_routes) < num_routes and total_attempts < MAX_HGA_RETRY_ATTEMPTS:
-            # Check timeout
-            elapsed_time = time.time() - start_time
-            if elapsed_time >= ROUTE_SEARCH_TIMEOUT_SECONDS:
-                timeout_reached = True
-                print(f"\n⏱ Timeout reached: {elapsed_time:.2f}s >= {ROUTE_SEARCH_TIMEOUT_SECONDS}s")
-                break
-            total_attempts += 1
-            print(f"\n--- HGA Attempt {total_attempts} (Valid routes: {len(valid_routes)}/{num_routes}) ---")
-            
-            # Inisialisasi HGA baru untuk setiap attempt
-            hga = HybridGeneticAlgorithm(
-                population_size=hga_config.population_size,
-                generations=hga_config.generations,
-                crossover_rate=hga_config.crossover_rate,
-                mutation_rate=hga_config.mutation_rate,
-                elitism_count=hga_config.elitism_count,
-                tournament_size=hga_config.tournament_size,
-                use_2opt=hga_config.use_2opt,
-                two_opt_iterations=hga_config.two_opt_iterations
+        # Seluruh request memakai satu snapshot walaupun terjadi reload di tengah jalan
+        with snapshot_manager.pin() as snapshot, \
+                (RequestProfiler() if profiling else nullcontext()) as profiler:
+            message, response_data = generate_route_recommendations(
+                destinations=snapshot.destinations,
+                user_location=(request.latitude, request.longitude),
+                num_routes=request.num_routes,
+                hga_config=hga_config.model_dump(),
+                grouped_destinations=snapshot.grouped_destinations,
+                osrm_profile=request.osrm_profile
             )
-            
-            # Jalankan HGA - minta lebih banyak solusi untuk meningkatkan peluang mendapat rute valid
-            candidates_needed = num_routes - len(valid_routes)
-            solutions_to_request = min(candidates_needed + 2, 5)  # Minta sedikit lebih banyak
-            
-            best_chromosomes = hga.run(
-                destinations=destinations,
-                start_point=user_location,
-                num_solutions=solutions_to_request
-            )
-            
-            # Simpan statistik
-            stats = hga.get_evolution_statistics()
-            all_stats.append(stats)
-            
-            # Proses setiap chromosome hasil HGA
-            for chromosome in best_chromosomes:
-                if len(valid_routes) >= num_routes:
-                    break
-                
-                # Buat route signature untuk cek duplikat (berdasarkan urutan place_id)
-                route_signature = tuple(dest.place_id for dest in chromosome.genes)
-                if route_signature in seen_route_signatures:
-                    print(f"  Skipping duplicate route")
-                    continue
-                
-                # Rekalkulasi dengan OSRM untuk mendapatkan jarak real
-                osrm_data = recalculate_route_with_osrm(user_location, chromosome.genes)
-                
-                if osrm_data['success']:
-                    osrm_distance = osrm_data['total_distance_km']
-                    
-                    # Validasi jarak <= 25 km
-                    if osrm_distance <= MAX_ROUTE_DISTANCE_KM:
-                        print(f"  ✓ Valid route found: {osrm_distance:.2f} km")
-                        
-                        # Tandai route sebagai sudah dilihat
-                        seen_route_signatures.add(route_signature)
-                        
-                        # Buat route info
-                        route = Route(user_location, chromosome.genes)
-                        route_info = route.get_route_summary()
-                        route_info['fitness'] = chromosome.get_fitness()
-                        
-                        # Generate Google Maps URL untuk navigasi
-                        google_maps_url = generate_google_maps_url(user_location, chromosome.genes)
-                        route_info['google_maps_url'] = google_maps_url
-                        
-                        # Update dengan data OSRM yang lebih akurat
-                        route_info['total_distance_km'] = osrm_data['total_distance_km']
-                        route_info['total_travel_time_minutes'] = osrm_data['total_duration_minutes']
-                        route_info['total_travel_time_hours'] = osrm_data['total_duration_hours']
-                        route_info['osrm_recalculated'] = True
-                        route_info['osrm_route_geometry'] = osrm_data.get('geometry')
-                        
-                        # Update constraint info dengan data OSRM
-                        if 'constraint_info' in route_info:
-                            from utils.penalty import calculate_distance_penalty, calculate_time_penalty, calculate_total_penalty
-                            
-                            distance_km = osrm_data['total_distance_km']
-                            time_minutes = osrm_data['total_duration_minutes']
-                            distance_violated = distance_km > 20.0
-                            time_violated = time_minutes > 300.0
-                            
-                            route_info['constraint_info']['distance']['value'] = round(distance_km, 2)
-                            route_info['constraint_info']['distance']['violated'] = distance_violated
-                            route_info['constraint_info']['distance']['excess'] = round(max(0, distance_km - 20.0), 2)
-                            route_info['constraint_info']['distance']['penalty'] = round(calculate_distance_penalty(distance_km), 6)
-                            
-                            route_info['constraint_info']['time']['value_minutes'] = round(time_minutes, 2)
-                            route_info['constraint_info']['time']['value_hours'] = round(time_minutes / 60, 2)
-                            route_info['constraint_info']['time']['violated'] = time_violated
-                            route_info['constraint_info']['time']['excess_minutes'] = round(max(0, time_minutes - 300.0), 2)
-                            route_info['constraint_info']['time']['penalty'] = round(calculate_time_penalty(time_minutes), 6)
-                            
-                            route_info['constraint_info']['total_penalty'] = round(calculate_total_penalty(distance_km, time_minutes), 6)
-                            route_info['constraint_info']['is_feasible'] = not distance_violated and not time_violated
-                        
-                        valid_routes.append(route_info)
-                    else:
-                        print(f"  ✗ Route rejected: {osrm_distance:.2f} km > {MAX_ROUTE_DISTANCE_KM} km limit")
-                        rejected_routes_count += 1
-                else:
-                    # Jika OSRM gagal, tetap terima rute tapi tandai
-                    print(f"  ⚠ OSRM failed, accepting route with estimated distance")
-                    seen_route_signatures.add(route_signature)
-                    
-                    route = Route(user_location, chromosome.genes)
-                    route_info = route.get_route_summary()
-                    route_info['fitness'] = chromosome.get_fitness()
-                    
-                    google_maps_url = generate_google_maps_url(user_location, chromosome.genes)
-                    route_info['google_maps_url'] = google_maps_url
-                    route_info['osrm_recalculated'] = False
-                    route_info['osrm_error'] = osrm_data.get('error', 'Unknown error')
-                    
-                    valid_routes.append(route_info)
-        
-        # Cek apakah berhasil mendapatkan cukup rute
-        elapsed_time = time.time() - start_time
-        
-        if len(valid_routes) == 0:
-            if timeout_reached:
-                raise HTTPException(
-                    status_code=408,  # Request Timeout
-                    detail=f"Timeout: Failed to find any valid routes within {MAX_ROUTE_DISTANCE_KM} km after {elapsed_time:.2f} seconds (timeout: {ROUTE_SEARCH_TIMEOUT_SECONDS}s)"
-                )
-            else:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to find any valid routes within {MAX_ROUTE_DISTANCE_KM} km after {total_attempts} attempts"
-                )
-        
-        recommendations = valid_routes
-        
-        # Sorting routes berdasarkan jarak OSRM (terpendek ke terpanjang)
-        recommendations.sort(key=lambda x: x.get('total_distance_km', float('inf')))
-        
-        # Update rank setelah sorting
-        for i, route in enumerate(recommendations):
-            route['rank'] = i + 1
+        response_data["data_version"] = snapshot.version
         
-        # Aggregate statistics dari semua HGA runs
-        final_stats = all_stats[-1] if all_stats else None
-        
-        # Response
-        response_data = {
-            "user_location": {
-                "latitude": user_location[0],
-                "longitude": user_location[1]
-            },
-            "hga_config": {
-                "population_size": hga_config.population_size,
-                "generations": hga_config.generations,
-                "crossover_rate": hga_config.crossover_rate,
-                "mutation_rate": hga_config.mutation_rate,
-                "elitism_count": hga_config.elitism_count,
-                "tournament_size": hga_config.tournament_size,
-                "use_2opt": hga_config.use_2opt,
-                "two_opt_iterations": hga_config.two_opt_iterations
-            },
-            "route_validation": {
-                "max_distance_km": MAX_ROUTE_DISTANCE_KM,
-                "total_hga_attempts": total_attempts,
-                "rejected_routes_count": rejected_routes_count,
-                "valid_routes_found": len(recommendations),
-                "search_time_seconds": round(elapsed_time, 2),
-                "timeout_seconds": ROUTE_SEARCH_TIMEOUT_SECONDS,
-                "timeout_reached": timeout_reached
-            },
-            "statistics": {
-                "total_generations": final_stats['total_generations'] if final_stats else 0,
-                "best_distance_km": final_stats['best_distance'] if final_stats else 0,
-                "initial_fitness": final_stats['best_fitness_history'][0] if final_stats else 0,
-                "final_fitness": final_stats['best_fitness_history'][-1] if final_stats else 0,
-                "improvement_percentage": (
-                    (final_stats['best_fitness_history'][-1] - final_stats['best_fitness_history'][0]) 
-                    / final_stats['best_fitness_history'][0] * 100
-                ) if final_stats and final_stats['best_fitness_history'][0] != 0 else 0
-            },
-            "routes": recommendations
-        }
-        
-        print(f"\n=== Route Generation Summary ===")
-        print(f"Successfully generated {len(recommendations)} valid routes")
-        print(f"Total HGA attempts: {total_attempts}")
-        print(f"Search time: {elapsed_time:.2f}s / {ROUTE_SEARCH_TIMEOUT_SECONDS}s")
-        print(f"Rejected routes (>{MAX_ROUTE_DISTANCE_KM} km): {rejected_routes_count}")
-        if recommendations:
-            print(f"Best route distance: {recommendations[0].get('total_distance_km', 'N/A'):.2f} km\n")
-        
-        # Tentukan message berdasarkan apakah timeout tercapai
-        if timeout_reached and len(recommendations) < num_routes:
-            message = f"Timeout reached. Generated {len(recommendations)}/{num_routes} route recommendations in {elapsed_time:.2f}s"
-        else:
-            message = f"Successfully generated {len(recommendations)} route recommendations"
+        if profiler is not None:
+            response_data["profile"] = profiler.summary()
+            response_data["profile"]["saved_to"] = profiler.save()
         
         return RouteRecommendationResponse(
             success=True,
@@ -502,6 +470,8 @@ async def get_route_recommendations(request: RouteRecommendationRequest):
             timestamp=datetime.now().isoformat()
         )
         
+    except RouteGenerationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         print(f"Error processing request: {str(e)}")
         raise HTTPException(
@@ -509,33 +479,185 @@ async def get_route_recommendations(request: RouteRecommendationRequest):
             detail=f"Error generating route recommendations: {str(e)}"
         )
 
+@app.post("/generate-routes/batch", tags=["Recommendations"])
+async def get_batch_route_recommendations(request: BatchRouteRecommendationRequest):
+    """
+    Rekomendasi rute untuk banyak titik awal sekaligus dengan konfigurasi yang sama
+    
+    Item masuk ke antrian job yang sama dengan /jobs (batas JOB_QUEUE_MAX_SIZE) lalu
+    dijalankan di pool proses solver yang sudah memuat destinasi, matrix, dan
+    pengelompokan kategori, sehingga semua item berbagi precomputation tersebut.
+    Jika antrian sudah penuh saat batch dikirim, response 503.
+    
+    Response berupa NDJSON (satu baris JSON per lokasi) yang dikirim sesuai urutan
+    selesai. Setiap baris berisi `index` (posisi di `locations`) serta `data` seperti
+    /generate-routes, atau `error` jika lokasi tersebut gagal.
+    """
+    if job_manager is None:
+        raise HTTPException(status_code=503, detail="Job workers are not running")
+    
+    hga_config = (request.hga_config or HGAConfig()).model_dump()
+    osrm_stats = get_osrm_cache_stats()
+    payloads = [
+        {
+            "latitude": location.latitude,
+            "longitude": location.longitude,
+            "num_routes": request.num_routes,
+            "hga_config": hga_config,
+            "timeout_seconds": ROUTE_SEARCH_TIMEOUT_SECONDS,
+            "osrm_enabled": osrm_stats['osrm_enabled'],
+            "osrm_profile": request.osrm_profile or osrm_stats['osrm_profile'],
+            "data_version": snapshot_manager.current.version
+        }
+        for location in request.locations
+    ]
+    
+    try:
+        futures = job_manager.submit_batch(payloads)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    async def stream_results():
+        pending = {asyncio.wrap_future(future): index for index, future in enumerate(futures)}
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = pending.pop(task)
+                    location = request.locations[index]
+                    item = {
+                        "index": index,
+                        "latitude": location.latitude,
+                        "longitude": location.longitude
+                    }
+                    try:
+                        outcome = collect_outcome_metrics(task.result())
+                    except Exception as e:
+                        outcome = {"success": False, "status_code": 500, "detail": f"Worker error: {str(e)}"}
+                    
+                    item["success"] = outcome['success']
+                    if outcome['success']:
+                        item["message"] = outcome['message']
+                        item["data"] = outcome['data']
+                    else:
+                        item["error"] = {"status_code": outcome['status_code'], "detail": outcome['detail']}
+                    yield json.dumps(item) + "\n"
+        finally:
+            # Client disconnect: batalkan item yang belum mulai dijalankan
+            for future in futures:
+                future.cancel()
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.post("/jobs/generate-routes", status_code=202, response_model=RouteRecommendationResponse, tags=["Jobs"])
+async def submit_route_job(request: RouteRecommendationRequest):
+    """
+    Mengirim request rekomendasi rute sebagai job asinkron
+    
+    Cocok untuk konfigurasi HGA yang berat (mis. generations besar). Response berisi
+    job_id yang dapat dipantau melalui GET /jobs/{job_id}.
+    """
+    if job_manager is None:
+        raise HTTPException(status_code=503, detail="Job workers are not running")
+    
+    hga_config = request.hga_config or HGAConfig()
+    osrm_stats = get_osrm_cache_stats()
+    payload = {
+        "latitude": request.latitude,
+        "longitude": request.longitude,
+        "num_routes": request.num_routes,
+        "hga_config": hga_config.model_dump(),
+        "timeout_seconds": JOB_ROUTE_SEARCH_TIMEOUT_SECONDS,
+        "osrm_enabled": osrm_stats['osrm_enabled'],
+        "osrm_profile": request.osrm_profile or osrm_stats['osrm_profile'],
+        "data_version": snapshot_manager.current.version
+    }
+    
+    try:
+        job = job_manager.submit(payload)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return RouteRecommendationResponse(
+        success=True,
+        message="Job queued",
+        data={
+            "job_id": job.job_id,
+            "status": job.status,
+            "status_url": f"/jobs/{job.job_id}",
+            "queue_depth": job_manager.queue_depth()
+        },
+        timestamp=datetime.now().isoformat()
+    )
+
+@app.get("/jobs/{job_id}", tags=["Jobs"])
+async def get_route_job(job_id: str):
+    """
+    Mendapatkan status dan hasil job route generation
+    
+    - **status**: queued, running, completed, atau failed
+    - **result**: Hasil rekomendasi (sama dengan data /generate-routes) jika completed
+    - **error**: status_code dan detail jika failed
+    
+    Hasil hanya disimpan selama result TTL setelah job selesai.
+    """
+    job = job_manager.get(job_id) if job_manager is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found or expired")
+    
+    return {
+        "success": True,
+        "data": job.to_dict(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/api/destinations", tags=["Destinations"])
-async def get_destinations():
-    """Get all available destinations"""
-    if destinations is None:
+async def get_destinations(
+    request: Request,
+    category: Optional[str] = Query(None, description="Filter kategori, dipisahkan koma (mis. makanan_berat,oleh_oleh)"),
+    bbox: Optional[str] = Query(None, description="Bounding box: min_lat,min_lon,max_lat,max_lon"),
+    fields: Optional[str] = Query(None, description="'summary' (tanpa deskripsi), 'all', atau daftar field dipisahkan koma"),
+    offset: int = Query(0, ge=0, description="Posisi awal halaman"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Jumlah destinasi per halaman")
+):
+    """
+    Get all available destinations
+    
+    Response sudah diserialisasi saat data dimuat dan dikirim dengan ETag
+    (mendukung If-None-Match -> 304) serta body gzip jika client mendukungnya.
+    """
+    snapshot = snapshot_manager.current if snapshot_manager is not None else None
+    if snapshot is None:
         raise HTTPException(
             status_code=500,
             detail="Destinations data not loaded"
         )
     
-    destinations_list = []
-    for dest in destinations:
-        destinations_list.append({
-            "place_id": dest.place_id,
-            "nama_destinasi": dest.nama,
-            "kategori": dest.kategori,
-            "latitude": dest.latitude,
-            "longitude": dest.longitude,
-            "alamat": dest.alamat,
-            "image_url": dest.image_url,
-            "deskripsi": dest.deskripsi
-        })
+    try:
+        catalog_response = snapshot.catalog.get_response(
+            categories=parse_categories(category),
+            bbox=parse_bbox(bbox),
+            fields=parse_fields(fields),
+            offset=offset,
+            limit=limit
+        )
+    except CatalogQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return {
-        "success": True,
-        "total": len(destinations_list),
-        "data": destinations_list
+    headers = {
+        "ETag": catalog_response.etag,
+        "Cache-Control": f"public, max-age={DESTINATIONS_CACHE_MAX_AGE}",
+        "Vary": "Accept-Encoding"
     }
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if catalog_response.etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=catalog_response.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=catalog_response.body, media_type="application/json", headers=headers)
 
 @app.get("/api/config/default", tags=["Configuration"])
 async def get_default_config():
@@ -567,19 +689,22 @@ async def get_osrm_status():
             "osrm_base_url": stats['osrm_base_url'],
             "osrm_profile": stats['osrm_profile'],
             "profile_description": profile_description.get(stats['osrm_profile'], 'Unknown'),
-            "cache_size": stats['cache_size'],
+            "cache_size": stats['osrm_runtime_cache_size'],
+            "response_cache": stats['osrm_cache'],
+            "key_caches": stats['key_caches'],
+            "matrix_profiles": stats['matrix_profiles'],
             "available_profiles": list(profile_description.keys()),
             "description": "OSRM is used to calculate real route distances on roads. Falls back to Haversine (straight-line distance) if OSRM fails."
         }
     }
 
 @app.post("/api/osrm/clear-cache", tags=["OSRM"])
-async def clear_cache():
-    """Clear OSRM distance cache"""
-    clear_osrm_cache()
+async def clear_cache(profile: Optional[str] = None):
+    """Clear OSRM response cache (memory dan persisten), opsional hanya untuk satu profil"""
+    clear_osrm_cache(profile)
     return {
         "success": True,
-        "message": "OSRM cache cleared successfully"
+        "message": f"OSRM cache cleared successfully{f' for profile {profile}' if profile else ''}"
     }
 
 @app.post("/api/osrm/toggle", tags=["OSRM"])
@@ -597,6 +722,82 @@ async def toggle_osrm(enable: bool = True):
         "osrm_enabled": enable
     }
 
+@app.post("/api/admin/reload", tags=["Admin"])
+async def reload_data(force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """
+    Reload data destinasi dan matrix tanpa restart (butuh header `X-Admin-Token`)
+    
+    Snapshot baru (destinasi, index kategori, katalog, matrix semua profil) dibangun di
+    background lalu ditukar secara atomik. Request yang sedang berjalan selesai dengan
+    snapshot lama; worker job memuat snapshot baru saat menerima job berikutnya.
+    
+    - **force**: Tukar snapshot walaupun isi data tidak berubah
+    """
+    require_admin(x_admin_token)
+    if snapshot_manager is None:
+        raise HTTPException(status_code=503, detail="Destinations data not loaded")
+    
+    try:
+        result = await asyncio.to_thread(snapshot_manager.reload, force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, keeping current snapshot: {str(e)}")
+    
+    return {
+        "success": True,
+        "message": "Data reloaded" if result['swapped'] else "Data unchanged",
+        "data": {**result, "snapshot": snapshot_manager.current.summary()},
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/admin/memory", tags=["Admin"])
+async def memory_usage(
+    top: int = Query(10, ge=1, le=100, description="Jumlah lokasi alokasi tracemalloc"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Laporan memory proses API (butuh header `X-Admin-Token`)
+    
+    Ukuran resident per struktur: destinations, distance_matrix, travel_time_matrix,
+    key_cache, osrm_cache, dense_matrices, populations (yang masih hidup), dan histories
+    fitness. Setiap panggilan disimpan sebagai sampel, sehingga `growth` menunjukkan
+    pertumbuhan sejak panggilan pertama dan sejak panggilan sebelumnya. Lokasi alokasi
+    hanya tersedia jika API dijalankan dengan `MEMORY_TRACEMALLOC=1` (laporan menjadi
+    beberapa detik karena snapshot tracemalloc).
+    
+    Worker job berjalan di proses terpisah dan tidak termasuk dalam laporan ini
+    (gunakan `python report_memory.py` untuk mengukur solver).
+    
+    - **top**: Jumlah lokasi alokasi terbesar / paling bertambah yang dilaporkan
+    """
+    require_admin(x_admin_token)
+    snapshot = snapshot_manager.current if snapshot_manager is not None else None
+    report = await asyncio.to_thread(memory_report, snapshot.destinations if snapshot else None, top)
+    
+    return {
+        "success": True,
+        "message": "Memory report generated",
+        "data": report,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/admin/osrm-cache", tags=["Admin"])
+async def osrm_cache_status(x_admin_token: Optional[str] = Header(None)):
+    """
+    Statistik cache OSRM termasuk jumlah entry SQLite (butuh header `X-Admin-Token`)
+    
+    /health dan /api/osrm/status tidak menghitung entry SQLite (`disk_entries` = null)
+    karena COUNT(*) memindai seluruh tabel cache yang ukurannya tidak dibatasi.
+    """
+    require_admin(x_admin_token)
+    stats = await asyncio.to_thread(get_osrm_cache_stats, True)
+    
+    return {
+        "success": True,
+        "message": "OSRM cache statistics",
+        "data": stats['osrm_cache'],
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.post("/api/osrm/set-profile", tags=["OSRM"])
 async def set_profile(profile: str = "bike"):
     """
@@ -609,6 +810,9 @@ async def set_profile(profile: str = "bike"):
     
     Note: Public OSRM server tidak memiliki profil 'motorcycle' terpisah.
     Gunakan 'driving' untuk motor di Indonesia.
+    
+    Profil juga bisa dipilih per request lewat field `osrm_profile` tanpa mengubah
+    profil global.
     """
     try:
         set_osrm_profile(profile)
@@ -624,7 +828,8 @@ async def set_profile(profile: str = "bike"):
             "message": f"OSRM profile changed to '{profile}'",
             "profile": profile,
             "description": profile_description.get(profile, 'Unknown'),
-            "note": "Cache has been cleared due to profile change"
+            "matrix": get_osrm_cache_stats()['matrix_profiles'][profile],
+            "note": "Matrices and OSRM cache are kept per profile; switching back is instant"
         }
     except ValueError as e:
         raise HTTPException(
@@ -0,0 +1,12 @@
+"""
+Micro-benchmark hot path algoritme
+
+Jalankan: python run_benchmarks.py
+Bandingkan dua hasil: python run_benchmarks.py --compare lama.json baru.json
+
+Semua benchmark memakai data bawaan di ./data dan seed random yang tetap, sehingga
+hasil dari dua commit (pada mesin yang sama) bisa dibandingkan langsung.
+
+Load test /generate-routes (latensi p50/p95/p99, throughput, timeout, CPU) dengan
+OSRM tiruan: python run_loadtest.py (lihat benchmarks.loadtest).
+"""
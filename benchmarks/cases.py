@@ -0,0 +1,381 @@
+"""
+Daftar benchmark hot path HGA
+
+Setiap benchmark didaftarkan dengan @benchmark dan menerima BenchmarkContext (data
+yang sudah dimuat). Fungsi benchmark menyiapkan input dengan seed tetap lalu
+mengembalikan operasi tanpa argumen yang diukur. 'items' adalah jumlah unit kerja
+per operasi (mis. jumlah kromosom yang dievaluasi) untuk menghitung waktu per item.
+"""
+import contextlib
+import io
+import itertools
+import random
+import shutil
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Seed random semua benchmark (input identik antar run)
+BENCHMARK_SEED = 20240601
+
+# Titik awal (pusat kota Surabaya), sama dengan contoh di API
+START_POINT = (-7.2575, 112.7521)
+
+# Jumlah kromosom input untuk benchmark per kromosom
+CHROMOSOME_SAMPLE_SIZE = 100
+
+# Rute panjang (tanpa pola kategori) untuk benchmark 2-Opt reversal
+LONG_ROUTE_SIZE = 40
+LONG_ROUTE_COUNT = 5
+
+# Jumlah pasangan koordinat per operasi benchmark calculate_distance
+DISTANCE_SAMPLE_SIZE = 1000
+
+
+class BenchmarkCase:
+    """Satu benchmark terdaftar"""
+
+    def __init__(self, name: str, function: Callable, number: int, repeat: int, items: int):
+        self.name = name
+        self.function = function
+        self.number = number
+        self.repeat = repeat
+        self.items = items
+
+
+BENCHMARKS: List[BenchmarkCase] = []
+
+
+def benchmark(name: str, number: int = 1, repeat: int = 7, items: int = 1):
+    """
+    Decorator pendaftaran benchmark
+
+    Args:
+        name: Nama unik (dipakai sebagai key di file hasil)
+        number: Pemanggilan operasi per sampel
+        repeat: Jumlah sampel
+        items: Unit kerja per operasi
+    """
+    def register(function: Callable) -> Callable:
+        BENCHMARKS.append(BenchmarkCase(name, function, number, repeat, items))
+        return function
+    return register
+
+
+@contextlib.contextmanager
+def quiet():
+    """Membuang output print (load matrix, progress HGA) selama benchmark"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+class BenchmarkContext:
+    """
+    Data bersama untuk semua benchmark: destinasi dari ./data dan matrix yang dimuat
+
+    OSRM real-time dimatikan agar benchmark tidak bergantung pada jaringan.
+    """
+
+    def __init__(self, data_file: str = "./data/data_wisata.jsonl"):
+        from utils.data_loader import load_destinations_from_csv, group_destinations_by_category
+        from utils.distance import set_use_osrm
+        from utils.matrix_store import preload_profiles
+
+        self.data_file = data_file
+        with quiet():
+            set_use_osrm(False)
+            self.destinations = load_destinations_from_csv(data_file)
+            self.grouped_destinations = group_destinations_by_category(self.destinations)
+            self.profiles = preload_profiles()
+
+    def seed(self):
+        """Reset seed random sebelum menyiapkan input"""
+        random.seed(BENCHMARK_SEED)
+
+    def chromosomes(self, count: int = CHROMOSOME_SAMPLE_SIZE):
+        """Kromosom valid random (seed tetap)"""
+        from algorithms.population import Population
+        self.seed()
+        population = Population(population_size=count)
+        population.initialize_random_population(self.destinations, START_POINT, self.grouped_destinations)
+        return population.chromosomes
+
+    def metadata(self) -> Dict:
+        """Info data yang dipakai benchmark (disimpan di file hasil)"""
+        from utils.matrix_store import store_stats
+        stats = store_stats()
+        return {
+            'data_file': self.data_file,
+            'destinations': len(self.destinations),
+            'matrix_pairs': {
+                profile: (profile_stats['distance_pairs'], profile_stats['travel_time_pairs'])
+                for profile, profile_stats in stats.items() if profile_stats['loaded']
+            }
+        }
+
+
+def _cycle(values: List) -> Callable[[], object]:
+    """Mengambil elemen berikutnya secara bergiliran (input berbeda tiap pemanggilan)"""
+    iterator = itertools.cycle(values)
+    return lambda: next(iterator)
+
+
+# -----------------------------------------------------------------------------
+# Evaluasi
+# -----------------------------------------------------------------------------
+
+@benchmark("chromosome.calculate_fitness", number=5, items=CHROMOSOME_SAMPLE_SIZE)
+def bench_calculate_fitness(context: BenchmarkContext):
+    chromosomes = context.chromosomes()
+
+    def operation():
+        for chromosome in chromosomes:
+            chromosome.calculate_fitness()
+    return operation
+
+
+@benchmark("population.initialize_random_population", number=5, items=CHROMOSOME_SAMPLE_SIZE)
+def bench_initialize_population(context: BenchmarkContext):
+    from algorithms.population import Population
+    context.seed()
+
+    def operation():
+        population = Population(population_size=CHROMOSOME_SAMPLE_SIZE)
+        population.initialize_random_population(context.destinations, START_POINT, context.grouped_destinations)
+    return operation
+
+
+@benchmark("kernels.evaluate_population", number=20, items=CHROMOSOME_SAMPLE_SIZE)
+def bench_kernel_evaluate(context: BenchmarkContext):
+    from algorithms.kernels import IndexKernels
+    chromosomes = context.chromosomes()
+    kernels = IndexKernels(context.destinations[0].table, START_POINT)
+
+    def operation():
+        # evaluate() hanya menghitung kromosom yang belum punya fitness
+        for chromosome in chromosomes:
+            chromosome.fitness_value = None
+        kernels.evaluate(chromosomes)
+    return operation
+
+
+# -----------------------------------------------------------------------------
+# Operator GA
+# -----------------------------------------------------------------------------
+
+def _pairs(context: BenchmarkContext, group: int) -> Callable[[], Tuple]:
+    chromosomes = context.chromosomes()
+    return _cycle([tuple(chromosomes[i:i + group]) for i in range(0, len(chromosomes) - group + 1, group)])
+
+
+@benchmark("operators.order_crossover", number=200)
+def bench_order_crossover(context: BenchmarkContext):
+    from algorithms.operators import GAOperators
+    next_parents = _pairs(context, 2)
+    return lambda: GAOperators.order_crossover(*next_parents())
+
+
+@benchmark("operators.order_crossover_modified", number=200)
+def bench_order_crossover_modified(context: BenchmarkContext):
+    from algorithms.operators import GAOperators
+    next_parents = _pairs(context, 4)
+    return lambda: GAOperators.order_crossover_modified(*next_parents())
+
+
+@benchmark("operators.position_based_crossover", number=200)
+def bench_position_based_crossover(context: BenchmarkContext):
+    from algorithms.operators import GAOperators
+    next_parents = _pairs(context, 2)
+    return lambda: GAOperators.position_based_crossover(*next_parents())
+
+
+def _mutation(context: BenchmarkContext, name: str):
+    from algorithms.operators import GAOperators
+    mutate = getattr(GAOperators, name)
+    next_chromosome = _cycle(context.chromosomes())
+    # mutation_rate=1.0: setiap pemanggilan benar-benar memutasi
+    return lambda: mutate(next_chromosome(), 1.0)
+
+
+@benchmark("operators.swap_mutation", number=500)
+def bench_swap_mutation(context: BenchmarkContext):
+    return _mutation(context, 'swap_mutation')
+
+
+@benchmark("operators.inversion_mutation", number=500)
+def bench_inversion_mutation(context: BenchmarkContext):
+    return _mutation(context, 'inversion_mutation')
+
+
+@benchmark("operators.scramble_mutation", number=500)
+def bench_scramble_mutation(context: BenchmarkContext):
+    return _mutation(context, 'scramble_mutation')
+
+
+# -----------------------------------------------------------------------------
+# Local search
+# -----------------------------------------------------------------------------
+
+@benchmark("two_opt.optimize_with_constraints", number=1, items=CHROMOSOME_SAMPLE_SIZE)
+def bench_two_opt(context: BenchmarkContext):
+    from algorithms.two_opt import TwoOptOptimizer
+    chromosomes = context.chromosomes()
+    optimizer = TwoOptOptimizer(max_iterations=100)
+
+    def operation():
+        for chromosome in chromosomes:
+            optimizer.optimize_with_constraints(chromosome)
+    return operation
+
+
+def _two_opt_long_routes(context: BenchmarkContext, **options):
+    from algorithms.chromosome import Chromosome
+    from algorithms.two_opt import TwoOptOptimizer
+    context.seed()
+    chromosomes = [
+        Chromosome(random.sample(context.destinations, LONG_ROUTE_SIZE), START_POINT)
+        for _ in range(LONG_ROUTE_COUNT)
+    ]
+    optimizer = TwoOptOptimizer(max_iterations=500, **options)
+
+    def operation():
+        for chromosome in chromosomes:
+            optimizer.optimize(chromosome)
+    return operation
+
+
+@benchmark("two_opt.optimize[rescan]", number=1, repeat=3, items=LONG_ROUTE_COUNT)
+def bench_two_opt_long_rescan(context: BenchmarkContext):
+    return _two_opt_long_routes(context)
+
+
+@benchmark("two_opt.optimize[dlb+neighbors]", number=1, repeat=3, items=LONG_ROUTE_COUNT)
+def bench_two_opt_long_dont_look_bits(context: BenchmarkContext):
+    return _two_opt_long_routes(context, dont_look_bits=True, neighbors=8)
+
+
+def _category_local_search(context: BenchmarkContext, policy: str):
+    from algorithms.local_search import CategoryLocalSearch
+    chromosomes = context.chromosomes()
+    local_search = CategoryLocalSearch(context.destinations, START_POINT, max_iterations=100, policy=policy)
+
+    def operation():
+        for chromosome in chromosomes:
+            local_search.optimize(chromosome)
+    return operation
+
+
+@benchmark("local_search.category[first]", number=1, items=CHROMOSOME_SAMPLE_SIZE)
+def bench_category_local_search_first(context: BenchmarkContext):
+    return _category_local_search(context, 'first')
+
+
+@benchmark("local_search.category[best]", number=1, items=CHROMOSOME_SAMPLE_SIZE)
+def bench_category_local_search_best(context: BenchmarkContext):
+    return _category_local_search(context, 'best')
+
+
+# -----------------------------------------------------------------------------
+# Jarak
+# -----------------------------------------------------------------------------
+
+def _destination_pairs(context: BenchmarkContext) -> List[Tuple[float, float, float, float]]:
+    context.seed()
+    coordinates = [(d.latitude, d.longitude) for d in context.destinations]
+    pairs = []
+    while len(pairs) < DISTANCE_SAMPLE_SIZE:
+        (lat1, lon1), (lat2, lon2) = random.sample(coordinates, 2)
+        if (lat1, lon1) != (lat2, lon2):
+            pairs.append((lat1, lon1, lat2, lon2))
+    return pairs
+
+
+@benchmark("distance.calculate_distance[matrix_hit]", number=5, items=DISTANCE_SAMPLE_SIZE)
+def bench_distance_matrix_hit(context: BenchmarkContext):
+    from utils.distance import calculate_distance
+    pairs = _destination_pairs(context)
+
+    def operation():
+        for lat1, lon1, lat2, lon2 in pairs:
+            calculate_distance(lat1, lon1, lat2, lon2)
+    return operation
+
+
+@benchmark("distance.calculate_distance[fallback]", number=5, items=DISTANCE_SAMPLE_SIZE)
+def bench_distance_fallback(context: BenchmarkContext):
+    from utils.distance import calculate_distance
+    # Titik awal user tidak ada di matrix: lookup gagal lalu Haversine
+    pairs = [(START_POINT[0], START_POINT[1], lat2, lon2) for _, _, lat2, lon2 in _destination_pairs(context)]
+
+    def operation():
+        for lat1, lon1, lat2, lon2 in pairs:
+            calculate_distance(lat1, lon1, lat2, lon2)
+    return operation
+
+
+@benchmark("distance.calculate_distance[haversine_user]", number=5, items=DISTANCE_SAMPLE_SIZE)
+def bench_distance_haversine_user(context: BenchmarkContext):
+    from utils.distance import calculate_distance
+    pairs = [(START_POINT[0], START_POINT[1], lat2, lon2) for _, _, lat2, lon2 in _destination_pairs(context)]
+
+    def operation():
+        for lat1, lon1, lat2, lon2 in pairs:
+            calculate_distance(lat1, lon1, lat2, lon2, use_haversine_for_user=True)
+    return operation
+
+
+# -----------------------------------------------------------------------------
+# Load matrix
+# -----------------------------------------------------------------------------
+
+@benchmark("matrix_load.distance_json", repeat=5)
+def bench_load_distance_matrix(context: BenchmarkContext):
+    from utils.distance_matrix import DistanceMatrixCache
+    from utils.matrix_store import DEFAULT_MATRIX_PROFILE, matrix_files
+    distance_file, _ = matrix_files(DEFAULT_MATRIX_PROFILE)
+
+    def operation():
+        with quiet():
+            DistanceMatrixCache(distance_file).load()
+    return operation
+
+
+@benchmark("matrix_load.travel_time_json", repeat=5)
+def bench_load_travel_time_matrix(context: BenchmarkContext):
+    from utils.travel_time_matrix import TravelTimeMatrixCache
+    from utils.matrix_store import DEFAULT_MATRIX_PROFILE, matrix_files
+    _, travel_time_file = matrix_files(DEFAULT_MATRIX_PROFILE)
+
+    def operation():
+        with quiet():
+            TravelTimeMatrixCache(travel_time_file).load()
+    return operation
+
+
+@benchmark("matrix_load.data_plane_attach", repeat=5)
+def bench_attach_data_plane(context: BenchmarkContext):
+    from utils import data_plane
+    from utils.matrix_store import DEFAULT_MATRIX_PROFILE
+    # Data plane diterbitkan sekali ke direktori sementara (tidak menyentuh ./data/plane)
+    plane_dir = tempfile.mkdtemp(prefix="bench-plane-")
+    previous_dir = data_plane.DATA_PLANE_DIR
+    data_plane.DATA_PLANE_DIR = plane_dir
+    with quiet():
+        data_plane.publish_profile(DEFAULT_MATRIX_PROFILE)
+
+    def operation():
+        data_plane.DATA_PLANE_DIR = plane_dir
+        try:
+            with quiet():
+                data_plane.attach_profile(DEFAULT_MATRIX_PROFILE, publish=False)
+        finally:
+            data_plane.DATA_PLANE_DIR = previous_dir
+    operation.cleanup = lambda: shutil.rmtree(plane_dir, ignore_errors=True)
+    data_plane.DATA_PLANE_DIR = previous_dir
+    return operation
+
+
+def select_benchmarks(patterns: Optional[List[str]] = None) -> List[BenchmarkCase]:
+    """Benchmark yang namanya mengandung salah satu pattern (semua jika kosong)"""
+    if not patterns:
+        return list(BENCHMARKS)
+    return [case for case in BENCHMARKS if any(pattern in case.name for pattern in patterns)]
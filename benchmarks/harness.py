@@ -0,0 +1,261 @@
+"""
+Pengukuran waktu, metadata mesin, penyimpanan, dan perbandingan hasil benchmark
+"""
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# Versi format file hasil (naikkan jika struktur JSON berubah)
+RESULTS_SCHEMA_VERSION = 1
+
+# Direktori default file hasil
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Durasi minimal satu sampel; number dinaikkan otomatis untuk operasi yang sangat cepat
+MIN_SAMPLE_SECONDS = 0.05
+
+# Perubahan median di bawah ambang ini dianggap noise (persen)
+DEFAULT_THRESHOLD_PERCENT = 5.0
+
+
+def measure(operation: Callable[[], object], number: int = 1, repeat: int = 5, warmup: int = 1,
+            min_sample_seconds: float = MIN_SAMPLE_SECONDS) -> Dict:
+    """
+    Mengukur waktu satu operasi (gaya timeit: repeat x number pemanggilan)
+
+    GC dimatikan selama pengukuran agar koleksi sampah tidak jatuh acak ke satu sampel.
+
+    Args:
+        operation: Fungsi tanpa argumen yang diukur
+        number: Jumlah pemanggilan minimal per sampel
+        repeat: Jumlah sampel
+        warmup: Jumlah sampel pemanasan yang tidak dicatat (cache, matrix dense)
+        min_sample_seconds: number dinaikkan sampai satu sampel minimal selama ini
+
+    Returns:
+        Dictionary statistik waktu per pemanggilan (detik) dan sampel mentah
+    """
+    warmup_started = time.perf_counter()
+    for _ in range(warmup):
+        for _ in range(number):
+            operation()
+    if warmup:
+        per_call = (time.perf_counter() - warmup_started) / (warmup * number)
+        if per_call > 0:
+            number = max(number, math.ceil(min_sample_seconds / per_call))
+
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                operation()
+            samples.append((time.perf_counter() - started) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'samples': samples
+    }
+
+
+def run_suite(context, cases: List, quick: bool = False, progress: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Menjalankan daftar benchmark
+
+    Args:
+        context: BenchmarkContext (data yang sudah dimuat)
+        cases: List BenchmarkCase
+        quick: Sampel lebih sedikit (cek cepat, hasil lebih noisy)
+        progress: Callback nama benchmark sebelum dijalankan
+
+    Returns:
+        Dictionary hasil lengkap (schema, waktu, metadata mesin dan data, hasil per benchmark)
+    """
+    results = {}
+    for case in cases:
+        if progress is not None:
+            progress(case.name)
+        operation = case.function(context)
+        repeat = 3 if quick else case.repeat
+        try:
+            result = measure(operation, number=case.number, repeat=repeat)
+        finally:
+            cleanup = getattr(operation, 'cleanup', None)
+            if cleanup is not None:
+                cleanup()
+        result['items'] = case.items
+        results[case.name] = result
+
+    return {
+        'schema': RESULTS_SCHEMA_VERSION,
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'quick': quick,
+        'machine': machine_metadata(),
+        'data': context.metadata(),
+        'results': results
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        return output.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def machine_metadata() -> Dict:
+    """Metadata mesin dan lingkungan (disimpan bersama hasil untuk perbandingan)"""
+    from algorithms.kernels import resolve_backend
+    return {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor() or None,
+        'cpu_count': os.cpu_count(),
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'numpy': np.__version__,
+        'hga_backend': resolve_backend(),
+        'git_commit': _git_commit()
+    }
+
+
+def save_results(results: Dict, path: str) -> str:
+    """Menyimpan hasil benchmark ke file JSON"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def load_results(path: str) -> Dict:
+    """
+    Memuat file hasil benchmark
+
+    Raises:
+        ValueError: Jika versi format file tidak dikenal
+    """
+    with open(path, 'r') as f:
+        results = json.load(f)
+    if results.get('schema') != RESULTS_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported benchmark results schema in {path}: {results.get('schema')}")
+    return results
+
+
+def compare_results(base: Dict, new: Dict, threshold_percent: float = DEFAULT_THRESHOLD_PERCENT) -> Dict:
+    """
+    Membandingkan dua hasil benchmark berdasarkan median waktu per operasi
+
+    Args:
+        base: Hasil acuan (mis. sebelum perubahan)
+        new: Hasil baru
+        threshold_percent: Perubahan di bawah ambang ini dianggap sama (juga selisih yang
+                           lebih kecil dari jumlah stdev kedua hasil)
+
+    Returns:
+        Dictionary {rows, machine_differences, only_in_base, only_in_new}
+    """
+    rows = []
+    for name, base_result in base['results'].items():
+        new_result = new['results'].get(name)
+        if new_result is None:
+            continue
+        base_median = base_result['median']
+        new_median = new_result['median']
+        change = (new_median - base_median) / base_median * 100 if base_median > 0 else 0.0
+        # Selisih di dalam sebaran sampel kedua run juga dianggap noise
+        spread = base_result['stdev'] + new_result['stdev']
+        if abs(change) < threshold_percent or abs(new_median - base_median) <= spread:
+            verdict = 'same'
+        else:
+            verdict = 'slower' if change > 0 else 'faster'
+        rows.append({
+            'name': name,
+            'base_median': base_median,
+            'new_median': new_median,
+            'speedup': base_median / new_median if new_median > 0 else None,
+            'change_percent': change,
+            'verdict': verdict
+        })
+
+    base_machine = base.get('machine', {})
+    new_machine = new.get('machine', {})
+    ignored = {'git_commit'}
+    machine_differences = {
+        key: (base_machine.get(key), new_machine.get(key))
+        for key in sorted(set(base_machine) | set(new_machine))
+        if key not in ignored and base_machine.get(key) != new_machine.get(key)
+    }
+    return {
+        'rows': rows,
+        'machine_differences': machine_differences,
+        'only_in_base': sorted(set(base['results']) - set(new['results'])),
+        'only_in_new': sorted(set(new['results']) - set(base['results']))
+    }
+
+
+def format_duration(seconds: float) -> str:
+    """Format durasi dengan satuan yang sesuai (ns/us/ms/s)"""
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def format_results(results: Dict) -> str:
+    """Tabel hasil satu run"""
+    lines = [f"{'Benchmark':<48} {'Median':>12} {'Min':>12} {'Stdev':>8} {'Per item':>12}"]
+    for name, result in results['results'].items():
+        per_item = result['median'] / result['items'] if result.get('items') else None
+        stdev_percent = result['stdev'] / result['median'] * 100 if result['median'] > 0 else 0.0
+        lines.append(
+            f"{name:<48} {format_duration(result['median']):>12} {format_duration(result['min']):>12} "
+            f"{stdev_percent:>7.1f}% {format_duration(per_item) if per_item else '-':>12}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(comparison: Dict) -> str:
+    """Tabel perbandingan dua hasil"""
+    symbols = {'faster': '🟢', 'slower': '🔴', 'same': '⚪'}
+    lines = [f"{'Benchmark':<48} {'Base':>12} {'New':>12} {'Change':>9} {'Speedup':>8}"]
+    for row in comparison['rows']:
+        speedup = f"{row['speedup']:.2f}x" if row['speedup'] else '-'
+        lines.append(
+            f"{row['name']:<48} {format_duration(row['base_median']):>12} {format_duration(row['new_median']):>12} "
+            f"{row['change_percent']:>+8.1f}% {speedup:>8} {symbols[row['verdict']]}"
+        )
+    for name in comparison['only_in_base']:
+        lines.append(f"{name:<48} (only in base)")
+    for name in comparison['only_in_new']:
+        lines.append(f"{name:<48} (only in new)")
+    if comparison['machine_differences']:
+        lines.append("")
+        lines.append("⚠️  Results come from different environments:")
+        for key, (base_value, new_value) in comparison['machine_differences'].items():
+            lines.append(f"   {key}: {base_value} → {new_value}")
+    return "\n".join(lines)
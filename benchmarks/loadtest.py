@@ -0,0 +1,350 @@
+"""
+Load test lokal untuk /generate-routes
+
+Request diambil dari file JSONL (satu body request per baris, hasil rekaman) atau
+dibuat sintetis: titik awal random di sekitar destinasi katalog. Request dikirim
+oleh beberapa thread sekaligus (closed loop: setiap thread mengirim request
+berikutnya setelah respons sebelumnya diterima) ke salah satu target:
+
+- asgi: aplikasi FastAPI di proses ini lewat TestClient (tanpa jaringan)
+- uvicorn: uvicorn lokal di thread proses ini, lewat HTTP
+- url: server yang sudah berjalan (OSRM tiruan tidak berlaku untuk server tsb)
+
+Hasil: latensi p50/p95/p99, throughput, tingkat timeout dan error, serta CPU proses.
+"""
+import contextlib
+import json
+import math
+import random
+import socket
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Endpoint yang diuji
+ROUTE_ENDPOINT = "/generate-routes"
+
+# Radius titik awal sintetis di sekitar destinasi katalog (km)
+SYNTHETIC_RADIUS_KM = 3.0
+
+# Batas waktu satu request HTTP di sisi client (detik)
+CLIENT_TIMEOUT_SECONDS = 120.0
+
+# Persentil latensi yang dilaporkan
+LATENCY_PERCENTILES = (50, 95, 99)
+
+# Fungsi kirim satu body request: (status HTTP atau None jika gagal, body JSON atau pesan error)
+SendFunction = Callable[[Dict], Tuple[Optional[int], object]]
+
+
+# -----------------------------------------------------------------------------
+# Request mix
+# -----------------------------------------------------------------------------
+
+def load_request_mix(path: str) -> Tuple[List[Dict], int]:
+    """
+    Membaca body request rekaman dari file JSONL
+
+    Setiap baris berisi body /generate-routes, atau object dengan key 'body'.
+    Baris yang tidak punya latitude/longitude dilewati.
+
+    Returns:
+        Tuple (list body request, jumlah baris yang dilewati)
+    """
+    bodies, skipped = [], 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+            body = record.get('body', record) if isinstance(record, dict) else None
+            if isinstance(body, dict) and 'latitude' in body and 'longitude' in body:
+                bodies.append(body)
+            else:
+                skipped += 1
+    return bodies, skipped
+
+
+def synthetic_requests(destinations, count: int, seed: int = 0,
+                       radius_km: float = SYNTHETIC_RADIUS_KM,
+                       num_routes: int = 1,
+                       hga_config: Optional[Dict] = None) -> List[Dict]:
+    """
+    Body request dengan titik awal random di sekitar destinasi katalog
+
+    Args:
+        destinations: Destinasi katalog
+        count: Jumlah body
+        seed: Seed random (mix yang sama untuk seed yang sama)
+        radius_km: Jarak maksimal titik awal dari destinasi yang dipilih
+        num_routes: num_routes setiap request
+        hga_config: hga_config setiap request (None = default server)
+    """
+    rng = random.Random(seed)
+    bodies = []
+    for _ in range(count):
+        anchor = rng.choice(destinations)
+        # Offset uniform dalam lingkaran; 1 derajat latitude ~ 111 km
+        distance_deg = radius_km * (rng.random() ** 0.5) / 111.0
+        angle = rng.uniform(0, 2 * math.pi)
+        longitude_scale = max(math.cos(math.radians(anchor.latitude)), 0.1)
+        body = {
+            'latitude': round(anchor.latitude + distance_deg * math.sin(angle), 6),
+            'longitude': round(anchor.longitude + distance_deg * math.cos(angle) / longitude_scale, 6),
+            'num_routes': num_routes
+        }
+        if hga_config:
+            body['hga_config'] = dict(hga_config)
+        bodies.append(body)
+    return bodies
+
+
+# -----------------------------------------------------------------------------
+# Target
+# -----------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def asgi_target() -> Iterator[SendFunction]:
+    """Aplikasi api.app di proses ini (lifespan dijalankan, satu event loop bersama)"""
+    from fastapi.testclient import TestClient
+    import api
+
+    with TestClient(api.app, raise_server_exceptions=False) as client:
+        def send(body: Dict):
+            response = client.post(ROUTE_ENDPOINT, json=body)
+            return response.status_code, _json_or_text(response)
+        yield send
+
+
+def _free_port(host: str) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def uvicorn_target(host: str = "127.0.0.1", port: Optional[int] = None,
+                   timeout: float = CLIENT_TIMEOUT_SECONDS) -> Iterator[SendFunction]:
+    """uvicorn lokal di thread background (satu worker, sama seperti `python api.py`)"""
+    import uvicorn
+    import api
+
+    port = port or _free_port(host)
+    server = uvicorn.Server(uvicorn.Config(api.app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="loadtest-uvicorn", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("uvicorn failed to start")
+        time.sleep(0.05)
+    try:
+        with http_target(f"http://{host}:{port}", timeout) as send:
+            yield send
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+@contextlib.contextmanager
+def http_target(base_url: str, timeout: float = CLIENT_TIMEOUT_SECONDS) -> Iterator[SendFunction]:
+    """Server HTTP yang sudah berjalan (satu requests.Session per thread)"""
+    import requests
+
+    sessions = threading.local()
+    url = base_url.rstrip('/') + ROUTE_ENDPOINT
+
+    def send(body: Dict):
+        session = getattr(sessions, 'session', None)
+        if session is None:
+            session = sessions.session = requests.Session()
+        try:
+            response = session.post(url, json=body, timeout=timeout)
+        except requests.Timeout:
+            return None, 'client timeout'
+        except requests.RequestException as e:
+            return None, str(e)
+        return response.status_code, _json_or_text(response)
+    yield send
+
+
+def _json_or_text(response):
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+# -----------------------------------------------------------------------------
+# Eksekusi
+# -----------------------------------------------------------------------------
+
+def _cpu_seconds() -> float:
+    """
+    CPU user + system proses ini dan child process yang sudah selesai
+
+    Modul resource hanya ada di POSIX; di platform lain dipakai time.process_time()
+    (hanya proses ini).
+    """
+    try:
+        import resource
+    except ImportError:
+        return time.process_time()
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def _timed_out(status: Optional[int], body) -> bool:
+    """Timeout pencarian rute (408 / timeout_reached) atau timeout di sisi client"""
+    if status == 408 or (status is None and body == 'client timeout'):
+        return True
+    if status == 200 and isinstance(body, dict):
+        validation = (body.get('data') or {}).get('route_validation') or {}
+        return bool(validation.get('timeout_reached'))
+    return False
+
+
+def run_load(send: SendFunction, bodies: List[Dict], concurrency: int = 1,
+             total_requests: Optional[int] = None, duration_seconds: Optional[float] = None,
+             warmup_requests: int = 0,
+             progress: Optional[Callable[[int], None]] = None) -> Dict:
+    """
+    Mengirim request secara paralel lalu merangkum hasilnya
+
+    Args:
+        send: Fungsi kirim dari salah satu target
+        bodies: Request mix (dipakai bergiliran)
+        concurrency: Jumlah thread client
+        total_requests: Berhenti setelah sekian request (default: satu putaran mix)
+        duration_seconds: Berhenti setelah sekian detik (request yang berjalan diselesaikan)
+        warmup_requests: Request pemanasan berurutan sebelum pengukuran (tidak dihitung)
+        progress: Dipanggil dengan jumlah request selesai
+
+    Returns:
+        Ringkasan (lihat summarize)
+    """
+    if not bodies:
+        raise ValueError("Request mix is empty")
+    if total_requests is None and duration_seconds is None:
+        total_requests = len(bodies)
+
+    for i in range(warmup_requests):
+        send(bodies[i % len(bodies)])
+
+    records = []
+    lock = threading.Lock()
+    next_index = [0]
+    started = time.perf_counter()
+    deadline = started + duration_seconds if duration_seconds else None
+
+    def take() -> Optional[int]:
+        with lock:
+            index = next_index[0]
+            if total_requests is not None and index >= total_requests:
+                return None
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            next_index[0] += 1
+            return index
+
+    def worker():
+        while True:
+            index = take()
+            if index is None:
+                return
+            request_started = time.perf_counter()
+            status, body = send(bodies[index % len(bodies)])
+            latency = time.perf_counter() - request_started
+            record = {
+                'latency': latency,
+                'status': status,
+                'timed_out': _timed_out(status, body),
+                'error': None if status == 200 else (body.get('detail') if isinstance(body, dict) else str(body))
+            }
+            with lock:
+                records.append(record)
+                done = len(records)
+            if progress is not None:
+                progress(done)
+
+    cpu_started = _cpu_seconds()
+    threads = [threading.Thread(target=worker, name=f"loadtest-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.perf_counter() - started
+    return summarize(records, wall_seconds, _cpu_seconds() - cpu_started, concurrency)
+
+
+def summarize(records: List[Dict], wall_seconds: float, cpu_seconds: float, concurrency: int) -> Dict:
+    """
+    Statistik load test
+
+    Returns:
+        Dictionary requests, throughput, latensi (detik, semua request), tingkat
+        timeout/error, dan CPU (cpu_percent 100 = satu core penuh)
+    """
+    latencies = np.array([record['latency'] for record in records], dtype=np.float64)
+    statuses: Dict[str, int] = {}
+    for record in records:
+        key = str(record['status']) if record['status'] is not None else 'client_error'
+        statuses[key] = statuses.get(key, 0) + 1
+    count = len(records)
+    errors = sum(1 for record in records if record['status'] != 200)
+    timeouts = sum(1 for record in records if record['timed_out'])
+    error_messages: Dict[str, int] = {}
+    for record in records:
+        if record['error']:
+            message = str(record['error'])[:120]
+            error_messages[message] = error_messages.get(message, 0) + 1
+
+    latency = {}
+    if count:
+        for percentile, value in zip(LATENCY_PERCENTILES, np.percentile(latencies, LATENCY_PERCENTILES)):
+            latency[f"p{percentile}"] = float(value)
+        latency.update({'mean': float(latencies.mean()), 'min': float(latencies.min()), 'max': float(latencies.max())})
+
+    return {
+        'requests': count,
+        'concurrency': concurrency,
+        'wall_seconds': wall_seconds,
+        'throughput_rps': count / wall_seconds if wall_seconds > 0 else 0.0,
+        'latency_seconds': latency,
+        'status_counts': statuses,
+        'error_rate': errors / count if count else 0.0,
+        'timeout_rate': timeouts / count if count else 0.0,
+        'top_errors': sorted(error_messages.items(), key=lambda item: -item[1])[:5],
+        'cpu_seconds': cpu_seconds,
+        'cpu_percent': 100.0 * cpu_seconds / wall_seconds if wall_seconds > 0 else 0.0
+    }
+
+
+def format_report(result: Dict) -> str:
+    """Ringkasan load test sebagai teks"""
+    latency = result['latency_seconds']
+    lines = [
+        f"Requests:     {result['requests']} (concurrency {result['concurrency']}, {result['wall_seconds']:.1f}s)",
+        f"Throughput:   {result['throughput_rps']:.2f} req/s",
+    ]
+    if latency:
+        percentiles = "  ".join(f"{name}={latency[name] * 1000:.0f}ms" for name in (f"p{p}" for p in LATENCY_PERCENTILES))
+        lines.append(f"Latency:      {percentiles}  mean={latency['mean'] * 1000:.0f}ms  max={latency['max'] * 1000:.0f}ms")
+    lines.append(f"Timeout rate: {result['timeout_rate'] * 100:.1f}%")
+    lines.append(f"Error rate:   {result['error_rate'] * 100:.1f}%  "
+                 f"({', '.join(f'{status}: {n}' for status, n in sorted(result['status_counts'].items()))})")
+    lines.append(f"CPU:          {result['cpu_seconds']:.1f}s ({result['cpu_percent']:.0f}% of one core)")
+    if result.get('osrm_stub_requests') is not None:
+        lines.append(f"OSRM stub:    {result['osrm_stub_requests']} requests")
+    for message, n in result['top_errors']:
+        lines.append(f"  {n}x {message}")
+    return "\n".join(lines)
@@ -0,0 +1,169 @@
+"""
+Server OSRM tiruan untuk load test
+
+Menjawab /route/v1 dan /table/v1 secara lokal dengan jarak Haversine dikali faktor
+belokan dan durasi dari kecepatan rata-rata per profil, dengan latensi buatan
+opsional. Load test jadi tidak bergantung pada (dan tidak membebani) server OSRM
+publik, tetapi jalur kode OSRM (HTTP, cache, validasi rute) tetap berjalan.
+"""
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Jarak jalan ~ jarak garis lurus x faktor ini
+DETOUR_FACTOR = 1.3
+
+# Kecepatan rata-rata per profil (km/jam)
+PROFILE_SPEED_KMH = {'driving': 30.0, 'bike': 15.0, 'foot': 5.0}
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def _leg(profile: str, origin: Tuple[float, float], destination: Tuple[float, float]) -> Tuple[float, float]:
+    """(jarak meter, durasi detik) satu ruas; origin/destination dalam (lon, lat)"""
+    distance_km = _haversine_km(origin[1], origin[0], destination[1], destination[0]) * DETOUR_FACTOR
+    speed = PROFILE_SPEED_KMH.get(profile, PROFILE_SPEED_KMH['driving'])
+    return distance_km * 1000.0, distance_km / speed * 3600.0
+
+
+def _parse_path(path: str) -> Tuple[str, str, List[Tuple[float, float]], Dict[str, str]]:
+    """/<service>/v1/<profile>/<lon,lat;lon,lat...>?<query> -> (service, profile, koordinat, query)"""
+    # urlsplit, bukan urlparse: urlparse memotong path di ';' (URL params)
+    url = urlsplit(path)
+    parts = url.path.strip('/').split('/')
+    if len(parts) != 4:
+        raise ValueError(f"Unsupported path: {path}")
+    service, _, profile, coordinates = parts
+    points = [tuple(float(value) for value in pair.split(',')) for pair in coordinates.split(';')]
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    return service, profile, points, query
+
+
+def _indices(query: Dict[str, str], name: str, count: int) -> List[int]:
+    """Index dari parameter sources/destinations ('all' atau kosong = semua titik)"""
+    value = query.get(name, 'all')
+    if value == 'all':
+        return list(range(count))
+    indices = [int(index) for index in value.split(';')]
+    if any(not 0 <= index < count for index in indices):
+        raise ValueError(f"Invalid {name}: {value}")
+    return indices
+
+
+class StubOSRMServer:
+    """
+    Server HTTP OSRM tiruan di thread background
+
+    Attributes:
+        latency_seconds: Latensi buatan per request
+        request_count: Jumlah request yang dijawab
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub._count_lock:
+                    stub.request_count += 1
+                if stub.latency_seconds > 0:
+                    time.sleep(stub.latency_seconds)
+                try:
+                    body = stub.respond(self.path)
+                    status = 200
+                except ValueError as e:
+                    body, status = {'code': 'InvalidUrl', 'message': str(e)}, 400
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def respond(self, path: str) -> Dict:
+        """Body respons OSRM untuk satu path request"""
+        service, profile, points, query = _parse_path(path)
+        if service == 'route':
+            legs = [_leg(profile, a, b) for a, b in zip(points, points[1:])]
+            return {
+                'code': 'Ok',
+                'routes': [{
+                    'distance': sum(distance for distance, _ in legs),
+                    'duration': sum(duration for _, duration in legs),
+                    'geometry': None
+                }]
+            }
+        if service == 'table':
+            sources = _indices(query, 'sources', len(points))
+            destinations = _indices(query, 'destinations', len(points))
+            cells = [[_leg(profile, points[i], points[j]) for j in destinations] for i in sources]
+            return {
+                'code': 'Ok',
+                'distances': [[distance for distance, _ in row] for row in cells],
+                'durations': [[duration for _, duration in row] for row in cells]
+            }
+        raise ValueError(f"Unsupported service: {service}")
+
+    def start(self) -> "StubOSRMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="osrm-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@contextmanager
+def stub_osrm(latency_seconds: float = 0.0):
+    """
+    Menjalankan StubOSRMServer dan mengarahkan kode OSRM proses ini ke sana
+
+    Selama blok berjalan OSRM diaktifkan, OSRM_BASE_URL menunjuk ke stub, dan cache
+    respons OSRM diganti cache memory kosong agar hasil stub tidak masuk ke cache
+    SQLite asli.
+
+    Yields:
+        StubOSRMServer
+    """
+    from utils import distance, travel_time_matrix
+    from utils.osrm_cache import OSRMResponseCache
+
+    server = StubOSRMServer(latency_seconds=latency_seconds).start()
+    previous = (distance.OSRM_BASE_URL, travel_time_matrix.OSRM_BASE_URL, distance.USE_OSRM, distance._osrm_cache)
+    distance.OSRM_BASE_URL = travel_time_matrix.OSRM_BASE_URL = server.base_url
+    distance._osrm_cache = OSRMResponseCache(db_path=None)
+    distance.set_use_osrm(True)
+    try:
+        yield server
+    finally:
+        distance.OSRM_BASE_URL, travel_time_matrix.OSRM_BASE_URL, use_osrm, distance._osrm_cache = previous
+        distance.set_use_osrm(use_osrm)
+        server.stop()
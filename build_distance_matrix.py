@@ -1,13 +1,29 @@
 """
 Script untuk build distance matrix pertama kali
 Jalankan sekali: python build_distance_matrix.py
+Lebih cepat dengan OSRM /table: python build_distance_matrix.py --table
+Untuk profil lain: python build_distance_matrix.py --profile bike
+Untuk build distance + travel time sekaligus gunakan: python build_matrices.py
 """
+import argparse
 from utils.data_loader import load_destinations_from_csv
+from utils.distance import use_osrm_profile
 from utils.distance_matrix import DistanceMatrixCache
+from utils.matrix_store import DEFAULT_MATRIX_PROFILE, MATRIX_PROFILES, matrix_files
+from utils.osrm_table import build_matrices_with_table, OSRM_TABLE_CONCURRENCY
 
 def main():
+    parser = argparse.ArgumentParser(description='Build Distance Matrix')
+    parser.add_argument('--table', action='store_true',
+                        help='Use OSRM /table endpoint (block requests, concurrent) instead of per-pair /route')
+    parser.add_argument('--concurrency', type=int, default=OSRM_TABLE_CONCURRENCY,
+                        help=f'Concurrent /table requests (default: {OSRM_TABLE_CONCURRENCY})')
+    parser.add_argument('--profile', default=DEFAULT_MATRIX_PROFILE, choices=MATRIX_PROFILES,
+                        help=f'OSRM profile; each profile has its own matrix files (default: {DEFAULT_MATRIX_PROFILE})')
+    args = parser.parse_args()
+    
     print("="*70)
-    print(" BUILD DISTANCE MATRIX - OSRM Real Routes")
+    print(f" BUILD DISTANCE MATRIX - OSRM Real Routes ({args.profile})")
     print("="*70)
     print()
     
@@ -30,9 +46,16 @@ def main():
     print()
     
     # Build matrix
-    cache = DistanceMatrixCache()
+    cache = DistanceMatrixCache(matrix_files(args.profile)[0])
     cache.load()  # Load existing jika ada
-    cache.build_matrix(destinations, max_retries=3)
+    with use_osrm_profile(args.profile):
+        if args.table:
+            # Blok /table dulu, sisa pasangan yang gagal diisi build_matrix per pasangan
+            stats = build_matrices_with_table(destinations, distance_cache=cache, profile=args.profile,
+                                              concurrency=args.concurrency)
+            print(f"✓ OSRM /table: {stats['pairs']} pairs, {stats['requests']} requests, "
+                  f"{stats['failed_blocks']} failed blocks")
+        cache.build_matrix(destinations, max_retries=3)
     
     print()
     print("="*70)
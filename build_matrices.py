@@ -0,0 +1,79 @@
+"""
+Script untuk build distance matrix DAN travel time matrix sekaligus
+Jalankan: python build_matrices.py
+
+Kedua matrix diisi dari respons OSRM yang sama (jarak + waktu tempuh), sehingga
+hanya satu sweep ke OSRM dan kedua file selalu konsisten.
+Setiap profil OSRM punya file matrix sendiri: python build_matrices.py --profile bike
+"""
+import argparse
+from utils.data_loader import load_destinations_from_csv
+from utils.distance_matrix import DistanceMatrixCache
+from utils.travel_time_matrix import TravelTimeMatrixCache
+from utils.matrix_builder import build_matrices
+from utils.osrm_table import OSRM_TABLE_CONCURRENCY
+from utils.matrix_store import DEFAULT_MATRIX_PROFILE, MATRIX_PROFILES, matrix_files
+
+def main():
+    parser = argparse.ArgumentParser(description='Build Distance + Travel Time Matrix (single pass)')
+    parser.add_argument('--data', default='./data/data_wisata.jsonl',
+                        help='Destination data file (default: ./data/data_wisata.jsonl)')
+    parser.add_argument('--no-osrm', action='store_true',
+                        help='Skip OSRM API, fill travel times with distance-based estimation only')
+    parser.add_argument('--no-table', action='store_true',
+                        help='Skip OSRM /table blocks, use per-pair /route requests only')
+    parser.add_argument('--concurrency', type=int, default=OSRM_TABLE_CONCURRENCY,
+                        help=f'Concurrent /table requests (default: {OSRM_TABLE_CONCURRENCY})')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retry attempts per pair for per-pair requests (default: 3)')
+    parser.add_argument('--profile', default=DEFAULT_MATRIX_PROFILE, choices=MATRIX_PROFILES,
+                        help=f'OSRM profile; each profile has its own matrix files (default: {DEFAULT_MATRIX_PROFILE})')
+    parser.add_argument('--full', action='store_true',
+                        help='Check every pair instead of only changed catalog coordinates (retries old gaps)')
+    args = parser.parse_args()
+
+    print("="*70)
+    print(f" BUILD MATRICES - Distance + Travel Time (OSRM {args.profile})")
+    print("="*70)
+    print()
+
+    print("📂 Loading destinations from JSONL...")
+    destinations = load_destinations_from_csv(args.data)
+    print(f"✓ Loaded {len(destinations)} destinations")
+
+    distance_file, travel_time_file = matrix_files(args.profile)
+    distance_cache = DistanceMatrixCache(distance_file)
+    distance_cache.load()  # Load existing jika ada (incremental)
+    travel_time_cache = TravelTimeMatrixCache(travel_time_file)
+    travel_time_cache.load()
+
+    stats = build_matrices(
+        destinations,
+        distance_cache,
+        travel_time_cache,
+        use_osrm=not args.no_osrm,
+        use_table=not args.no_table,
+        max_retries=args.retries,
+        profile=args.profile,
+        full_scan=args.full,
+        concurrency=args.concurrency
+    )
+
+    print()
+    print("="*70)
+    print(" 🎉 DONE!")
+    print("="*70)
+    if stats['table']:
+        table = stats['table']
+        print(f" OSRM /table: {table['pairs']} pairs in {table['requests']} requests "
+              f"({table['failed_blocks']} failed blocks)")
+    print(f" Per-pair OSRM: {stats['osrm_pairs']}")
+    print(f" Estimated travel times: {stats['estimated_pairs']}")
+    print(f" Failed pairs: {stats['failed_pairs']}")
+    print(f" Distance matrix: {stats['distance_pairs']} pairs → {distance_cache.cache_file}")
+    print(f" Travel time matrix: {stats['travel_time_pairs']} pairs → {travel_time_cache.cache_file}")
+    print(f" Build id: {stats['build_id']}")
+    print("="*70)
+
+if __name__ == "__main__":
+    main()
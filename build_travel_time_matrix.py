@@ -1,6 +1,8 @@
 """
 Script untuk build travel time matrix (waktu tempuh)
 Jalankan sekali: python build_travel_time_matrix.py
+Untuk profil lain: python build_travel_time_matrix.py --profile foot
+Untuk build distance + travel time sekaligus gunakan: python build_matrices.py
 
 Waktu tempuh didapatkan dari:
 1. OSRM API (real driving time) - Prioritas utama
@@ -9,6 +11,8 @@ Waktu tempuh didapatkan dari:
 import argparse
 from utils.data_loader import load_destinations_from_csv
 from utils.travel_time_matrix import TravelTimeMatrixCache, AVERAGE_SPEED_KMH
+from utils.matrix_store import DEFAULT_MATRIX_PROFILE, MATRIX_PROFILES, matrix_files
+from utils.osrm_table import build_matrices_with_table, OSRM_TABLE_CONCURRENCY
 
 def main():
     # Parse arguments
@@ -17,6 +21,12 @@ def main():
                         help='Skip OSRM API, use distance-based estimation only')
     parser.add_argument('--speed', type=float, default=AVERAGE_SPEED_KMH,
                         help=f'Average speed in km/h for estimation (default: {AVERAGE_SPEED_KMH})')
+    parser.add_argument('--table', action='store_true',
+                        help='Use OSRM /table endpoint (block requests, concurrent) instead of per-pair /route')
+    parser.add_argument('--concurrency', type=int, default=OSRM_TABLE_CONCURRENCY,
+                        help=f'Concurrent /table requests (default: {OSRM_TABLE_CONCURRENCY})')
+    parser.add_argument('--profile', default=DEFAULT_MATRIX_PROFILE, choices=MATRIX_PROFILES,
+                        help=f'OSRM profile; each profile has its own matrix files (default: {DEFAULT_MATRIX_PROFILE})')
     args = parser.parse_args()
     
     print("="*70)
@@ -49,14 +59,15 @@ def main():
         print("   1️⃣  OSRM API (Prioritas):")
         print("       - Real driving time dari routing service")
         print("       - Memperhitungkan jalan raya, jarak rute nyata")
-        print("       - Profile: 'driving' (mobil/motor)")
+        print(f"       - Profile: '{args.profile}'")
         print()
         print("   2️⃣  Fallback Estimation:")
         print(f"       - Jika OSRM gagal: time = distance / {args.speed} km/h")
         print("       - Distance dari distance_matrix_osrm.json")
     
     print()
-    print("   📊 Output: travel_time_matrix_osrm.json")
+    distance_file, travel_time_file = matrix_files(args.profile)
+    print(f"   📊 Output: {travel_time_file}")
     print("       - duration: Waktu tempuh (menit)")
     print("       - distance: Jarak (km)")
     print("       - source: 'osrm' atau 'estimated'")
@@ -75,7 +86,7 @@ def main():
     print()
     
     # Build matrix
-    cache = TravelTimeMatrixCache()
+    cache = TravelTimeMatrixCache(travel_time_file)
     cache.load()  # Load existing jika ada
     
     # Update speed jika custom
@@ -83,11 +94,19 @@ def main():
         from utils import travel_time_matrix
         travel_time_matrix.AVERAGE_SPEED_KMH = args.speed
     
+    if args.table and not args.no_osrm:
+        # Blok /table dulu, sisa pasangan yang gagal diisi build_matrix (retry/estimasi)
+        stats = build_matrices_with_table(destinations, travel_time_cache=cache, profile=args.profile,
+                                          concurrency=args.concurrency)
+        print(f"✓ OSRM /table: {stats['pairs']} pairs, {stats['requests']} requests, "
+              f"{stats['failed_blocks']} failed blocks")
+    
     cache.build_matrix(
         destinations, 
-        distance_matrix_file="./data/distance_matrix_osrm.json",
+        distance_matrix_file=distance_file,
         use_osrm=not args.no_osrm,
-        max_retries=3
+        max_retries=3,
+        profile=args.profile
     )
     
     # Print statistics
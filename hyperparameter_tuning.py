@@ -18,6 +18,7 @@ import threading
 
 from algorithms.hga import HybridGeneticAlgorithm
 from utils.data_loader import load_destinations_from_csv
+from utils.data_plane import DATA_PLANE_ENABLED, publish_profiles
 from models.destination import Destination
 
 # # Lokasi start point (contoh: Surabaya pusat)
@@ -45,6 +46,10 @@ FIXED_PARAMS = {}
 # Number of runs per configuration for statistical significance
 NUM_RUNS_PER_CONFIG = 3
 
+# Seed dasar (None = tidak reproducible). Run ke-n setiap konfigurasi memakai seed
+# BASE_SEED + n, sehingga semua konfigurasi dibandingkan dengan stream random yang sama
+BASE_SEED = 42
+
 # Parallel processing workers (2 = run 2 configs simultaneously)
 NUM_WORKERS = 6  # Ubah ke 1 untuk disable parallel, atau 3-4 jika CPU kuat
 
@@ -131,7 +136,8 @@ def run_single_experiment(
     elitism_count: int,
     tournament_size: int,
     two_opt_iterations: int,
-    run_number: int
+    run_number: int,
+    seed: int = None
 ) -> Dict:
     """
     Run single HGA experiment with given parameters
@@ -143,7 +149,7 @@ def run_single_experiment(
     print(f"Run #{run_number}")
     print(f"Population: {population_size}, Generations: {generations}")
     print(f"Crossover: {crossover_rate}, Mutation: {mutation_rate}, 2-Opt: {use_2opt}")
-    print(f"Elitism: {elitism_count}, Tournament: {tournament_size}, 2-Opt Iter: {two_opt_iterations}")
+    print(f"Elitism: {elitism_count}, Tournament: {tournament_size}, 2-Opt Iter: {two_opt_iterations}, Seed: {seed}")
     print(f"{'='*80}")
     
     # Initialize HGA
@@ -155,7 +161,8 @@ def run_single_experiment(
         elitism_count=elitism_count,
         tournament_size=tournament_size,
         use_2opt=use_2opt,
-        two_opt_iterations=two_opt_iterations
+        two_opt_iterations=two_opt_iterations,
+        seed=seed
     )
     
     # Measure execution time
@@ -210,6 +217,7 @@ def run_single_experiment(
         'tournament_size': tournament_size,
         'two_opt_iterations': two_opt_iterations,
         'run_number': run_number,
+        'seed': seed,
         'best_distance_km': round(best_distance, 4),
         'best_fitness': round(best_fitness, 6),
         'travel_time_minutes': round(best_time, 2),
@@ -264,7 +272,8 @@ def run_config_wrapper(args):
                 elitism_count=elitism,
                 tournament_size=tournament,
                 two_opt_iterations=two_opt_iter,
-                run_number=run_num
+                run_number=run_num,
+                seed=BASE_SEED + run_num if BASE_SEED is not None else None
             )
             config_runs.append(result)
         
@@ -363,6 +372,7 @@ def run_hyperparameter_tuning():
     
     print(f"\nTotal configurations: {total_configs}")
     print(f"Runs per configuration: {NUM_RUNS_PER_CONFIG}")
+    print(f"Base seed: {BASE_SEED}")
     print(f"Total experiments: {total_runs}")
     print(f"\n⚡ PARALLEL MODE: Using {NUM_WORKERS} workers")
     print(f"   Speed boost: ~{NUM_WORKERS}x faster than sequential")
@@ -401,6 +411,10 @@ def run_hyperparameter_tuning():
     # Process configurations in parallel
     try:
         if NUM_WORKERS > 1:
+            # Matrix diterbitkan sekali ke data plane; worker Pool hanya memetakannya (MATRIX_DATA_PLANE=1)
+            if DATA_PLANE_ENABLED:
+                publish_profiles()
+            
             # Parallel execution
             with Pool(processes=NUM_WORKERS) as pool:
                 results_iter = pool.imap_unordered(run_config_wrapper, configs_to_process)
@@ -487,7 +501,7 @@ def save_results(all_results: List[Dict], config_results: List[Dict]):
             writer = csv.DictWriter(f, fieldnames=[
                 'population_size', 'generations', 'crossover_rate', 'mutation_rate', 
                 'use_2opt', 'elitism_count', 'tournament_size', 'two_opt_iterations',
-                'run_number', 'best_distance_km', 'best_fitness',
+                'run_number', 'seed', 'best_distance_km', 'best_fitness',
                 'travel_time_minutes', 'is_feasible', 'execution_time_seconds',
                 'initial_distance_km', 'final_distance_km', 'improvement_km',
                 'improvement_percentage', 'convergence_generation'
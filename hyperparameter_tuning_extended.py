@@ -52,6 +52,10 @@ VARIANT_CONFIGS = [
 # Number of runs per configuration
 NUM_RUNS_PER_CONFIG = 3
 
+# Seed dasar (None = tidak reproducible). Run ke-n setiap konfigurasi memakai seed
+# BASE_SEED + n, sehingga semua konfigurasi dibandingkan dengan stream random yang sama
+BASE_SEED = 42
+
 
 def load_test_data() -> List[Destination]:
     """Load destinations data for testing"""
@@ -72,14 +76,15 @@ def run_single_experiment(
     elitism_count: int,
     tournament_size: int,
     two_opt_iterations: int,
-    run_number: int
+    run_number: int,
+    seed: int = None
 ) -> Dict:
     """Run single HGA experiment"""
     print(f"\n{'='*80}")
     print(f"Run #{run_number}")
     print(f"Population: {population_size}, Generations: {generations}")
     print(f"Crossover: {crossover_rate}, Mutation: {mutation_rate}, 2-Opt: {use_2opt}")
-    print(f"Elitism: {elitism_count}, Tournament: {tournament_size}, 2-Opt Iter: {two_opt_iterations}")
+    print(f"Elitism: {elitism_count}, Tournament: {tournament_size}, 2-Opt Iter: {two_opt_iterations}, Seed: {seed}")
     print(f"{'='*80}")
     
     # Initialize HGA
@@ -91,7 +96,8 @@ def run_single_experiment(
         elitism_count=elitism_count,
         tournament_size=tournament_size,
         use_2opt=use_2opt,
-        two_opt_iterations=two_opt_iterations
+        two_opt_iterations=two_opt_iterations,
+        seed=seed
     )
     
     # Measure execution time
@@ -146,6 +152,7 @@ def run_single_experiment(
         'tournament_size': tournament_size,
         'two_opt_iterations': two_opt_iterations,
         'run_number': run_number,
+        'seed': seed,
         'best_distance_km': round(best_distance, 4),
         'best_fitness': round(best_fitness, 6),
         'travel_time_minutes': round(best_time, 2),
@@ -226,6 +233,7 @@ def run_extended_tuning():
     print(f"New parameter combinations: {len(new_param_combinations)}")
     print(f"Total configurations: {total_configs}")
     print(f"Runs per configuration: {NUM_RUNS_PER_CONFIG}")
+    print(f"Base seed: {BASE_SEED}")
     print(f"Total experiments: {total_runs}")
     print(f"\nEstimated time: {total_runs * 10 / 3600:.1f} - {total_runs * 20 / 3600:.1f} hours")
     
@@ -262,7 +270,8 @@ def run_extended_tuning():
                     elitism_count=elitism,
                     tournament_size=tournament,
                     two_opt_iterations=two_opt_iter,
-                    run_number=run_num
+                    run_number=run_num,
+                    seed=BASE_SEED + run_num if BASE_SEED is not None else None
                 )
                 config_runs.append(result)
                 all_results.append(result)
@@ -307,7 +316,7 @@ def save_results(all_results: List[Dict], config_results: List[Dict]):
             writer = csv.DictWriter(f, fieldnames=[
                 'population_size', 'generations', 'crossover_rate', 'mutation_rate', 
                 'use_2opt', 'elitism_count', 'tournament_size', 'two_opt_iterations',
-                'run_number', 'best_distance_km', 'best_fitness',
+                'run_number', 'seed', 'best_distance_km', 'best_fitness',
                 'travel_time_minutes', 'is_feasible', 'execution_time_seconds',
                 'initial_distance_km', 'final_distance_km', 'improvement_km',
                 'improvement_percentage', 'convergence_generation'
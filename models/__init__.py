@@ -2,6 +2,7 @@
 __init__ file untuk package models
 """
 from models.destination import Destination
+from models.destination_table import DestinationTable
 from models.route import Route
 
-__all__ = ['Destination', 'Route']
+__all__ = ['Destination', 'DestinationTable', 'Route']
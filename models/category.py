@@ -0,0 +1,116 @@
+"""
+Representasi kategori destinasi sebagai bitmask
+
+Setiap kategori memiliki satu bit; kategori sebuah destinasi adalah OR dari bit
+kategorinya. Pola rute K1, C1, W1, K2, W2, C2, K3, O disimpan sebagai array mask
+per slot sehingga validasi pola dan filter kandidat cukup dengan operasi bitwise
+(bisa sekaligus untuk seluruh populasi).
+"""
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+# Bit kategori yang dipakai pola rute; kategori lain mendapat bit berikutnya per tabel
+CATEGORY_BITS = {
+    'makanan_berat': 1 << 0,
+    'makanan_ringan': 1 << 1,
+    'non_kuliner': 1 << 2,
+    'oleh_oleh': 1 << 3,
+    'all': 1 << 4,
+}
+
+# Pola urutan rute: K1, C1, W1, K2, W2, C2, K3, O
+ROUTE_PATTERN = (
+    'makanan_berat',   # K1
+    'makanan_ringan',  # C1
+    'non_kuliner',     # W1
+    'makanan_berat',   # K2
+    'non_kuliner',     # W2
+    'makanan_ringan',  # C2
+    'makanan_berat',   # K3
+    'oleh_oleh'        # O
+)
+
+ROUTE_LENGTH = len(ROUTE_PATTERN)
+
+# Mask kategori yang wajib dimiliki destinasi di setiap slot (validasi urutan)
+ROUTE_PATTERN_BITS = tuple(CATEGORY_BITS[category] for category in ROUTE_PATTERN)
+ROUTE_PATTERN_MASKS = np.array(ROUTE_PATTERN_BITS, dtype=np.uint64)
+
+# Mask kandidat per slot saat membangun rute: destinasi kategori 'all'
+# boleh mengisi slot wisata (W1, W2) dan oleh-oleh (O)
+SLOT_CANDIDATE_BITS = tuple(
+    bits | CATEGORY_BITS['all'] if category in ('non_kuliner', 'oleh_oleh') else bits
+    for category, bits in zip(ROUTE_PATTERN, ROUTE_PATTERN_BITS)
+)
+SLOT_CANDIDATE_MASKS = np.array(SLOT_CANDIDATE_BITS, dtype=np.uint64)
+
+
+def _slot_groups() -> Dict[str, List[int]]:
+    groups: Dict[str, List[int]] = {}
+    for position, category in enumerate(ROUTE_PATTERN):
+        groups.setdefault(category, []).append(position)
+    return groups
+
+
+# Posisi slot per kategori pola: {'makanan_berat': [0, 3, 6], 'makanan_ringan': [1, 5],
+# 'non_kuliner': [2, 4], 'oleh_oleh': [7]}. Gen hanya boleh ditukar di dalam grup.
+SLOT_GROUPS = _slot_groups()
+
+
+def categories_to_mask(categories: Iterable[str], category_bits: Dict[str, int] = CATEGORY_BITS) -> int:
+    """
+    Mengubah list kategori menjadi bitmask
+
+    Args:
+        categories: List nama kategori
+        category_bits: Mapping kategori -> bit
+
+    Returns:
+        Bitmask kategori (kategori yang tidak dikenal diabaikan)
+    """
+    mask = 0
+    for category in categories:
+        mask |= category_bits.get(category, 0)
+    return mask
+
+
+def route_order_valid(gene_masks: np.ndarray) -> np.ndarray:
+    """
+    Validasi pola urutan untuk satu atau banyak rute sekaligus
+
+    Args:
+        gene_masks: Array (..., 8) berisi bitmask kategori gen setiap rute
+
+    Returns:
+        Array bool (...) - True jika setiap slot memiliki kategori pola yang sesuai
+    """
+    return ((gene_masks & ROUTE_PATTERN_MASKS) != 0).all(axis=-1)
+
+
+def slot_compatible(gene_masks: np.ndarray) -> np.ndarray:
+    """
+    Mengecek kecocokan setiap gen dengan slot yang ditempatinya
+
+    Args:
+        gene_masks: Array (..., 8) berisi bitmask kategori gen
+
+    Returns:
+        Array bool (..., 8) - True jika gen boleh berada di slot tersebut
+    """
+    return (gene_masks & SLOT_CANDIDATE_MASKS) != 0
+
+
+def slot_candidates(candidate_indices: np.ndarray, candidate_masks: np.ndarray) -> List[np.ndarray]:
+    """
+    Mendapatkan kandidat destinasi untuk setiap slot pola
+
+    Args:
+        candidate_indices: Index baris destinasi yang tersedia
+        candidate_masks: Bitmask kategori untuk setiap index tersebut
+
+    Returns:
+        List 8 array index kandidat (urutan sesuai candidate_indices)
+    """
+    compatible = (candidate_masks[:, None] & SLOT_CANDIDATE_MASKS[None, :]) != 0
+    return [candidate_indices[compatible[:, slot]] for slot in range(ROUTE_LENGTH)]
@@ -1,44 +1,88 @@
 """
 Model untuk representasi destinasi wisata
+
+Data destinasi disimpan per kolom di DestinationTable (models/destination_table.py);
+Destination adalah view ringan ke satu baris tabel tersebut.
 """
-from typing import List, Set
-from dataclasses import dataclass
+from typing import List, Optional
+
+# Nilai place_id untuk destinasi tanpa ID
+MISSING_PLACE_ID = -1
+
 
-@dataclass
 class Destination:
     """
-    Class untuk merepresentasikan satu destinasi wisata
-    
+    View ringan ke satu baris DestinationTable
+
+    Setiap baris memiliki tepat satu view (lihat DestinationTable.destinations),
+    sehingga kesamaan destinasi cukup dibandingkan dengan identitas objek (==, in,
+    id()) tanpa membandingkan isi field.
+
     Attributes:
-        place_id: ID unik destinasi
-        nama: Nama destinasi wisata
-        kategori: List kategori destinasi (makanan_berat, makanan_ringan, non_kuliner, oleh_oleh)
-        latitude: Koordinat latitude
-        longitude: Koordinat longitude
-        alamat: Alamat destinasi (optional)
-        image_url: URL gambar destinasi (optional)
-        deskripsi: Deskripsi destinasi (optional)
+        index: Posisi baris di tabel
+        place_id, nama, kategori, latitude, longitude: Dibaca dari kolom tabel
+        alamat, image_url, deskripsi: Dibaca dari text store (lazy)
     """
-    nama: str
-    kategori: List[str]
-    latitude: float
-    longitude: float
-    place_id: int = None
-    alamat: str = None
-    image_url: str = None
-    deskripsi: str = None
-    
+
+    __slots__ = ('_table', 'index')
+
+    def __init__(self, table: 'DestinationTable', index: int):
+        self._table = table
+        self.index = index
+
+    @property
+    def table(self) -> 'DestinationTable':
+        return self._table
+
+    @property
+    def nama(self) -> str:
+        return self._table.names[self.index]
+
+    @property
+    def kategori(self) -> List[str]:
+        return list(self._table.category_sets[self._table.category_set_index[self.index]])
+
+    @property
+    def latitude(self) -> float:
+        return self._table.latitude.item(self.index)
+
+    @property
+    def longitude(self) -> float:
+        return self._table.longitude.item(self.index)
+
+    @property
+    def category_mask(self) -> int:
+        return self._table.category_mask.item(self.index)
+
+    @property
+    def place_id(self) -> Optional[int]:
+        place_id = self._table.place_id.item(self.index)
+        return None if place_id == MISSING_PLACE_ID else place_id
+
+    @property
+    def alamat(self) -> Optional[str]:
+        return self._table.text_store.get(self.index)[0]
+
+    @property
+    def image_url(self) -> Optional[str]:
+        return self._table.text_store.get(self.index)[1]
+
+    @property
+    def deskripsi(self) -> Optional[str]:
+        return self._table.text_store.get(self.index)[2]
+
     def has_category(self, category: str) -> bool:
         """
         Mengecek apakah destinasi memiliki kategori tertentu
-        
+
         Args:
             category: Kategori yang dicari
-            
+
         Returns:
             True jika destinasi memiliki kategori tersebut
         """
-        return category in self.kategori
-    
+        bit = self._table.category_bits.get(category)
+        return bit is not None and bool(self._table.category_mask[self.index] & bit)
+
     def __repr__(self) -> str:
         return f"Destination(nama={self.nama}, kategori={self.kategori})"
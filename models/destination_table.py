@@ -0,0 +1,193 @@
+"""
+Penyimpanan destinasi berbasis kolom (struct-of-arrays)
+
+Kolom numerik (latitude, longitude, bitmask kategori, place_id) disimpan sebagai
+array NumPy, sedangkan field teks panjang (alamat, image_url, deskripsi) disimpan
+terpisah (file sementara milik tabel) dan baru dibaca saat dibutuhkan. Objek Destination hanyalah view ringan
+(table + index) ke salah satu baris tabel (lihat models/destination.py).
+"""
+import json
+import os
+import tempfile
+import threading
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.category import CATEGORY_BITS
+from models.destination import Destination, MISSING_PLACE_ID
+
+# Field teks yang disimpan di luar tabel numerik
+TEXT_FIELDS = ('alamat', 'image_url', 'deskripsi')
+
+# Jumlah kategori maksimal (lebar bit category_mask)
+MAX_CATEGORY_BITS = 64
+
+# Jumlah baris teks yang disimpan di memori oleh LazyTextStore
+TEXT_CACHE_SIZE = 1024
+
+
+class InMemoryTextStore:
+    """Field teks yang sudah ada di memori (mis. tabel yang dibangun dari data API)"""
+
+    def __init__(self, rows: Sequence[Tuple[Optional[str], ...]]):
+        self._rows = list(rows)
+
+    def get(self, index: int) -> Tuple[Optional[str], ...]:
+        return self._rows[index]
+
+
+class LazyTextStore:
+    """
+    Field teks yang disimpan di file sementara milik store dan dibaca saat dibutuhkan
+
+    Saat memuat data, field teks setiap baris ditulis ke file sementara anonim dan
+    hanya byte offset-nya yang disimpan di memori. File tersebut milik store (ikut
+    terhapus saat store di-garbage-collect), sehingga teks tabel dari snapshot lama
+    tetap benar walaupun file data sumber sudah diubah (hot reload).
+
+    Baca/tulis memakai os.pread/os.pwrite dengan offset eksplisit, tanpa posisi file
+    bersama, karena handle file ikut diwarisi proses hasil fork (job pool, worker tuning).
+    """
+
+    def __init__(self, cache_size: int = TEXT_CACHE_SIZE):
+        """
+        Args:
+            cache_size: Jumlah baris yang disimpan di cache LRU
+        """
+        self._file = tempfile.TemporaryFile()
+        # Baris i ada di byte _offsets[i] sampai _offsets[i + 1]
+        self._offsets = array('q', [0])
+        self._lock = threading.Lock()
+        self.get = lru_cache(maxsize=cache_size)(self._read)
+
+    def append(self, fields: Tuple[Optional[str], ...]):
+        """Menambah field teks satu baris (urutan sama dengan baris tabel)"""
+        payload = json.dumps(fields, ensure_ascii=False).encode('utf-8')
+        with self._lock:
+            start = self._offsets[-1]
+            written = 0
+            while written < len(payload):
+                written += os.pwrite(self._file.fileno(), payload[written:], start + written)
+            self._offsets.append(start + len(payload))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _read(self, index: int) -> Tuple[Optional[str], ...]:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, end = self._offsets[index], self._offsets[index + 1]
+        payload = os.pread(self._file.fileno(), end - start, start)
+        return tuple(json.loads(payload.decode('utf-8')))
+
+
+class DestinationTable:
+    """
+    Tabel destinasi berbasis kolom
+
+    Attributes:
+        latitude: np.ndarray float64
+        longitude: np.ndarray float64
+        category_mask: np.ndarray uint64, bitmask kategori (lihat category_bits)
+        place_id: np.ndarray int64 (MISSING_PLACE_ID jika tidak ada)
+        names: List nama destinasi
+        category_sets: Kombinasi kategori unik (urutan sesuai data)
+        category_set_index: np.ndarray uint16, index ke category_sets per baris
+        category_bits: Mapping kategori -> bit (CATEGORY_BITS + kategori lain dari data)
+        text_store: Penyimpanan field teks (InMemoryTextStore / LazyTextStore)
+        destinations: Satu view Destination per baris
+    """
+
+    def __init__(self,
+                 names: Sequence[str],
+                 categories: Sequence[Sequence[str]],
+                 latitudes: Sequence[float],
+                 longitudes: Sequence[float],
+                 place_ids: Sequence[Optional[int]],
+                 text_store=None):
+        """
+        Args:
+            names: Nama destinasi
+            categories: List kategori per destinasi
+            latitudes: Latitude per destinasi
+            longitudes: Longitude per destinasi
+            place_ids: place_id per destinasi (boleh None)
+            text_store: Sumber field teks; default semua None
+
+        Raises:
+            ValueError: Jika jumlah kategori melebihi MAX_CATEGORY_BITS
+        """
+        self.names = list(names)
+        self.latitude = np.asarray(latitudes, dtype=np.float64)
+        self.longitude = np.asarray(longitudes, dtype=np.float64)
+        self.place_id = np.asarray(
+            [MISSING_PLACE_ID if place_id is None else place_id for place_id in place_ids],
+            dtype=np.int64
+        )
+
+        self.category_bits: Dict[str, int] = dict(CATEGORY_BITS)
+        self.category_sets: List[Tuple[str, ...]] = []
+        set_lookup: Dict[Tuple[str, ...], int] = {}
+        set_index = np.empty(len(self.names), dtype=np.uint16)
+        masks = np.zeros(len(self.names), dtype=np.uint64)
+
+        for row, kategori in enumerate(categories):
+            key = tuple(kategori)
+            if key not in set_lookup:
+                set_lookup[key] = len(self.category_sets)
+                self.category_sets.append(key)
+            set_index[row] = set_lookup[key]
+
+            mask = 0
+            for category in key:
+                if category not in self.category_bits:
+                    if len(self.category_bits) >= MAX_CATEGORY_BITS:
+                        raise ValueError(
+                            f"Too many categories: category_mask holds at most {MAX_CATEGORY_BITS} categories "
+                            f"(cannot add '{category}')"
+                        )
+                    self.category_bits[category] = 1 << len(self.category_bits)
+                mask |= self.category_bits[category]
+            masks[row] = mask
+
+        self.category_set_index = set_index
+        self.category_mask = masks
+
+        self.text_store = text_store or InMemoryTextStore([(None,) * len(TEXT_FIELDS)] * len(self.names))
+        self.destinations: List[Destination] = [Destination(self, i) for i in range(len(self.names))]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def indices_of(self, destinations: Sequence[Destination]) -> np.ndarray:
+        """
+        Index baris untuk list destinasi (view dari tabel ini)
+
+        Args:
+            destinations: List Destination
+
+        Returns:
+            np.ndarray int64 berisi index baris
+        """
+        if destinations is self.destinations:
+            return np.arange(len(self.destinations), dtype=np.int64)
+        return np.fromiter((dest.index for dest in destinations), dtype=np.int64, count=len(destinations))
+
+    def __getitem__(self, index: int) -> Destination:
+        return self.destinations[index]
+
+    def __iter__(self):
+        return iter(self.destinations)
+
+    @property
+    def nbytes(self) -> int:
+        """Ukuran kolom numerik dalam byte"""
+        return sum(array.nbytes for array in (
+            self.latitude, self.longitude, self.category_mask, self.place_id, self.category_set_index
+        ))
+
+    def __repr__(self) -> str:
+        return f"DestinationTable(rows={len(self)}, categories={len(self.category_bits)})"
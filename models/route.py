@@ -2,6 +2,7 @@
 Model untuk representasi rute wisata
 """
 from typing import List, Tuple
+from models.category import ROUTE_LENGTH, ROUTE_PATTERN_BITS
 from models.destination import Destination
 from utils.distance import calculate_distance
 from utils.travel_time_matrix import get_travel_time
@@ -104,39 +105,33 @@ class Route:
         Returns:
             True jika urutan valid
         """
-        if len(self.destinations) != 8:
+        if len(self.destinations) != ROUTE_LENGTH:
             return False
         
-        # Pola urutan yang diharapkan
-        expected_pattern = [
-            'makanan_berat',  # K1
-            'makanan_ringan',  # C1
-            'non_kuliner',     # W1
-            'makanan_berat',   # K2
-            'non_kuliner',     # W2
-            'makanan_ringan',  # C2
-            'makanan_berat',   # K3
-            'oleh_oleh'        # O
-        ]
-        
-        # Validasi urutan
-        for i, expected_category in enumerate(expected_pattern):
-            if not self.destinations[i].has_category(expected_category):
+        # Setiap slot harus memiliki bit kategori sesuai pola (lihat models/category.py)
+        for dest, required_bits in zip(self.destinations, ROUTE_PATTERN_BITS):
+            if not dest.category_mask & required_bits:
                 return False
         
         return True
     
-    def get_route_summary(self) -> dict:
+    def get_route_summary(self, total_distance: float = None, total_time: float = None) -> dict:
         """
         Mendapatkan ringkasan rute
         
+        Args:
+            total_distance: Total jarak yang sudah dihitung (opsional, dihitung jika None)
+            total_time: Total waktu tempuh yang sudah dihitung (opsional, dihitung jika None)
+        
         Returns:
             Dictionary berisi informasi rute
         """
         from utils.penalty import get_constraint_violation_info
         
-        total_distance = self.calculate_total_distance()
-        total_time = self.calculate_total_travel_time()
+        if total_distance is None:
+            total_distance = self.calculate_total_distance()
+        if total_time is None:
+            total_time = self.calculate_total_travel_time()
         constraint_info = get_constraint_violation_info(total_distance, total_time)
         
         return {
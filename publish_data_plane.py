@@ -0,0 +1,42 @@
+"""
+Script untuk menerbitkan distance + travel time matrix ke data plane bersama
+Jalankan sebelum menjalankan beberapa worker: python publish_data_plane.py
+
+Matrix di-parse dari JSON sekali lalu disimpan sebagai array numerik (.npy) di
+./data/plane. Worker yang dijalankan dengan MATRIX_DATA_PLANE=1 memetakan file
+tersebut read-only (mmap) alih-alih mem-parse JSON sendiri, mis.:
+    MATRIX_DATA_PLANE=1 gunicorn api:app -k uvicorn.workers.UvicornWorker -w 8
+Tanpa script ini, worker pertama yang memuat matrix akan menerbitkannya.
+"""
+import argparse
+from utils.data_plane import DATA_PLANE_DIR, publish_profiles
+from utils.matrix_store import MATRIX_PROFILES, available_profiles
+
+def main():
+    parser = argparse.ArgumentParser(description='Publish matrices to the shared data plane')
+    parser.add_argument('--profile', action='append', choices=MATRIX_PROFILES,
+                        help='Profile to publish (repeatable; default: all profiles with matrix files)')
+    args = parser.parse_args()
+
+    profiles = args.profile or available_profiles()
+
+    print("="*70)
+    print(f" PUBLISH DATA PLANE - {', '.join(profiles) or '-'}")
+    print("="*70)
+    print()
+
+    paths = publish_profiles(profiles)
+
+    print()
+    print("="*70)
+    print(" 🎉 DONE!")
+    print("="*70)
+    print(f" Data plane dir: {DATA_PLANE_DIR}")
+    for path in paths:
+        print(f"   - {path}")
+    print()
+    print(" Start workers with MATRIX_DATA_PLANE=1 to attach read-only 🚀")
+    print("="*70)
+
+if __name__ == "__main__":
+    main()
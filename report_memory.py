@@ -0,0 +1,82 @@
+"""
+Script untuk laporan memory data yang dimuat dan state solver
+Jalankan: python report_memory.py
+
+Mengukur destinasi, distance/travel time matrix, key cache, cache OSRM, matrix dense,
+populasi, dan history fitness. Dengan --runs N, HGA dijalankan N kali dan laporan
+dicetak setelah setiap run sehingga pertumbuhan (leak) antar run terlihat:
+    python report_memory.py --runs 5 --trace
+"""
+import argparse
+import json
+from algorithms.hga import HybridGeneticAlgorithm
+from utils.data_loader import load_destinations_from_csv, group_destinations_by_category
+from utils.distance import set_use_osrm
+from utils.matrix_store import preload_profiles
+from utils.memory_report import MemoryTracker, format_report, start_tracing
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory report for loaded data and solver state')
+    parser.add_argument('--data', default='./data/data_wisata.jsonl',
+                        help='Destination data file (default: ./data/data_wisata.jsonl)')
+    parser.add_argument('--runs', type=int, default=0,
+                        help='HGA runs to execute, reporting after each run (default: 0)')
+    parser.add_argument('--population', type=int, default=50, help='HGA population size (default: 50)')
+    parser.add_argument('--generations', type=int, default=100, help='HGA generations (default: 100)')
+    parser.add_argument('--start', default='-7.2575,112.7521',
+                        help='Start point "lat,lon" for HGA runs (default: Surabaya center)')
+    parser.add_argument('--trace', action='store_true',
+                        help='Enable tracemalloc before loading data (slower, reports allocation sites)')
+    parser.add_argument('--top', type=int, default=10, help='Allocation sites to report with --trace (default: 10)')
+    parser.add_argument('--osrm', action='store_true',
+                        help='Allow live OSRM requests during HGA runs (default: matrix/Haversine only)')
+    parser.add_argument('--json', help='Write the final report to this JSON file')
+    args = parser.parse_args()
+
+    print("="*70)
+    print(" MEMORY REPORT")
+    print("="*70)
+    print()
+
+    if args.trace:
+        start_tracing()
+        print("🔍 tracemalloc enabled")
+
+    tracker = MemoryTracker()
+    report = tracker.report(None, args.top)
+    print("📏 Baseline (before loading data)")
+    print(format_report(report))
+    print()
+
+    print("📂 Loading destinations and matrices...")
+    destinations = load_destinations_from_csv(args.data)
+    profiles = preload_profiles()
+    print(f"✓ Loaded {len(destinations)} destinations, matrices for: {', '.join(profiles) or '-'}")
+    report = tracker.report(destinations, args.top)
+    print(format_report(report))
+    print()
+
+    set_use_osrm(args.osrm)
+    start_point = tuple(float(value) for value in args.start.split(','))
+    grouped_destinations = group_destinations_by_category(destinations)
+    for run in range(1, args.runs + 1):
+        hga = HybridGeneticAlgorithm(population_size=args.population, generations=args.generations)
+        hga.run(destinations, start_point, num_solutions=1, grouped_destinations=grouped_destinations)
+        report = tracker.report(destinations, args.top)
+        print()
+        print(f"📊 After run {run}/{args.runs} (HGA instance still alive)")
+        print(format_report(report))
+        del hga
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report saved to {args.json}")
+
+    print()
+    print("="*70)
+    print(" 🎉 DONE!")
+    print("="*70)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Script untuk menjalankan micro-benchmark hot path HGA
+Jalankan: python run_benchmarks.py
+
+Hasil disimpan sebagai JSON (dengan metadata mesin) di benchmarks/results/.
+Bandingkan dua hasil, mis. sebelum dan sesudah perubahan:
+    python run_benchmarks.py --output before.json
+    (ubah kode)
+    python run_benchmarks.py --baseline before.json
+    python run_benchmarks.py --compare before.json after.json
+"""
+import argparse
+import os
+import sys
+import time
+from benchmarks.cases import BenchmarkContext, select_benchmarks
+from benchmarks.harness import (
+    DEFAULT_THRESHOLD_PERCENT,
+    RESULTS_DIR,
+    compare_results,
+    format_comparison,
+    format_results,
+    load_results,
+    run_suite,
+    save_results
+)
+
+def print_comparison(base, new, threshold):
+    comparison = compare_results(base, new, threshold)
+    print(format_comparison(comparison))
+    return comparison
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for the HGA hot paths')
+    parser.add_argument('--filter', action='append',
+                        help='Only run benchmarks whose name contains this text (repeatable)')
+    parser.add_argument('--quick', action='store_true', help='Fewer samples (noisier, for a fast check)')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/bench_<timestamp>.json)')
+    parser.add_argument('--baseline', help='Compare this run against an earlier results file')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'),
+                        help='Compare two existing results files without running benchmarks')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD_PERCENT,
+                        help=f'Changes below this percentage count as noise (default: {DEFAULT_THRESHOLD_PERCENT})')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with status 1 if any benchmark is slower than the baseline')
+    parser.add_argument('--list', action='store_true', help='List benchmarks and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        for case in select_benchmarks(args.filter):
+            print(case.name)
+        return 0
+
+    if args.compare:
+        comparison = print_comparison(load_results(args.compare[0]), load_results(args.compare[1]), args.threshold)
+        slower = [row for row in comparison['rows'] if row['verdict'] == 'slower']
+        return 1 if args.fail_on_regression and slower else 0
+
+    print("="*70)
+    print(" BENCHMARKS - HGA hot paths")
+    print("="*70)
+    print()
+
+    print("📂 Loading destinations and matrices...")
+    context = BenchmarkContext()
+    print(f"✓ Loaded {len(context.destinations)} destinations, matrices for: {', '.join(context.profiles) or '-'}")
+    print()
+
+    cases = select_benchmarks(args.filter)
+    if not cases:
+        print("⚠️  No benchmarks match the filter")
+        return 1
+    started = time.perf_counter()
+    results = run_suite(context, cases, quick=args.quick, progress=lambda name: print(f"⏱️  {name}"))
+    print(f"✓ {len(cases)} benchmarks in {time.perf_counter() - started:.1f}s")
+    print()
+    print(format_results(results))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    save_results(results, output)
+    print()
+    print(f"✓ Results saved to {output}")
+
+    if args.baseline:
+        print()
+        print(f"📊 Compared with {args.baseline}")
+        comparison = print_comparison(load_results(args.baseline), results, args.threshold)
+        slower = [row for row in comparison['rows'] if row['verdict'] == 'slower']
+        if args.fail_on_regression and slower:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
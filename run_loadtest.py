@@ -0,0 +1,130 @@
+"""
+Script load test lokal untuk /generate-routes
+Jalankan: python run_loadtest.py
+
+Contoh:
+    python run_loadtest.py --concurrency 4 --total 40 --hga-config '{"generations": 100}'
+    python run_loadtest.py --requests-file recorded.jsonl --duration 60
+    python run_loadtest.py --target uvicorn --osrm-latency-ms 50
+    python run_loadtest.py --target url --url http://localhost:8000
+
+OSRM diganti server tiruan lokal (benchmarks.osrm_stub) untuk target asgi/uvicorn.
+Hasil disimpan sebagai JSON di benchmarks/results/.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from benchmarks.harness import RESULTS_DIR, machine_metadata, save_results
+from benchmarks.loadtest import (
+    SYNTHETIC_RADIUS_KM,
+    asgi_target,
+    format_report,
+    http_target,
+    load_request_mix,
+    run_load,
+    synthetic_requests,
+    uvicorn_target
+)
+from benchmarks.osrm_stub import stub_osrm
+
+def build_request_mix(args):
+    if args.requests_file:
+        bodies, skipped = load_request_mix(args.requests_file)
+        print(f"✓ Loaded {len(bodies)} recorded requests from {args.requests_file}"
+              + (f" ({skipped} lines skipped)" if skipped else ""))
+    else:
+        from utils.data_loader import load_destinations_from_csv
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            destinations = load_destinations_from_csv(args.data_file)
+        bodies = synthetic_requests(destinations, args.synthetic, seed=args.seed, radius_km=args.radius_km,
+                                    num_routes=args.num_routes)
+        print(f"✓ Generated {len(bodies)} synthetic requests around {len(destinations)} destinations (seed {args.seed})")
+    if args.hga_config:
+        override = json.loads(args.hga_config)
+        for body in bodies:
+            body['hga_config'] = {**(body.get('hga_config') or {}), **override}
+    return bodies
+
+def open_target(args):
+    if args.target == 'url':
+        return http_target(args.url, args.client_timeout)
+    if args.target == 'uvicorn':
+        return uvicorn_target(timeout=args.client_timeout)
+    return asgi_target()
+
+def main():
+    parser = argparse.ArgumentParser(description='Local load test for /generate-routes')
+    parser.add_argument('--target', choices=['asgi', 'uvicorn', 'url'], default='asgi',
+                        help='asgi: in-process app, uvicorn: local uvicorn thread, url: running server')
+    parser.add_argument('--url', default='http://localhost:8000', help='Server URL for --target url')
+    parser.add_argument('--requests-file', help='Replay recorded request bodies from a JSONL file')
+    parser.add_argument('--synthetic', type=int, default=20, help='Number of synthetic requests (default: 20)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for synthetic start points')
+    parser.add_argument('--radius-km', type=float, default=SYNTHETIC_RADIUS_KM,
+                        help=f'Synthetic start point radius around a destination (default: {SYNTHETIC_RADIUS_KM})')
+    parser.add_argument('--num-routes', type=int, default=1, help='num_routes of synthetic requests')
+    parser.add_argument('--hga-config', help='JSON merged into every request hga_config, e.g. \'{"generations": 100}\'')
+    parser.add_argument('--data-file', default='./data/data_wisata.jsonl', help='Destinations for synthetic requests')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent client threads (default: 4)')
+    parser.add_argument('--total', type=int, help='Total requests (default: one pass over the mix)')
+    parser.add_argument('--duration', type=float, help='Stop sending new requests after this many seconds')
+    parser.add_argument('--warmup', type=int, default=1, help='Sequential warmup requests, not measured (default: 1)')
+    parser.add_argument('--client-timeout', type=float, default=120.0, help='HTTP client timeout in seconds')
+    parser.add_argument('--osrm-latency-ms', type=float, default=0.0, help='Artificial latency of the OSRM stub')
+    parser.add_argument('--real-osrm', action='store_true', help='Use the configured OSRM server instead of the stub')
+    parser.add_argument('--verbose', action='store_true', help='Show server output (HGA progress)')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/loadtest_<timestamp>.json)')
+    args = parser.parse_args()
+
+    print("="*70)
+    print(" LOAD TEST - /generate-routes")
+    print("="*70)
+    print()
+
+    bodies = build_request_mix(args)
+    if not bodies:
+        print("⚠️  Request mix is empty")
+        return 1
+
+    use_stub = args.target != 'url' and not args.real_osrm
+    if args.target == 'url' and not args.real_osrm:
+        print("⚠️  The OSRM stub only applies to in-process targets; the server uses its own OSRM")
+
+    console = sys.stdout
+    def progress(done):
+        console.write(f"\r⏱️  {done} requests completed")
+        console.flush()
+
+    print(f"🚀 Target: {args.target}, concurrency {args.concurrency}, OSRM: {'stub' if use_stub else 'real'}")
+    with contextlib.ExitStack() as stack:
+        stub = stack.enter_context(stub_osrm(args.osrm_latency_ms / 1000.0)) if use_stub else None
+        if not args.verbose:
+            # Output HGA/server per request tidak ditampilkan (thread server ikut memakai sys.stdout)
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+        send = stack.enter_context(open_target(args))
+        result = run_load(send, bodies, concurrency=args.concurrency, total_requests=args.total,
+                          duration_seconds=args.duration, warmup_requests=args.warmup, progress=progress)
+        if stub is not None:
+            result['osrm_stub_requests'] = stub.request_count
+    print()
+    print()
+    print(format_report(result))
+
+    result['config'] = {
+        key: getattr(args, key) for key in
+        ('target', 'requests_file', 'synthetic', 'seed', 'radius_km', 'num_routes', 'hga_config',
+         'concurrency', 'total', 'duration', 'warmup', 'osrm_latency_ms', 'real_osrm')
+    }
+    result['machine'] = machine_metadata()
+    result['created_at'] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    output = args.output or os.path.join(RESULTS_DIR, f"loadtest_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    save_results(result, output)
+    print()
+    print(f"✓ Results saved to {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
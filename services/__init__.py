@@ -0,0 +1,23 @@
+"""
+__init__ file untuk package services
+"""
+from services.route_generation import (
+    RouteGenerationError,
+    generate_route_recommendations,
+    generate_google_maps_url
+)
+from services.jobs import JobManager, JobQueueFullError
+from services.destination_catalog import DestinationCatalog, CatalogQueryError
+from services.data_snapshot import DataSnapshot, SnapshotManager
+
+__all__ = [
+    'RouteGenerationError',
+    'generate_route_recommendations',
+    'generate_google_maps_url',
+    'JobManager',
+    'JobQueueFullError',
+    'DestinationCatalog',
+    'CatalogQueryError',
+    'DataSnapshot',
+    'SnapshotManager'
+]
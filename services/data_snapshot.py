@@ -0,0 +1,179 @@
+"""
+Snapshot data berversi untuk reload tanpa restart
+
+Satu snapshot berisi semua data yang dipakai request: destinasi, pengelompokan
+kategori, katalog /api/destinations, dan generasi distance/travel time matrix
+(lihat utils.matrix_store). Reload membangun snapshot baru di background lalu
+menukarnya secara atomik. Request yang sedang berjalan memegang snapshot lama
+(pin) sampai selesai, dan cache turunan yang terikat pada data lama (matrix dense
+per tabel) dibuang saat pertukaran.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from services.destination_catalog import DestinationCatalog
+from utils.data_loader import load_destinations_from_csv, group_destinations_by_category
+from utils.matrix_store import (
+    MatrixGeneration,
+    current_generation,
+    load_generation,
+    matrix_files_signature,
+    pin_generation,
+    preload_profiles,
+    swap_generation
+)
+
+# Interval pengecekan perubahan file data/matrix (detik); 0 = file watch nonaktif
+DATA_WATCH_INTERVAL_SECONDS = float(os.environ.get("DATA_WATCH_INTERVAL_SECONDS", "0"))
+
+
+def files_signature(data_file: str) -> Tuple:
+    """(path, mtime, size) file destinasi dan semua file matrix"""
+    signature = []
+    if os.path.exists(data_file):
+        stat = os.stat(data_file)
+        signature.append((data_file, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature) + matrix_files_signature()
+
+
+class DataSnapshot:
+    """
+    Data yang dimuat bersama dan dipakai utuh oleh satu request
+
+    Attributes:
+        version: Hash isi katalog + versi matrix (berubah jika data berubah)
+        destinations: List destinasi
+        grouped_destinations: Destinasi per kategori
+        catalog: DestinationCatalog untuk /api/destinations
+        matrices: MatrixGeneration yang dipakai snapshot ini
+        signature: Signature file saat snapshot dibangun (untuk file watch)
+        loaded_at: Waktu snapshot dibangun (epoch detik)
+    """
+
+    def __init__(self, destinations, matrices: MatrixGeneration, signature: Tuple):
+        self.destinations = destinations
+        self.grouped_destinations = group_destinations_by_category(destinations)
+        self.catalog = DestinationCatalog(destinations)
+        self.matrices = matrices
+        self.signature = signature
+        self.loaded_at = time.time()
+
+        version_source = json.dumps({
+            'catalog': self.catalog.version,
+            'matrices': matrices.content_versions()
+        }, sort_keys=True)
+        self.version = hashlib.sha256(version_source.encode('utf-8')).hexdigest()[:16]
+
+    def summary(self) -> Dict:
+        return {
+            'version': self.version,
+            'destinations': len(self.destinations),
+            'catalog_version': self.catalog.version,
+            'matrix_versions': self.matrices.data_versions(),
+            'loaded_at': time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.loaded_at))
+        }
+
+
+def build_snapshot(data_file: str, matrices: Optional[MatrixGeneration] = None) -> DataSnapshot:
+    """
+    Membangun snapshot dari file (tidak mengubah snapshot/generasi yang aktif)
+
+    Args:
+        data_file: Path file JSONL destinasi
+        matrices: Generasi matrix yang dipakai (default: muat generasi baru dari file)
+
+    Returns:
+        DataSnapshot
+    """
+    signature = files_signature(data_file)
+    destinations = load_destinations_from_csv(data_file)
+    return DataSnapshot(destinations, matrices or load_generation(), signature)
+
+
+class SnapshotManager:
+    """
+    Memegang snapshot aktif dan menukarnya saat reload
+
+    Reload dijalankan satu per satu (lock); pembacaan snapshot aktif tidak perlu lock
+    karena pertukaran hanya mengganti satu referensi.
+    """
+
+    def __init__(self, data_file: str):
+        self.data_file = data_file
+        self._snapshot: Optional[DataSnapshot] = None
+        self._reload_lock = threading.Lock()
+        self.reload_count = 0
+        self.last_reload: Optional[Dict] = None
+
+    @property
+    def current(self) -> Optional[DataSnapshot]:
+        return self._snapshot
+
+    def load_initial(self) -> DataSnapshot:
+        """Snapshot pertama memakai generasi matrix yang sudah aktif (tanpa memuat ulang)"""
+        with self._reload_lock:
+            if self._snapshot is None:
+                # Profil yang tersedia dimuat dulu agar versi sama dengan hasil load_generation
+                preload_profiles()
+                self._snapshot = build_snapshot(self.data_file, matrices=current_generation())
+            return self._snapshot
+
+    def has_file_changes(self) -> bool:
+        """True jika file destinasi/matrix berubah sejak snapshot aktif dibangun"""
+        return self._snapshot is None or files_signature(self.data_file) != self._snapshot.signature
+
+    def reload(self, force: bool = False) -> Dict:
+        """
+        Membangun snapshot baru lalu menukarnya jika versinya berbeda
+
+        Args:
+            force: Tukar walaupun versinya sama
+
+        Returns:
+            Ringkasan reload (versi lama/baru, berubah atau tidak, durasi)
+        """
+        with self._reload_lock:
+            started = time.perf_counter()
+            previous = self._snapshot
+            snapshot = build_snapshot(self.data_file)
+            changed = previous is None or snapshot.version != previous.version
+            if changed or force:
+                self._activate(snapshot)
+            elif previous is not None:
+                # Isi sama: simpan signature baru agar file watch tidak memicu reload lagi
+                previous.signature = snapshot.signature
+
+            self.reload_count += 1
+            self.last_reload = {
+                'previous_version': previous.version if previous else None,
+                'version': self._snapshot.version,
+                'changed': changed,
+                'swapped': changed or force,
+                'duration_seconds': round(time.perf_counter() - started, 3),
+                'finished_at': time.strftime("%Y-%m-%dT%H:%M:%S")
+            }
+            return self.last_reload
+
+    def _activate(self, snapshot: DataSnapshot):
+        from algorithms.evaluation import clear_dense_matrices
+        swap_generation(snapshot.matrices)
+        self._snapshot = snapshot
+        # Matrix dense dibangun per tabel destinasi lama; request lama sudah memegang objeknya
+        clear_dense_matrices()
+
+    @contextmanager
+    def pin(self):
+        """
+        Memakai snapshot aktif (beserta generasi matrix-nya) untuk satu request
+
+        Yields:
+            DataSnapshot
+        """
+        snapshot = self._snapshot
+        with pin_generation(snapshot.matrices if snapshot is not None else None):
+            yield snapshot
@@ -0,0 +1,275 @@
+"""
+Katalog destinasi untuk endpoint /api/destinations
+
+Payload JSON, versi gzip, dan ETag dihitung sekali saat data dimuat. Filter kategori
+dan bounding box memakai index yang dibangun bersamaan. Katalog tidak menyimpan dict
+per destinasi: item untuk variasi query lain dibuat dari view Destination saat body
+diserialisasi, sehingga field teks tetap dibaca lazily dari text store tabel.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from models.destination import Destination
+
+# Field yang tersedia di setiap item katalog (urutan = urutan di response)
+CATALOG_FIELDS = (
+    "place_id",
+    "nama_destinasi",
+    "kategori",
+    "latitude",
+    "longitude",
+    "alamat",
+    "image_url",
+    "deskripsi"
+)
+
+# Field untuk tampilan peta (tanpa deskripsi yang berukuran besar)
+SUMMARY_FIELDS = tuple(field for field in CATALOG_FIELDS if field != "deskripsi")
+
+# Maksimal variasi query yang body-nya disimpan
+CATALOG_RESPONSE_CACHE_SIZE = 256
+
+# Level kompresi gzip (body dikompresi sekali per variasi query)
+CATALOG_GZIP_LEVEL = 6
+
+
+class CatalogQueryError(ValueError):
+    """Error untuk parameter query katalog yang tidak valid"""
+
+
+class CatalogResponse:
+    """
+    Body response katalog yang sudah diserialisasi
+
+    Attributes:
+        body: JSON (bytes)
+        gzip_body: JSON terkompresi gzip (bytes)
+        etag: Strong ETag (sudah dalam tanda kutip)
+    """
+
+    __slots__ = ('body', 'gzip_body', 'etag')
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=CATALOG_GZIP_LEVEL, mtime=0)
+        self.etag = etag
+
+
+def _serialize(payload: Dict) -> bytes:
+    # Sama dengan JSONResponse FastAPI
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+# Cara membaca setiap field katalog dari Destination
+_FIELD_GETTERS = {
+    "place_id": lambda dest: dest.place_id,
+    "nama_destinasi": lambda dest: dest.nama,
+    "kategori": lambda dest: dest.kategori,
+    "latitude": lambda dest: dest.latitude,
+    "longitude": lambda dest: dest.longitude,
+    "alamat": lambda dest: dest.alamat,
+    "image_url": lambda dest: dest.image_url,
+    "deskripsi": lambda dest: dest.deskripsi
+}
+
+
+def _destination_to_row(dest: Destination, fields: Tuple[str, ...] = CATALOG_FIELDS) -> Dict:
+    return {field: _FIELD_GETTERS[field](dest) for field in fields}
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Parse parameter field selection
+
+    Args:
+        fields: None/"all" (semua field), "summary" (tanpa deskripsi),
+                atau daftar field dipisahkan koma
+
+    Returns:
+        Tuple field sesuai urutan CATALOG_FIELDS
+    """
+    if fields is None or fields.strip() in ("", "all"):
+        return CATALOG_FIELDS
+    if fields.strip() == "summary":
+        return SUMMARY_FIELDS
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(CATALOG_FIELDS)
+    if unknown:
+        raise CatalogQueryError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(CATALOG_FIELDS)}"
+        )
+    return tuple(field for field in CATALOG_FIELDS if field in requested)
+
+
+def parse_bbox(bbox: Optional[str]) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Parse parameter bounding box "min_lat,min_lon,max_lat,max_lon"
+
+    Returns:
+        Tuple (min_lat, min_lon, max_lat, max_lon) atau None
+    """
+    if bbox is None or not bbox.strip():
+        return None
+    try:
+        min_lat, min_lon, max_lat, max_lon = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise CatalogQueryError("bbox must be 'min_lat,min_lon,max_lat,max_lon'")
+    if min_lat > max_lat or min_lon > max_lon:
+        raise CatalogQueryError("bbox minimum must not exceed maximum")
+    return min_lat, min_lon, max_lat, max_lon
+
+
+def parse_categories(category: Optional[str]) -> Tuple[str, ...]:
+    """Parse parameter kategori (dipisahkan koma, dicocokkan dengan OR)"""
+    if category is None:
+        return ()
+    return tuple(sorted({value.strip() for value in category.split(",") if value.strip()}))
+
+
+class DestinationCatalog:
+    """
+    Katalog destinasi yang sudah diserialisasi dan diindeks
+
+    - Payload lengkap dan ringkas (tanpa deskripsi) dihitung saat build
+    - Index kategori: kategori -> list posisi destinasi
+    - Index latitude: posisi terurut berdasarkan latitude (filter bbox dengan bisect)
+    - Body hasil query lain disimpan di cache LRU kecil beserta gzip dan ETag-nya
+    """
+
+    def __init__(self, destinations: Sequence[Destination]):
+        """
+        Args:
+            destinations: List destinasi yang dimuat dari file data
+        """
+        self._destinations: List[Destination] = list(destinations)
+        self._longitudes: List[float] = [dest.longitude for dest in self._destinations]
+
+        self._category_index: Dict[str, List[int]] = {}
+        for position, dest in enumerate(destinations):
+            for kategori in dest.kategori:
+                self._category_index.setdefault(kategori, []).append(position)
+
+        latitudes = [dest.latitude for dest in self._destinations]
+        by_latitude = sorted(range(len(latitudes)), key=lambda position: latitudes[position])
+        self._latitude_order = by_latitude
+        self._latitude_keys = [latitudes[position] for position in by_latitude]
+
+        # Versi katalog: hash payload lengkap, dipakai sebagai prefix semua ETag
+        full_body = _serialize(self._build_payload(list(range(len(self._destinations))), CATALOG_FIELDS))
+        self.version = hashlib.sha256(full_body).hexdigest()[:16]
+
+        self._cache: "OrderedDict[Tuple, CatalogResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Precompute dua variasi yang paling sering dipakai
+        full_key = self._cache_key((), None, CATALOG_FIELDS, 0, None)
+        self._cache[full_key] = CatalogResponse(full_body, self._etag(full_key))
+        self.get_response(fields=SUMMARY_FIELDS)
+
+    def __len__(self) -> int:
+        return len(self._destinations)
+
+    @property
+    def categories(self) -> List[str]:
+        return sorted(self._category_index)
+
+    @staticmethod
+    def _cache_key(categories, bbox, fields, offset, limit) -> Tuple:
+        return (categories, bbox, fields, offset, limit)
+
+    def _etag(self, key: Tuple) -> str:
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:16]
+        return f'"{self.version}-{digest}"'
+
+    def _select(self, categories: Tuple[str, ...], bbox) -> List[int]:
+        """Posisi destinasi yang cocok dengan filter (urutan sesuai file data)"""
+        if categories:
+            unknown = [kategori for kategori in categories if kategori not in self._category_index]
+            if unknown:
+                raise CatalogQueryError(
+                    f"Unknown category: {', '.join(unknown)}. Available: {', '.join(self.categories)}"
+                )
+            selected = set()
+            for kategori in categories:
+                selected.update(self._category_index[kategori])
+        else:
+            selected = None
+
+        if bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            start = bisect_left(self._latitude_keys, min_lat)
+            end = bisect_right(self._latitude_keys, max_lat)
+            in_box = {
+                position for position in self._latitude_order[start:end]
+                if min_lon <= self._longitudes[position] <= max_lon
+            }
+            selected = in_box if selected is None else selected & in_box
+
+        if selected is None:
+            return list(range(len(self._destinations)))
+        return sorted(selected)
+
+    def _build_payload(self, positions: List[int], fields: Tuple[str, ...],
+                       offset: int = 0, limit: Optional[int] = None) -> Dict:
+        total = len(positions)
+        page = positions[offset:offset + limit] if limit is not None else positions[offset:]
+
+        data = [_destination_to_row(self._destinations[position], fields) for position in page]
+
+        payload = {
+            "success": True,
+            "total": total,
+            "data": data
+        }
+        if offset or limit is not None:
+            payload["offset"] = offset
+            payload["limit"] = limit
+            payload["count"] = len(data)
+        return payload
+
+    def get_response(self,
+                     categories: Tuple[str, ...] = (),
+                     bbox: Optional[Tuple[float, float, float, float]] = None,
+                     fields: Tuple[str, ...] = CATALOG_FIELDS,
+                     offset: int = 0,
+                     limit: Optional[int] = None) -> CatalogResponse:
+        """
+        Mendapatkan body response untuk kombinasi filter tertentu
+
+        Args:
+            categories: Filter kategori (OR), kosong = semua
+            bbox: (min_lat, min_lon, max_lat, max_lon) atau None
+            fields: Field yang disertakan (lihat parse_fields)
+            offset: Posisi awal halaman
+            limit: Jumlah item per halaman (None = semua)
+
+        Returns:
+            CatalogResponse berisi body, gzip body, dan ETag
+
+        Raises:
+            CatalogQueryError: Jika kategori tidak dikenal
+        """
+        key = self._cache_key(categories, bbox, fields, offset, limit)
+        with self._lock:
+            response = self._cache.get(key)
+            if response is not None:
+                self._cache.move_to_end(key)
+                return response
+
+        positions = self._select(categories, bbox)
+        response = CatalogResponse(
+            _serialize(self._build_payload(positions, fields, offset, limit)),
+            self._etag(key)
+        )
+
+        with self._lock:
+            self._cache[key] = response
+            while len(self._cache) > CATALOG_RESPONSE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return response
@@ -0,0 +1,369 @@
+"""
+Job queue asinkron untuk route generation
+
+Request dimasukkan ke antrian in-process, lalu dieksekusi oleh pool proses worker
+(ProcessPoolExecutor). Hasil disimpan di memori selama result TTL. Item batch memakai
+antrian yang sama, sehingga batas antrian berlaku untuk job dan batch.
+"""
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from services.route_generation import RouteGenerationError, generate_route_recommendations
+from utils.metrics import REGISTRY
+
+# Status job
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_COMPLETED = "completed"
+JOB_STATUS_FAILED = "failed"
+
+# Jumlah proses solver default: semua core, bisa diubah dengan ROUTE_API_JOB_WORKERS
+DEFAULT_JOB_WORKERS = int(os.environ.get("ROUTE_API_JOB_WORKERS", 0)) or os.cpu_count() or 1
+
+# Interval cek shutdown saat item batch menunggu tempat di antrian (detik)
+BATCH_FEED_POLL_SECONDS = 0.5
+
+# Snapshot data (destinasi, kategori, matrix) per proses worker (lihat _init_worker)
+_worker_snapshots = None
+
+
+class JobQueueFullError(Exception):
+    """Error ketika antrian job sudah penuh"""
+
+
+class Job:
+    """
+    Class untuk merepresentasikan satu job route generation
+
+    Attributes:
+        job_id: ID unik job
+        payload: Parameter route generation (lokasi, jumlah rute, konfigurasi HGA)
+        status: queued, running, completed, atau failed
+        result: Hasil route generation (jika completed)
+        error: Informasi error (jika failed)
+    """
+
+    def __init__(self, payload: Dict):
+        self.job_id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = JOB_STATUS_QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def is_finished(self) -> bool:
+        return self.status in (JOB_STATUS_COMPLETED, JOB_STATUS_FAILED)
+
+    def to_dict(self) -> Dict:
+        """
+        Mendapatkan representasi job untuk response API
+
+        Returns:
+            Dictionary berisi status, waktu, dan hasil job
+        """
+        def _iso(timestamp):
+            return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timestamp)) if timestamp else None
+
+        data = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "created_at": _iso(self.created_at),
+            "started_at": _iso(self.started_at),
+            "finished_at": _iso(self.finished_at),
+        }
+        if self.status == JOB_STATUS_COMPLETED:
+            data["result"] = self.result
+        elif self.status == JOB_STATUS_FAILED:
+            data["error"] = self.error
+        return data
+
+
+class BatchItem:
+    """Satu item batch di antrian job; hasilnya dikirim lewat future"""
+
+    __slots__ = ('payload', 'future')
+
+    def __init__(self, payload: Dict):
+        self.payload = payload
+        self.future: Future = Future()
+
+
+def _init_worker(data_file: str):
+    """
+    Initializer proses worker: muat data destinasi sekali per proses
+
+    Distance/travel time matrix dimuat lazily pada evaluasi pertama dan tetap
+    tersimpan di proses worker, sehingga dipakai ulang oleh semua job berikutnya.
+    Jika proses API me-reload data, worker memuat snapshot baru saat menerima job
+    dengan data_version yang berbeda (lihat _run_route_job).
+
+    Args:
+        data_file: Path ke file JSONL data destinasi
+    """
+    global _worker_snapshots
+    # Worker hasil fork mewarisi nilai metrics proses API; buang agar tidak terhitung dua kali
+    REGISTRY.drain_snapshot()
+
+    from services.data_snapshot import SnapshotManager
+    _worker_snapshots = SnapshotManager(data_file)
+    _worker_snapshots.load_initial()
+
+
+def _run_route_job(payload: Dict) -> Dict:
+    """
+    Menjalankan satu job route generation di proses worker
+
+    Args:
+        payload: Dictionary dengan keys latitude, longitude, num_routes, hga_config,
+                 timeout_seconds, osrm_enabled, osrm_profile, data_version
+
+    Returns:
+        Dictionary {'success': True, 'message', 'data'} atau
+        {'success': False, 'status_code', 'detail'}, ditambah 'metrics'
+        (snapshot metrics worker untuk digabung di proses API)
+    """
+    from utils.distance import set_use_osrm
+
+    # Samakan pengaturan OSRM dengan proses API; profil berlaku per job
+    # (matrix setiap profil tetap tersimpan di worker sehingga tidak dimuat ulang)
+    set_use_osrm(payload['osrm_enabled'])
+
+    # Samakan snapshot data dengan proses API (setelah /api/admin/reload atau file watch)
+    data_version = payload.get('data_version')
+    if data_version is not None and _worker_snapshots.current.version != data_version:
+        _worker_snapshots.reload()
+
+    try:
+        with _worker_snapshots.pin() as snapshot:
+            message, data = generate_route_recommendations(
+                destinations=snapshot.destinations,
+                user_location=(payload['latitude'], payload['longitude']),
+                num_routes=payload['num_routes'],
+                hga_config=payload['hga_config'],
+                timeout_seconds=payload['timeout_seconds'],
+                grouped_destinations=snapshot.grouped_destinations,
+                osrm_profile=payload['osrm_profile']
+            )
+        data["data_version"] = snapshot.version
+        outcome = {"success": True, "message": message, "data": data}
+    except RouteGenerationError as e:
+        outcome = {"success": False, "status_code": e.status_code, "detail": e.detail}
+    except Exception as e:
+        outcome = {"success": False, "status_code": 500, "detail": f"Error generating route recommendations: {str(e)}"}
+
+    outcome['metrics'] = REGISTRY.drain_snapshot()
+    return outcome
+
+
+def collect_outcome_metrics(outcome: Dict) -> Dict:
+    """
+    Menggabungkan snapshot metrics dari worker ke registry proses API
+
+    Args:
+        outcome: Hasil _run_route_job
+
+    Returns:
+        Outcome yang sama tanpa key 'metrics'
+    """
+    REGISTRY.merge_snapshot(outcome.pop('metrics', None))
+    return outcome
+
+
+class JobManager:
+    """
+    Mengelola antrian job dan pool proses solver
+
+    Setiap dispatcher thread mengambil job dari antrian dan menjalankannya di
+    ProcessPoolExecutor, sehingga jumlah job yang berjalan bersamaan dibatasi oleh
+    jumlah worker dan sisanya menunggu di antrian.
+    """
+
+    def __init__(self,
+                 data_file: str,
+                 max_workers: int = DEFAULT_JOB_WORKERS,
+                 max_queue_size: int = 100,
+                 result_ttl_seconds: float = 3600):
+        """
+        Args:
+            data_file: Path data destinasi yang dimuat di setiap worker
+            max_workers: Jumlah proses solver
+            max_queue_size: Maksimal job yang menunggu di antrian
+            result_ttl_seconds: Lama hasil job disimpan setelah selesai (detik)
+        """
+        self.data_file = data_file
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.result_ttl_seconds = result_ttl_seconds
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._dispatchers = []
+
+    def start(self):
+        """Menjalankan pool worker dan dispatcher thread"""
+        if self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.data_file,)
+        )
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._dispatch_loop, name=f"job-dispatcher-{i}", daemon=True)
+            thread.start()
+            self._dispatchers.append(thread)
+
+    def shutdown(self):
+        """Menghentikan dispatcher dan pool worker"""
+        if self._executor is None:
+            return
+        for _ in self._dispatchers:
+            self._queue.put(None)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._dispatchers = []
+
+    def submit(self, payload: Dict) -> Job:
+        """
+        Memasukkan job baru ke antrian
+
+        Args:
+            payload: Parameter route generation (lihat _run_route_job)
+
+        Returns:
+            Job yang baru dibuat
+
+        Raises:
+            JobQueueFullError: Jika antrian penuh
+        """
+        self._purge_expired()
+        job = Job(payload)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.job_id]
+            raise JobQueueFullError(f"Job queue is full ({self.max_queue_size} jobs waiting)")
+        return job
+
+    def submit_batch(self, payloads: List[Dict]) -> List[Future]:
+        """
+        Menjadwalkan item batch lewat antrian job yang sama (terbatas max_queue_size)
+
+        Item dimasukkan ke antrian secara bertahap oleh thread feeder: jika antrian
+        penuh, feeder menunggu tempat kosong sehingga antrian tidak pernah melebihi
+        batasnya. Semua item berbagi data destinasi, matrix, dan pengelompokan kategori
+        yang sudah dimuat di setiap worker. Future yang dibatalkan sebelum item mulai
+        dijalankan (mis. client disconnect) dilewati.
+
+        Args:
+            payloads: List parameter route generation (lihat _run_route_job)
+
+        Returns:
+            List Future (urutan sama dengan payloads) yang menghasilkan outcome _run_route_job
+
+        Raises:
+            JobQueueFullError: Jika antrian sudah penuh saat batch dikirim
+        """
+        if self._executor is None:
+            raise RuntimeError("Job workers are not running")
+        if self._queue.full():
+            raise JobQueueFullError(f"Job queue is full ({self.max_queue_size} jobs waiting)")
+        items = [BatchItem(payload) for payload in payloads]
+        threading.Thread(target=self._feed_batch, args=(items,), name="job-batch-feeder", daemon=True).start()
+        return [item.future for item in items]
+
+    def _feed_batch(self, items: List[BatchItem]):
+        """Masukkan item batch ke antrian satu per satu, menunggu jika antrian penuh"""
+        for position, item in enumerate(items):
+            while not item.future.cancelled():
+                if self._executor is None:
+                    # Manager dihentikan: item yang belum masuk antrian tidak akan dijalankan
+                    for pending in items[position:]:
+                        pending.future.cancel()
+                    return
+                try:
+                    self._queue.put(item, timeout=BATCH_FEED_POLL_SECONDS)
+                    break
+                except queue.Full:
+                    continue
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Mengambil job berdasarkan ID (None jika tidak ada atau sudah kedaluwarsa)"""
+        self._purge_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        """Jumlah job yang masih menunggu di antrian"""
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict:
+        """Statistik job untuk endpoint status"""
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth(),
+            "max_queue_size": self.max_queue_size,
+            "result_ttl_seconds": self.result_ttl_seconds,
+            "running": statuses.count(JOB_STATUS_RUNNING),
+            "completed": statuses.count(JOB_STATUS_COMPLETED),
+            "failed": statuses.count(JOB_STATUS_FAILED)
+        }
+
+    def _dispatch_loop(self):
+        """Loop dispatcher: ambil job dari antrian lalu jalankan di pool worker"""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if isinstance(job, BatchItem):
+                self._run_batch_item(job)
+                continue
+
+            job.status = JOB_STATUS_RUNNING
+            job.started_at = time.time()
+            try:
+                outcome = collect_outcome_metrics(self._executor.submit(_run_route_job, job.payload).result())
+            except Exception as e:
+                outcome = {"success": False, "status_code": 500, "detail": f"Worker error: {str(e)}"}
+
+            if outcome['success']:
+                job.result = {"message": outcome['message'], "data": outcome['data']}
+                job.status = JOB_STATUS_COMPLETED
+            else:
+                job.error = {"status_code": outcome['status_code'], "detail": outcome['detail']}
+                job.status = JOB_STATUS_FAILED
+            job.finished_at = time.time()
+
+    def _run_batch_item(self, item: BatchItem):
+        """Jalankan satu item batch di pool worker dan teruskan hasilnya ke future item"""
+        if not item.future.set_running_or_notify_cancel():
+            return
+        try:
+            item.future.set_result(self._executor.submit(_run_route_job, item.payload).result())
+        except Exception as e:
+            item.future.set_exception(e)
+
+    def _purge_expired(self):
+        """Hapus job yang sudah selesai lebih lama dari result TTL"""
+        now = time.time()
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.is_finished() and now - job.finished_at > self.result_ttl_seconds
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
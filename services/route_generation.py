@@ -0,0 +1,382 @@
+"""
+Logika inti pembuatan rekomendasi rute (dipakai oleh endpoint sinkron dan job worker)
+
+Dipisahkan dari api.py agar dapat dijalankan di proses worker tanpa FastAPI.
+"""
+import random
+import time
+from typing import List, Optional, Tuple, Dict
+
+from algorithms.hga import HybridGeneticAlgorithm
+from models.destination import Destination
+from utils.data_loader import group_destinations_by_category
+from utils.distance import current_profile, recalculate_route_with_osrm, use_osrm_profile
+from utils.penalty import calculate_distance_penalty, calculate_time_penalty, calculate_total_penalty
+from utils.metrics import (
+    ROUTE_REQUEST_DURATION,
+    ROUTE_STAGE_DURATION,
+    HGA_ATTEMPTS,
+    REJECTED_ROUTES,
+    ROUTE_TIMEOUTS
+)
+
+# Konstanta untuk validasi rute
+MAX_ROUTE_DISTANCE_KM = 25.0  # Maksimal jarak rute yang valid
+MAX_HGA_RETRY_ATTEMPTS = 10   # Maksimal percobaan ulang HGA
+ROUTE_SEARCH_TIMEOUT_SECONDS = 60  # Timeout untuk pencarian rute (detik)
+
+
+class RouteGenerationError(Exception):
+    """
+    Error ketika rute tidak dapat dihasilkan
+
+    Attributes:
+        status_code: HTTP status code yang sesuai (408 untuk timeout, 500 untuk lainnya)
+        detail: Pesan error
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def generate_google_maps_url(start_point, destinations_list):
+    """
+    Generate Google Maps URL untuk navigasi rute
+
+    Args:
+        start_point: Tuple (latitude, longitude) titik awal
+        destinations_list: List of Destination objects
+
+    Returns:
+        String URL Google Maps untuk navigasi
+
+    Format URL: https://www.google.com/maps/dir/start/dest1/dest2/.../destN
+    """
+    base_url = "https://www.google.com/maps/dir"
+
+    # Build waypoints list
+    waypoints = []
+
+    # Add start point
+    waypoints.append(f"'{start_point[0]},{start_point[1]}'")
+
+    # Add all destinations
+    for dest in destinations_list:
+        waypoints.append(f"{dest.latitude},+{dest.longitude}")
+
+    # Join waypoints with /
+    waypoints_str = "/".join(waypoints)
+
+    # Add travel mode parameter (9 = motorcycle/driving)
+    # Reference: https://developers.google.com/maps/documentation/urls/get-started
+    url = f"{base_url}/{waypoints_str}?entry=ttu&travelmode=two-wheeler"
+
+    return url
+
+
+def _apply_osrm_constraint_info(route_info: dict, osrm_data: dict):
+    """
+    Update constraint info pada route summary dengan data OSRM
+
+    Args:
+        route_info: Dictionary hasil Route.get_route_summary()
+        osrm_data: Hasil recalculate_route_with_osrm()
+    """
+    distance_km = osrm_data['total_distance_km']
+    time_minutes = osrm_data['total_duration_minutes']
+    distance_violated = distance_km > 20.0
+    time_violated = time_minutes > 300.0
+
+    route_info['constraint_info']['distance']['value'] = round(distance_km, 2)
+    route_info['constraint_info']['distance']['violated'] = distance_violated
+    route_info['constraint_info']['distance']['excess'] = round(max(0, distance_km - 20.0), 2)
+    route_info['constraint_info']['distance']['penalty'] = round(calculate_distance_penalty(distance_km), 6)
+
+    route_info['constraint_info']['time']['value_minutes'] = round(time_minutes, 2)
+    route_info['constraint_info']['time']['value_hours'] = round(time_minutes / 60, 2)
+    route_info['constraint_info']['time']['violated'] = time_violated
+    route_info['constraint_info']['time']['excess_minutes'] = round(max(0, time_minutes - 300.0), 2)
+    route_info['constraint_info']['time']['penalty'] = round(calculate_time_penalty(time_minutes), 6)
+
+    route_info['constraint_info']['total_penalty'] = round(calculate_total_penalty(distance_km, time_minutes), 6)
+    route_info['constraint_info']['is_feasible'] = not distance_violated and not time_violated
+
+
+def _build_route_info(user_location: Tuple[float, float], chromosome, osrm_data: dict) -> dict:
+    """
+    Membuat route info untuk response dari kromosom hasil HGA
+
+    Args:
+        user_location: Koordinat user (latitude, longitude)
+        chromosome: Kromosom solusi
+        osrm_data: Hasil recalculate_route_with_osrm() untuk kromosom tersebut
+
+    Returns:
+        Dictionary route summary (dengan data OSRM jika rekalkulasi berhasil)
+    """
+    with ROUTE_STAGE_DURATION.labels(stage="response_building").time():
+        route_info = chromosome.get_route_summary()
+        route_info['fitness'] = chromosome.get_fitness()
+
+        # Generate Google Maps URL untuk navigasi
+        google_maps_url = generate_google_maps_url(user_location, chromosome.genes)
+        route_info['google_maps_url'] = google_maps_url
+
+        if not osrm_data['success']:
+            route_info['osrm_recalculated'] = False
+            route_info['osrm_error'] = osrm_data.get('error', 'Unknown error')
+            return route_info
+
+        # Update dengan data OSRM yang lebih akurat
+        route_info['total_distance_km'] = osrm_data['total_distance_km']
+        route_info['total_travel_time_minutes'] = osrm_data['total_duration_minutes']
+        route_info['total_travel_time_hours'] = osrm_data['total_duration_hours']
+        route_info['osrm_recalculated'] = True
+        route_info['osrm_route_geometry'] = osrm_data.get('geometry')
+
+        # Update constraint info dengan data OSRM
+        if 'constraint_info' in route_info:
+            _apply_osrm_constraint_info(route_info, osrm_data)
+
+        return route_info
+
+
+def generate_route_recommendations(
+        destinations: List[Destination],
+        user_location: Tuple[float, float],
+        num_routes: int,
+        hga_config: Dict,
+        timeout_seconds: float = ROUTE_SEARCH_TIMEOUT_SECONDS,
+        grouped_destinations: Dict = None,
+        osrm_profile: Optional[str] = None
+    ) -> Tuple[str, Dict]:
+    """
+    Menjalankan HGA berulang kali hingga mendapatkan sejumlah rute valid
+
+    Mekanisme validasi:
+    - Setelah rute dihasilkan, dilakukan pengecekan ulang dengan OSRM
+    - Jika jarak > 25 km, rute ditolak dan HGA dijalankan ulang
+    - Proses berlanjut hingga mendapatkan sejumlah rute yang diminta
+
+    Args:
+        destinations: List semua destinasi yang tersedia
+        user_location: Koordinat user (latitude, longitude)
+        num_routes: Jumlah rute yang diinginkan
+        hga_config: Dictionary konfigurasi HGA (field sama dengan HGAConfig)
+        timeout_seconds: Batas waktu pencarian rute (detik)
+        grouped_destinations: Destinasi yang sudah dikelompokkan per kategori
+                              (opsional, dipakai ulang antar request dalam satu batch)
+        osrm_profile: Profil OSRM untuk request ini (matrix + validasi OSRM);
+                      None = profil global
+
+    Returns:
+        Tuple (message, response_data)
+
+    Raises:
+        RouteGenerationError: Jika tidak ada satu pun rute valid yang ditemukan
+        ValueError: Jika osrm_profile tidak dikenal
+    """
+    with use_osrm_profile(osrm_profile), ROUTE_REQUEST_DURATION.time():
+        return _generate_route_recommendations(
+            destinations, user_location, num_routes, hga_config, timeout_seconds, grouped_destinations
+        )
+
+
+def _generate_route_recommendations(
+        destinations: List[Destination],
+        user_location: Tuple[float, float],
+        num_routes: int,
+        hga_config: Dict,
+        timeout_seconds: float,
+        grouped_destinations: Dict
+    ) -> Tuple[str, Dict]:
+    """Implementasi generate_route_recommendations (tanpa pengukuran durasi total)"""
+    print(f"\nProcessing request for location: {user_location}")
+    print(f"HGA Config - Pop: {hga_config['population_size']}, Gen: {hga_config['generations']}, "
+          f"2-Opt: {hga_config['use_2opt']} ({hga_config['two_opt_iterations']} iter)")
+    print(f"Target: {num_routes} routes with max distance {MAX_ROUTE_DISTANCE_KM} km")
+
+    if grouped_destinations is None:
+        grouped_destinations = group_destinations_by_category(destinations)
+
+    # List untuk menyimpan rute yang valid
+    valid_routes = []
+    # Set untuk menyimpan route signature (untuk menghindari duplikat)
+    seen_route_signatures = set()
+    # Counter untuk retry attempts
+    total_attempts = 0
+    # Statistik untuk response
+    all_stats = []
+    rejected_routes_count = 0
+    # Track waktu mulai untuk timeout
+    start_time = time.time()
+    timeout_reached = False
+    # Satu stream random untuk semua attempt: hasil reproducible jika seed diisi,
+    # tetapi setiap attempt tetap mencoba populasi yang berbeda
+    seed = hga_config.get('seed')
+    rng = random.Random(seed) if seed is not None else None
+
+    # Loop hingga mendapatkan jumlah rute yang diminta atau mencapai batas retry atau timeout
+    while len(valid_routes) < num_routes and total_attempts < MAX_HGA_RETRY_ATTEMPTS:
+        # Check timeout
+        elapsed_time = time.time() - start_time
+        if elapsed_time >= timeout_seconds:
+            timeout_reached = True
+            ROUTE_TIMEOUTS.inc()
+            print(f"\n⏱ Timeout reached: {elapsed_time:.2f}s >= {timeout_seconds}s")
+            break
+        total_attempts += 1
+        HGA_ATTEMPTS.inc()
+        print(f"\n--- HGA Attempt {total_attempts} (Valid routes: {len(valid_routes)}/{num_routes}) ---")
+
+        # Inisialisasi HGA baru untuk setiap attempt
+        hga = HybridGeneticAlgorithm(
+            population_size=hga_config['population_size'],
+            generations=hga_config['generations'],
+            crossover_rate=hga_config['crossover_rate'],
+            mutation_rate=hga_config['mutation_rate'],
+            elitism_count=hga_config['elitism_count'],
+            tournament_size=hga_config['tournament_size'],
+            use_2opt=hga_config['use_2opt'],
+            two_opt_iterations=hga_config['two_opt_iterations'],
+            rng=rng,
+            local_search=hga_config.get('local_search', 'swap'),
+            local_search_policy=hga_config.get('local_search_policy', 'first'),
+            dont_look_bits=hga_config.get('dont_look_bits', False)
+        )
+
+        # Jalankan HGA - minta lebih banyak solusi untuk meningkatkan peluang mendapat rute valid
+        candidates_needed = num_routes - len(valid_routes)
+        solutions_to_request = min(candidates_needed + 2, 5)  # Minta sedikit lebih banyak
+
+        with ROUTE_STAGE_DURATION.labels(stage="hga_attempt").time():
+            best_chromosomes = hga.run(
+                destinations=destinations,
+                start_point=user_location,
+                num_solutions=solutions_to_request,
+                grouped_destinations=grouped_destinations
+            )
+
+        # Simpan statistik
+        stats = hga.get_evolution_statistics()
+        all_stats.append(stats)
+
+        # Proses setiap chromosome hasil HGA
+        for chromosome in best_chromosomes:
+            if len(valid_routes) >= num_routes:
+                break
+
+            # Buat route signature untuk cek duplikat (berdasarkan urutan place_id)
+            route_signature = tuple(dest.place_id for dest in chromosome.genes)
+            if route_signature in seen_route_signatures:
+                print(f"  Skipping duplicate route")
+                continue
+
+            # Rekalkulasi dengan OSRM untuk mendapatkan jarak real
+            with ROUTE_STAGE_DURATION.labels(stage="osrm_validation").time():
+                osrm_data = recalculate_route_with_osrm(user_location, chromosome.genes)
+
+            if osrm_data['success']:
+                osrm_distance = osrm_data['total_distance_km']
+
+                # Validasi jarak <= 25 km
+                if osrm_distance <= MAX_ROUTE_DISTANCE_KM:
+                    print(f"  ✓ Valid route found: {osrm_distance:.2f} km")
+
+                    # Tandai route sebagai sudah dilihat
+                    seen_route_signatures.add(route_signature)
+
+                    # Buat route info dengan data OSRM yang lebih akurat
+                    route_info = _build_route_info(user_location, chromosome, osrm_data)
+                    valid_routes.append(route_info)
+                else:
+                    print(f"  ✗ Route rejected: {osrm_distance:.2f} km > {MAX_ROUTE_DISTANCE_KM} km limit")
+                    rejected_routes_count += 1
+                    REJECTED_ROUTES.inc()
+            else:
+                # Jika OSRM gagal, tetap terima rute tapi tandai
+                print(f"  ⚠ OSRM failed, accepting route with estimated distance")
+                seen_route_signatures.add(route_signature)
+
+                route_info = _build_route_info(user_location, chromosome, osrm_data)
+                valid_routes.append(route_info)
+
+    # Cek apakah berhasil mendapatkan cukup rute
+    elapsed_time = time.time() - start_time
+
+    if len(valid_routes) == 0:
+        if timeout_reached:
+            raise RouteGenerationError(
+                status_code=408,  # Request Timeout
+                detail=f"Timeout: Failed to find any valid routes within {MAX_ROUTE_DISTANCE_KM} km after {elapsed_time:.2f} seconds (timeout: {timeout_seconds}s)"
+            )
+        else:
+            raise RouteGenerationError(
+                status_code=500,
+                detail=f"Failed to find any valid routes within {MAX_ROUTE_DISTANCE_KM} km after {total_attempts} attempts"
+            )
+
+    recommendations = valid_routes
+
+    # Sorting routes berdasarkan jarak OSRM (terpendek ke terpanjang)
+    recommendations.sort(key=lambda x: x.get('total_distance_km', float('inf')))
+
+    # Update rank setelah sorting
+    for i, route in enumerate(recommendations):
+        route['rank'] = i + 1
+
+    # Aggregate statistics dari semua HGA runs
+    final_stats = all_stats[-1] if all_stats else None
+
+    # Response
+    response_data = {
+        "user_location": {
+            "latitude": user_location[0],
+            "longitude": user_location[1]
+        },
+        "hga_config": dict(hga_config),
+        "osrm_profile": current_profile(),
+        "route_validation": {
+            "max_distance_km": MAX_ROUTE_DISTANCE_KM,
+            "total_hga_attempts": total_attempts,
+            "rejected_routes_count": rejected_routes_count,
+            "valid_routes_found": len(recommendations),
+            "search_time_seconds": round(elapsed_time, 2),
+            "timeout_seconds": timeout_seconds,
+            "timeout_reached": timeout_reached
+        },
+        "statistics": {
+            "total_generations": final_stats['total_generations'] if final_stats else 0,
+            "best_distance_km": final_stats['best_distance'] if final_stats else 0,
+            "initial_fitness": final_stats['best_fitness_history'][0] if final_stats else 0,
+            "final_fitness": final_stats['best_fitness_history'][-1] if final_stats else 0,
+            "improvement_percentage": (
+                (final_stats['best_fitness_history'][-1] - final_stats['best_fitness_history'][0])
+                / final_stats['best_fitness_history'][0] * 100
+            ) if final_stats and final_stats['best_fitness_history'][0] != 0 else 0,
+            # Langkah local search dijumlahkan dari semua HGA run
+            "local_search_moves": {
+                key: sum(stats['local_search_moves'][key] for stats in all_stats)
+                for key in ('evaluated', 'applied')
+            }
+        },
+        "routes": recommendations
+    }
+
+    print(f"\n=== Route Generation Summary ===")
+    print(f"Successfully generated {len(recommendations)} valid routes")
+    print(f"Total HGA attempts: {total_attempts}")
+    print(f"Search time: {elapsed_time:.2f}s / {timeout_seconds}s")
+    print(f"Rejected routes (>{MAX_ROUTE_DISTANCE_KM} km): {rejected_routes_count}")
+    if recommendations:
+        print(f"Best route distance: {recommendations[0].get('total_distance_km', 'N/A'):.2f} km\n")
+
+    # Tentukan message berdasarkan apakah timeout tercapai
+    if timeout_reached and len(recommendations) < num_routes:
+        message = f"Timeout reached. Generated {len(recommendations)}/{num_routes} route recommendations in {elapsed_time:.2f}s"
+    else:
+        message = f"Successfully generated {len(recommendations)} route recommendations"
+
+    return message, response_data
@@ -6,6 +6,8 @@ from utils.distance import (
     calculate_route_distance,
     calculate_distance_haversine,
     calculate_distance_osrm,
+    haversine_many,
+    distance_matrix_for,
     clear_osrm_cache,
     get_osrm_cache_stats,
     set_use_osrm,
@@ -23,6 +25,8 @@ __all__ = [
     'calculate_route_distance',
     'calculate_distance_haversine',
     'calculate_distance_osrm',
+    'haversine_many',
+    'distance_matrix_for',
     'clear_osrm_cache',
     'get_osrm_cache_stats',
     'set_use_osrm',
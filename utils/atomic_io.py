@@ -0,0 +1,35 @@
+"""
+Penulisan file secara atomik
+
+File ditulis ke file sementara di direktori yang sama, di-fsync, lalu di-rename ke
+path tujuan (os.replace), sehingga pembaca tidak pernah melihat file setengah tertulis
+dan crash di tengah penulisan tidak merusak file lama.
+"""
+import json
+import os
+import tempfile
+from typing import Any
+
+
+def write_json_atomic(path: str, data: Any, indent: int = None):
+    """
+    Menulis JSON ke file secara atomik
+
+    Args:
+        path: Path file tujuan
+        data: Data yang bisa di-serialize ke JSON
+        indent: Indentasi JSON (None = compact)
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
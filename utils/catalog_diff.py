@@ -0,0 +1,136 @@
+"""
+Diff katalog destinasi terhadap matrix yang tersimpan
+
+Setiap koordinat punya fingerprint berupa string "lat,lon" (6 desimal, sama dengan
+format key matrix). Metadata matrix menyimpan daftar fingerprint dan data_version
+(hash dari seluruh fingerprint) sehingga perubahan katalog bisa dideteksi walaupun
+jumlah destinasi tetap sama:
+- koordinat baru/diubah: hanya baris+kolom koordinat itu yang dihitung (O(changed x N))
+- koordinat yang dihapus/diubah: pasangan lamanya dibuang dari matrix (garbage collect)
+"""
+import hashlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .pair_keys import make_pair_key
+
+Coordinate = Tuple[float, float]
+
+
+def coordinate_fingerprint(coord: Coordinate) -> str:
+    """Fingerprint satu koordinat ("lat,lon" 6 desimal)"""
+    return f"{coord[0]:.6f},{coord[1]:.6f}"
+
+
+def parse_fingerprint(fingerprint: str) -> Coordinate:
+    """Kebalikan coordinate_fingerprint"""
+    lat, lon = fingerprint.split(',')
+    return float(lat), float(lon)
+
+
+def compute_data_version(fingerprints: Iterable[str]) -> str:
+    """
+    Hash isi katalog (tidak bergantung urutan)
+
+    Args:
+        fingerprints: Fingerprint koordinat
+
+    Returns:
+        16 karakter hex pertama dari SHA-256
+    """
+    digest = hashlib.sha256("\n".join(sorted(set(fingerprints))).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def stored_fingerprints(metadata: Dict, matrix: Dict) -> Set[str]:
+    """
+    Fingerprint koordinat yang tercakup di matrix tersimpan
+
+    Matrix lama (tanpa metadata 'coordinates') diturunkan dari key matrix.
+    """
+    coordinates = metadata.get('coordinates')
+    if coordinates is not None:
+        return set(coordinates)
+    fingerprints = set()
+    for key in matrix:
+        fingerprints.update(key.split('|'))
+    return fingerprints
+
+
+def record_catalog(metadata: Dict, coords: Iterable[Coordinate]):
+    """Menyimpan fingerprint dan data_version katalog ke metadata matrix"""
+    fingerprints = sorted({coordinate_fingerprint(coord) for coord in coords})
+    metadata['coordinates'] = fingerprints
+    metadata['data_version'] = compute_data_version(fingerprints)
+
+
+class CatalogDiff:
+    """Hasil perbandingan katalog saat ini dengan matrix tersimpan"""
+
+    def __init__(self, current: Set[str], stored: Set[str], stored_version: Optional[str]):
+        self.current = current
+        self.stored = stored
+        self.added = current - stored
+        self.removed = stored - current
+        self.data_version = compute_data_version(current)
+        self.stored_version = stored_version
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed) or self.data_version != self.stored_version
+
+    def changed_pairs(self) -> List[Tuple[Coordinate, Coordinate]]:
+        """Pasangan baris/kolom koordinat baru terhadap seluruh katalog saat ini"""
+        pairs = []
+        seen = set()
+        current = [parse_fingerprint(fp) for fp in sorted(self.current)]
+        for added in sorted(self.added):
+            coord1 = parse_fingerprint(added)
+            for coord2 in current:
+                if coord2 == coord1:
+                    continue
+                key = make_pair_key(coord1, coord2)
+                if key not in seen:
+                    seen.add(key)
+                    pairs.append((coord1, coord2))
+        return pairs
+
+    def stale_keys(self, matrix: Dict) -> List[str]:
+        """Key pasangan yang menyentuh koordinat yang sudah tidak ada di katalog"""
+        if not self.removed:
+            return []
+        stale = set()
+        stored = [parse_fingerprint(fp) for fp in self.stored]
+        for removed in self.removed:
+            coord1 = parse_fingerprint(removed)
+            for coord2 in stored:
+                if coord2 == coord1:
+                    continue
+                key = make_pair_key(coord1, coord2)
+                if key in matrix:
+                    stale.add(key)
+        return sorted(stale)
+
+    def summary(self) -> Dict:
+        return {
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'unchanged': len(self.current & self.stored),
+            'data_version': self.data_version,
+            'stored_version': self.stored_version
+        }
+
+
+def diff_catalog(coords: Iterable[Coordinate], metadata: Dict, matrix: Dict) -> CatalogDiff:
+    """
+    Membandingkan koordinat katalog dengan matrix tersimpan
+
+    Args:
+        coords: Koordinat katalog saat ini
+        metadata: Metadata matrix tersimpan
+        matrix: Isi matrix tersimpan
+
+    Returns:
+        CatalogDiff
+    """
+    current = {coordinate_fingerprint(coord) for coord in coords}
+    return CatalogDiff(current, stored_fingerprints(metadata, matrix), metadata.get('data_version'))
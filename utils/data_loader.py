@@ -2,26 +2,59 @@
 Utility functions untuk memuat dan memproses data destinasi wisata
 """
 import json
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+from models.category import CATEGORY_BITS
 from models.destination import Destination
+from models.destination_table import DestinationTable, LazyTextStore
 
-def load_destinations_from_csv(filepath: str) -> List[Destination]:
+def _parse_text_fields(data: dict) -> Tuple[Optional[str], ...]:
     """
-    Memuat data destinasi wisata dari file JSONL
+    Parse field teks opsional (alamat, image_url, deskripsi) dari satu record
+    
+    Args:
+        data: Record JSON satu destinasi
+        
+    Returns:
+        Tuple (alamat, image_url, deskripsi), None jika kosong
+    """
+    alamat = data.get('alamat', '').strip() if data.get('alamat') else None
+    image_url = data.get('image_url', '').strip() if data.get('image_url') else None
+    deskripsi = data.get('deskripsi', '').strip() if data.get('deskripsi') else None
+    
+    # Set None jika string kosong atau 'null'
+    if alamat == '':
+        alamat = None
+    if image_url == '':
+        image_url = None
+    if deskripsi == '' or deskripsi == 'null':
+        deskripsi = None
+    
+    return alamat, image_url, deskripsi
+
+
+def load_destination_table(filepath: str) -> DestinationTable:
+    """
+    Memuat data destinasi wisata dari file JSONL ke DestinationTable
+    
+    Hanya kolom numerik dan nama yang dimuat ke memori; field teks panjang
+    (alamat, image_url, deskripsi) disalin ke file sementara milik tabel dan
+    dibaca saat dibutuhkan.
     
     Args:
         filepath: Path ke file JSONL
         
     Returns:
-        List of Destination objects
+        DestinationTable
     """
-    destinations = []
+    names, categories, latitudes, longitudes, place_ids = [], [], [], [], []
+    text_store = LazyTextStore()
     
-    with open(filepath, 'r', encoding='utf-8') as file:
-        for line in file:
+    with open(filepath, 'rb') as file:
+        for raw_line in file:
             try:
                 # Parse JSON dari setiap baris
-                data = json.loads(line.strip())
+                data = json.loads(raw_line.decode('utf-8').strip())
                 
                 # Parse kategori (bisa multiple, dipisahkan koma)
                 kategori_str = data['kategori'].strip()
@@ -33,40 +66,53 @@ def load_destinations_from_csv(filepath: str) -> List[Destination]:
                 latitude = float(lat_str)
                 longitude = float(lon_str)
                 
+                nama = data['nama_destinasi'].strip()
+                
                 # Parse place_id
                 place_id = data.get('place_id')
                 
-                # Parse optional fields (alamat, image_url, deskripsi)
-                alamat = data.get('alamat', '').strip() if data.get('alamat') else None
-                image_url = data.get('image_url', '').strip() if data.get('image_url') else None
-                deskripsi = data.get('deskripsi', '').strip() if data.get('deskripsi') else None
-                
-                # Set None jika string kosong atau 'null'
-                if alamat == '':
-                    alamat = None
-                if image_url == '':
-                    image_url = None
-                if deskripsi == '' or deskripsi == 'null':
-                    deskripsi = None
-                
-                destination = Destination(
-                    nama=data['nama_destinasi'].strip(),
-                    kategori=kategori_list,
-                    latitude=latitude,
-                    longitude=longitude,
-                    place_id=place_id,
-                    alamat=alamat,
-                    image_url=image_url,
-                    deskripsi=deskripsi
-                )
-                
-                destinations.append(destination)
+                text_fields = _parse_text_fields(data)
                 
-            except (ValueError, KeyError, json.JSONDecodeError) as e:
+            except (ValueError, KeyError, AttributeError, json.JSONDecodeError) as e:
                 print(f"Error parsing line: {e}")
                 continue
+            
+            names.append(nama)
+            categories.append(kategori_list)
+            latitudes.append(latitude)
+            longitudes.append(longitude)
+            place_ids.append(place_id)
+            text_store.append(text_fields)
     
-    return destinations
+    return DestinationTable(
+        names=names,
+        categories=categories,
+        latitudes=latitudes,
+        longitudes=longitudes,
+        place_ids=place_ids,
+        text_store=text_store
+    )
+
+
+def load_destinations_from_csv(filepath: str) -> List[Destination]:
+    """
+    Memuat data destinasi wisata dari file JSONL
+    
+    Args:
+        filepath: Path ke file JSONL
+        
+    Returns:
+        List of Destination (view ke DestinationTable yang dimuat)
+    """
+    return load_destination_table(filepath).destinations
+
+
+def _category_masks(destinations: List[Destination]) -> np.ndarray:
+    """Bitmask kategori untuk list destinasi (satu operasi indexing pada tabel)"""
+    if not destinations:
+        return np.zeros(0, dtype=np.uint64)
+    table = destinations[0].table
+    return table.category_mask[table.indices_of(destinations)]
 
 
 def filter_destinations_by_category(destinations: List[Destination], 
@@ -81,7 +127,10 @@ def filter_destinations_by_category(destinations: List[Destination],
     Returns:
         List destinasi yang memiliki kategori tersebut
     """
-    return [dest for dest in destinations if dest.has_category(category)]
+    if not destinations:
+        return []
+    bit = destinations[0].table.category_bits.get(category, 0)
+    return [destinations[i] for i in np.flatnonzero(_category_masks(destinations) & bit)]
 
 
 def group_destinations_by_category(destinations: List[Destination]) -> Dict[str, List[Destination]]:
@@ -94,17 +143,9 @@ def group_destinations_by_category(destinations: List[Destination]) -> Dict[str,
     Returns:
         Dictionary dengan key kategori dan value list destinasi
     """
-    grouped = {
-        'makanan_berat': [],
-        'makanan_ringan': [],
-        'non_kuliner': [],
-        'oleh_oleh': [],
-        'all': []
-    }
+    masks = _category_masks(destinations)
     
-    for dest in destinations:
-        for category in dest.kategori:
-            if category in grouped:
-                grouped[category].append(dest)
-    
-    return grouped
+    return {
+        category: [destinations[i] for i in np.flatnonzero(masks & CATEGORY_BITS[category])]
+        for category in ('makanan_berat', 'makanan_ringan', 'non_kuliner', 'oleh_oleh', 'all')
+    }
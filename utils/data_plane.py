@@ -0,0 +1,360 @@
+"""
+Data plane matrix bersama antar proses worker
+
+Tanpa data plane, setiap worker (uvicorn/gunicorn, ProcessPoolExecutor job, Pool
+hyperparameter tuning) mem-parse sendiri file JSON distance dan travel time matrix
+menjadi dict Python. Dengan data plane, satu proses (loader) mem-parse JSON sekali lalu
+menerbitkan isinya sebagai array numerik (.npy) di DATA_PLANE_DIR; worker lain
+memetakan file tersebut read-only dengan mmap sehingga halaman memory dibagi lewat
+page cache OS dan memory data per worker hampir nol.
+
+Layout per profil: <DATA_PLANE_DIR>/<profil>/<source>/ dengan <source> = hash
+(mtime, ukuran) file JSON matrix. Jika file JSON berubah (build ulang), source berubah
+dan worker berikutnya yang memuat matrix menerbitkan versi baru. Penerbitan ditulis
+ke direktori sementara lalu di-rename (atomik); jika beberapa worker menerbitkan
+bersamaan, yang pertama menang dan sisanya memakai hasil tersebut.
+
+Aktifkan dengan environment variable MATRIX_DATA_PLANE=1, atau terbitkan lebih dulu
+sebelum worker dijalankan: python publish_data_plane.py
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .catalog_diff import parse_fingerprint
+from .matrix_store import MATRIX_DIR, matrix_files
+
+# Worker memakai matrix dari data plane (mmap) alih-alih mem-parse JSON sendiri
+DATA_PLANE_ENABLED = os.environ.get("MATRIX_DATA_PLANE", "0") == "1"
+
+# Direktori file data plane
+DATA_PLANE_DIR = os.environ.get("MATRIX_DATA_PLANE_DIR", os.path.join(MATRIX_DIR, "plane"))
+
+MANIFEST_FILE = "manifest.json"
+
+
+class SharedPairMatrix(Mapping, ABC):
+    """
+    Tampilan read-only {"lat,lon|lat,lon": value} di atas array N x N
+
+    Koordinat diurutkan sama dengan make_pair_key (tuple float), sehingga untuk
+    i <= j key pasangan selalu "<fingerprint i>|<fingerprint j>" (diagonal = pasangan
+    koordinat dengan dirinya sendiri, ada di sebagian file matrix lama).
+    """
+
+    def __init__(self, fingerprints: List[str], pairs: int):
+        self.fingerprints = fingerprints
+        self._index = {fingerprint: i for i, fingerprint in enumerate(fingerprints)}
+        self._pairs = pairs
+
+    @abstractmethod
+    def _present(self) -> np.ndarray:
+        """Mask boolean N x N pasangan yang punya nilai"""
+
+    @abstractmethod
+    def _value(self, i: int, j: int):
+        """Nilai pasangan (i, j), None jika tidak ada"""
+
+    def _positions(self, key: str) -> Optional[Tuple[int, int]]:
+        first, _, second = key.partition('|')
+        i = self._index.get(first)
+        j = self._index.get(second)
+        if i is None or j is None:
+            return None
+        return i, j
+
+    def __getitem__(self, key: str):
+        positions = self._positions(key)
+        value = self._value(*positions) if positions is not None else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        positions = self._positions(key)
+        return positions is not None and self._value(*positions) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        fingerprints = self.fingerprints
+        rows, cols = np.nonzero(np.triu(self._present()))
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            yield f"{fingerprints[i]}|{fingerprints[j]}"
+
+    def __len__(self) -> int:
+        return self._pairs
+
+    def dense_block(self, fingerprints: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sub-matrix untuk daftar koordinat (mis. baris DestinationTable)
+
+        Args:
+            fingerprints: Fingerprint koordinat per baris tabel
+
+        Returns:
+            Tuple (index baris tabel yang dikenal, mask pasangan yang ada, index plane)
+        """
+        plane_index = np.array([self._index.get(fingerprint, -1) for fingerprint in fingerprints], dtype=np.int64)
+        known = np.flatnonzero(plane_index >= 0)
+        block = np.ix_(plane_index[known], plane_index[known])
+        return known, self._present()[block], block
+
+
+class SharedDistanceMatrix(SharedPairMatrix):
+    """Distance matrix (km); NaN = pasangan tidak ada"""
+
+    def __init__(self, fingerprints: List[str], pairs: int, distance: np.ndarray):
+        super().__init__(fingerprints, pairs)
+        self.distance = distance
+
+    def _present(self) -> np.ndarray:
+        return ~np.isnan(self.distance)
+
+    def _value(self, i: int, j: int) -> Optional[float]:
+        value = self.distance.item(i, j)
+        return None if value != value else value
+
+    def fill_dense(self, target: np.ndarray, fingerprints: List[str]) -> int:
+        """Mengisi target[i, j] dari matrix; return jumlah pasangan (i <= j) yang terisi"""
+        known, present, block = self.dense_block(fingerprints)
+        sub = target[np.ix_(known, known)]
+        sub[present] = self.distance[block][present]
+        target[np.ix_(known, known)] = sub
+        return int(np.triu(present).sum())
+
+
+class SharedTravelTimeMatrix(SharedPairMatrix):
+    """Travel time matrix; value dibentuk ulang sebagai {duration, distance, source}"""
+
+    def __init__(self, fingerprints: List[str], pairs: int, duration: np.ndarray,
+                 distance: np.ndarray, source: np.ndarray, sources: List[str]):
+        super().__init__(fingerprints, pairs)
+        self.duration = duration
+        self.distance = distance
+        self.source = source  # Index ke sources; -1 = pasangan tidak ada
+        self.sources = sources
+
+    def _present(self) -> np.ndarray:
+        return self.source >= 0
+
+    def _value(self, i: int, j: int) -> Optional[Dict]:
+        source = self.source.item(i, j)
+        if source < 0:
+            return None
+        return {
+            'duration': self.duration.item(i, j),
+            'distance': self.distance.item(i, j),
+            'source': self.sources[source]
+        }
+
+    def fill_dense(self, target: np.ndarray, fingerprints: List[str]) -> int:
+        """Mengisi target[i, j] dengan duration; return jumlah pasangan (i <= j) yang terisi"""
+        known, present, block = self.dense_block(fingerprints)
+        sub = target[np.ix_(known, known)]
+        sub[present] = self.duration[block][present]
+        target[np.ix_(known, known)] = sub
+        return int(np.triu(present).sum())
+
+
+def _file_signature(path: str) -> List:
+    if not os.path.exists(path):
+        return [path, None, None]
+    stat = os.stat(path)
+    return [path, stat.st_mtime_ns, stat.st_size]
+
+
+def source_tag(profile: str) -> str:
+    """Hash (path, mtime, ukuran) file JSON matrix profil; berubah jika matrix di-build ulang"""
+    signature = json.dumps([_file_signature(path) for path in matrix_files(profile)])
+    return hashlib.sha256(signature.encode('utf-8')).hexdigest()[:16]
+
+
+def plane_path(profile: str, source: Optional[str] = None) -> str:
+    """Direktori data plane untuk profil dan source tertentu (default: source saat ini)"""
+    return os.path.join(DATA_PLANE_DIR, profile, source or source_tag(profile))
+
+
+def _collect_fingerprints(*matrices: Dict) -> List[str]:
+    fingerprints = set()
+    for matrix in matrices:
+        for key in matrix:
+            first, _, second = key.partition('|')
+            fingerprints.add(first)
+            fingerprints.add(second)
+    # Urutan sama dengan make_pair_key (tuple float), bukan urutan string
+    return sorted(fingerprints, key=parse_fingerprint)
+
+
+def publish_profile(profile: str, distance_cache=None, travel_time_cache=None) -> str:
+    """
+    Menerbitkan matrix satu profil ke data plane (dipanggil oleh proses loader)
+
+    Args:
+        profile: Profil OSRM
+        distance_cache: DistanceMatrixCache yang sudah dimuat (default: load dari file)
+        travel_time_cache: TravelTimeMatrixCache yang sudah dimuat (default: load dari file)
+
+    Returns:
+        Path direktori data plane
+    """
+    from .distance_matrix import DistanceMatrixCache
+    from .travel_time_matrix import TravelTimeMatrixCache
+
+    # Source dihitung sebelum load agar perubahan file saat publish memicu publish ulang
+    source = source_tag(profile)
+    target = plane_path(profile, source)
+    if os.path.exists(os.path.join(target, MANIFEST_FILE)):
+        return target
+
+    distance_file, travel_time_file = matrix_files(profile)
+    if distance_cache is None:
+        distance_cache = DistanceMatrixCache(distance_file)
+        distance_cache.load()
+    if travel_time_cache is None:
+        travel_time_cache = TravelTimeMatrixCache(travel_time_file)
+        if os.path.exists(travel_time_file):
+            travel_time_cache.load()
+
+    fingerprints = _collect_fingerprints(distance_cache.matrix, travel_time_cache.matrix)
+    index = {fingerprint: i for i, fingerprint in enumerate(fingerprints)}
+    size = len(fingerprints)
+
+    distance = np.full((size, size), np.nan)
+    for key, value in distance_cache.matrix.items():
+        first, _, second = key.partition('|')
+        i, j = index[first], index[second]
+        distance[i, j] = distance[j, i] = value
+
+    duration = np.zeros((size, size))
+    travel_distance = np.zeros((size, size))
+    source_index = np.full((size, size), -1, dtype=np.int16)
+    sources: List[str] = []
+    for key, value in travel_time_cache.matrix.items():
+        first, _, second = key.partition('|')
+        i, j = index[first], index[second]
+        if value.get('source') not in sources:
+            sources.append(value.get('source'))
+        duration[i, j] = duration[j, i] = value.get('duration') or 0.0
+        travel_distance[i, j] = travel_distance[j, i] = value.get('distance') or 0.0
+        source_index[i, j] = source_index[j, i] = sources.index(value.get('source'))
+
+    manifest = {
+        'profile': profile,
+        'source': source,
+        'published_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'coordinates': fingerprints,
+        'distance': {
+            'pairs': len(distance_cache.matrix),
+            # Daftar fingerprint di metadata tidak disalin (sudah ada di 'coordinates')
+            'metadata': {k: v for k, v in distance_cache.metadata.items() if k != 'coordinates'}
+        },
+        'travel_time': {
+            'pairs': len(travel_time_cache.matrix),
+            'metadata': {k: v for k, v in travel_time_cache.metadata.items() if k != 'coordinates'},
+            'sources': sources
+        }
+    }
+
+    profile_dir = os.path.dirname(target)
+    os.makedirs(profile_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f".{source}.", dir=profile_dir)
+    try:
+        np.save(os.path.join(staging, "distance.npy"), distance)
+        np.save(os.path.join(staging, "duration.npy"), duration)
+        np.save(os.path.join(staging, "travel_distance.npy"), travel_distance)
+        np.save(os.path.join(staging, "source.npy"), source_index)
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f)
+        os.rename(staging, target)
+    except OSError:
+        # Worker lain sudah menerbitkan source yang sama lebih dulu
+        shutil.rmtree(staging, ignore_errors=True)
+        if not os.path.exists(os.path.join(target, MANIFEST_FILE)):
+            raise
+
+    prune_profile(profile, keep=source)
+    print(f"✓ Published {profile} matrices to data plane {target} ({size} coordinates)")
+    return target
+
+
+def prune_profile(profile: str, keep: str):
+    """Hapus versi data plane lama sebuah profil (gagal diabaikan jika masih dipetakan worker)"""
+    profile_dir = os.path.join(DATA_PLANE_DIR, profile)
+    for name in os.listdir(profile_dir):
+        if name != keep and not name.startswith('.'):
+            shutil.rmtree(os.path.join(profile_dir, name), ignore_errors=True)
+
+
+def attach_profile(profile: str, publish: bool = True):
+    """
+    Memetakan matrix satu profil dari data plane (read-only, mmap)
+
+    Args:
+        profile: Profil OSRM
+        publish: Terbitkan dulu jika data plane untuk file matrix saat ini belum ada
+
+    Returns:
+        Tuple (DistanceMatrixCache, TravelTimeMatrixCache) dengan matrix read-only,
+        atau None jika profil belum punya file distance matrix
+    """
+    from .distance_matrix import DistanceMatrixCache
+    from .travel_time_matrix import TravelTimeMatrixCache
+
+    distance_file, travel_time_file = matrix_files(profile)
+    if not os.path.exists(distance_file):
+        return None
+
+    path = plane_path(profile)
+    manifest_file = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_file):
+        if not publish:
+            return None
+        path = publish_profile(profile)
+        manifest_file = os.path.join(path, MANIFEST_FILE)
+
+    with open(manifest_file, 'r') as f:
+        manifest = json.load(f)
+
+    def mapped(name: str) -> np.ndarray:
+        return np.load(os.path.join(path, name), mmap_mode='r')
+
+    fingerprints = manifest['coordinates']
+    distance_cache = DistanceMatrixCache(distance_file)
+    distance_cache.matrix = SharedDistanceMatrix(
+        fingerprints, manifest['distance']['pairs'], mapped("distance.npy")
+    )
+    distance_cache.metadata = manifest['distance']['metadata']
+
+    travel_time_cache = TravelTimeMatrixCache(travel_time_file)
+    travel_time_cache.matrix = SharedTravelTimeMatrix(
+        fingerprints, manifest['travel_time']['pairs'], mapped("duration.npy"),
+        mapped("travel_distance.npy"), mapped("source.npy"), manifest['travel_time']['sources']
+    )
+    travel_time_cache.metadata = manifest['travel_time']['metadata']
+
+    print(f"✓ Attached {profile} matrices from data plane ({len(distance_cache.matrix)} distances, "
+          f"{len(travel_time_cache.matrix)} travel times)")
+    return distance_cache, travel_time_cache
+
+
+def publish_profiles(profiles: Optional[List[str]] = None) -> List[str]:
+    """
+    Menerbitkan semua profil yang punya file matrix (dijalankan sebelum worker start)
+
+    Returns:
+        Path data plane yang diterbitkan
+    """
+    from .matrix_store import available_profiles
+    return [publish_profile(profile) for profile in profiles or available_profiles()]
+
+
+def is_shared(cache) -> bool:
+    """True jika matrix cache dipetakan dari data plane"""
+    return cache is not None and isinstance(cache.matrix, SharedPairMatrix)
@@ -2,11 +2,18 @@
 Utility functions untuk menghitung jarak antar koordinat
 Menggunakan pre-calculated distance matrix dengan OSRM real routes
 """
+import contextvars
 import math
 import requests
-from typing import Optional
+from contextlib import contextmanager
+from typing import Optional, Sequence, Tuple
 import time
 
+import numpy as np
+
+from utils.osrm_cache import OSRMResponseCache
+from utils.matrix_store import get_distance_cache, get_travel_time_cache, preload_profiles, store_stats, validate_profile
+
 # OSRM API Configuration
 OSRM_BASE_URL = "http://router.project-osrm.org"
 OSRM_PROFILE = "driving"  # Options: 'driving', 'bike', 'foot' (motor menggunakan 'driving')
@@ -17,10 +24,22 @@ OSRM_MAX_RETRIES = 2  # Maximum retry attempts
 
 # Distance Matrix Configuration
 USE_DISTANCE_MATRIX = True  # Prioritas utama: gunakan pre-calculated matrix
-_distance_matrix_cache = None  # Will be initialized on first use
+# Matrix per profil dimuat lazily oleh utils.matrix_store
+
+# Profil untuk request yang sedang berjalan (override OSRM_PROFILE, lihat use_osrm_profile)
+_request_profile: contextvars.ContextVar = contextvars.ContextVar('osrm_request_profile', default=None)
 
 # Cache untuk menyimpan hasil OSRM agar tidak request berulang untuk koordinat yang sama
-_osrm_cache = {}
+# (LRU memory + SQLite, dipartisi per profil; lihat utils.osrm_cache)
+_osrm_cache = OSRMResponseCache()
+
+# Statistik sumber lookup jarak (di-flush ke utils.metrics saat scrape)
+_lookup_stats = {
+    'matrix_hit': 0,
+    'haversine_fallback': 0,
+    'haversine_user': 0,
+    'osrm': 0
+}
 
 def calculate_distance_haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -58,6 +77,57 @@ def calculate_distance_haversine(lat1: float, lon1: float, lat2: float, lon2: fl
     
     return distance
 
+def haversine_many(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Versi array dari calculate_distance_haversine (mengikuti aturan broadcasting NumPy)
+    
+    Hasil sama dengan versi skalar dalam toleransi floating point (selisih 1 ulp).
+    
+    Args:
+        lat1: Array latitude titik pertama
+        lon1: Array longitude titik pertama
+        lat2: Array latitude titik kedua
+        lon2: Array longitude titik kedua
+        
+    Returns:
+        Array jarak dalam kilometer
+    """
+    R = 6371.0
+    
+    lat1_rad = np.radians(np.asarray(lat1, dtype=np.float64))
+    lon1_rad = np.radians(np.asarray(lon1, dtype=np.float64))
+    lat2_rad = np.radians(np.asarray(lat2, dtype=np.float64))
+    lon2_rad = np.radians(np.asarray(lon2, dtype=np.float64))
+    
+    dlat = lat2_rad - lat1_rad
+    dlon = lon2_rad - lon1_rad
+    
+    a = np.sin(dlat / 2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    
+    return R * c
+
+
+def distance_matrix_for(points: Sequence[Tuple[float, float]],
+                        other_points: Sequence[Tuple[float, float]] = None) -> np.ndarray:
+    """
+    Matrix jarak Haversine antar titik
+    
+    Args:
+        points: List koordinat (latitude, longitude) atau array (N, 2)
+        other_points: List koordinat tujuan (opsional, default = points)
+        
+    Returns:
+        Array (N, M) jarak dalam kilometer; baris = points, kolom = other_points
+    """
+    origins = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    targets = origins if other_points is None else np.asarray(other_points, dtype=np.float64).reshape(-1, 2)
+    return haversine_many(
+        origins[:, 0:1], origins[:, 1:2],
+        targets[None, :, 0], targets[None, :, 1]
+    )
+
+
 def calculate_distance_osrm(lat1: float, lon1: float, lat2: float, lon2: float) -> Optional[float]:
     """
     Menghitung jarak rute nyata antara dua titik menggunakan OSRM API
@@ -73,13 +143,16 @@ def calculate_distance_osrm(lat1: float, lon1: float, lat2: float, lon2: float)
         Jarak rute dalam kilometer, atau None jika gagal
     """
     # Cek cache
-    cache_key = f"{lat1},{lon1}-{lat2},{lon2}-{OSRM_PROFILE}"
-    if cache_key in _osrm_cache:
-        return _osrm_cache[cache_key]
+    profile = current_profile()
+    origin = f"{lat1},{lon1}"
+    destination = f"{lat2},{lon2}"
+    cached = _osrm_cache.get(profile, origin, destination)
+    if cached is not None:
+        return cached
     
     # Format: longitude,latitude (OSRM menggunakan lon,lat bukan lat,lon!)
     # Untuk motor/motorcycle, gunakan profil 'driving' karena public OSRM tidak punya profil motorcycle
-    url = f"{OSRM_BASE_URL}/route/v1/{OSRM_PROFILE}/{lon1},{lat1};{lon2},{lat2}"
+    url = f"{OSRM_BASE_URL}/route/v1/{profile}/{lon1},{lat1};{lon2},{lat2}"
     params = {
         'overview': 'false',  # Kita hanya butuh jarak, tidak butuh geometry
         'steps': 'false'
@@ -97,7 +170,7 @@ def calculate_distance_osrm(lat1: float, lon1: float, lat2: float, lon2: float)
                     distance_km = data['routes'][0]['distance'] / 1000.0
                     
                     # Simpan ke cache
-                    _osrm_cache[cache_key] = distance_km
+                    _osrm_cache.set(profile, origin, destination, distance_km)
                     
                     return distance_km
             
@@ -114,20 +187,37 @@ def calculate_distance_osrm(lat1: float, lon1: float, lat2: float, lon2: float)
     # Jika semua retry gagal, return None
     return None
 
+def current_profile() -> str:
+    """Profil OSRM yang berlaku: profil request (jika di-set) atau profil global"""
+    return _request_profile.get() or OSRM_PROFILE
+
+
+@contextmanager
+def use_osrm_profile(profile: Optional[str]):
+    """
+    Memakai profil OSRM tertentu untuk kode di dalam blok (per request)
+    
+    Matrix dan cache OSRM profil tersebut dipakai tanpa mengubah profil global.
+    
+    Args:
+        profile: Profil OSRM, atau None untuk memakai profil global
+    
+    Raises:
+        ValueError: Jika profil tidak dikenal
+    """
+    if profile is None:
+        yield
+        return
+    token = _request_profile.set(validate_profile(profile))
+    try:
+        yield
+    finally:
+        _request_profile.reset(token)
+
+
 def _get_distance_matrix():
-    """Lazy load distance matrix cache"""
-    global _distance_matrix_cache
-    if _distance_matrix_cache is None:
-        try:
-            from .distance_matrix import _distance_cache
-            _distance_matrix_cache = _distance_cache
-            # Load matrix jika belum loaded (cek length, bukan truthiness)
-            if len(_distance_matrix_cache.matrix) == 0:
-                _distance_matrix_cache.load()
-        except Exception:
-            # Jika gagal load, disable distance matrix
-            _distance_matrix_cache = False
-    return _distance_matrix_cache if _distance_matrix_cache else None
+    """Distance matrix profil aktif (lazy load, lihat utils.matrix_store)"""
+    return get_distance_cache(current_profile())
 
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float, 
@@ -156,6 +246,7 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float,
     
     # Jika flag haversine aktif (untuk user location), langsung gunakan Haversine
     if use_haversine_for_user:
+        _lookup_stats['haversine_user'] += 1
         return calculate_distance_haversine(lat1, lon1, lat2, lon2)
     
     # PRIORITAS 1: Coba gunakan Distance Matrix (pre-calculated OSRM routes)
@@ -166,19 +257,23 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float,
             coord2 = (lat2, lon2)
             distance = matrix.get(coord1, coord2)
             if distance is not None:
+                _lookup_stats['matrix_hit'] += 1
                 return distance
             # Jika tidak ada di matrix, kemungkinan besar salah satu adalah user location
             # Gunakan Haversine untuk performa (tidak perlu hit OSRM API)
             else:
+                _lookup_stats['haversine_fallback'] += 1
                 return calculate_distance_haversine(lat1, lon1, lat2, lon2)
     
     # PRIORITAS 2: Coba gunakan OSRM real-time jika diaktifkan (jarang terjadi)
     if USE_OSRM:
         osrm_distance = calculate_distance_osrm(lat1, lon1, lat2, lon2)
         if osrm_distance is not None:
+            _lookup_stats['osrm'] += 1
             return osrm_distance
     
     # PRIORITAS 3: Fallback ke Haversine
+    _lookup_stats['haversine_fallback'] += 1
     return calculate_distance_haversine(lat1, lon1, lat2, lon2)
 
 
@@ -205,18 +300,47 @@ def calculate_route_distance(points: list) -> float:
     return total_distance
 
 
-def clear_osrm_cache():
+def clear_osrm_cache(profile: str = None):
+    """
+    Menghapus cache OSRM (memory dan persisten)
+    
+    Args:
+        profile: Hanya hapus cache profil ini (None = semua profil)
+    """
+    _osrm_cache.clear(profile)
+
+
+def warm_osrm_cache() -> int:
     """
-    Menghapus cache OSRM
+    Memuat entry cache OSRM terbaru untuk profil aktif dari disk ke memory
+    
+    Returns:
+        Jumlah entry yang dimuat
+    """
+    return _osrm_cache.warm(current_profile())
+
+
+def drain_lookup_stats() -> dict:
+    """
+    Mengambil statistik sumber lookup jarak sejak pemanggilan terakhir lalu me-reset-nya
+    
+    Returns:
+        Dictionary {source: jumlah lookup}
     """
-    global _osrm_cache
-    _osrm_cache.clear()
+    drained = {}
+    for source in _lookup_stats:
+        drained[source] = _lookup_stats[source]
+        _lookup_stats[source] = 0
+    return drained
 
 
-def get_osrm_cache_stats() -> dict:
+def get_osrm_cache_stats(count_disk: bool = False) -> dict:
     """
     Mendapatkan statistik cache OSRM dan Distance Matrix
     
+    Args:
+        count_disk: Hitung jumlah entry SQLite cache OSRM (mahal, hanya untuk admin)
+    
     Returns:
         Dictionary berisi statistik cache
     """
@@ -233,15 +357,24 @@ def get_osrm_cache_stats() -> dict:
             'cached_pairs': len(matrix.matrix),
             'last_updated': matrix.metadata.get('last_updated', 'Unknown'),
             'osrm_success': matrix.metadata.get('osrm_success', 0),
-            'total_destinations': matrix.metadata.get('total_destinations', 0)
+            'total_destinations': matrix.metadata.get('total_destinations', 0),
+            'data_version': matrix.metadata.get('data_version')
         }
     
+    travel_time_cache = get_travel_time_cache(current_profile())
+    key_caches = {'travel_time_matrix': travel_time_cache._key_cache.stats()}
+    if matrix is not None:
+        key_caches['distance_matrix'] = matrix._key_cache.stats()
+    
     return {
         'distance_matrix': matrix_stats,
         'osrm_runtime_cache_size': len(_osrm_cache),
+        'osrm_cache': _osrm_cache.stats(count_disk=count_disk),
+        'key_caches': key_caches,
         'osrm_enabled': USE_OSRM,
         'osrm_base_url': OSRM_BASE_URL,
         'osrm_profile': OSRM_PROFILE,
+        'matrix_profiles': store_stats(),
         'use_distance_matrix': USE_DISTANCE_MATRIX
     }
 
@@ -282,14 +415,13 @@ def set_osrm_profile(profile: str):
         Public OSRM server tidak memiliki profil 'motorcycle' terpisah.
     """
     global OSRM_PROFILE
-    valid_profiles = ['driving', 'bike', 'foot']
-    
-    if profile not in valid_profiles:
-        raise ValueError(f"Invalid profile. Must be one of: {valid_profiles}")
+    validate_profile(profile)
     
     OSRM_PROFILE = profile
-    # Clear cache karena profil berbeda akan menghasilkan jarak berbeda
-    clear_osrm_cache()
+    # Matrix dan cache OSRM dipartisi per profil, jadi tidak perlu dihapus;
+    # matrix profil baru dimuat sekali dan dipakai ulang saat berganti profil lagi
+    preload_profiles([profile])
+    warm_osrm_cache()
 
 
 def recalculate_route_with_osrm(start_point, destinations):
@@ -337,9 +469,17 @@ def recalculate_route_with_osrm(start_point, destinations):
         for dest in destinations:
             coordinates.append(f"{dest.longitude},{dest.latitude}")
         
+        # Rute yang sama (profil + urutan titik) diambil dari cache
+        profile = current_profile()
+        cache_origin = coordinates[0]
+        cache_destination = ";".join(coordinates[1:])
+        cached = _osrm_cache.get(profile, cache_origin, cache_destination)
+        if cached is not None:
+            return dict(cached)
+        
         # Build OSRM route request URL
         coords_string = ";".join(coordinates)
-        url = f"{OSRM_BASE_URL}/route/v1/{OSRM_PROFILE}/{coords_string}"
+        url = f"{OSRM_BASE_URL}/route/v1/{profile}/{coords_string}"
         
         # Parameters: overview=full untuk mendapatkan geometry lengkap
         params = {
@@ -371,13 +511,15 @@ def recalculate_route_with_osrm(start_point, destinations):
         total_duration_minutes = total_duration_seconds / 60.0
         total_duration_hours = total_duration_minutes / 60.0
         
-        return {
+        result = {
             'success': True,
             'total_distance_km': round(total_distance_km, 2),
             'total_duration_minutes': round(total_duration_minutes, 1),
             'total_duration_hours': round(total_duration_hours, 2),
             'geometry': geometry
         }
+        _osrm_cache.set(profile, cache_origin, cache_destination, result)
+        return dict(result)
         
     except requests.exceptions.Timeout:
         return {
@@ -5,7 +5,11 @@ Menggunakan OSRM untuk jarak rute nyata
 import json
 import os
 from typing import Dict, List, Tuple, Optional
-from .distance import calculate_distance_osrm
+from .distance import calculate_distance_osrm, current_profile
+from .atomic_io import write_json_atomic
+from .catalog_diff import coordinate_fingerprint, diff_catalog, record_catalog
+from .matrix_checkpoint import MatrixCheckpoint
+from .pair_keys import PairKeyCache
 from tqdm import tqdm
 import time
 
@@ -15,7 +19,8 @@ class DistanceMatrixCache:
     def __init__(self, cache_file: str = "./data/distance_matrix_osrm.json"):
         self.cache_file = cache_file
         self.matrix: Dict[str, float] = {}
-        self._key_cache: Dict[Tuple, str] = {}  # Cache untuk key lookup
+        self._key_cache = PairKeyCache()  # Cache untuk key lookup (terbatas, hanya pasangan katalog)
+        self._checkpoint = MatrixCheckpoint(cache_file)  # Log append-only selama build
         self.metadata = {
             "total_destinations": 0,
             "total_pairs": 0,
@@ -27,20 +32,7 @@ class DistanceMatrixCache:
         
     def _make_key(self, coord1: Tuple[float, float], coord2: Tuple[float, float]) -> str:
         """Buat key unik untuk pasangan koordinat (dengan caching)"""
-        # Cache lookup key untuk performa
-        cache_key = (coord1, coord2)
-        if cache_key in self._key_cache:
-            return self._key_cache[cache_key]
-        
-        # Sort agar (A,B) = (B,A)
-        coords = sorted([coord1, coord2])
-        key = f"{coords[0][0]:.6f},{coords[0][1]:.6f}|{coords[1][0]:.6f},{coords[1][1]:.6f}"
-        
-        # Simpan ke cache (both directions)
-        self._key_cache[cache_key] = key
-        self._key_cache[(coord2, coord1)] = key
-        
-        return key
+        return self._key_cache.key(coord1, coord2, self.matrix)
     
     def get(self, coord1: Tuple[float, float], coord2: Tuple[float, float]) -> Optional[float]:
         """Ambil jarak dari cache"""
@@ -51,6 +43,8 @@ class DistanceMatrixCache:
         """Simpan jarak ke cache"""
         key = self._make_key(coord1, coord2)
         self.matrix[key] = distance
+        if self._checkpoint.active:
+            self._checkpoint.append(key, distance)
     
     def load(self) -> bool:
         """Load matrix dari file"""
@@ -68,11 +62,43 @@ class DistanceMatrixCache:
             except Exception as e:
                 print(f"⚠ Error loading cache: {e}")
         return False
+
+    @property
+    def checkpoint_active(self) -> bool:
+        """True jika sedang build dengan log checkpoint terbuka"""
+        return self._checkpoint.active
+
+    def begin_checkpoint(self) -> int:
+        """
+        Mulai checkpoint append-only untuk build
+
+        Sisa log dari build yang terhenti di-replay ke matrix terlebih dahulu (resume).
+
+        Returns:
+            Jumlah pasangan yang dipulihkan dari log
+        """
+        replayed = self._checkpoint.open(self.matrix)
+        if replayed:
+            print(f"♻️  Resumed {replayed} distances from checkpoint log {self._checkpoint.path}")
+        return replayed
+
+    def checkpoint(self):
+        """Flush log checkpoint ke disk (pengganti save() periodik selama build)"""
+        self._checkpoint.flush()
+
+    def finish_checkpoint(self, save: bool = True):
+        """
+        Compaction: tulis matrix final secara atomik lalu hapus log
+
+        Args:
+            save: False jika tidak ada perubahan yang perlu ditulis
+        """
+        if save:
+            self.save()
+        self._checkpoint.close(remove=True)
     
     def save(self):
         """Simpan matrix ke file"""
-        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-        
         # Update metadata
         self.metadata['total_pairs'] = len(self.matrix)
         self.metadata['last_updated'] = time.strftime("%Y-%m-%d %H:%M:%S")
@@ -82,12 +108,13 @@ class DistanceMatrixCache:
             'metadata': self.metadata
         }
         
-        with open(self.cache_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Tulis atomik (file sementara + rename) agar file tidak pernah setengah tertulis
+        write_json_atomic(self.cache_file, data, indent=2)
         
         print(f"✓ Saved {len(self.matrix)} distances to {self.cache_file}")
     
-    def build_matrix(self, destinations: List, user_location: Tuple[float, float] = None, max_retries: int = 3):
+    def build_matrix(self, destinations: List, user_location: Tuple[float, float] = None, max_retries: int = 3,
+                     pairs: Optional[List[Tuple[Tuple[float, float], Tuple[float, float]]]] = None):
         """
         Build distance matrix dengan OSRM REAL ROUTES ONLY
         SMART: Hanya hitung pasangan yang belum ada di cache!
@@ -97,6 +124,7 @@ class DistanceMatrixCache:
             destinations: List of Destination objects
             user_location: Optional user location
             max_retries: Jumlah percobaan ulang jika gagal (default: 3)
+            pairs: Hanya hitung pasangan ini (hasil diff katalog); default semua N² pasangan
         """
         print("\n" + "="*70)
         print("🔨 BUILDING DISTANCE MATRIX - OSRM REAL ROUTES ONLY")
@@ -107,20 +135,22 @@ class DistanceMatrixCache:
         if user_location:
             coords.append(user_location)
         
-        total_possible = len(coords) * (len(coords) - 1) // 2
+        # Pulihkan pasangan dari build sebelumnya yang terhenti
+        replayed = self.begin_checkpoint()
+        
+        if pairs is None:
+            pairs = [(coords[i], coords[j]) for i in range(len(coords)) for j in range(i + 1, len(coords))]
+        total_possible = len(pairs)
         already_cached = 0
         to_calculate = []
         
         # Cek mana yang perlu dihitung
         print("\n📊 Analyzing pairs...")
-        for i in range(len(coords)):
-            for j in range(i + 1, len(coords)):
-                coord1, coord2 = coords[i], coords[j]
-                
-                if self.get(coord1, coord2) is not None:
-                    already_cached += 1
-                else:
-                    to_calculate.append((coord1, coord2))
+        for coord1, coord2 in pairs:
+            if self.get(coord1, coord2) is not None:
+                already_cached += 1
+            else:
+                to_calculate.append((coord1, coord2))
         
         print(f"  Total pairs: {total_possible}")
         print(f"  Already cached: {already_cached} ✓")
@@ -128,6 +158,13 @@ class DistanceMatrixCache:
         
         if len(to_calculate) == 0:
             print("\n✅ All distances already cached! No calculation needed.")
+            catalog_changed = self.metadata.get('coordinates') is None or set(self.metadata['coordinates']) != {
+                coordinate_fingerprint(coord) for coord in coords
+            }
+            if catalog_changed:
+                self.metadata['total_destinations'] = len(coords)
+                record_catalog(self.metadata, coords)
+            self.finish_checkpoint(save=replayed > 0 or catalog_changed)
             return
         
         # Hitung yang belum ada
@@ -179,22 +216,20 @@ class DistanceMatrixCache:
                 
                 pbar.update(1)
                 
-                # Save setiap 50 kalkulasi untuk safety
+                # Flush checkpoint setiap 50 kalkulasi untuk safety (append-only, bukan tulis ulang file)
                 if calculated % 50 == 0 and calculated > 0:
-                    # Update metadata sebelum save
-                    self.metadata['osrm_success'] = self.metadata.get('osrm_success', 0) + osrm_success
-                    self.metadata['osrm_fallback'] = 0
-                    osrm_success = 0  # Reset counter setelah save
-                    self.save()
+                    self.checkpoint()
         
         # Update metadata final
         self.metadata['total_destinations'] = len(coords)
         self.metadata['osrm_enabled'] = True
         self.metadata['osrm_success'] = self.metadata.get('osrm_success', 0) + osrm_success
         self.metadata['osrm_fallback'] = 0  # No fallback
+        self.metadata['profile'] = current_profile()
+        record_catalog(self.metadata, coords)
         
-        # Final save
-        self.save()
+        # Final save: compaction log checkpoint ke file matrix
+        self.finish_checkpoint()
         
         print("\n" + "="*70)
         print("✅ DISTANCE MATRIX BUILD COMPLETE!")
@@ -267,21 +302,29 @@ def initialize_distance_cache(destinations: List, user_location: Tuple[float, fl
         # Build/Rebuild matrix
         _distance_cache.build_matrix(destinations, user_location, max_retries=max_retries)
     else:
-        # Auto-detect: cek apakah ada destinasi baru
+        # Auto-detect: diff fingerprint koordinat katalog terhadap matrix tersimpan
         coords = [(d.latitude, d.longitude) for d in destinations]
         if user_location:
             coords.append(user_location)
         
-        # Cek apakah jumlah destinasi berubah
-        cached_dest = _distance_cache.metadata.get('total_destinations', 0)
-        current_dest = len(coords)
-        
-        if current_dest > cached_dest:
-            print(f"\n🔔 Detected new destinations: {cached_dest} → {current_dest}")
-            print("   Running incremental build...")
-            _distance_cache.build_matrix(destinations, user_location, max_retries=max_retries)
-        else:
+        diff = diff_catalog(coords, _distance_cache.metadata, _distance_cache.matrix)
+        if not diff.changed:
             print("✓ Distance cache is up to date!")
+            return
+        
+        print(f"\n🔔 Catalog changed: +{len(diff.added)} / -{len(diff.removed)} coordinates "
+              f"(data version {diff.stored_version} → {diff.data_version})")
+        
+        # Garbage collect pasangan milik koordinat yang sudah tidak ada
+        stale_keys = diff.stale_keys(_distance_cache.matrix)
+        for key in stale_keys:
+            del _distance_cache.matrix[key]
+        if stale_keys:
+            print(f"   Removed {len(stale_keys)} stale pairs")
+        
+        # Hanya baris/kolom koordinat baru yang dihitung
+        print("   Running incremental build...")
+        _distance_cache.build_matrix(destinations, user_location, max_retries=max_retries, pairs=diff.changed_pairs())
 
 def rebuild_distance_cache(destinations: List, user_location: Tuple[float, float] = None, max_retries: int = 3):
     """Force rebuild entire distance matrix - OSRM REAL ROUTES ONLY"""
@@ -302,5 +345,6 @@ def get_cache_stats() -> dict:
         "total_cached_pairs": len(_distance_cache.matrix),
         "cache_file": _distance_cache.cache_file,
         "cache_exists": os.path.exists(_distance_cache.cache_file),
-        "metadata": _distance_cache.metadata
+        # Daftar fingerprint koordinat tidak ikut ditampilkan (bisa ratusan entry)
+        "metadata": {key: value for key, value in _distance_cache.metadata.items() if key != 'coordinates'}
     }
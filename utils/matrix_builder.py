@@ -0,0 +1,213 @@
+"""
+Builder gabungan distance matrix dan travel time matrix
+
+Satu respons OSRM berisi jarak sekaligus waktu tempuh, sehingga kedua matrix diisi
+dari respons yang sama dalam satu kali sweep:
+1. OSRM /table per blok (lihat utils.osrm_table), jika diaktifkan
+2. OSRM /route per pasangan untuk pasangan yang masih kosong
+3. Waktu tempuh estimasi (jarak / kecepatan rata-rata) jika OSRM gagal;
+   distance matrix tetap hanya berisi jarak rute nyata
+
+Sebelum sweep, katalog dibandingkan dengan fingerprint koordinat di metadata kedua
+matrix (lihat utils.catalog_diff): pasangan koordinat yang sudah dihapus dibuang dari
+kedua matrix, dan sweep hanya menghitung baris/kolom koordinat baru. full_scan=True
+memeriksa ulang semua pasangan (mis. untuk mengulang pasangan yang dulu gagal).
+
+Selama build, pasangan baru dicatat ke log checkpoint append-only (lihat
+utils.matrix_checkpoint); di akhir kedua file ditulis atomik sekali dan diberi
+build_id yang sama di metadata.
+"""
+import time
+from typing import Dict, List, Tuple
+
+from tqdm import tqdm
+
+from .catalog_diff import coordinate_fingerprint, diff_catalog, record_catalog
+from .distance import haversine_many
+from .distance_matrix import DistanceMatrixCache
+from .pair_keys import make_pair_key
+from .osrm_table import build_matrices_with_table
+from .travel_time_matrix import TravelTimeMatrixCache, calculate_travel_time_osrm, estimate_travel_time_from_distance
+
+# Flush log checkpoint setiap N pasangan pada sweep per pasangan
+PAIR_CHECKPOINT_EVERY = 100
+
+# Faktor jarak rute terhadap jarak garis lurus untuk estimasi
+HAVERSINE_ROUTE_FACTOR = 1.3
+
+
+Coordinate = Tuple[float, float]
+
+
+def _all_pairs(coords: List[Coordinate]) -> List[Tuple[Coordinate, Coordinate]]:
+    """Semua pasangan i < j"""
+    return [(coords[i], coords[j]) for i in range(len(coords)) for j in range(i + 1, len(coords))]
+
+
+def _missing_pairs(pairs: List[Tuple[Coordinate, Coordinate]],
+                   distance_cache: DistanceMatrixCache,
+                   travel_time_cache: TravelTimeMatrixCache) -> List[Tuple[Coordinate, Coordinate]]:
+    """Pasangan yang belum ada di salah satu matrix"""
+    return [
+        (coord1, coord2) for coord1, coord2 in pairs
+        if distance_cache.get(coord1, coord2) is None or travel_time_cache.get(coord1, coord2) is None
+    ]
+
+
+def _sync_catalog(coords: List[Coordinate],
+                  distance_cache: DistanceMatrixCache,
+                  travel_time_cache: TravelTimeMatrixCache) -> List[Coordinate]:
+    """
+    Diff katalog terhadap kedua matrix dan buang pasangan koordinat yang sudah dihapus
+
+    Returns:
+        Koordinat baru/diubah (gabungan kedua matrix)
+    """
+    added = set()
+    for name, cache in (("distance", distance_cache), ("travel time", travel_time_cache)):
+        diff = diff_catalog(coords, cache.metadata, cache.matrix)
+        if not diff.changed:
+            continue
+        print(f"🔔 {name.capitalize()} matrix: +{len(diff.added)} / -{len(diff.removed)} coordinates "
+              f"(data version {diff.stored_version} → {diff.data_version})")
+        stale_keys = diff.stale_keys(cache.matrix)
+        for key in stale_keys:
+            del cache.matrix[key]
+        if stale_keys:
+            print(f"   Removed {len(stale_keys)} stale pairs")
+        added |= diff.added
+    return [coord for coord in dict.fromkeys(coords) if coordinate_fingerprint(coord) in added]
+
+
+def _changed_pairs(changed: List[Coordinate], coords: List[Coordinate]) -> List[Tuple[Coordinate, Coordinate]]:
+    """Pasangan baris/kolom koordinat yang berubah terhadap seluruh katalog"""
+    pairs = []
+    seen = set()
+    for coord1 in changed:
+        for coord2 in coords:
+            if coord2 == coord1:
+                continue
+            key = make_pair_key(coord1, coord2)
+            if key not in seen:
+                seen.add(key)
+                pairs.append((coord1, coord2))
+    return pairs
+
+
+def build_matrices(destinations: List,
+                   distance_cache: DistanceMatrixCache,
+                   travel_time_cache: TravelTimeMatrixCache,
+                   use_osrm: bool = True,
+                   use_table: bool = True,
+                   max_retries: int = 3,
+                   profile: str = None,
+                   full_scan: bool = False,
+                   **table_options) -> Dict:
+    """
+    Mengisi distance matrix dan travel time matrix dalam satu sweep
+
+    Args:
+        destinations: List destinasi
+        distance_cache: DistanceMatrixCache tujuan (sudah di-load jika ingin incremental)
+        travel_time_cache: TravelTimeMatrixCache tujuan
+        use_osrm: False untuk hanya mengisi travel time estimasi
+        use_table: Gunakan OSRM /table sebelum sweep per pasangan
+        max_retries: Percobaan per pasangan pada sweep per pasangan
+        profile: Profil OSRM (default utils.distance.OSRM_PROFILE); file matrix per profil
+                 lihat utils.matrix_store.matrix_files
+        full_scan: Periksa semua pasangan, bukan hanya baris/kolom koordinat yang berubah
+        **table_options: Diteruskan ke build_matrices_with_table (concurrency, block_size, ...)
+
+    Returns:
+        Statistik build
+    """
+    if profile is None:
+        from .distance import OSRM_PROFILE
+        profile = OSRM_PROFILE
+    coords = [(d.latitude, d.longitude) for d in destinations]
+    unique_coords = list(dict.fromkeys(coords))
+    stats = {'table': None, 'osrm_pairs': 0, 'estimated_pairs': 0, 'failed_pairs': 0}
+
+    # Diff dihitung sebelum replay log checkpoint (matrix lama tanpa metadata
+    # 'coordinates' diturunkan dari key matrix)
+    changed = None if full_scan else _sync_catalog(coords, distance_cache, travel_time_cache)
+    if changed is not None:
+        print(f"📊 Coordinates to compute: {len(changed)} of {len(unique_coords)}")
+
+    # Pulihkan pasangan dari build sebelumnya yang terhenti
+    distance_cache.begin_checkpoint()
+    travel_time_cache.begin_checkpoint()
+
+    # 1. OSRM /table
+    if use_osrm and use_table and changed != []:
+        print("\n📡 OSRM /table sweep...")
+        stats['table'] = build_matrices_with_table(
+            destinations, distance_cache=distance_cache, travel_time_cache=travel_time_cache, profile=profile,
+            changed_coordinates=changed, **table_options
+        )
+
+    # 2. Sweep per pasangan untuk sisa pasangan
+    candidates = _all_pairs(unique_coords) if changed is None else _changed_pairs(changed, unique_coords)
+    missing = _missing_pairs(candidates, distance_cache, travel_time_cache)
+    print(f"\n📊 Pairs still missing: {len(missing)}")
+    if missing:
+        fallback_distances = haversine_many(
+            [coord1[0] for coord1, _ in missing], [coord1[1] for coord1, _ in missing],
+            [coord2[0] for _, coord2 in missing], [coord2[1] for _, coord2 in missing]
+        ).tolist()
+
+        with tqdm(total=len(missing), desc="Progress", unit="pairs", ncols=80) as pbar:
+            for done, ((coord1, coord2), haversine_distance) in enumerate(zip(missing, fallback_distances), start=1):
+                result = None
+                if use_osrm:
+                    for attempt in range(max_retries):
+                        result = calculate_travel_time_osrm(coord1[0], coord1[1], coord2[0], coord2[1], profile=profile)
+                        if result is not None:
+                            break
+                        if attempt < max_retries - 1:
+                            time.sleep(0.3)
+
+                if result is not None:
+                    # Jarak dan waktu dari respons yang sama
+                    duration, distance = result
+                    distance_cache.set(coord1, coord2, distance)
+                    travel_time_cache.set(coord1, coord2, duration, distance, "osrm")
+                    stats['osrm_pairs'] += 1
+                elif travel_time_cache.get(coord1, coord2) is None:
+                    distance = distance_cache.get(coord1, coord2)
+                    if distance is not None:
+                        source = "estimated"
+                    else:
+                        distance = haversine_distance * HAVERSINE_ROUTE_FACTOR
+                        source = "estimated_haversine"
+                    travel_time_cache.set(coord1, coord2, estimate_travel_time_from_distance(distance), distance, source)
+                    stats['estimated_pairs'] += 1
+                else:
+                    stats['failed_pairs'] += 1
+
+                pbar.update(1)
+                if done % PAIR_CHECKPOINT_EVERY == 0:
+                    distance_cache.checkpoint()
+                    travel_time_cache.checkpoint()
+
+    # 3. Metadata konsisten + compaction atomik
+    build_id = time.strftime("%Y%m%dT%H%M%S")
+    for cache in (distance_cache, travel_time_cache):
+        cache.metadata['total_destinations'] = len(coords)
+        cache.metadata['build_id'] = build_id
+        cache.metadata['profile'] = profile
+        record_catalog(cache.metadata, coords)
+    distance_cache.metadata['osrm_enabled'] = use_osrm
+    travel_time_cache.metadata['osrm_success'] = sum(
+        1 for value in travel_time_cache.matrix.values() if value.get('source') == 'osrm'
+    )
+    travel_time_cache.metadata['estimated_fallback'] = sum(
+        1 for value in travel_time_cache.matrix.values() if 'estimated' in value.get('source', '')
+    )
+    distance_cache.finish_checkpoint()
+    travel_time_cache.finish_checkpoint()
+
+    stats['build_id'] = build_id
+    stats['distance_pairs'] = len(distance_cache.matrix)
+    stats['travel_time_pairs'] = len(travel_time_cache.matrix)
+    return stats
@@ -0,0 +1,103 @@
+"""
+Checkpoint append-only untuk build matrix
+
+Selama build, setiap pasangan baru ditambahkan sebagai satu baris JSONL ke file log
+di samping file matrix (<cache_file>.checkpoint.jsonl), bukan menulis ulang seluruh
+JSON matrix. Di akhir build, matrix ditulis sekali secara atomik dan log dihapus
+(compaction). Jika build terhenti, log di-replay saat build berikutnya dimulai sehingga
+pasangan yang sudah dihitung tidak diminta ulang ke OSRM.
+"""
+import json
+import os
+from typing import Any, Dict
+
+
+class MatrixCheckpoint:
+    """
+    Log checkpoint JSONL untuk satu file matrix
+
+    Setiap baris: [key, value]. Baris terakhir yang terpotong (crash saat menulis)
+    diabaikan saat replay.
+    """
+
+    def __init__(self, cache_file: str):
+        self.path = f"{cache_file}.checkpoint.jsonl"
+        self._file = None
+        self.pending = 0
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def replay(self, matrix: Dict[str, Any]) -> int:
+        """
+        Memasukkan isi log (jika ada) ke matrix
+
+        Args:
+            matrix: Dict matrix yang akan di-update
+
+        Returns:
+            Jumlah entry yang di-replay
+        """
+        if not os.path.exists(self.path):
+            return 0
+        replayed = 0
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                try:
+                    key, value = json.loads(raw)
+                except ValueError:
+                    break
+                if not raw.endswith(b'\n'):
+                    break
+                matrix[key] = value
+                replayed += 1
+                valid_bytes += len(raw)
+        # Buang ekor yang rusak agar append berikutnya dimulai di baris baru
+        if valid_bytes != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return replayed
+
+    def open(self, matrix: Dict[str, Any]) -> int:
+        """
+        Replay log lama lalu buka log untuk append
+
+        Returns:
+            Jumlah entry yang di-replay
+        """
+        if self.active:
+            return 0
+        replayed = self.replay(matrix)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'a')
+        return replayed
+
+    def append(self, key: str, value: Any):
+        """Menambahkan satu entry ke log (di-buffer sampai flush)"""
+        self._file.write(json.dumps([key, value], separators=(',', ':')) + "\n")
+        self.pending += 1
+
+    def flush(self):
+        """Menulis buffer ke disk (fsync)"""
+        if not self.active:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.pending = 0
+
+    def close(self, remove: bool = True):
+        """
+        Menutup log
+
+        Args:
+            remove: Hapus file log (dipanggil setelah matrix final tersimpan)
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
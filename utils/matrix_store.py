@@ -0,0 +1,306 @@
+"""
+Penyimpanan distance/travel time matrix per profil OSRM
+
+Setiap profil (driving/bike/foot) punya pasangan file matrix sendiri:
+- driving: ./data/distance_matrix_osrm.json dan ./data/travel_time_matrix_osrm.json
+  (nama file lama, tetap kompatibel)
+- profil lain: ./data/distance_matrix_osrm_<profil>.json dan
+  ./data/travel_time_matrix_osrm_<profil>.json
+
+Matrix dimuat lazily saat pertama kali dipakai lalu disimpan di memory, sehingga
+berganti profil (global atau per request) tidak memuat ulang file. preload_profiles()
+dipanggil saat startup agar request pertama setiap profil tidak menunggu load.
+
+Matrix yang sedang dipakai dikelompokkan dalam satu MatrixGeneration. Reload
+(lihat services.data_snapshot) memuat generasi baru di background lalu menukarnya
+secara atomik; request yang sedang berjalan memakai generasi yang di-pin di awal
+request (pin_generation) sehingga selesai dengan matrix lama.
+
+Dengan MATRIX_DATA_PLANE=1 matrix tidak di-parse dari JSON per proses, melainkan
+dipetakan read-only dari data plane bersama (lihat utils.data_plane).
+"""
+import contextvars
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Profil OSRM yang didukung
+MATRIX_PROFILES = ('driving', 'bike', 'foot')
+
+# Profil yang memakai nama file lama (tanpa suffix profil)
+DEFAULT_MATRIX_PROFILE = 'driving'
+
+# Direktori file matrix
+MATRIX_DIR = "./data"
+
+
+class MatrixGeneration:
+    """
+    Satu set matrix (semua profil) yang dimuat bersama
+
+    Generasi awal (legacy=True) memakai instance global _distance_cache dan
+    _travel_time_cache untuk profil driving; generasi hasil reload selalu membuat
+    instance baru sehingga generasi lama tetap utuh untuk request yang masih berjalan.
+    """
+
+    def __init__(self, legacy: bool = False):
+        self.legacy = legacy
+        self.distance_caches: Dict[str, object] = {}
+        self.travel_time_caches: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def distance_cache(self, profile: str):
+        if profile in self.distance_caches:
+            return self.distance_caches[profile]
+        with self._lock:
+            if profile in self.distance_caches:
+                return self.distance_caches[profile]
+            from .distance_matrix import DistanceMatrixCache, _distance_cache
+            distance_file, _ = matrix_files(profile)
+            if self._attach_shared(profile):
+                return self.distance_caches[profile]
+            if self.legacy and profile == DEFAULT_MATRIX_PROFILE:
+                cache = _distance_cache
+                if len(cache.matrix) == 0:
+                    cache.load()
+            elif profile == DEFAULT_MATRIX_PROFILE or os.path.exists(distance_file):
+                cache = DistanceMatrixCache(distance_file)
+                cache.load()
+            else:
+                cache = None
+            self.distance_caches[profile] = cache
+            return cache
+
+    def travel_time_cache(self, profile: str):
+        cache = self.travel_time_caches.get(profile)
+        if cache is not None:
+            return cache
+        with self._lock:
+            if profile in self.travel_time_caches:
+                return self.travel_time_caches[profile]
+            from .travel_time_matrix import TravelTimeMatrixCache, _travel_time_cache
+            _, travel_time_file = matrix_files(profile)
+            if self._attach_shared(profile):
+                return self.travel_time_caches[profile]
+            if self.legacy and profile == DEFAULT_MATRIX_PROFILE:
+                cache = _travel_time_cache
+            else:
+                cache = TravelTimeMatrixCache(travel_time_file)
+            if len(cache.matrix) == 0 and os.path.exists(cache.cache_file):
+                cache.load()
+            self.travel_time_caches[profile] = cache
+            return cache
+
+    def _attach_shared(self, profile: str) -> bool:
+        """Memetakan kedua matrix profil dari data plane (MATRIX_DATA_PLANE=1); False jika tidak dipakai"""
+        from . import data_plane
+        if not data_plane.DATA_PLANE_ENABLED:
+            return False
+        attached = data_plane.attach_profile(profile)
+        if attached is None:
+            return False
+        self.distance_caches[profile], self.travel_time_caches[profile] = attached
+        return True
+
+    def data_versions(self) -> Dict[str, Optional[str]]:
+        """data_version distance matrix setiap profil yang dimuat"""
+        return {
+            profile: cache.metadata.get('data_version')
+            for profile, cache in self.distance_caches.items() if cache is not None
+        }
+
+    def content_versions(self) -> Dict[str, List]:
+        """Penanda isi setiap matrix yang dimuat (data_version, last_updated, jumlah pasangan)"""
+        versions = {}
+        for kind, caches in (('distance', self.distance_caches), ('travel_time', self.travel_time_caches)):
+            for profile, cache in caches.items():
+                if cache is not None:
+                    versions[f"{kind}:{profile}"] = [
+                        cache.metadata.get('data_version'), cache.metadata.get('last_updated'), len(cache.matrix)
+                    ]
+        return versions
+
+
+_current = MatrixGeneration(legacy=True)
+
+# Generasi yang di-pin untuk request yang sedang berjalan (lihat pin_generation)
+_pinned: contextvars.ContextVar = contextvars.ContextVar('matrix_generation', default=None)
+
+_lock = threading.Lock()
+
+
+def current_generation() -> MatrixGeneration:
+    """Generasi yang berlaku: generasi yang di-pin request, atau generasi terbaru"""
+    return _pinned.get() or _current
+
+
+@contextmanager
+def pin_generation(generation: Optional[MatrixGeneration] = None):
+    """
+    Memakai satu generasi matrix untuk seluruh kode di dalam blok
+
+    Args:
+        generation: Generasi yang di-pin (default: generasi terbaru saat ini)
+    """
+    token = _pinned.set(generation or _current)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def load_generation(profiles: Optional[List[str]] = None) -> MatrixGeneration:
+    """
+    Memuat generasi matrix baru dari file (tanpa mengganti generasi aktif)
+
+    Args:
+        profiles: Profil yang dimuat sekarang (default: semua profil yang punya file)
+
+    Returns:
+        MatrixGeneration baru
+    """
+    generation = MatrixGeneration()
+    for profile in profiles or available_profiles():
+        if generation.distance_cache(profile) is not None:
+            generation.travel_time_cache(profile)
+    return generation
+
+
+def swap_generation(generation: MatrixGeneration) -> MatrixGeneration:
+    """
+    Mengganti generasi aktif secara atomik
+
+    Returns:
+        Generasi sebelumnya
+    """
+    global _current
+    with _lock:
+        previous, _current = _current, generation
+    return previous
+
+
+def matrix_files_signature() -> Tuple:
+    """(path, mtime, size) semua file matrix yang ada, untuk mendeteksi perubahan file"""
+    signature = []
+    for profile in MATRIX_PROFILES:
+        for path in matrix_files(profile):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def validate_profile(profile: str) -> str:
+    """
+    Memastikan profil didukung
+
+    Raises:
+        ValueError: Jika profil tidak dikenal
+    """
+    if profile not in MATRIX_PROFILES:
+        raise ValueError(f"Invalid profile. Must be one of: {list(MATRIX_PROFILES)}")
+    return profile
+
+
+def matrix_files(profile: str) -> Tuple[str, str]:
+    """
+    Path file matrix untuk satu profil
+
+    Args:
+        profile: Profil OSRM
+
+    Returns:
+        Tuple (path distance matrix, path travel time matrix)
+    """
+    validate_profile(profile)
+    suffix = "" if profile == DEFAULT_MATRIX_PROFILE else f"_{profile}"
+    return (
+        os.path.join(MATRIX_DIR, f"distance_matrix_osrm{suffix}.json"),
+        os.path.join(MATRIX_DIR, f"travel_time_matrix_osrm{suffix}.json")
+    )
+
+
+def get_distance_cache(profile: str):
+    """
+    DistanceMatrixCache untuk profil pada generasi aktif (dimuat saat pertama kali dipakai)
+
+    Returns:
+        DistanceMatrixCache, atau None jika profil non-driving belum punya file matrix
+        (jarak dihitung live dengan OSRM profil tersebut)
+    """
+    return current_generation().distance_cache(profile)
+
+
+def get_travel_time_cache(profile: str):
+    """
+    TravelTimeMatrixCache untuk profil pada generasi aktif (dimuat saat pertama kali dipakai)
+
+    Profil tanpa file matrix mendapat cache kosong (waktu tempuh tidak diketahui).
+    """
+    return current_generation().travel_time_cache(profile)
+
+
+def loaded_distance_caches() -> Dict[str, object]:
+    """Distance matrix generasi aktif yang sudah dimuat, per profil (tanpa memicu load)"""
+    return {profile: cache for profile, cache in current_generation().distance_caches.items() if cache is not None}
+
+
+def loaded_travel_time_caches() -> Dict[str, object]:
+    """Travel time matrix generasi aktif yang sudah dimuat, per profil (tanpa memicu load)"""
+    return dict(current_generation().travel_time_caches)
+
+
+def available_profiles() -> List[str]:
+    """Profil yang punya file distance matrix"""
+    return [profile for profile in MATRIX_PROFILES if os.path.exists(matrix_files(profile)[0])]
+
+
+def preload_profiles(profiles: Optional[List[str]] = None) -> List[str]:
+    """
+    Memuat matrix beberapa profil ke memory sekaligus (dipanggil saat startup)
+
+    Args:
+        profiles: Profil yang dimuat (default: semua profil yang punya file matrix)
+
+    Returns:
+        Profil yang berhasil dimuat
+    """
+    loaded = []
+    for profile in profiles or available_profiles():
+        if get_distance_cache(profile) is not None:
+            get_travel_time_cache(profile)
+            loaded.append(profile)
+    return loaded
+
+
+def reset_profile(profile: str):
+    """Lupakan matrix profil yang sudah dimuat (load ulang saat dipakai berikutnya)"""
+    generation = current_generation()
+    with generation._lock:
+        generation.distance_caches.pop(profile, None)
+        generation.travel_time_caches.pop(profile, None)
+
+
+def store_stats() -> Dict:
+    """
+    Statistik matrix per profil
+
+    Returns:
+        Dictionary profil -> {available, loaded, distance_pairs, travel_time_pairs, data_version, shared}
+    """
+    from .data_plane import is_shared
+    stats = {}
+    generation = current_generation()
+    for profile in MATRIX_PROFILES:
+        distance_cache = generation.distance_caches.get(profile)
+        travel_time_cache = generation.travel_time_caches.get(profile)
+        stats[profile] = {
+            'available': os.path.exists(matrix_files(profile)[0]),
+            'loaded': distance_cache is not None,
+            'distance_pairs': len(distance_cache.matrix) if distance_cache is not None else 0,
+            'travel_time_pairs': len(travel_time_cache.matrix) if travel_time_cache is not None else 0,
+            'data_version': distance_cache.metadata.get('data_version') if distance_cache is not None else None,
+            'shared': is_shared(distance_cache)
+        }
+    return stats
@@ -0,0 +1,380 @@
+"""
+Laporan pemakaian memory data yang dimuat dan state solver
+
+Ukuran setiap struktur dihitung dengan menelusuri objek (sys.getsizeof rekursif).
+Objek yang dipakai bersama dihitung sekali, pada struktur pertama yang memilikinya
+(urutan STRUCTURES), sehingga total tidak dihitung ganda. Array yang dipetakan dari
+file (data plane mmap) dilaporkan terpisah sebagai mapped_bytes karena dibagi antar
+proses lewat page cache.
+
+Jika tracemalloc aktif (MEMORY_TRACEMALLOC=1 atau start_tracing()), laporan juga
+berisi total memory yang ditrace dan lokasi alokasi terbesar serta yang paling
+bertambah sejak baseline. Setiap laporan disimpan sebagai sampel sehingga
+pertumbuhan antar laporan (mis. key cache yang tidak terbatas) terlihat.
+"""
+import mmap
+import os
+import sys
+import time
+import tracemalloc
+import types
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Aktifkan tracemalloc saat startup API (ada overhead pada setiap alokasi)
+MEMORY_TRACEMALLOC = os.environ.get("MEMORY_TRACEMALLOC", "0") == "1"
+
+# Jumlah frame traceback yang disimpan tracemalloc per alokasi
+TRACEMALLOC_FRAMES = 1
+
+# Jumlah sampel laporan yang disimpan untuk menghitung pertumbuhan
+MEMORY_HISTORY_SIZE = 120
+
+# Urutan struktur dalam laporan (juga urutan atribusi objek yang dipakai bersama)
+STRUCTURES = (
+    'destinations',
+    'distance_matrix',
+    'travel_time_matrix',
+    'key_cache',
+    'osrm_cache',
+    'dense_matrices',
+    'populations',
+    'histories'
+)
+
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+_SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def deep_sizeof(root, seen: Optional[Set[int]] = None) -> Dict:
+    """
+    Ukuran objek beserta semua objek yang direferensikan
+
+    Args:
+        root: Objek yang diukur
+        seen: id objek yang sudah dihitung (dipakai bersama antar struktur)
+
+    Returns:
+        Dictionary {bytes, objects, mapped_bytes}
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    objects = 0
+    mapped = 0
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIPPED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        objects += 1
+
+        if isinstance(obj, _ATOMIC_TYPES):
+            continue
+        if isinstance(obj, np.ndarray):
+            # getsizeof sudah termasuk buffer jika array memiliki datanya sendiri
+            if isinstance(obj, np.memmap) or isinstance(obj.base, mmap.mmap):
+                mapped += obj.nbytes
+            elif obj.base is not None:
+                stack.append(obj.base)
+            continue
+        try:
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+                stack.extend(obj)
+        except RuntimeError:
+            # Diubah thread lain saat ditelusuri; sisanya dilewati
+            pass
+        instance_dict = getattr(obj, '__dict__', None)
+        if isinstance(instance_dict, dict):
+            stack.append(instance_dict)
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                value = getattr(obj, slot, None)
+                if value is not None:
+                    stack.append(value)
+    return {'bytes': total, 'objects': objects, 'mapped_bytes': mapped}
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size proses saat ini (bytes), None jika tidak tersedia (non-Linux)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+# -----------------------------------------------------------------------------
+# tracemalloc
+# -----------------------------------------------------------------------------
+
+_baseline_snapshot: Optional[tracemalloc.Snapshot] = None
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    # Alokasi tracemalloc sendiri dan import machinery tidak relevan
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+
+
+def start_tracing(frames: int = TRACEMALLOC_FRAMES) -> bool:
+    """
+    Mulai tracemalloc dan simpan snapshot baseline
+
+    Returns:
+        True jika tracing baru dimulai (False jika sudah aktif)
+    """
+    global _baseline_snapshot
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(frames)
+    _baseline_snapshot = _snapshot()
+    return True
+
+
+def stop_tracing():
+    """Hentikan tracemalloc dan buang baseline"""
+    global _baseline_snapshot
+    tracemalloc.stop()
+    _baseline_snapshot = None
+
+
+def _stat_row(stat) -> Dict:
+    frame = stat.traceback[0]
+    row = {
+        'location': f"{os.path.relpath(frame.filename) if os.path.isabs(frame.filename) else frame.filename}:{frame.lineno}",
+        'bytes': stat.size,
+        'count': stat.count
+    }
+    if hasattr(stat, 'size_diff'):
+        row['bytes_diff'] = stat.size_diff
+        row['count_diff'] = stat.count_diff
+    return row
+
+
+def tracemalloc_report(top: int = 10) -> Dict:
+    """
+    Ringkasan tracemalloc: total, lokasi alokasi terbesar, dan pertumbuhan sejak baseline
+
+    Args:
+        top: Jumlah lokasi yang dilaporkan
+
+    Returns:
+        Dictionary (tracing=False jika tracemalloc tidak aktif)
+    """
+    if not tracemalloc.is_tracing():
+        return {'tracing': False}
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = _snapshot()
+    report = {
+        'tracing': True,
+        'traced_bytes': current,
+        'traced_peak_bytes': peak,
+        'top_allocations': [_stat_row(stat) for stat in snapshot.statistics('lineno')[:top]]
+    }
+    if _baseline_snapshot is not None:
+        growth = snapshot.compare_to(_baseline_snapshot, 'lineno')
+        report['top_growth'] = [_stat_row(stat) for stat in growth[:top] if stat.size_diff > 0]
+    return report
+
+
+# -----------------------------------------------------------------------------
+# Struktur data
+# -----------------------------------------------------------------------------
+
+def _structure_roots(destinations: Optional[List]) -> Dict[str, Tuple[List, int]]:
+    """
+    Objek root dan jumlah item setiap struktur (tanpa memicu load matrix yang belum dimuat)
+
+    Returns:
+        Dictionary nama struktur -> (list objek root, jumlah item)
+    """
+    from algorithms.evaluation import _dense_matrices
+    from algorithms.hga import live_instances
+    from algorithms.population import live_populations
+    from utils.distance import _osrm_cache
+    from utils.matrix_store import loaded_distance_caches, loaded_travel_time_caches
+
+    distance_caches = list(loaded_distance_caches().values())
+    travel_time_caches = list(loaded_travel_time_caches().values())
+    key_caches = [cache._key_cache for cache in distance_caches + travel_time_caches]
+    populations = live_populations()
+    histories = [
+        history for hga in live_instances()
+        for history in (hga.best_fitness_history, hga.average_fitness_history)
+    ]
+    return {
+        'destinations': ([destinations], len(destinations)) if destinations is not None else ([], 0),
+        'distance_matrix': (
+            [part for cache in distance_caches for part in (cache.matrix, cache.metadata)],
+            sum(len(cache.matrix) for cache in distance_caches)
+        ),
+        'travel_time_matrix': (
+            [part for cache in travel_time_caches for part in (cache.matrix, cache.metadata)],
+            sum(len(cache.matrix) for cache in travel_time_caches)
+        ),
+        'key_cache': (key_caches, sum(len(key_cache._keys) for key_cache in key_caches)),
+        'osrm_cache': ([_osrm_cache._memory], len(_osrm_cache._memory)),
+        'dense_matrices': ([_dense_matrices], len(_dense_matrices)),
+        'populations': (populations, sum(len(population.chromosomes) for population in populations)),
+        'histories': (histories, sum(len(history) for history in histories))
+    }
+
+
+def measure_structures(destinations: Optional[List] = None) -> Dict[str, Dict]:
+    """
+    Ukuran setiap struktur di STRUCTURES
+
+    Args:
+        destinations: List destinasi yang sedang dipakai (mis. snapshot aktif)
+
+    Returns:
+        Dictionary nama struktur -> {bytes, objects, mapped_bytes, items}
+    """
+    roots = _structure_roots(destinations)
+    seen: Set[int] = set()
+    sizes = {}
+    for name in STRUCTURES:
+        objects, items = roots[name]
+        size = {'bytes': 0, 'objects': 0, 'mapped_bytes': 0, 'items': items}
+        for root in objects:
+            measured = deep_sizeof(root, seen)
+            for key in ('bytes', 'objects', 'mapped_bytes'):
+                size[key] += measured[key]
+        sizes[name] = size
+    return sizes
+
+
+class MemoryTracker:
+    """
+    Menyimpan sampel laporan memory untuk melihat pertumbuhan dari waktu ke waktu
+
+    Pertumbuhan dihitung terhadap sampel pertama (sejak tracker dibuat) dan sampel
+    sebelumnya, per struktur dan untuk RSS proses.
+    """
+
+    def __init__(self, history_size: int = MEMORY_HISTORY_SIZE):
+        self.samples: deque = deque(maxlen=history_size)
+        self.first: Optional[Dict] = None
+
+    def sample(self, destinations: Optional[List] = None) -> Dict:
+        """Mengukur struktur dan RSS lalu menyimpannya sebagai sampel"""
+        structures = measure_structures(destinations)
+        sample = {
+            'timestamp': time.time(),
+            'rss_bytes': current_rss(),
+            'structures': {name: size['bytes'] for name, size in structures.items()}
+        }
+        if self.first is None:
+            self.first = sample
+        self.samples.append(sample)
+        return {'sample': sample, 'structures': structures}
+
+    @staticmethod
+    def _diff(newer: Dict, older: Dict) -> Dict:
+        elapsed = newer['timestamp'] - older['timestamp']
+        structures = {
+            name: value - older['structures'].get(name, 0)
+            for name, value in newer['structures'].items()
+        }
+        rss = None
+        if newer['rss_bytes'] is not None and older['rss_bytes'] is not None:
+            rss = newer['rss_bytes'] - older['rss_bytes']
+        return {
+            'seconds': round(elapsed, 3),
+            'rss_bytes': rss,
+            'structures': structures,
+            'bytes_per_hour': {
+                name: round(diff / elapsed * 3600) for name, diff in structures.items()
+            } if elapsed > 0 else None
+        }
+
+    def growth(self) -> Dict:
+        """Pertumbuhan sejak sampel pertama dan sejak sampel sebelumnya"""
+        if len(self.samples) < 2:
+            return {'samples': len(self.samples), 'since_first': None, 'since_previous': None}
+        latest = self.samples[-1]
+        return {
+            'samples': len(self.samples),
+            'since_first': self._diff(latest, self.first),
+            'since_previous': self._diff(latest, self.samples[-2])
+        }
+
+    def report(self, destinations: Optional[List] = None, top: int = 10) -> Dict:
+        """
+        Laporan lengkap: ukuran struktur, RSS, tracemalloc, dan pertumbuhan
+
+        Args:
+            destinations: List destinasi yang sedang dipakai
+            top: Jumlah lokasi alokasi tracemalloc yang dilaporkan
+
+        Returns:
+            Dictionary laporan (ikut disimpan sebagai sampel)
+        """
+        started = time.perf_counter()
+        measured = self.sample(destinations)
+        structures = measured['structures']
+        return {
+            'pid': os.getpid(),
+            'rss_bytes': measured['sample']['rss_bytes'],
+            'total_bytes': sum(size['bytes'] for size in structures.values()),
+            'total_mapped_bytes': sum(size['mapped_bytes'] for size in structures.values()),
+            'structures': structures,
+            'growth': self.growth(),
+            'tracemalloc': tracemalloc_report(top),
+            'measure_seconds': round(time.perf_counter() - started, 3)
+        }
+
+
+# Tracker proses ini (dipakai endpoint admin dan CLI)
+_tracker = MemoryTracker()
+
+
+def memory_report(destinations: Optional[List] = None, top: int = 10) -> Dict:
+    """Laporan memory proses ini (lihat MemoryTracker.report)"""
+    return _tracker.report(destinations, top)
+
+
+def format_bytes(value: Optional[float]) -> str:
+    """Format ukuran bytes untuk ditampilkan (KB/MB/GB)"""
+    if value is None:
+        return "-"
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{sign}{value:.0f} {unit}" if unit == "B" else f"{sign}{value:.1f} {unit}"
+        value /= 1024
+    return f"{sign}{value:.2f} GB"
+
+
+def format_report(report: Dict) -> str:
+    """Laporan memory dalam bentuk tabel teks (untuk CLI)"""
+    lines = [f"{'Structure':<20} {'Resident':>12} {'Mapped':>12} {'Items':>10} {'Objects':>10} {'Growth':>12}"]
+    since_first = (report['growth'] or {}).get('since_first') or {}
+    growth = since_first.get('structures', {})
+    for name, size in report['structures'].items():
+        lines.append(
+            f"{name:<20} {format_bytes(size['bytes']):>12} {format_bytes(size['mapped_bytes']):>12} "
+            f"{size['items']:>10} {size['objects']:>10} {format_bytes(growth.get(name)) if growth else '-':>12}"
+        )
+    lines.append(f"{'TOTAL':<20} {format_bytes(report['total_bytes']):>12} {format_bytes(report['total_mapped_bytes']):>12}")
+    lines.append(f"Process RSS: {format_bytes(report['rss_bytes'])}"
+                 + (f" (growth {format_bytes(since_first.get('rss_bytes'))})" if since_first else ""))
+    trace = report['tracemalloc']
+    if trace.get('tracing'):
+        lines.append(f"tracemalloc: {format_bytes(trace['traced_bytes'])} traced, "
+                     f"peak {format_bytes(trace['traced_peak_bytes'])}")
+        for row in trace.get('top_growth', []):
+            lines.append(f"  +{format_bytes(row['bytes_diff']):>10}  {row['location']}")
+    return "\n".join(lines)
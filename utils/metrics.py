@@ -0,0 +1,408 @@
+"""
+Metrics sederhana berformat Prometheus (tanpa dependency eksternal)
+
+Menyediakan Counter, Gauge, dan Histogram dengan label, serta registry global yang
+dapat di-render ke text exposition format untuk endpoint /metrics.
+
+Metrics yang direkam di proses worker dikirim kembali ke proses API melalui
+drain_snapshot() / merge_snapshot() sehingga /metrics mencakup semua worker.
+"""
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Bucket default (detik): dari sub-milidetik (evaluasi fitness) hingga menit (job HGA besar)
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0
+)
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: Tuple = ()) -> str:
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = [
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in pairs
+    ]
+    return "{" + ",".join(escaped) + "}"
+
+
+class _Timer:
+    """Context manager untuk mengukur durasi dan mencatatnya ke histogram"""
+
+    __slots__ = ('_child', '_start')
+
+    def __init__(self, child):
+        self._child = child
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _CounterChild:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def get(self) -> float:
+        return self._value
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        self._value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Nilai gauge dibaca dari function saat scrape"""
+        self._function = function
+
+    def get(self) -> float:
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception:
+                return float('nan')
+        return self._value
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)  # slot terakhir = +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def time(self) -> _Timer:
+        """Context manager: `with histogram.time(): ...`"""
+        return _Timer(self)
+
+    def get(self) -> Tuple[List[int], float]:
+        return list(self._counts), self._sum
+
+
+class _Metric:
+    """Base class metric dengan dukungan label"""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *labelvalues, **labelkwargs):
+        """Mendapatkan child metric untuk kombinasi label tertentu"""
+        if labelkwargs:
+            labelvalues = tuple(str(labelkwargs[name]) for name in self.labelnames)
+        else:
+            labelvalues = tuple(str(value) for value in labelvalues)
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}")
+
+        child = self._children.get(labelvalues)
+        if child is None:
+            with self._lock:
+                child = self._children.get(labelvalues)
+                if child is None:
+                    child = self._new_child()
+                    self._children[labelvalues] = child
+        return child
+
+    def _items(self):
+        with self._lock:
+            return list(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+        for labelvalues, child in self._items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(child.get())}")
+        return lines
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def set_function(self, function: Callable[[], float]):
+        self._default.set_function(function)
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return self._default.time()
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+        for labelvalues, child in self._items():
+            counts, total = child.get()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Kumpulan metric yang di-render bersama untuk /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collect_hooks: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collect_hook(self, hook: Callable[[], None]):
+        """Hook yang dijalankan sebelum render/snapshot (mis. flush counter hot-path)"""
+        self._collect_hooks.append(hook)
+
+    def _run_collect_hooks(self):
+        for hook in self._collect_hooks:
+            hook()
+
+    def render(self) -> str:
+        """Render semua metric ke Prometheus text exposition format"""
+        self._run_collect_hooks()
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def drain_snapshot(self) -> List:
+        """
+        Mengambil nilai counter dan histogram lalu me-reset-nya ke nol
+
+        Dipakai di proses worker: snapshot dikirim bersama hasil job dan digabung
+        di proses API dengan merge_snapshot(). Gauge tidak ikut (bersifat lokal).
+
+        Returns:
+            List [name, labelvalues, value] (value = angka atau [counts, sum])
+        """
+        self._run_collect_hooks()
+        snapshot = []
+        for metric in self._metrics.values():
+            if isinstance(metric, Gauge):
+                continue
+            for labelvalues, child in metric._items():
+                with child._lock:
+                    if isinstance(metric, Histogram):
+                        value = [list(child._counts), child._sum]
+                        if not any(child._counts):
+                            continue
+                        child._counts = [0] * len(child._counts)
+                        child._sum = 0.0
+                    else:
+                        value = child._value
+                        if not value:
+                            continue
+                        child._value = 0.0
+                snapshot.append([metric.name, list(labelvalues), value])
+        return snapshot
+
+    def merge_snapshot(self, snapshot: List):
+        """Menambahkan snapshot dari proses lain ke registry ini"""
+        for name, labelvalues, value in snapshot or []:
+            metric = self._metrics.get(name)
+            if metric is None:
+                continue
+            child = metric.labels(*labelvalues)
+            with child._lock:
+                if isinstance(metric, Histogram):
+                    counts, total = value
+                    child._counts = [a + b for a, b in zip(child._counts, counts)]
+                    child._sum += total
+                else:
+                    child._value += value
+
+
+# Registry global
+REGISTRY = MetricsRegistry()
+
+# =============================================================================
+# METRICS ROUTE GENERATION
+# =============================================================================
+
+ROUTE_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "route_request_duration_seconds",
+    "Total waktu satu request route generation (semua attempt HGA + validasi)"
+))
+
+ROUTE_STAGE_DURATION = REGISTRY.register(Histogram(
+    "route_stage_duration_seconds",
+    "Durasi per tahap route generation",
+    labelnames=("stage",)
+))
+
+HGA_ATTEMPTS = REGISTRY.register(Counter(
+    "route_hga_attempts_total",
+    "Jumlah attempt HGA yang dijalankan"
+))
+
+REJECTED_ROUTES = REGISTRY.register(Counter(
+    "route_rejected_routes_total",
+    "Jumlah rute yang ditolak karena jarak OSRM melebihi batas"
+))
+
+ROUTE_TIMEOUTS = REGISTRY.register(Counter(
+    "route_timeouts_total",
+    "Jumlah request route generation yang mencapai timeout"
+))
+
+DISTANCE_LOOKUPS = REGISTRY.register(Counter(
+    "distance_lookups_total",
+    "Jumlah lookup jarak per sumber (matrix_hit, haversine_fallback, haversine_user, osrm)",
+    labelnames=("source",)
+))
+
+DENSE_MATRIX_CELLS_FILLED = REGISTRY.register(Counter(
+    "dense_matrix_cells_filled_total",
+    "Jumlah sel matrix jarak dense (dan vektor titik awal) yang diisi saat dibangun, per sumber (matrix, haversine)",
+    labelnames=("source",)
+))
+
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight",
+    "Jumlah HTTP request yang sedang diproses"
+))
+
+JOB_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "job_queue_depth",
+    "Jumlah job yang menunggu di antrian"
+))
+
+
+KEY_CACHE_SIZE = REGISTRY.register(Gauge(
+    "coordinate_key_cache_entries",
+    "Jumlah entry key cache pasangan koordinat per matrix",
+    labelnames=("cache",)
+))
+
+
+def _flush_distance_lookups():
+    """Pindahkan counter lookup jarak (hot path, tanpa lock) ke registry"""
+    from utils.distance import drain_lookup_stats
+    for source, count in drain_lookup_stats().items():
+        if count:
+            DISTANCE_LOOKUPS.labels(source=source).inc(count)
+
+
+def _flush_dense_matrix_fills():
+    """Pindahkan counter pengisian matrix dense ke registry"""
+    evaluation = sys.modules.get('algorithms.evaluation')
+    if evaluation is None:
+        # Belum ada matrix dense yang dibangun di proses ini
+        return
+    for source, count in evaluation.drain_fill_stats().items():
+        if count:
+            DENSE_MATRIX_CELLS_FILLED.labels(source=source).inc(count)
+
+
+def _update_key_cache_sizes():
+    """Ukuran key cache DistanceMatrixCache / TravelTimeMatrixCache saat scrape (semua profil yang dimuat)"""
+    from utils.matrix_store import loaded_distance_caches, loaded_travel_time_caches
+    KEY_CACHE_SIZE.labels(cache="travel_time_matrix").set(
+        sum(len(cache._key_cache) for cache in loaded_travel_time_caches().values())
+    )
+    KEY_CACHE_SIZE.labels(cache="distance_matrix").set(
+        sum(len(cache._key_cache) for cache in loaded_distance_caches().values())
+    )
+
+
+REGISTRY.add_collect_hook(_flush_distance_lookups)
+REGISTRY.add_collect_hook(_flush_dense_matrix_fills)
+REGISTRY.add_collect_hook(_update_key_cache_sizes)
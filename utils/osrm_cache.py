@@ -0,0 +1,303 @@
+"""
+Cache respons OSRM dua tingkat
+
+- Tingkat 1: LRU in-memory dengan ukuran terbatas
+- Tingkat 2: SQLite lokal (persisten antar restart, dipakai bersama oleh proses worker)
+
+Entry dipartisi per profil OSRM (driving/bike/foot), sehingga mengganti profil tidak
+menghapus cache profil lain. Entry yang lebih tua dari TTL dianggap tidak ada.
+Hanya respons yang berhasil yang disimpan.
+
+Setiap titik awal user baru menambah entry, sehingga SQLite dipangkas berkala dari
+set(): entry kedaluwarsa dihapus dan, jika jumlah entry melewati OSRM_CACHE_MAX_ROWS,
+entry terlama (created_at) ikut dihapus.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Lokasi database cache (kosongkan OSRM_CACHE_DB untuk cache memory saja)
+OSRM_CACHE_DB = os.environ.get("OSRM_CACHE_DB", "./data/osrm_cache.sqlite3")
+
+# Maksimal entry di LRU memory
+OSRM_CACHE_MEMORY_SIZE = int(os.environ.get("OSRM_CACHE_MEMORY_SIZE", "10000"))
+
+# Umur maksimal entry (detik), default 30 hari
+OSRM_CACHE_TTL_SECONDS = int(os.environ.get("OSRM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Jumlah entry terbaru yang dimuat ke memory saat startup
+OSRM_CACHE_WARM_LIMIT = 5000
+
+# Pemangkasan SQLite dijalankan setiap N penulisan
+OSRM_CACHE_PURGE_EVERY_WRITES = int(os.environ.get("OSRM_CACHE_PURGE_EVERY_WRITES", "1000"))
+
+# Maksimal entry di SQLite (0 = tanpa batas, hanya TTL)
+OSRM_CACHE_MAX_ROWS = int(os.environ.get("OSRM_CACHE_MAX_ROWS", "200000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS osrm_cache (
+    profile TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (profile, origin, destination)
+);
+CREATE INDEX IF NOT EXISTS idx_osrm_cache_created_at ON osrm_cache (created_at);
+"""
+
+CacheKey = Tuple[str, str, str]
+
+
+class OSRMResponseCache:
+    """
+    Cache respons OSRM: LRU memory di atas SQLite
+
+    Key entry adalah (profile, origin, destination). Untuk jarak pasangan titik,
+    origin/destination adalah "lat,lon"; untuk rute multi-titik, origin adalah titik
+    awal dan destination adalah daftar titik tujuan yang dipisah ';'.
+    """
+
+    def __init__(self,
+                 db_path: Optional[str] = OSRM_CACHE_DB,
+                 memory_size: int = OSRM_CACHE_MEMORY_SIZE,
+                 ttl_seconds: float = OSRM_CACHE_TTL_SECONDS,
+                 max_rows: int = OSRM_CACHE_MAX_ROWS,
+                 purge_every_writes: int = OSRM_CACHE_PURGE_EVERY_WRITES):
+        self.db_path = db_path or None
+        self.memory_size = memory_size
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.purge_every_writes = max(1, purge_every_writes)
+        self._writes_since_purge = 0
+        self._memory: "OrderedDict[CacheKey, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._connection_pid: Optional[int] = None
+        self.stats_counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'expired': 0, 'writes': 0, 'purged': 0}
+
+    # -------------------------------------------------------------------------
+    # SQLite
+    # -------------------------------------------------------------------------
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """Koneksi SQLite untuk proses ini (dibuka ulang setelah fork)"""
+        if self.db_path is None:
+            return None
+        if self._connection is not None and self._connection_pid == os.getpid():
+            return self._connection
+        try:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        except sqlite3.Error as e:
+            print(f"⚠ OSRM cache database tidak bisa dibuka ({e}), memakai cache memory saja")
+            self.db_path = None
+            self._connection = None
+        return self._connection
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    # -------------------------------------------------------------------------
+    # Memory LRU
+    # -------------------------------------------------------------------------
+
+    def _remember(self, key: CacheKey, value: Any, created_at: float):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    def get(self, profile: str, origin: str, destination: str) -> Optional[Any]:
+        """
+        Mengambil respons dari cache
+
+        Args:
+            profile: Profil OSRM
+            origin: Titik asal
+            destination: Titik tujuan
+
+        Returns:
+            Nilai yang disimpan, atau None jika tidak ada / kedaluwarsa
+        """
+        key = (profile, origin, destination)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self._memory.move_to_end(key)
+                    self.stats_counters['memory_hits'] += 1
+                    return entry[0]
+                del self._memory[key]
+                self.stats_counters['expired'] += 1
+
+            db = self._db()
+            if db is not None:
+                try:
+                    row = db.execute(
+                        "SELECT value, created_at FROM osrm_cache WHERE profile = ? AND origin = ? AND destination = ?",
+                        key
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is not None:
+                    value, created_at = json.loads(row[0]), row[1]
+                    if not self._expired(created_at):
+                        self._remember(key, value, created_at)
+                        self.stats_counters['disk_hits'] += 1
+                        return value
+                    self.stats_counters['expired'] += 1
+
+            self.stats_counters['misses'] += 1
+            return None
+
+    def set(self, profile: str, origin: str, destination: str, value: Any):
+        """
+        Menyimpan respons ke memory dan SQLite
+
+        Args:
+            profile: Profil OSRM
+            origin: Titik asal
+            destination: Titik tujuan
+            value: Nilai yang bisa di-serialize ke JSON
+        """
+        key = (profile, origin, destination)
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, value, created_at)
+            self.stats_counters['writes'] += 1
+            db = self._db()
+            if db is not None:
+                try:
+                    with db:
+                        db.execute(
+                            "INSERT OR REPLACE INTO osrm_cache (profile, origin, destination, value, created_at) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (profile, origin, destination, json.dumps(value), created_at)
+                        )
+                except sqlite3.Error as e:
+                    print(f"⚠ Gagal menyimpan OSRM cache: {e}")
+                self._writes_since_purge += 1
+                if self._writes_since_purge >= self.purge_every_writes:
+                    self._writes_since_purge = 0
+                    self._purge(db)
+
+    def warm(self, profile: str, limit: int = OSRM_CACHE_WARM_LIMIT) -> int:
+        """
+        Memuat entry terbaru satu profil dari SQLite ke memory
+
+        Args:
+            profile: Profil OSRM
+            limit: Maksimal entry yang dimuat
+
+        Returns:
+            Jumlah entry yang dimuat
+        """
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return 0
+            self._purge(db)
+            limit = min(limit, self.memory_size)
+            try:
+                rows = db.execute(
+                    "SELECT origin, destination, value, created_at FROM osrm_cache "
+                    "WHERE profile = ? ORDER BY created_at DESC LIMIT ?",
+                    (profile, limit)
+                ).fetchall()
+            except sqlite3.Error:
+                return 0
+            # Dimasukkan dari yang terlama agar entry terbaru berada di ujung LRU
+            for origin, destination, value, created_at in reversed(rows):
+                self._remember((profile, origin, destination), json.loads(value), created_at)
+            return len(rows)
+
+    def _purge(self, db: sqlite3.Connection):
+        """Menghapus entry kedaluwarsa dan entry terlama di atas max_rows (memakai index created_at)"""
+        try:
+            with db:
+                if self.ttl_seconds > 0:
+                    cursor = db.execute("DELETE FROM osrm_cache WHERE created_at < ?",
+                                        (time.time() - self.ttl_seconds,))
+                    self.stats_counters['purged'] += max(cursor.rowcount, 0)
+                if self.max_rows > 0:
+                    # created_at entry ke-(max_rows + 1) dari yang terbaru; entry setua itu dihapus
+                    row = db.execute("SELECT created_at FROM osrm_cache ORDER BY created_at DESC LIMIT 1 OFFSET ?",
+                                     (self.max_rows,)).fetchone()
+                    if row is not None:
+                        cursor = db.execute("DELETE FROM osrm_cache WHERE created_at <= ?", (row[0],))
+                        self.stats_counters['purged'] += max(cursor.rowcount, 0)
+        except sqlite3.Error:
+            pass
+
+    def clear(self, profile: Optional[str] = None):
+        """
+        Menghapus cache (memory dan SQLite)
+
+        Args:
+            profile: Hanya hapus entry profil ini (None = semua profil)
+        """
+        with self._lock:
+            if profile is None:
+                self._memory.clear()
+            else:
+                for key in [key for key in self._memory if key[0] == profile]:
+                    del self._memory[key]
+            db = self._db()
+            if db is not None:
+                try:
+                    with db:
+                        if profile is None:
+                            db.execute("DELETE FROM osrm_cache")
+                        else:
+                            db.execute("DELETE FROM osrm_cache WHERE profile = ?", (profile,))
+                except sqlite3.Error as e:
+                    print(f"⚠ Gagal menghapus OSRM cache: {e}")
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def stats(self, count_disk: bool = False) -> Dict:
+        """
+        Statistik cache
+
+        Args:
+            count_disk: Hitung jumlah entry SQLite (COUNT(*) atas seluruh tabel, sehingga
+                        hanya untuk endpoint admin; default disk_entries = None)
+
+        Returns:
+            Dictionary berisi ukuran memory/disk, konfigurasi, dan counter hit/miss
+        """
+        with self._lock:
+            disk_entries = None
+            db = self._db() if count_disk else None
+            if db is not None:
+                try:
+                    disk_entries = db.execute("SELECT COUNT(*) FROM osrm_cache").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            lookups = self.stats_counters['memory_hits'] + self.stats_counters['disk_hits'] + self.stats_counters['misses']
+            hits = self.stats_counters['memory_hits'] + self.stats_counters['disk_hits']
+            return {
+                'memory_entries': len(self._memory),
+                'memory_max_entries': self.memory_size,
+                'disk_entries': disk_entries,
+                'db_path': self.db_path,
+                'ttl_seconds': self.ttl_seconds,
+                'max_rows': self.max_rows,
+                **self.stats_counters,
+                'hit_rate': round(hits / lookups, 4) if lookups else None
+            }
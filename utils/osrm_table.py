@@ -0,0 +1,404 @@
+"""
+Builder matrix jarak dan waktu tempuh memakai endpoint OSRM /table
+
+Alih-alih satu request /route per pasangan (N*(N-1)/2 request berurutan), matrix dibagi
+menjadi blok sumber x tujuan dan setiap blok diminta dengan satu request /table
+(annotations=distance,duration). Blok dikirim paralel dengan batas request per detik,
+retry dengan backoff, dan blok yang ditolak karena terlalu besar dipecah dua.
+
+Progress bersifat resumable: blok yang semua pasangannya sudah ada di cache dilewati,
+dan hasil setiap blok langsung ditulis ke cache lewat callback.
+
+Fungsi fetch bisa diganti (mis. stand-in OSRM lokal untuk testing):
+    fetch(url: str, params: dict, timeout: float) -> dict (JSON respons OSRM)
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from .catalog_diff import record_catalog
+
+# Konfigurasi default builder
+OSRM_TABLE_BLOCK_SIZE = 50  # Jumlah sumber / tujuan per blok (public OSRM membatasi ukuran table)
+OSRM_TABLE_CONCURRENCY = 4  # Request paralel
+OSRM_TABLE_RATE_LIMIT = 5.0  # Request per detik (semua thread)
+OSRM_TABLE_MAX_RETRIES = 5
+OSRM_TABLE_TIMEOUT = 30  # Timeout per request (detik)
+OSRM_TABLE_BACKOFF_SECONDS = 0.5  # Backoff awal, dikali 2 setiap retry
+
+# Kode respons OSRM yang berarti blok terlalu besar untuk server
+_TOO_BIG_CODES = ('TooBig', 'TooBigRequest')
+
+Block = Tuple[int, int, int, int]  # (row_start, row_end, col_start, col_end)
+
+
+class OSRMTableError(Exception):
+    """Error dari endpoint OSRM /table"""
+
+    def __init__(self, message: str, code: Optional[str] = None, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+        self.status_code = status_code
+
+
+def fetch_json(url: str, params: Dict, timeout: float) -> Dict:
+    """
+    Fetch default: GET ke OSRM dan kembalikan JSON
+
+    Raises:
+        OSRMTableError: Jika HTTP status bukan 200 atau respons bukan JSON
+    """
+    try:
+        response = requests.get(url, params=params, timeout=timeout)
+    except requests.RequestException as e:
+        raise OSRMTableError(f"OSRM request failed: {e}")
+    try:
+        data = response.json()
+    except ValueError:
+        data = {}
+    if response.status_code != 200:
+        raise OSRMTableError(
+            f"OSRM returned HTTP {response.status_code}",
+            code=data.get('code'), status_code=response.status_code
+        )
+    return data
+
+
+class RateLimiter:
+    """Membatasi jumlah request per detik untuk semua thread, dengan perlambatan adaptif"""
+
+    def __init__(self, rate: float):
+        self.base_interval = 1.0 / rate if rate > 0 else 0.0
+        self.interval = self.base_interval
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    def slow_down(self):
+        """Gandakan jarak antar request (mis. setelah HTTP 429)"""
+        with self._lock:
+            self.interval = max(self.interval * 2, 0.1)
+
+    def speed_up(self):
+        """Kembali perlahan ke rate awal setelah request berhasil"""
+        with self._lock:
+            self.interval = max(self.base_interval, self.interval * 0.9)
+
+
+def triangle_blocks(size: int, block_size: int, row_limit: Optional[int] = None) -> List[Block]:
+    """
+    Blok yang menutupi semua pasangan (i, j) dengan i < j
+
+    Args:
+        size: Jumlah titik
+        block_size: Ukuran sisi blok
+        row_limit: Hanya pasangan dengan i < row_limit (None = semua)
+
+    Returns:
+        List blok (row_start, row_end, col_start, col_end), row blok <= col blok
+    """
+    row_limit = size if row_limit is None else min(row_limit, size)
+    starts = list(range(0, size, block_size))
+    blocks = []
+    for a, row_start in enumerate(starts):
+        if row_start >= row_limit:
+            break
+        row_end = min(row_start + block_size, row_limit)
+        for col_start in starts[a:]:
+            blocks.append((row_start, row_end, col_start, min(col_start + block_size, size)))
+    return blocks
+
+
+def _block_pairs(block: Block):
+    row_start, row_end, col_start, col_end = block
+    for i in range(row_start, row_end):
+        for j in range(max(col_start, i + 1), col_end):
+            yield i, j
+
+
+class OSRMTableBuilder:
+    """
+    Membangun jarak (km) dan waktu tempuh (menit) antar titik dengan OSRM /table
+
+    Args:
+        coordinates: List koordinat (latitude, longitude)
+        base_url: URL server OSRM
+        profile: Profil OSRM
+        block_size: Jumlah sumber / tujuan per request
+        concurrency: Jumlah request paralel
+        rate_limit: Maksimal request per detik
+        max_retries: Percobaan per blok sebelum dianggap gagal
+        fetch: Fungsi fetch (default fetch_json)
+    """
+
+    def __init__(self,
+                 coordinates: Sequence[Tuple[float, float]],
+                 base_url: str,
+                 profile: str = "driving",
+                 block_size: int = OSRM_TABLE_BLOCK_SIZE,
+                 concurrency: int = OSRM_TABLE_CONCURRENCY,
+                 rate_limit: float = OSRM_TABLE_RATE_LIMIT,
+                 max_retries: int = OSRM_TABLE_MAX_RETRIES,
+                 timeout: float = OSRM_TABLE_TIMEOUT,
+                 fetch: Callable[[str, Dict, float], Dict] = None):
+        self.coordinates = [tuple(coordinate) for coordinate in coordinates]
+        self.base_url = base_url.rstrip('/')
+        self.profile = profile
+        self.block_size = max(1, block_size)
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(1, max_retries)
+        self.timeout = timeout
+        self.fetch = fetch or fetch_json
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.stats = {'requests': 0, 'retries': 0, 'splits': 0, 'failed_blocks': 0, 'skipped_blocks': 0, 'pairs': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[name] += amount
+
+    def _request_block(self, block: Block) -> Dict:
+        """Satu request /table untuk blok; kembalikan JSON respons"""
+        row_start, row_end, col_start, col_end = block
+        rows = list(range(row_start, row_end))
+        # Kolom yang sudah termasuk di rows tidak perlu diulang di daftar koordinat
+        cols = [j for j in range(col_start, col_end) if not row_start <= j < row_end]
+        points = rows + cols
+        position = {index: k for k, index in enumerate(points)}
+
+        # OSRM memakai format lon,lat
+        coordinate_string = ";".join(
+            f"{self.coordinates[index][1]},{self.coordinates[index][0]}" for index in points
+        )
+        url = f"{self.base_url}/table/v1/{self.profile}/{coordinate_string}"
+        params = {
+            'sources': ";".join(str(position[i]) for i in rows),
+            'destinations': ";".join(str(position[j]) for j in range(col_start, col_end)),
+            'annotations': 'distance,duration'
+        }
+        self.rate_limiter.wait()
+        self._count('requests')
+        data = self.fetch(url, params, self.timeout)
+        if data.get('code') != 'Ok':
+            raise OSRMTableError(f"OSRM returned code: {data.get('code')}", code=data.get('code'))
+        self._check_shape(data, len(rows), col_end - col_start)
+        return data
+
+    @staticmethod
+    def _check_shape(data: Dict, rows: int, cols: int):
+        """
+        Memastikan distances dan durations berukuran rows x cols
+
+        Raises:
+            OSRMTableError: Jika bentuk respons tidak cocok dengan blok
+        """
+        for name in ('distances', 'durations'):
+            matrix = data.get(name)
+            if not isinstance(matrix, list) or len(matrix) != rows:
+                raise OSRMTableError(f"OSRM /table {name} has {len(matrix) if isinstance(matrix, list) else 'no'} rows, expected {rows}")
+            for row in matrix:
+                if not isinstance(row, list) or len(row) != cols:
+                    raise OSRMTableError(f"OSRM /table {name} row has wrong length, expected {cols}")
+
+    def _fetch_block(self, block: Block) -> List[Tuple[Block, Optional[Dict]]]:
+        """
+        Fetch satu blok dengan retry adaptif
+
+        Returns:
+            List (blok, data) - lebih dari satu jika blok dipecah; data None jika gagal
+        """
+        for attempt in range(self.max_retries):
+            try:
+                data = self._request_block(block)
+                self.rate_limiter.speed_up()
+                return [(block, data)]
+            except OSRMTableError as e:
+                row_start, row_end, col_start, col_end = block
+                too_big = e.code in _TOO_BIG_CODES or e.status_code == 413
+                if too_big and (row_end - row_start > 1 or col_end - col_start > 1):
+                    # Pecah sisi terpanjang menjadi dua lalu fetch masing-masing
+                    self._count('splits')
+                    if row_end - row_start >= col_end - col_start:
+                        middle = (row_start + row_end) // 2
+                        halves = [(row_start, middle, col_start, col_end), (middle, row_end, col_start, col_end)]
+                    else:
+                        middle = (col_start + col_end) // 2
+                        halves = [(row_start, row_end, col_start, middle), (row_start, row_end, middle, col_end)]
+                    results = []
+                    for half in halves:
+                        results.extend(self._fetch_block(half))
+                    return results
+                if e.status_code == 429:
+                    self.rate_limiter.slow_down()
+            except (requests.RequestException, ValueError):
+                pass
+            if attempt < self.max_retries - 1:
+                self._count('retries')
+                backoff = OSRM_TABLE_BACKOFF_SECONDS * (2 ** attempt)
+                time.sleep(backoff + random.uniform(0, backoff / 2))
+        self._count('failed_blocks')
+        return [(block, None)]
+
+    def _block_values(self, block: Block, data: Dict):
+        """Iterasi (i, j, distance_km, duration_minutes) dari respons blok"""
+        row_start, _, col_start, _ = block
+        # Bentuk respons sudah dicek di _request_block
+        distances = data['distances']
+        durations = data['durations']
+        for i, j in _block_pairs(block):
+            r, c = i - row_start, j - col_start
+            distance = distances[r][c]
+            duration = durations[r][c]
+            # null = tidak ada rute
+            if distance is None or duration is None:
+                continue
+            yield i, j, distance / 1000.0, duration / 60.0
+
+    def build(self,
+              on_pair: Callable[[int, int, float, float], None],
+              is_cached: Callable[[int, int], bool] = None,
+              on_block_done: Callable[[Block, int], None] = None,
+              progress: Callable[[int], None] = None,
+              row_limit: Optional[int] = None) -> Dict:
+        """
+        Membangun matrix untuk semua pasangan i < j
+
+        Args:
+            on_pair: Dipanggil untuk setiap pasangan berhasil: on_pair(i, j, distance_km, duration_minutes)
+            is_cached: Jika diberikan, blok yang semua pasangannya sudah di-cache dilewati
+            on_block_done: Dipanggil setelah satu blok selesai ditulis (mis. untuk save berkala)
+            progress: Dipanggil dengan jumlah pasangan yang selesai diproses per blok
+            row_limit: Hanya pasangan dengan i < row_limit (titik yang berubah diletakkan
+                       di awal coordinates, lihat build_matrices_with_table)
+
+        Returns:
+            Statistik build (requests, retries, splits, failed_blocks, skipped_blocks, pairs)
+        """
+        pending = []
+        for block in triangle_blocks(len(self.coordinates), self.block_size, row_limit):
+            if is_cached is not None and all(is_cached(i, j) for i, j in _block_pairs(block)):
+                self._count('skipped_blocks')
+                if progress is not None:
+                    progress(sum(1 for _ in _block_pairs(block)))
+                continue
+            pending.append(block)
+
+        # Callback dipanggil di thread pemanggil, jadi cache tidak perlu thread-safe
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [executor.submit(self._fetch_block, block) for block in pending]
+            for future in as_completed(futures):
+                for block, data in future.result():
+                    written = 0
+                    if data is not None:
+                        for i, j, distance_km, duration_minutes in self._block_values(block, data):
+                            on_pair(i, j, distance_km, duration_minutes)
+                            written += 1
+                    self._count('pairs', written)
+                    if progress is not None:
+                        progress(sum(1 for _ in _block_pairs(block)))
+                    if on_block_done is not None:
+                        on_block_done(block, written)
+        return dict(self.stats)
+
+
+def build_matrices_with_table(destinations: List,
+                              distance_cache=None,
+                              travel_time_cache=None,
+                              base_url: str = None,
+                              profile: str = None,
+                              save_every_blocks: int = 10,
+                              changed_coordinates: Optional[Sequence[Tuple[float, float]]] = None,
+                              **builder_options) -> Dict:
+    """
+    Mengisi DistanceMatrixCache dan/atau TravelTimeMatrixCache dari OSRM /table
+
+    Pasangan yang sudah ada di cache (semua cache yang diberikan) dilewati per blok. Hasil
+    ditulis ke log checkpoint append-only dan di-flush setiap beberapa blok sehingga build
+    yang terputus bisa dilanjutkan; file matrix ditulis sekali di akhir.
+
+    Args:
+        destinations: List destinasi (butuh latitude, longitude)
+        distance_cache: DistanceMatrixCache (opsional)
+        travel_time_cache: TravelTimeMatrixCache (opsional)
+        base_url: URL OSRM (default utils.distance.OSRM_BASE_URL)
+        profile: Profil OSRM (default utils.distance.OSRM_PROFILE)
+        save_every_blocks: Flush log checkpoint setiap N blok
+        changed_coordinates: Jika diberikan, hanya pasangan yang menyentuh koordinat ini
+                             (baris/kolom koordinat baru) yang diminta
+        **builder_options: Diteruskan ke OSRMTableBuilder (block_size, concurrency, fetch, ...)
+
+    Returns:
+        Statistik build
+    """
+    import utils.distance as distance_module
+    from tqdm import tqdm
+
+    caches = [cache for cache in (distance_cache, travel_time_cache) if cache is not None]
+    # Checkpoint yang dibuka di sini juga di-compact di sini (build_matrices membuka sendiri)
+    owned_checkpoints = [cache for cache in caches if not cache.checkpoint_active]
+    for cache in owned_checkpoints:
+        cache.begin_checkpoint()
+    coordinates = [(d.latitude, d.longitude) for d in destinations]
+    row_limit = None
+    if changed_coordinates is not None:
+        # Koordinat yang berubah di awal: pasangan i < row_limit = baris/kolom yang berubah
+        changed = list(dict.fromkeys(tuple(coord) for coord in changed_coordinates))
+        changed_set = set(changed)
+        coordinates = changed + [coord for coord in dict.fromkeys(coordinates) if coord not in changed_set]
+        row_limit = len(changed)
+    builder = OSRMTableBuilder(
+        coordinates,
+        base_url=base_url or distance_module.OSRM_BASE_URL,
+        profile=profile or distance_module.OSRM_PROFILE,
+        **builder_options
+    )
+
+    def is_cached(i: int, j: int) -> bool:
+        return all(cache.get(coordinates[i], coordinates[j]) is not None for cache in caches)
+
+    def on_pair(i: int, j: int, distance_km: float, duration_minutes: float):
+        if distance_cache is not None:
+            distance_cache.set(coordinates[i], coordinates[j], distance_km)
+        if travel_time_cache is not None:
+            travel_time_cache.set(coordinates[i], coordinates[j], duration_minutes, distance_km, "osrm")
+
+    completed_blocks = [0]
+
+    def on_block_done(block: Block, written: int):
+        completed_blocks[0] += 1
+        if completed_blocks[0] % save_every_blocks == 0:
+            for cache in caches:
+                cache.checkpoint()
+
+    total_pairs = sum(
+        sum(1 for _ in _block_pairs(block))
+        for block in triangle_blocks(len(coordinates), builder.block_size, row_limit)
+    )
+    with tqdm(total=total_pairs, desc="Progress", unit="pairs", ncols=80) as pbar:
+        stats = builder.build(on_pair, is_cached=is_cached, on_block_done=on_block_done, progress=pbar.update,
+                              row_limit=row_limit)
+
+    for cache in caches:
+        cache.metadata['profile'] = builder.profile
+    if distance_cache is not None:
+        distance_cache.metadata['total_destinations'] = len(destinations)
+        distance_cache.metadata['osrm_enabled'] = True
+    if travel_time_cache is not None:
+        travel_time_cache.metadata['total_destinations'] = len(destinations)
+    for cache in caches:
+        record_catalog(cache.metadata, coordinates)
+        cache.checkpoint()
+    for cache in owned_checkpoints:
+        cache.finish_checkpoint()
+    return stats
@@ -0,0 +1,101 @@
+"""
+Key pasangan koordinat untuk DistanceMatrixCache dan TravelTimeMatrixCache
+
+Key berbentuk "lat,lon|lat,lon" (6 desimal, koordinat diurutkan agar (A,B) = (B,A)).
+Membentuk string ini cukup mahal, sehingga key pasangan disimpan di cache. Cache dibatasi
+ukurannya dan hanya menyimpan pasangan yang ada di matrix (pasangan antar destinasi
+katalog). Pasangan dengan koordinat di luar katalog (mis. lokasi user yang berbeda-beda
+setiap request) tidak disimpan, sehingga memori tetap datar walaupun API berjalan lama.
+"""
+from typing import Container, Dict, Tuple
+
+# Maksimal entry key cache (satu pasangan = 2 entry, untuk kedua arah)
+KEY_CACHE_MAX_SIZE = 65536
+
+
+def make_pair_key(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> str:
+    """
+    Membuat key unik untuk pasangan koordinat
+
+    Args:
+        coord1: Koordinat pertama (latitude, longitude)
+        coord2: Koordinat kedua (latitude, longitude)
+
+    Returns:
+        Key "lat,lon|lat,lon"
+    """
+    # Sort agar (A,B) = (B,A)
+    coords = sorted([coord1, coord2])
+    return f"{coords[0][0]:.6f},{coords[0][1]:.6f}|{coords[1][0]:.6f},{coords[1][1]:.6f}"
+
+
+class PairKeyCache:
+    """
+    Cache key pasangan koordinat dengan ukuran terbatas
+
+    Entry terlama dibuang (FIFO) jika cache penuh. Key untuk pasangan yang tidak ada
+    di matrix selalu dibentuk ulang tanpa disimpan (bypass).
+    """
+
+    def __init__(self, max_size: int = KEY_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._keys: Dict[Tuple, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def key(self, coord1: Tuple[float, float], coord2: Tuple[float, float], known_keys: Container[str]) -> str:
+        """
+        Mendapatkan key pasangan koordinat
+
+        Args:
+            coord1: Koordinat pertama
+            coord2: Koordinat kedua
+            known_keys: Key yang ada di matrix; hanya pasangan ini yang disimpan di cache
+
+        Returns:
+            Key "lat,lon|lat,lon"
+        """
+        cache_key = (coord1, coord2)
+        key = self._keys.get(cache_key)
+        if key is not None:
+            self.hits += 1
+            return key
+
+        key = make_pair_key(coord1, coord2)
+        if key not in known_keys:
+            self.bypassed += 1
+            return key
+
+        self.misses += 1
+        while self._keys and len(self._keys) + 2 > self.max_size:
+            del self._keys[next(iter(self._keys))]
+        # Simpan ke cache (both directions)
+        self._keys[cache_key] = key
+        self._keys[(coord2, coord1)] = key
+        return key
+
+    def clear(self):
+        """Mengosongkan cache dan statistik"""
+        self._keys.clear()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def stats(self) -> Dict:
+        """
+        Statistik key cache
+
+        Returns:
+            Dictionary berisi size, max_size, hits, misses, bypassed
+        """
+        return {
+            'size': len(self._keys),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'bypassed': self.bypassed
+        }
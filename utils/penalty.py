@@ -17,6 +17,9 @@ MAX_ROUTE_TIME_HOURS = 5.0
 # Maximum travel time dalam menit (untuk komputasi internal)
 MAX_ROUTE_TIME_MINUTES = MAX_ROUTE_TIME_HOURS * 60  # 300 menit
 
+# Batas jarak untuk status feasible (lebih longgar dari batas penalty)
+FEASIBLE_DISTANCE_KM = 24.0
+
 # =============================================================================
 # PENALTY WEIGHTS
 # =============================================================================
@@ -104,6 +107,20 @@ def calculate_total_penalty(total_distance_km: float, total_time_minutes: float)
     return distance_penalty + time_penalty
 
 
+def is_within_constraints(total_distance_km: float, total_time_minutes: float) -> bool:
+    """
+    Mengecek apakah rute feasible (tidak melanggar batas jarak maupun waktu)
+    
+    Args:
+        total_distance_km: Total jarak rute dalam km
+        total_time_minutes: Total waktu tempuh dalam menit
+        
+    Returns:
+        True jika feasible
+    """
+    return total_distance_km <= FEASIBLE_DISTANCE_KM and total_time_minutes <= MAX_ROUTE_TIME_MINUTES
+
+
 def get_constraint_violation_info(total_distance_km: float, total_time_minutes: float) -> dict:
     """
     Mendapatkan informasi detail tentang pelanggaran constraint
@@ -115,7 +132,7 @@ def get_constraint_violation_info(total_distance_km: float, total_time_minutes:
     Returns:
         Dictionary berisi informasi pelanggaran constraint
     """
-    distance_violated = total_distance_km > 24.0
+    distance_violated = total_distance_km > FEASIBLE_DISTANCE_KM
     time_violated = total_time_minutes > MAX_ROUTE_TIME_MINUTES
     
     return {
@@ -136,7 +153,7 @@ def get_constraint_violation_info(total_distance_km: float, total_time_minutes:
             'penalty': round(calculate_time_penalty(total_time_minutes), 6)
         },
         'total_penalty': round(calculate_total_penalty(total_distance_km, total_time_minutes), 6),
-        'is_feasible': not distance_violated and not time_violated
+        'is_feasible': is_within_constraints(total_distance_km, total_time_minutes)
     }
 
 
@@ -0,0 +1,152 @@
+"""
+Profiling on-demand untuk request route generation
+
+Menjalankan satu request di bawah cProfile (deterministic profiler) dan menghasilkan
+ringkasan per fungsi, dengan fokus pada hot path HGA dan panggilan OSRM.
+"""
+import cProfile
+import importlib
+import inspect
+import itertools
+import os
+import pstats
+import time
+from typing import Dict, List, Optional
+
+# Direktori untuk menyimpan file .prof (bisa dibuka dengan snakeviz / pstats)
+PROFILE_OUTPUT_DIR = "./profiles"
+
+# Nomor urut file .prof per proses (nama file unik walau detiknya sama)
+_save_counter = itertools.count(1)
+
+# Jumlah fungsi teratas (berdasarkan cumulative time) dalam ringkasan
+PROFILE_TOP_FUNCTIONS = 25
+
+# Fungsi yang selalu dilaporkan: nama tampilan -> (file relatif, nama fungsi)
+# Nama dengan titik (Class.method) dicocokkan juga dengan baris pertama fungsinya,
+# karena cProfile hanya mencatat nama pendek (mis. semua __init__ dalam satu file)
+PROFILE_TARGETS = {
+    'Chromosome.calculate_fitness': (os.path.join('algorithms', 'chromosome.py'), 'calculate_fitness'),
+    'TwoOptOptimizer.optimize_with_constraints': (os.path.join('algorithms', 'two_opt.py'), 'optimize_with_constraints'),
+    'TwoOptOptimizer.optimize': (os.path.join('algorithms', 'two_opt.py'), 'optimize'),
+    'TwoOptOptimizer._calculate_route_distance': (os.path.join('algorithms', 'two_opt.py'), '_calculate_route_distance'),
+    'evaluate_route': (os.path.join('algorithms', 'evaluation.py'), 'evaluate_route'),
+    'DenseMatrices.__init__': (os.path.join('algorithms', 'evaluation.py'), 'DenseMatrices.__init__'),
+    'Population.initialize_random_population': (os.path.join('algorithms', 'population.py'), 'initialize_random_population'),
+    'Population.evaluate_fitness': (os.path.join('algorithms', 'population.py'), 'evaluate_fitness'),
+    'calculate_distance_osrm': (os.path.join('utils', 'distance.py'), 'calculate_distance_osrm'),
+    'recalculate_route_with_osrm': (os.path.join('utils', 'distance.py'), 'recalculate_route_with_osrm'),
+}
+
+
+def _target_matcher(relative_file: str, funcname: str):
+    """(nama pendek, nomor baris pertama atau None) untuk mencocokkan key pstats"""
+    if '.' not in funcname:
+        return funcname, None
+    qualname = funcname
+    funcname = qualname.rsplit('.', 1)[1]
+    module_name = os.path.splitext(relative_file)[0].replace(os.sep, '.')
+    try:
+        target = importlib.import_module(module_name)
+        for part in qualname.split('.'):
+            target = getattr(target, part)
+        return funcname, inspect.unwrap(target).__code__.co_firstlineno
+    except (ImportError, AttributeError):
+        return funcname, -1
+
+
+def _function_label(key) -> str:
+    filename, lineno, funcname = key
+    if filename == '~':
+        return funcname
+    return f"{os.path.relpath(filename) if os.path.isabs(filename) else filename}:{lineno}({funcname})"
+
+
+def _row(key, value) -> Dict:
+    primitive_calls, total_calls, tottime, cumtime, _ = value
+    return {
+        'function': _function_label(key),
+        'ncalls': total_calls,
+        'primitive_calls': primitive_calls,
+        'tottime_ms': round(tottime * 1000, 3),
+        'cumtime_ms': round(cumtime * 1000, 3),
+        'per_call_us': round(cumtime / total_calls * 1e6, 3) if total_calls else 0.0
+    }
+
+
+class RequestProfiler:
+    """
+    Context manager untuk memprofile satu request
+
+    Contoh:
+        with RequestProfiler() as profiler:
+            ...
+        summary = profiler.summary()
+    """
+
+    def __init__(self, top_n: int = PROFILE_TOP_FUNCTIONS):
+        self.top_n = top_n
+        self._profiler = cProfile.Profile()
+        self._wall_start = None
+        self.wall_time = None
+
+    def __enter__(self):
+        self._wall_start = time.perf_counter()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._profiler.disable()
+        self.wall_time = time.perf_counter() - self._wall_start
+        return False
+
+    def summary(self) -> Dict:
+        """
+        Ringkasan hasil profiling
+
+        Returns:
+            Dictionary berisi wall time, statistik fungsi target, dan fungsi teratas
+        """
+        stats = pstats.Stats(self._profiler).stats
+
+        targets = {}
+        for label, (relative_file, funcname) in PROFILE_TARGETS.items():
+            funcname, lineno = _target_matcher(relative_file, funcname)
+            matches = [
+                (key, value) for key, value in stats.items()
+                if key[2] == funcname and os.path.normpath(key[0]).endswith(relative_file)
+                and (lineno is None or key[1] == lineno)
+            ]
+            if matches:
+                key, value = matches[0]
+                targets[label] = _row(key, value)
+            else:
+                targets[label] = None
+
+        top: List = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:self.top_n]
+
+        return {
+            'profiler': 'cProfile',
+            'wall_time_ms': round(self.wall_time * 1000, 3) if self.wall_time is not None else None,
+            'targets': targets,
+            'top_functions': [_row(key, value) for key, value in top]
+        }
+
+    def save(self, output_dir: str = PROFILE_OUTPUT_DIR, prefix: str = "request") -> Optional[str]:
+        """
+        Simpan hasil profiling mentah ke file .prof
+
+        Returns:
+            Path file, atau None jika gagal menyimpan
+        """
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            path = os.path.join(
+                output_dir,
+                f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{next(_save_counter)}.prof"
+            )
+            self._profiler.dump_stats(path)
+            return path
+        except OSError as e:
+            print(f"⚠ Could not save profile: {e}")
+            return None
@@ -10,6 +10,13 @@ import requests
 import time
 from tqdm import tqdm
 
+import numpy as np
+
+from .atomic_io import write_json_atomic
+from .catalog_diff import record_catalog
+from .matrix_checkpoint import MatrixCheckpoint
+from .pair_keys import PairKeyCache
+
 # OSRM API Configuration
 OSRM_BASE_URL = "http://router.project-osrm.org"
 OSRM_PROFILE = "driving"  # Options: 'driving', 'bike', 'foot'
@@ -21,7 +28,8 @@ OSRM_MAX_RETRIES = 3  # Maximum retry attempts
 AVERAGE_SPEED_KMH = 50  # Kecepatan rata-rata motor di Surabaya (urban traffic)
 
 
-def calculate_travel_time_osrm(lat1: float, lon1: float, lat2: float, lon2: float) -> Optional[Tuple[float, float]]:
+def calculate_travel_time_osrm(lat1: float, lon1: float, lat2: float, lon2: float,
+                               profile: str = None) -> Optional[Tuple[float, float]]:
     """
     Menghitung waktu tempuh rute nyata antara dua titik menggunakan OSRM API
     
@@ -30,12 +38,13 @@ def calculate_travel_time_osrm(lat1: float, lon1: float, lat2: float, lon2: floa
         lon1: Longitude titik pertama
         lat2: Latitude titik kedua
         lon2: Longitude titik kedua
+        profile: Profil OSRM (default: OSRM_PROFILE)
         
     Returns:
         Tuple (duration_minutes, distance_km), atau None jika gagal
     """
     # Format: longitude,latitude (OSRM menggunakan lon,lat bukan lat,lon!)
-    url = f"{OSRM_BASE_URL}/route/v1/{OSRM_PROFILE}/{lon1},{lat1};{lon2},{lat2}"
+    url = f"{OSRM_BASE_URL}/route/v1/{profile or OSRM_PROFILE}/{lon1},{lat1};{lon2},{lat2}"
     params = {
         'overview': 'false',  # Tidak butuh geometry
         'steps': 'false'
@@ -99,7 +108,8 @@ class TravelTimeMatrixCache:
     def __init__(self, cache_file: str = "./data/travel_time_matrix_osrm.json"):
         self.cache_file = cache_file
         self.matrix: Dict[str, Dict] = {}  # key -> {duration: float, distance: float, source: str}
-        self._key_cache: Dict[Tuple, str] = {}  # Cache untuk key lookup
+        self._key_cache = PairKeyCache()  # Cache untuk key lookup (terbatas, hanya pasangan katalog)
+        self._checkpoint = MatrixCheckpoint(cache_file)  # Log append-only selama build
         self.metadata = {
             "total_destinations": 0,
             "total_pairs": 0,
@@ -111,20 +121,7 @@ class TravelTimeMatrixCache:
         
     def _make_key(self, coord1: Tuple[float, float], coord2: Tuple[float, float]) -> str:
         """Buat key unik untuk pasangan koordinat (dengan caching)"""
-        # Cache lookup key untuk performa
-        cache_key = (coord1, coord2)
-        if cache_key in self._key_cache:
-            return self._key_cache[cache_key]
-        
-        # Sort agar (A,B) = (B,A) - untuk undirected travel time
-        coords = sorted([coord1, coord2])
-        key = f"{coords[0][0]:.6f},{coords[0][1]:.6f}|{coords[1][0]:.6f},{coords[1][1]:.6f}"
-        
-        # Simpan ke cache (both directions)
-        self._key_cache[cache_key] = key
-        self._key_cache[(coord2, coord1)] = key
-        
-        return key
+        return self._key_cache.key(coord1, coord2, self.matrix)
     
     def get(self, coord1: Tuple[float, float], coord2: Tuple[float, float]) -> Optional[Dict]:
         """
@@ -162,6 +159,8 @@ class TravelTimeMatrixCache:
             'distance': round(distance, 4),
             'source': source
         }
+        if self._checkpoint.active:
+            self._checkpoint.append(key, self.matrix[key])
     
     def load(self) -> bool:
         """Load matrix dari file"""
@@ -179,11 +178,43 @@ class TravelTimeMatrixCache:
             except Exception as e:
                 print(f"⚠ Error loading cache: {e}")
         return False
+
+    @property
+    def checkpoint_active(self) -> bool:
+        """True jika sedang build dengan log checkpoint terbuka"""
+        return self._checkpoint.active
+
+    def begin_checkpoint(self) -> int:
+        """
+        Mulai checkpoint append-only untuk build
+
+        Sisa log dari build yang terhenti di-replay ke matrix terlebih dahulu (resume).
+
+        Returns:
+            Jumlah pasangan yang dipulihkan dari log
+        """
+        replayed = self._checkpoint.open(self.matrix)
+        if replayed:
+            print(f"♻️  Resumed {replayed} travel times from checkpoint log {self._checkpoint.path}")
+        return replayed
+
+    def checkpoint(self):
+        """Flush log checkpoint ke disk (pengganti save() periodik selama build)"""
+        self._checkpoint.flush()
+
+    def finish_checkpoint(self, save: bool = True):
+        """
+        Compaction: tulis matrix final secara atomik lalu hapus log
+
+        Args:
+            save: False jika tidak ada perubahan yang perlu ditulis
+        """
+        if save:
+            self.save()
+        self._checkpoint.close(remove=True)
     
     def save(self):
         """Simpan matrix ke file"""
-        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-        
         # Update metadata
         self.metadata['total_pairs'] = len(self.matrix)
         self.metadata['last_updated'] = time.strftime("%Y-%m-%d %H:%M:%S")
@@ -193,15 +224,16 @@ class TravelTimeMatrixCache:
             'metadata': self.metadata
         }
         
-        with open(self.cache_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Tulis atomik (file sementara + rename) agar file tidak pernah setengah tertulis
+        write_json_atomic(self.cache_file, data, indent=2)
         
         print(f"✓ Saved {len(self.matrix)} travel times to {self.cache_file}")
     
     def build_matrix(self, destinations: List, 
                      distance_matrix_file: str = "./data/distance_matrix_osrm.json",
                      use_osrm: bool = True,
-                     max_retries: int = 3):
+                     max_retries: int = 3,
+                     profile: str = None):
         """
         Build travel time matrix
         
@@ -214,7 +246,9 @@ class TravelTimeMatrixCache:
             distance_matrix_file: Path ke distance matrix (untuk fallback)
             use_osrm: Gunakan OSRM API atau tidak
             max_retries: Jumlah percobaan ulang jika gagal
+            profile: Profil OSRM (default: OSRM_PROFILE, lihat utils.matrix_store.matrix_files)
         """
+        profile = profile or OSRM_PROFILE
         print("\n" + "="*70)
         print("🕐 BUILDING TRAVEL TIME MATRIX")
         print("="*70)
@@ -239,6 +273,9 @@ class TravelTimeMatrixCache:
         # Kumpulkan koordinat
         coords = [(d.latitude, d.longitude) for d in destinations]
         
+        # Pulihkan pasangan dari build sebelumnya yang terhenti
+        replayed = self.begin_checkpoint()
+        
         total_possible = len(coords) * (len(coords) - 1) // 2
         already_cached = 0
         to_calculate = []
@@ -260,6 +297,7 @@ class TravelTimeMatrixCache:
         
         if len(to_calculate) == 0:
             print("\n✅ All travel times already cached! No calculation needed.")
+            self.finish_checkpoint(save=replayed > 0)
             return
         
         # Hitung yang belum ada
@@ -275,8 +313,16 @@ class TravelTimeMatrixCache:
         estimated_count = 0
         failed_count = 0
         
+        # Jarak haversine (last resort) untuk semua pasangan dihitung sekaligus
+        from .distance import haversine_many
+        pair_coords = np.array(to_calculate, dtype=np.float64)
+        haversine_distances = haversine_many(
+            pair_coords[:, 0, 0], pair_coords[:, 0, 1],
+            pair_coords[:, 1, 0], pair_coords[:, 1, 1]
+        ).tolist()
+        
         with tqdm(total=len(to_calculate), desc="Progress", unit="pairs", ncols=80) as pbar:
-            for coord1, coord2 in to_calculate:
+            for (coord1, coord2), haversine_distance in zip(to_calculate, haversine_distances):
                 duration = None
                 distance = None
                 source = None
@@ -286,7 +332,8 @@ class TravelTimeMatrixCache:
                     for attempt in range(max_retries):
                         result = calculate_travel_time_osrm(
                             coord1[0], coord1[1],
-                            coord2[0], coord2[1]
+                            coord2[0], coord2[1],
+                            profile=profile
                         )
                         
                         if result is not None:
@@ -309,12 +356,8 @@ class TravelTimeMatrixCache:
                         source = "estimated"
                         estimated_count += 1
                     else:
-                        # Hitung jarak haversine sebagai last resort
-                        from .distance import calculate_distance_haversine
-                        distance = calculate_distance_haversine(
-                            coord1[0], coord1[1],
-                            coord2[0], coord2[1]
-                        )
+                        # Jarak haversine sebagai last resort
+                        distance = haversine_distance
                         # Apply multiplier untuk estimasi rute (1.3x dari garis lurus)
                         distance = distance * 1.3
                         duration = estimate_travel_time_from_distance(distance)
@@ -330,20 +373,20 @@ class TravelTimeMatrixCache:
                 
                 pbar.update(1)
                 
-                # Save setiap 100 kalkulasi untuk safety
+                # Flush checkpoint setiap 100 kalkulasi untuk safety (append-only, bukan tulis ulang file)
                 if (osrm_success + estimated_count) % 100 == 0:
-                    self.metadata['osrm_success'] = osrm_success
-                    self.metadata['estimated_fallback'] = estimated_count
-                    self.save()
+                    self.checkpoint()
         
         # Update metadata final
         self.metadata['total_destinations'] = len(coords)
         self.metadata['osrm_success'] = osrm_success
         self.metadata['estimated_fallback'] = estimated_count
         self.metadata['average_speed_kmh'] = AVERAGE_SPEED_KMH
+        self.metadata['profile'] = profile
+        record_catalog(self.metadata, coords)
         
-        # Final save
-        self.save()
+        # Final save: compaction log checkpoint ke file matrix
+        self.finish_checkpoint()
         
         print("\n" + "="*70)
         print("✅ TRAVEL TIME MATRIX BUILD COMPLETE!")
@@ -382,10 +425,17 @@ class TravelTimeMatrixCache:
         }
 
 
-# Global instance untuk digunakan di seluruh aplikasi
+# Global instance untuk digunakan di seluruh aplikasi (profil driving)
 _travel_time_cache = TravelTimeMatrixCache()
 
 
+def _active_travel_time_cache() -> TravelTimeMatrixCache:
+    """Travel time matrix profil aktif (lazy load, lihat utils.matrix_store)"""
+    from .distance import current_profile
+    from .matrix_store import get_travel_time_cache
+    return get_travel_time_cache(current_profile())
+
+
 def get_travel_time(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> Optional[float]:
     """
     Helper function untuk mendapatkan waktu tempuh dalam menit
@@ -397,13 +447,7 @@ def get_travel_time(coord1: Tuple[float, float], coord2: Tuple[float, float]) ->
     Returns:
         Waktu tempuh dalam menit, atau None jika tidak ada
     """
-    global _travel_time_cache
-    
-    # Load jika belum
-    if len(_travel_time_cache.matrix) == 0:
-        _travel_time_cache.load()
-    
-    return _travel_time_cache.get_duration(coord1, coord2)
+    return _active_travel_time_cache().get_duration(coord1, coord2)
 
 
 def get_travel_time_and_distance(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> Optional[Dict]:
@@ -413,10 +457,4 @@ def get_travel_time_and_distance(coord1: Tuple[float, float], coord2: Tuple[floa
     Returns:
         Dict dengan keys: duration (menit), distance (km), source
     """
-    global _travel_time_cache
-    
-    # Load jika belum
-    if len(_travel_time_cache.matrix) == 0:
-        _travel_time_cache.load()
-    
-    return _travel_time_cache.get(coord1, coord2)
+    return _active_travel_time_cache().get(coord1, coord2)